@@ -0,0 +1,91 @@
+# bench_caching.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+import shutil
+import tempfile
+
+import numpy as np
+from pyquaternion import Quaternion
+
+from xamla_motion.cache import Cache
+from xamla_motion.data_types import JointSet, JointTrajectory, Pose
+
+from .bench_trajectory import create_trajectory
+
+num_positions = 100
+rotations = [Quaternion(axis=[0.0, 0.0, 1.0], angle=a)
+             for a in np.linspace(-np.pi / 2, np.pi / 2, 4)]
+
+
+def create_cached_trajectories(num_positions, num_points=50):
+    joint_set = JointSet(['joint{}'.format(i) for i in range(1, 7)])
+    trajectory = JointTrajectory(joint_set,
+                                 create_trajectory(joint_set, num_points))
+    positions = np.random.RandomState(0).uniform(-0.5, 0.5,
+                                                 (num_positions, 3))
+    poses = [tuple(Pose(p, q) for q in rotations) for p in positions]
+    trajectories = [tuple(trajectory for _ in rotations)
+                    for _ in positions]
+    return positions, poses, trajectories
+
+
+class CacheSuite(object):
+
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        _, poses, trajectories = create_cached_trajectories(num_positions)
+        self.cache = Cache('benchmark', self.directory)
+        self.cache.add('trajectories', (poses, trajectories))
+        self.cache.dump()
+
+    def teardown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_dump(self):
+        self.cache.dump()
+
+    def time_load(self):
+        Cache('benchmark', self.directory).load()
+
+
+class TaskTrajectoryCacheSuite(object):
+
+    def setup(self):
+        try:
+            from sklearn.neighbors import BallTree
+            from xamla_motion.trajectory_caching import (TaskTrajectoryCache,
+                                                         TrajectoryCacheType)
+        except ImportError:
+            raise NotImplementedError('sklearn is not available')
+
+        positions, poses, trajectories = create_cached_trajectories(num_positions)
+        self.start = Pose.identity()
+        self.cache = TaskTrajectoryCache(start=self.start,
+                                         target=poses,
+                                         trajectory=trajectories,
+                                         start_ball_tree=None,
+                                         target_ball_tree=BallTree(positions),
+                                         end_effector_name='tool',
+                                         cache_type=TrajectoryCacheType.ONETOMANY)
+        self.targets = [Pose(p + 0.001, rotations[1]) for p in positions[:20]]
+
+    def time_get_trajectory(self):
+        for target in self.targets:
+            self.cache.get_trajectory(self.start, target, 0.01)
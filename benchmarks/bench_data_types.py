@@ -0,0 +1,127 @@
+# bench_data_types.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+import numpy as np
+from pyquaternion import Quaternion
+
+from xamla_motion.data_types import (CartesianPath, JointSet, JointValues, Pose,
+                                     PoseArray)
+
+joint_names = ['joint{}'.format(i) for i in range(1, 8)]
+
+
+class JointValuesSuite(object):
+
+    def setup(self):
+        self.joint_set = JointSet(joint_names)
+        self.values = np.linspace(-1.0, 1.0, len(joint_names))
+        self.a = JointValues(self.joint_set, self.values)
+        self.b = JointValues(self.joint_set, self.values[::-1])
+        self.reordered = JointSet(joint_names[::-1])
+
+    def time_construct(self):
+        JointValues(self.joint_set, self.values)
+
+    def time_add(self):
+        self.a + self.b
+
+    def time_sub(self):
+        self.a - self.b
+
+    def time_scalar_mul(self):
+        self.a * 0.5
+
+    def time_getitem_name(self):
+        self.a['joint4']
+
+    def time_reorder(self):
+        self.a.reorder(self.reordered)
+
+    def time_select(self):
+        self.a.select(['joint2', 'joint5'])
+
+
+class JointSetSuite(object):
+
+    def setup(self):
+        self.joint_set = JointSet(joint_names)
+        self.other = JointSet(joint_names[2:] + ['gripper'])
+
+    def time_construct(self):
+        JointSet(joint_names)
+
+    def time_get_index_of(self):
+        self.joint_set.get_index_of('joint6')
+
+    def time_contains(self):
+        'joint6' in self.joint_set
+
+    def time_union(self):
+        self.joint_set.union(self.other)
+
+    def time_is_subset(self):
+        self.joint_set.is_subset(self.other)
+
+
+class PoseSuite(object):
+
+    def setup(self):
+        rotation = Quaternion(axis=[0.0, 0.0, 1.0], angle=0.3)
+        self.a = Pose([0.1, 0.2, 0.3], rotation)
+        self.b = Pose([0.3, -0.1, 0.2], rotation.inverse)
+        self.matrix = self.a.transformation_matrix()
+
+    def time_construct(self):
+        Pose([0.1, 0.2, 0.3], self.a.quaternion)
+
+    def time_from_transformation_matrix(self):
+        Pose.from_transformation_matrix(self.matrix)
+
+    def time_mul_pose(self):
+        self.a * self.b
+
+    def time_mul_point(self):
+        self.a * np.array([0.1, 0.2, 0.3])
+
+    def time_inverse(self):
+        self.a.inverse('inverse')
+
+    def time_transformation_matrix(self):
+        self.a.transformation_matrix()
+
+    def time_eq(self):
+        self.a == self.b
+
+
+class CartesianPathSuite(object):
+
+    def setup(self):
+        random = np.random.RandomState(0)
+        poses = [Pose(random.uniform(-1.0, 1.0, 3),
+                      Quaternion(random.normal(size=4)).normalised)
+                 for _ in range(100)]
+        self.path = CartesianPath(poses)
+        self.pose_array = PoseArray.from_poses(poses)
+
+    def time_densify(self):
+        self.path.densify(0.01, 0.05)
+
+    def time_densify_pose_array(self):
+        self.pose_array.densify(0.01, 0.05)
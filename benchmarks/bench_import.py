@@ -0,0 +1,46 @@
+# bench_import.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+
+source_dir = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src')
+
+
+class ImportSuite(object):
+
+    # each call starts a fresh interpreter, time_startup is the
+    # part of time_import_package which is not spent in the import
+
+    def setup(self):
+        self.env = dict(os.environ)
+        self.env['PYTHONPATH'] = os.pathsep.join(
+            p for p in (source_dir, os.environ.get('PYTHONPATH')) if p)
+
+    def run(self, code):
+        subprocess.check_call([sys.executable, '-c', code], env=self.env)
+
+    def time_startup(self):
+        self.run('pass')
+
+    def time_import_package(self):
+        self.run('import xamla_motion')
@@ -0,0 +1,103 @@
+# bench_trajectory.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from xamla_motion.data_types import (IkResults, JointSet, JointTrajectory,
+                                     JointTrajectoryPoint, JointValues)
+
+num_points = 200
+
+
+def create_trajectory(joint_set, num_points, dt=0.01, phase=0.0):
+    n = len(joint_set)
+    points = []
+    for i in range(num_points):
+        t = i * dt
+        positions = np.sin(t + phase + np.arange(n))
+        velocities = np.cos(t + phase + np.arange(n))
+        points.append(JointTrajectoryPoint(timedelta(seconds=t),
+                                           JointValues(joint_set, positions),
+                                           JointValues(joint_set, velocities)))
+    return points
+
+
+class JointTrajectorySuite(object):
+
+    def setup(self):
+        self.joint_set = JointSet(['joint{}'.format(i) for i in range(1, 7)])
+        self.points = create_trajectory(self.joint_set, num_points)
+        self.trajectory = JointTrajectory(self.joint_set, self.points)
+
+        other_joint_set = JointSet(['gripper', 'rail'])
+        self.other = JointTrajectory(other_joint_set,
+                                     create_trajectory(other_joint_set,
+                                                       num_points // 2,
+                                                       dt=0.02, phase=1.0))
+        self.query_times = [timedelta(seconds=t)
+                            for t in np.linspace(0.0, 1.98, 50)]
+
+    def time_construct(self):
+        JointTrajectory(self.joint_set, self.points)
+
+    def time_evaluate_at(self):
+        for t in self.query_times:
+            self.trajectory.evaluate_at(t)
+
+    def time_positions(self):
+        self.trajectory.positions
+
+    def time_merge(self):
+        JointTrajectory.merge(self.trajectory, self.other)
+
+    def time_to_joint_trajectory_msg(self):
+        self.trajectory.to_joint_trajectory_msg()
+
+    def time_retime(self):
+        self.trajectory.retime(1.5)
+
+    def time_decimate(self):
+        self.trajectory.decimate(1e-4)
+
+
+class IkResultsSuite(object):
+
+    def setup(self):
+        # shaped like the response of the ik service
+        self.joint_set = JointSet(['joint{}'.format(i) for i in range(1, 7)])
+        self.solutions = [SimpleNamespace(positions=list(np.random.rand(6)))
+                          for _ in range(num_points)]
+        self.error_codes = [SimpleNamespace(val=1)
+                            for _ in range(num_points)]
+
+    def time_from_response(self):
+        # decoding as done by MotionService.query_inverse_kinematics_many
+        solutions = np.array([p.positions for p in self.solutions],
+                             dtype=float).reshape(-1, len(self.joint_set))
+        IkResults.from_arrays(self.joint_set, solutions,
+                              self.error_codes).succeeded
+
+    def time_path(self):
+        IkResults.from_arrays(self.joint_set,
+                              [p.positions for p in self.solutions],
+                              self.error_codes).path
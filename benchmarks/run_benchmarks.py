@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# run_benchmarks.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+"""
+Run the client side benchmarks and compare them against a baseline
+
+Benchmarks are written in the asv style: classes in the bench_*
+modules of this package with time_* methods and optional setup
+and teardown methods. A setup which raises NotImplementedError
+skips the suite, e.g. if an optional dependency is missing.
+
+Timings are only comparable on the same machine, so no baseline
+is committed. The saved baseline notes machine and python version.
+
+Examples
+--------
+Record the baseline of the unchanged tree
+
+    python3 benchmarks/run_benchmarks.py --save /tmp/baseline.json
+
+Check the working tree for regressions of more than 20 percent
+
+    python3 benchmarks/run_benchmarks.py --compare /tmp/baseline.json
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import platform
+import sys
+import timeit
+
+benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+repository_dir = os.path.dirname(benchmark_dir)
+
+
+def discover(pattern=''):
+    """
+    Find all benchmarks whose name contains pattern
+
+    Returns
+    -------
+    List[Tuple[str, type, str]]
+        Name, suite class and method name of each benchmark
+    """
+
+    benchmarks = []
+    for module_info in sorted(pkgutil.iter_modules([benchmark_dir]),
+                              key=lambda m: m.name):
+        if not module_info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module('benchmarks.' + module_info.name)
+        for class_name, suite in inspect.getmembers(module, inspect.isclass):
+            if suite.__module__ != module.__name__:
+                continue
+            for method_name in sorted(vars(suite)):
+                if not method_name.startswith('time_'):
+                    continue
+                name = '{}.{}.{}'.format(module_info.name, class_name,
+                                         method_name)
+                if pattern in name:
+                    benchmarks.append((name, suite, method_name))
+    return benchmarks
+
+
+def measure(suite, method_name, repeat=5, min_time=0.2):
+    """
+    Measure the best time per call of a benchmark in seconds
+
+    Returns
+    -------
+    float or None
+        Seconds per call, None if the suite was skipped
+    """
+
+    instance = suite()
+    try:
+        if hasattr(instance, 'setup'):
+            instance.setup()
+    except NotImplementedError:
+        return None
+
+    try:
+        timer = timeit.Timer(getattr(instance, method_name))
+        number, elapsed = timer.autorange()
+        # scale the number of calls so that each repetition takes min_time
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+        return min(timer.repeat(repeat=repeat, number=number)) / number
+    finally:
+        if hasattr(instance, 'teardown'):
+            instance.teardown()
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results against a baseline
+
+    Returns
+    -------
+    List[Tuple[str, float]]
+        Name and ratio of all benchmarks which are slower than
+        the baseline by more than threshold
+    """
+
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        reference = baseline.get(name)
+        if seconds is None or reference is None:
+            continue
+        ratio = seconds / reference
+        if ratio > 1.0 + threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('-k', dest='pattern', default='',
+                        help='only run benchmarks whose name contains pattern')
+    parser.add_argument('--save', metavar='FILE',
+                        help='store results as new baseline')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare results against baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slowdown (default 0.2)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of repetitions (default 5)')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.join(repository_dir, 'src'))
+    sys.path.insert(0, repository_dir)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            recorded = json.load(f)
+        baseline = recorded['results']
+        if recorded.get('machine') != platform.node():
+            print('warning: baseline was recorded on {}, timings of other'
+                  ' machines are not comparable'.format(
+                      recorded.get('machine')))
+
+    results = {}
+    for name, suite, method_name in discover(args.pattern):
+        seconds = measure(suite, method_name, repeat=args.repeat)
+        results[name] = seconds
+        if seconds is None:
+            print('{:<64} skipped'.format(name))
+            continue
+        line = '{:<64} {:>12.2f} us'.format(name, seconds * 1e6)
+        if name in baseline:
+            line += '  {:>6.2f}x'.format(seconds / baseline[name])
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'machine': platform.node(),
+                       'python': platform.python_version(),
+                       'results': {k: v for k, v in results.items()
+                                   if v is not None}},
+                      f, indent=2, sort_keys=True)
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, ratio in regressions:
+        print('regression: {} is {:.2f}x slower than baseline'.format(name,
+                                                                       ratio))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,69 @@
 #!/usr/bin/env python3
 name = "xamla_motion"
-from .gripper_client import (CommonGripper, CommonGripperProperties,
-                             WeissWsgGripper, WeissWsgGripperProperties)
-from .motion_client import EndEffector, MoveGroup
-from .motion_operations import (MoveCartesianArgs,
-                                MoveCartesianCollisionFreeOperation,
-                                MoveCartesianLinearOperation,
-                                MoveCartesianOperation, MoveJointsArgs,
-                                MoveJointsCollisionFreeOperation,
-                                MoveJointsOperation)
-from .motion_service import MotionService, SteppedMotionClient
-from .robot_chat_client import RobotChatClient, RobotChatSteppedMotion
-from .world_view_client import WorldViewClient
 
-from .cache import Cache
+import importlib
+import sys
 
+# public names and the submodules which define them, submodules are
+# imported on first access so `import xamla_motion` stays cheap and
+# ros message packages of grippers and robochat are only loaded on use
+_lazy_attributes = {
+    'CommonGripper': '.gripper_client',
+    'CommonGripperProperties': '.gripper_client',
+    'GripperGroup': '.gripper_client',
+    'GripperGroupResult': '.gripper_client',
+    'WeissWsgGripper': '.gripper_client',
+    'WeissWsgGripperProperties': '.gripper_client',
+    'EndEffector': '.motion_client',
+    'MoveGroup': '.motion_client',
+    'MoveCartesianArgs': '.motion_operations',
+    'MoveCartesianCollisionFreeOperation': '.motion_operations',
+    'MoveCartesianLinearOperation': '.motion_operations',
+    'MoveCartesianOperation': '.motion_operations',
+    'MoveJointsArgs': '.motion_operations',
+    'MoveJointsCollisionFreeOperation': '.motion_operations',
+    'MoveJointsOperation': '.motion_operations',
+    'MotionService': '.motion_service',
+    'SteppedMotionClient': '.motion_service',
+    'RobotChatClient': '.robot_chat_client',
+    'RobotChatSteppedMotion': '.robot_chat_client',
+    'WorldViewClient': '.world_view_client',
+    'Cache': '.cache',
+    'FakeMotionServer': '.fake_motion_server',
+    'FakeTransport': '.transport',
+    'ReachabilityMap': '.reachability_map',
+    'CallPolicy': '.service_call',
+    'ServiceTimeout': '.service_call',
+    'bind_deadline': '.service_call',
+    'deadline': '.service_call',
+    'get_service_statistics': '.service_call',
+    'set_call_policy': '.service_call',
+}
+
+__all__ = list(_lazy_attributes)
+
+if sys.version_info >= (3, 7):
+    def __getattr__(attr):
+        module_name = _lazy_attributes.get(attr)
+        if module_name is None:
+            # subpackages and submodules, e.g. xamla_motion.data_types
+            if not attr.startswith('_'):
+                try:
+                    return importlib.import_module('.' + attr, __name__)
+                except ModuleNotFoundError as exc:
+                    if exc.name != __name__ + '.' + attr:
+                        raise
+            raise AttributeError('module {!r} has no attribute'
+                                 ' {!r}'.format(__name__, attr))
+
+        value = getattr(importlib.import_module(module_name, __name__), attr)
+        globals()[attr] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_lazy_attributes))
+else:
+    # module level __getattr__ is not supported, import eagerly
+    for _attr, _module_name in _lazy_attributes.items():
+        globals()[_attr] = getattr(importlib.import_module(_module_name,
+                                                           __name__), _attr)
@@ -2,23 +2,28 @@
 
 from .joint_set import JointSet
 from .joint_values import JointValues
-from .joint_values_collision import JointValuesCollisions
+from .joint_values_collision import JointValuesCollisions, JointPathCollisions
 from .joint_states import JointStates
 from .joint_path import JointPath
 from .pose import Pose
 from .cartesian_path import CartesianPath
+from .pose_array import PoseArray
 from .joint_trajectory_point import JointTrajectoryPoint
 from .joint_trajectory import JointTrajectory
+from .compressed_joint_trajectory import CompressedJointTrajectory
 from .move_group_description import MoveGroupDescription
 from .end_effector_description import EndEffectorDescription
 from .end_effector_limits import EndEffectorLimits
 from .end_effector_pose import EndEffectorPose
 from .joint_limits import JointLimits
+from .joint_path_validation import JointPathValidator, JointPathViolations
 from .plan_parameters import PlanParameters
 from .task_space_plan_parameters import TaskSpacePlanParameters
 from .ik_results import IkResults, ErrorCodes
+from .ik_scoring import IkSolutionScorer
 from .move_gripper_result import MoveGripperResult
 from .wsg import WsgCommand, WsgState, WsgResult
 from .collision_object import CollisionPrimitiveKind, CollisionPrimitive, CollisionObject
+from .collision_index import CollisionIndex
 from .stepped_motion_state import SteppedMotionState
 from .twist import Twist
\ No newline at end of file
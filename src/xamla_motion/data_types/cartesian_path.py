@@ -43,6 +43,8 @@ class CartesianPath(object):
         Creates new CartesianPath with concatenated path points
     transform(transform_function)
         Creates a transformed version of CartesianPath
+    densify(max_translation_step, max_rotation_step=None)
+        Creates a resampled CartesianPath with limited step sizes
     """
 
     def __init__(self, points):
@@ -294,6 +296,46 @@ class CartesianPath(object):
         except TypeError as exc:
             raise TypeError('None valid transformation function') from exc
 
+    def densify(self, max_translation_step, max_rotation_step=None):
+        """
+        Creates a resampled CartesianPath with limited step sizes
+
+        Intermediate poses are inserted with linear interpolation
+        of the translation and slerp of the rotation until no step
+        between consecutive poses exceeds the limits. The
+        computation is vectorized over the whole path, see
+        PoseArray.densify.
+
+        Parameters
+        ----------
+        max_translation_step : float
+            Maximal translation between consecutive poses in meter
+        max_rotation_step : float or None (default None)
+            Maximal rotation angle between consecutive poses in
+            radian, if None rotation is not limited
+
+        Returns
+        ------
+        CartesianPath
+            A new Instance of CartesianPath which contains the
+            original and the interpolated poses
+
+        Raises
+        ------
+        ValueError
+            If a step limit is not positive
+        """
+
+        # imported here, pose_array depends on this module
+        from .pose_array import PoseArray
+
+        if len(self.__points) < 2:
+            return self
+
+        pose_array = PoseArray.from_poses(self.__points)
+        return pose_array.densify(max_translation_step,
+                                  max_rotation_step).to_cartesian_path()
+
     def to_cartesian_path_msg(self):
         """
         Generates a xamlamoveit_msgs.msg CartesianPath.msg from this CartesianPath instance
@@ -0,0 +1,556 @@
+# collision_index.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+from collections.abc import Mapping
+from typing import Iterable, Union
+
+import numpy as np
+
+from .collision_object import CollisionObject, CollisionPrimitiveKind
+from .pose import Pose
+
+
+class CollisionIndex(object):
+    """
+    Client side spatial index of collision objects
+
+    The solid primitives (box, sphere, cylinder, cone) of the
+    collision objects are stored in an axis aligned bounding box
+    tree. Queries are evaluated vectorized for many points,
+    spheres or boxes at once: the query items are pushed down
+    the tree together and only the items which overlap a leaf
+    are tested exactly against the primitives of this leaf.
+
+    Planes are unbounded and therefore not part of the tree, they
+    are treated as half spaces: everything on the side opposite
+    to the plane normal (ax + by + cz + d < 0) is in collision.
+
+    The index is intended as broadphase to cull candidate poses
+    locally before inverse kinematics or planning services are
+    called. It does not replace the collision check of the
+    motion server.
+
+    Methods
+    -------
+    contains_points(points, margin)
+        Check which points lie inside of a primitive
+    intersects_spheres(centers, radii)
+        Check which spheres intersect a primitive
+    intersects_boxes(min_corners, max_corners)
+        Check which axis aligned boxes intersect a primitive
+    collision_free_poses(poses, radius)
+        Check which poses are collision free
+    """
+
+    def __init__(self, collision_objects: Union[Iterable[CollisionObject],
+                                                Mapping],
+                 leaf_size: int=4):
+        """
+        Initialization of CollisionIndex
+
+        Parameters
+        ----------
+        collision_objects : Union[Iterable[CollisionObject], Mapping]
+            Collision objects which are indexed, if a mapping is provided
+            (e.g. the result of WorldViewClient.query_collision_objects)
+            its values are used
+        leaf_size : int (default 4)
+            Maximal number of primitives per leaf of the tree
+
+        Returns
+        -------
+        CollisionIndex
+            Instance of CollisionIndex
+
+        Raises
+        ------
+        TypeError
+            If collision_objects is not an iterable of CollisionObject
+        ValueError
+            If collision objects are defined in different frames
+            or leaf_size is smaller than one
+        """
+
+        if isinstance(collision_objects, Mapping):
+            collision_objects = collision_objects.values()
+
+        collision_objects = list(collision_objects)
+        if any(not isinstance(c, CollisionObject) for c in collision_objects):
+            raise TypeError('collision_objects is not of expected type'
+                            ' Iterable[CollisionObject]')
+
+        frame_ids = set(c.frame_id for c in collision_objects)
+        if len(frame_ids) > 1:
+            raise ValueError('all collision objects must be defined in'
+                             ' the same frame, got frames: {}'.format(
+                                 ', '.join(sorted(frame_ids))))
+        self.__frame_id = frame_ids.pop() if frame_ids else 'world'
+
+        leaf_size = int(leaf_size)
+        if leaf_size < 1:
+            raise ValueError('leaf_size must be greater than zero')
+
+        solids = []
+        planes = []
+        for c in collision_objects:
+            for p in c.primitives:
+                if p.kind is CollisionPrimitiveKind.plane:
+                    planes.append(p)
+                else:
+                    solids.append(p)
+
+        self.__primitives = solids + planes
+        self._init_planes(planes)
+        self._init_solids(solids)
+        self._build_tree(leaf_size)
+
+    def _init_planes(self, planes):
+        # planes are transformed to world frame as unit normal n and offset
+        # d so that a point x is in collision if n.x + d < 0
+        normals = np.zeros((len(planes), 3))
+        offsets = np.zeros(len(planes))
+        for i, p in enumerate(planes):
+            coef = p.parameters
+            norm = np.linalg.norm(coef[:3])
+            n_local = coef[:3] / norm
+            d_local = coef[3] / norm
+            rotation = p.pose.rotation_matrix()
+            normals[i] = rotation.dot(n_local)
+            offsets[i] = d_local - normals[i].dot(p.pose.translation)
+        self.__plane_normals = normals
+        self.__plane_offsets = offsets
+
+    def _init_solids(self, solids):
+        n = len(solids)
+        self.__kinds = np.zeros(n, dtype=np.int8)
+        self.__rotations = np.zeros((n, 3, 3))
+        self.__translations = np.zeros((n, 3))
+        # local half extents of each primitive along its x, y and z axis
+        self.__half_extents = np.zeros((n, 3))
+        self.__radii = np.zeros(n)
+
+        for i, p in enumerate(solids):
+            self.__kinds[i] = p.kind.value
+            self.__rotations[i] = p.pose.rotation_matrix()
+            self.__translations[i] = p.pose.translation
+            if p.kind is CollisionPrimitiveKind.box:
+                self.__half_extents[i] = p.parameters * 0.5
+            elif p.kind is CollisionPrimitiveKind.sphere:
+                r = p.parameters[0]
+                self.__half_extents[i] = (r, r, r)
+                self.__radii[i] = r
+            else:
+                h, r = p.parameters
+                self.__half_extents[i] = (r, r, h * 0.5)
+                self.__radii[i] = r
+
+        # world aabb of an oriented box is |R| * half_extents
+        world_extents = np.einsum('nij,nj->ni', np.abs(self.__rotations),
+                                  self.__half_extents)
+        self.__aabb_min = self.__translations - world_extents
+        self.__aabb_max = self.__translations + world_extents
+
+    def _build_tree(self, leaf_size):
+        n = len(self.__kinds)
+        order = np.arange(n)
+        node_min = []
+        node_max = []
+        # children[i] = (left, right) for inner nodes and (-1, -1) for leaves
+        children = []
+        # leaf_range[i] = (start, stop) into order for leaves
+        leaf_range = []
+
+        if n == 0:
+            self.__order = order
+            self.__node_min = np.zeros((0, 3))
+            self.__node_max = np.zeros((0, 3))
+            self.__children = np.zeros((0, 2), dtype=int)
+            self.__leaf_range = np.zeros((0, 2), dtype=int)
+            return
+
+        centers = (self.__aabb_min + self.__aabb_max) * 0.5
+
+        def build(start, stop):
+            idx = order[start:stop]
+            node = len(children)
+            node_min.append(self.__aabb_min[idx].min(axis=0))
+            node_max.append(self.__aabb_max[idx].max(axis=0))
+            children.append((-1, -1))
+            leaf_range.append((start, stop))
+
+            if stop - start <= leaf_size:
+                return node
+
+            # median split along the longest axis of the primitive centers
+            c = centers[idx]
+            axis = int(np.argmax(c.max(axis=0) - c.min(axis=0)))
+            order[start:stop] = idx[np.argsort(c[:, axis], kind='stable')]
+            mid = (start + stop) // 2
+            left = build(start, mid)
+            right = build(mid, stop)
+            children[node] = (left, right)
+            return node
+
+        build(0, n)
+
+        self.__order = order
+        self.__node_min = np.asarray(node_min)
+        self.__node_max = np.asarray(node_max)
+        self.__children = np.asarray(children, dtype=int)
+        self.__leaf_range = np.asarray(leaf_range, dtype=int)
+
+    @property
+    def frame_id(self) -> str:
+        """
+        frame_id : str (read only)
+            Frame in which the indexed collision objects
+            and all queries are described
+        """
+        return self.__frame_id
+
+    @property
+    def primitives(self):
+        """
+        primitives : List[CollisionPrimitive] (read only)
+            All indexed primitives
+        """
+        return list(self.__primitives)
+
+    @property
+    def bounds(self):
+        """
+        bounds : Tuple[numpy.ndarray, numpy.ndarray] (read only)
+            Min and max corner of the bounding box of all solid
+            primitives or None if no solid primitive is indexed
+        """
+        if len(self.__node_min) == 0:
+            return None
+        return self.__node_min[0].copy(), self.__node_max[0].copy()
+
+    def __len__(self):
+        return len(self.__primitives)
+
+    def _query(self, q_min, q_max, narrow):
+        """
+        Traverse the tree with the aabbs of all query items at once
+
+        narrow(items, primitive) returns for the query items which
+        overlap the aabb of primitive a mask of exact hits
+        """
+
+        num = q_min.shape[0]
+        hit = np.zeros(num, dtype=bool)
+
+        if len(self.__node_min) == 0 or num == 0:
+            return hit
+
+        stack = [(0, np.arange(num))]
+        while stack:
+            node, items = stack.pop()
+            items = items[~hit[items]]
+            if items.size == 0:
+                continue
+
+            overlap = np.all((q_min[items] <= self.__node_max[node]) &
+                             (q_max[items] >= self.__node_min[node]), axis=1)
+            items = items[overlap]
+            if items.size == 0:
+                continue
+
+            left, right = self.__children[node]
+            if left >= 0:
+                stack.append((right, items))
+                stack.append((left, items))
+                continue
+
+            start, stop = self.__leaf_range[node]
+            for primitive in self.__order[start:stop]:
+                candidates = items[~hit[items]]
+                if candidates.size == 0:
+                    break
+                overlap = np.all(
+                    (q_min[candidates] <= self.__aabb_max[primitive]) &
+                    (q_max[candidates] >= self.__aabb_min[primitive]), axis=1)
+                candidates = candidates[overlap]
+                if candidates.size == 0:
+                    continue
+                hit[candidates[narrow(candidates, primitive)]] = True
+
+        return hit
+
+    def _to_local(self, points, primitive):
+        # row vectors: (p - t) R is R^T (p - t) for every point
+        return (points - self.__translations[primitive]).dot(
+            self.__rotations[primitive])
+
+    def _distance(self, local, primitive):
+        """
+        Distance of local points to the surface of a primitive,
+        zero for points inside. The distance to a cone is
+        approximated by the distance to its bounding cylinder.
+        """
+
+        kind = self.__kinds[primitive]
+        if kind == CollisionPrimitiveKind.sphere.value:
+            return np.maximum(np.linalg.norm(local, axis=1)
+                              - self.__radii[primitive], 0.0)
+        elif kind == CollisionPrimitiveKind.box.value:
+            outside = np.maximum(np.abs(local)
+                                 - self.__half_extents[primitive], 0.0)
+            return np.linalg.norm(outside, axis=1)
+        else:
+            radial = np.hypot(local[:, 0], local[:, 1])
+            dr = np.maximum(radial - self.__radii[primitive], 0.0)
+            dz = np.maximum(np.abs(local[:, 2])
+                            - self.__half_extents[primitive, 2], 0.0)
+            return np.hypot(dr, dz)
+
+    def _contains(self, local, primitive):
+        kind = self.__kinds[primitive]
+        if kind == CollisionPrimitiveKind.cone.value:
+            # apex at +height/2, base with radius r at -height/2
+            half_height = self.__half_extents[primitive, 2]
+            z = local[:, 2]
+            radius = self.__radii[primitive] * (half_height - z) \
+                / (2.0 * half_height) if half_height > 0.0 else 0.0
+            radial = np.hypot(local[:, 0], local[:, 1])
+            return (np.abs(z) <= half_height) & (radial <= radius)
+        return self._distance(local, primitive) <= 0.0
+
+    def _check_points(self, points, name='points'):
+        points = np.asarray(points, dtype=float)
+        if points.ndim == 1:
+            points = points.reshape(1, -1)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError('{} must be of shape (N, 3)'.format(name))
+        return points
+
+    def _planes_hit(self, points, radii):
+        if len(self.__plane_offsets) == 0:
+            return np.zeros(points.shape[0], dtype=bool)
+        signed = points.dot(self.__plane_normals.T) + self.__plane_offsets
+        return np.any(signed < radii[:, None], axis=1)
+
+    def contains_points(self, points: np.ndarray, margin: float=0.0) -> np.ndarray:
+        """
+        Check which points lie inside of a primitive
+
+        Parameters
+        ----------
+        points : numpy.ndarray
+            Points of shape (N, 3) or (3,)
+        margin : float (default 0.0)
+            Points within margin to a primitive are treated
+            as inside, margin must not be negative
+
+        Returns
+        -------
+        mask : numpy.ndarray
+            Boolean array of shape (N,) which is True for points
+            in collision
+
+        Raises
+        ------
+        ValueError
+            If points has not the shape (N, 3) or margin is negative
+        """
+
+        margin = float(margin)
+        if margin < 0.0:
+            raise ValueError('margin must not be negative')
+
+        points = self._check_points(points)
+        if margin > 0.0:
+            return self.intersects_spheres(points,
+                                           np.full(points.shape[0], margin))
+
+        def narrow(items, primitive):
+            return self._contains(self._to_local(points[items], primitive),
+                                  primitive)
+
+        hit = self._query(points, points, narrow)
+        return hit | self._planes_hit(points, np.zeros(points.shape[0]))
+
+    def intersects_spheres(self, centers: np.ndarray,
+                           radii: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        Check which spheres intersect a primitive
+
+        Cones are approximated by their bounding cylinder for
+        spheres with non zero radius.
+
+        Parameters
+        ----------
+        centers : numpy.ndarray
+            Sphere centers of shape (N, 3) or (3,)
+        radii : Union[float, numpy.ndarray]
+            Radius for all spheres or radii of shape (N,)
+
+        Returns
+        -------
+        mask : numpy.ndarray
+            Boolean array of shape (N,) which is True for spheres
+            in collision
+
+        Raises
+        ------
+        ValueError
+            If centers has not the shape (N, 3), radii does not match
+            or a radius is negative
+        """
+
+        centers = self._check_points(centers, 'centers')
+        radii = np.broadcast_to(np.asarray(radii, dtype=float),
+                                (centers.shape[0],))
+        if np.any(radii < 0.0):
+            raise ValueError('radii must not be negative')
+
+        extents = radii[:, None]
+
+        def narrow(items, primitive):
+            local = self._to_local(centers[items], primitive)
+            if self.__kinds[primitive] == CollisionPrimitiveKind.cone.value:
+                inside = self._contains(local, primitive)
+                return inside | ((radii[items] > 0.0) &
+                                 (self._distance(local, primitive)
+                                  <= radii[items]))
+            return self._distance(local, primitive) <= radii[items]
+
+        hit = self._query(centers - extents, centers + extents, narrow)
+        return hit | self._planes_hit(centers, radii)
+
+    def intersects_boxes(self, min_corners: np.ndarray,
+                         max_corners: np.ndarray) -> np.ndarray:
+        """
+        Check which axis aligned boxes intersect a primitive
+
+        Spheres are tested exactly, all other primitives are
+        tested conservatively by their oriented bounding box.
+
+        Parameters
+        ----------
+        min_corners : numpy.ndarray
+            Minimal corners of the boxes of shape (N, 3) or (3,)
+        max_corners : numpy.ndarray
+            Maximal corners of the boxes of shape (N, 3) or (3,)
+
+        Returns
+        -------
+        mask : numpy.ndarray
+            Boolean array of shape (N,) which is True for boxes
+            in collision
+
+        Raises
+        ------
+        ValueError
+            If the corners have not the shape (N, 3) or a min
+            corner is greater than its max corner
+        """
+
+        min_corners = self._check_points(min_corners, 'min_corners')
+        max_corners = self._check_points(max_corners, 'max_corners')
+        if min_corners.shape != max_corners.shape:
+            raise ValueError('min_corners and max_corners must have'
+                             ' the same shape')
+        if np.any(min_corners > max_corners):
+            raise ValueError('min_corners must not be greater'
+                             ' than max_corners')
+
+        centers = (min_corners + max_corners) * 0.5
+        half = (max_corners - min_corners) * 0.5
+
+        def narrow(items, primitive):
+            if self.__kinds[primitive] == CollisionPrimitiveKind.sphere.value:
+                closest = np.clip(self.__translations[primitive],
+                                  min_corners[items], max_corners[items])
+                d = np.linalg.norm(closest - self.__translations[primitive],
+                                   axis=1)
+                return d <= self.__radii[primitive]
+
+            # separating axis test along the primitive axes, the world
+            # axes are already covered by the aabb overlap test
+            rotation = self.__rotations[primitive]
+            delta = (centers[items] - self.__translations[primitive]).dot(
+                rotation)
+            projected = half[items].dot(np.abs(rotation))
+            return np.all(np.abs(delta) <= projected
+                          + self.__half_extents[primitive], axis=1)
+
+        hit = self._query(min_corners, max_corners, narrow)
+
+        if len(self.__plane_offsets):
+            # the box corner which is farthest in negative normal direction
+            n = self.__plane_normals
+            lowest = (centers.dot(n.T) - half.dot(np.abs(n).T)
+                      + self.__plane_offsets)
+            hit |= np.any(lowest < 0.0, axis=1)
+
+        return hit
+
+    def collision_free_poses(self, poses: Iterable[Pose],
+                             radius: float=0.0) -> np.ndarray:
+        """
+        Check which poses are collision free
+
+        The position of each pose is tested as sphere with the
+        given radius, e.g. to cull candidate grasp poses before
+        inverse kinematics is computed for them.
+
+        Parameters
+        ----------
+        poses : Iterable[Pose]
+            Poses to check, must be defined in frame_id of the index
+        radius : float (default 0.0)
+            Clearance radius around each pose position
+
+        Returns
+        -------
+        mask : numpy.ndarray
+            Boolean array which is True for collision free poses
+
+        Raises
+        ------
+        TypeError
+            If poses is not an iterable of Pose
+        ValueError
+            If a pose is not defined in frame_id of the index
+        """
+
+        poses = list(poses)
+        if any(not isinstance(p, Pose) for p in poses):
+            raise TypeError('poses is not of expected type Iterable[Pose]')
+        if any(p.frame_id != self.__frame_id for p in poses):
+            raise ValueError('all poses must be defined in frame: {}'
+                             ''.format(self.__frame_id))
+
+        if not poses:
+            return np.zeros(0, dtype=bool)
+
+        points = np.asarray([p.translation for p in poses])
+        return ~self.intersects_spheres(points, float(radius))
+
+    def __str__(self):
+        return ('CollisionIndex(frame_id={}, num_primitives={},'
+                ' num_nodes={})'.format(self.__frame_id,
+                                        len(self.__primitives),
+                                        len(self.__node_min)))
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,289 @@
+# compressed_joint_trajectory.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+from datetime import timedelta
+from typing import Union
+
+import numpy as np
+
+from .joint_set import JointSet
+from .joint_trajectory import JointTrajectory
+from .joint_trajectory_point import JointTrajectoryPoint
+from .joint_values import JointValues
+
+
+class CompressedJointTrajectory(object):
+    """
+    Compact storage form of a decimated JointTrajectory
+
+    Only the time stamps, positions and velocities of the points kept
+    by JointTrajectory.decimate are stored as numpy arrays together
+    with the original time stamps, which are reduced to start, step
+    and count if they are equidistant. Instances pickle compactly
+    and can be stored in Cache or TaskTrajectoryCache.
+
+    The restored positions deviate at most by tolerance from the
+    original ones, the velocities by velocity_tolerance if it is
+    defined and otherwise by an unbounded amount. Accelerations
+    are not stored, decode takes them from the cubic
+    interpolation. Trajectories with efforts are rejected.
+
+    Attributes
+    ----------
+    joint_names : Tuple[str] (readonly)
+        Names of the joints
+    num_points : int (readonly)
+        Number of stored points
+    num_samples : int (readonly)
+        Number of points of the original trajectory
+    sample_times : np.ndarray((N,)) (readonly)
+        Time stamps of the original trajectory in seconds
+    tolerance : None or float (readonly)
+        Maximal joint position error of the restored trajectory
+    velocity_tolerance : None or float (readonly)
+        Maximal joint velocity error of the restored trajectory,
+        None if the velocity error is not bounded
+    nbytes : int (readonly)
+        Size of the stored arrays in bytes
+
+    Methods
+    -------
+    encode(trajectory, tolerance, velocity_tolerance=None)
+        Decimates and encodes a trajectory
+    decode(resample=True)
+        Restores a JointTrajectory
+    """
+
+    def __init__(self, joint_names, times, positions, velocities,
+                 sample_times, is_valid=True, tolerance=None,
+                 velocity_tolerance=None):
+        """
+        Initialization of CompressedJointTrajectory
+
+        Use encode to create an instance from a JointTrajectory.
+
+        Parameters
+        ----------
+        joint_names : Iterable[str]
+            Names of the joints
+        times : np.ndarray((K,))
+            Time stamps of the kept points in seconds
+        positions : np.ndarray((K,J))
+            Positions of the kept points
+        velocities : np.ndarray((K,J))
+            Velocities of the kept points
+        sample_times : np.ndarray((N,)) or Tuple[float, float, int]
+            Original time stamps in seconds or (start, step, count)
+            if they are equidistant
+        is_valid : bool (default True)
+            Validity flag of the original trajectory
+        tolerance : None or float (default None)
+            Maximal joint position error the points were
+            decimated with
+        velocity_tolerance : None or float (default None)
+            Maximal joint velocity error the points were
+            decimated with
+
+        Raises
+        ------
+        ValueError
+            If the shapes of the arrays do not match
+        """
+
+        self.__joint_names = tuple(str(n) for n in joint_names)
+        self.__times = np.asarray(times, dtype=float)
+        num_joints = len(self.__joint_names)
+        self.__positions = np.asarray(positions,
+                                      dtype=float).reshape(-1, num_joints)
+        self.__velocities = np.asarray(velocities,
+                                       dtype=float).reshape(-1, num_joints)
+        if not (self.__times.shape[0] == self.__positions.shape[0] ==
+                self.__velocities.shape[0]):
+            raise ValueError('times, positions and velocities must contain'
+                             ' the same number of points')
+
+        if isinstance(sample_times, tuple):
+            start, step, count = sample_times
+            self.__sample_times = (float(start), float(step), int(count))
+        else:
+            self.__sample_times = np.asarray(sample_times, dtype=float)
+        self.__is_valid = bool(is_valid)
+        self.__tolerance = None if tolerance is None else float(tolerance)
+        self.__velocity_tolerance = (None if velocity_tolerance is None
+                                     else float(velocity_tolerance))
+
+    @classmethod
+    def encode(cls, trajectory: JointTrajectory, tolerance: float,
+               velocity_tolerance: Union[None, float]=None):
+        """
+        Decimates and encodes a trajectory
+
+        Parameters
+        ----------
+        trajectory : JointTrajectory
+            Trajectory with velocities and without efforts
+        tolerance : float convertable
+            Maximal absolute joint position error of the restored
+            trajectory at the original time stamps
+        velocity_tolerance : None or float convertable (default None)
+            Maximal absolute joint velocity error of the restored
+            trajectory at the original time stamps, if None the
+            velocity error is not bounded
+
+        Returns
+        -------
+        CompressedJointTrajectory
+            Encoded trajectory
+
+        Raises
+        ------
+        TypeError
+            If trajectory is not of type JointTrajectory
+        ValueError
+            If a tolerance is negative, the trajectory has
+            no velocities or it has efforts
+        """
+
+        if not isinstance(trajectory, JointTrajectory):
+            raise TypeError('trajectory is not of expected'
+                            ' type JointTrajectory')
+        if trajectory.has_effort:
+            raise ValueError('efforts of trajectory can not be encoded')
+
+        keep = trajectory.decimation_mask(tolerance, velocity_tolerance)
+        times, positions, velocities, _ = trajectory._arrays()
+
+        sample_times = times
+        if times.shape[0] > 1:
+            step = (times[-1] - times[0]) / (times.shape[0] - 1)
+            uniform = times[0] + step * np.arange(times.shape[0])
+            # time stamps have microsecond resolution
+            if np.all(np.abs(uniform - times) < 1e-6):
+                sample_times = (times[0], step, times.shape[0])
+
+        return cls(trajectory.joint_set.names, times[keep], positions[keep],
+                   velocities[keep], sample_times, trajectory.is_valid,
+                   tolerance, velocity_tolerance)
+
+    @property
+    def joint_names(self):
+        """
+        joint_names : Tuple[str] (readonly)
+            Names of the joints
+        """
+        return self.__joint_names
+
+    @property
+    def num_points(self):
+        """
+        num_points : int (readonly)
+            Number of stored points
+        """
+        return self.__times.shape[0]
+
+    @property
+    def num_samples(self):
+        """
+        num_samples : int (readonly)
+            Number of points of the original trajectory
+        """
+        if isinstance(self.__sample_times, tuple):
+            return self.__sample_times[2]
+        return self.__sample_times.shape[0]
+
+    @property
+    def sample_times(self):
+        """
+        sample_times : np.ndarray((N,)) (readonly)
+            Time stamps of the original trajectory in seconds
+        """
+        if isinstance(self.__sample_times, tuple):
+            start, step, count = self.__sample_times
+            return start + step * np.arange(count)
+        return self.__sample_times.copy()
+
+    @property
+    def tolerance(self):
+        """
+        tolerance : None or float (readonly)
+            Maximal joint position error of the restored trajectory
+        """
+        return self.__tolerance
+
+    @property
+    def velocity_tolerance(self):
+        """
+        velocity_tolerance : None or float (readonly)
+            Maximal joint velocity error of the restored trajectory,
+            None if the velocity error is not bounded
+        """
+        return self.__velocity_tolerance
+
+    @property
+    def nbytes(self):
+        """
+        nbytes : int (readonly)
+            Size of the stored arrays in bytes
+        """
+        size = (self.__times.nbytes + self.__positions.nbytes +
+                self.__velocities.nbytes)
+        if not isinstance(self.__sample_times, tuple):
+            size += self.__sample_times.nbytes
+        return size
+
+    def decode(self, resample: bool=True) -> JointTrajectory:
+        """
+        Restores a JointTrajectory
+
+        Parameters
+        ----------
+        resample : bool (default True)
+            If True the trajectory is evaluated at the original time
+            stamps, else only the stored points are returned
+
+        Returns
+        -------
+        JointTrajectory
+            Restored trajectory, accelerations are taken from
+            the cubic interpolation
+        """
+
+        joint_set = JointSet(list(self.__joint_names))
+        points = [JointTrajectoryPoint(timedelta(seconds=t),
+                                       JointValues(joint_set, p),
+                                       JointValues(joint_set, v))
+                  for t, p, v in zip(self.__times, self.__positions,
+                                     self.__velocities)]
+        knots = JointTrajectory(joint_set, points, self.__is_valid)
+
+        if not resample:
+            return knots
+        return knots.resample(self.sample_times)
+
+    def __len__(self):
+        return self.num_samples
+
+    def __str__(self):
+        return ('CompressedJointTrajectory(joints={}, points={},'
+                ' samples={})'.format(len(self.__joint_names),
+                                      self.num_points, self.num_samples))
+
+    def __repr__(self):
+        return self.__str__()
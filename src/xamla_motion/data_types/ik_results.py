@@ -20,6 +20,11 @@
 
 import enum
 
+import numpy as np
+
+from .joint_path import JointPath
+from .joint_values import JointValues
+
 
 @enum.unique
 class ErrorCodes(enum.Enum):
@@ -54,11 +59,101 @@ class ErrorCodes(enum.Enum):
 class IkResults(object):
     """
     Class with hold result of a inverse kinematics query
+
+    Solutions and error codes are stored in numpy arrays,
+    JointValues, the JointPath and ErrorCodes are only
+    created on access.
+
+    Methods
+    -------
+    from_arrays(joint_set, solutions, error_codes)
+        Creates an instance of IkResults from arrays
     """
 
     def __init__(self, path, error_codes):
+        """
+        Initialization of IkResults class
+
+        Parameters
+        ----------
+        path : JointPath
+            solutions from the inverse kinematics
+        error_codes : Iterable[int or ErrorCodes or MoveItErrorCodes]
+            error code of each solution
+        """
+
+        self.__joint_set = path.joint_set
         self.__path = path
-        self.__error_codes = [ErrorCodes(x.val) for x in error_codes]
+        self.__solutions = np.array([p.values for p in path],
+                                    dtype=float).reshape(len(path),
+                                                         len(path.joint_set))
+        self._init_error_codes(error_codes)
+
+    @classmethod
+    def from_arrays(cls, joint_set, solutions, error_codes):
+        """
+        Creates an instance of IkResults from arrays
+
+        Parameters
+        ----------
+        joint_set : JointSet
+            joints of the solutions
+        solutions : convertable to numpy array of shape (N,J)
+            one row of joint positions per solution
+        error_codes : Iterable[int or ErrorCodes or MoveItErrorCodes]
+            error code of each solution
+
+        Returns
+        -------
+        IkResults
+            New instance of IkResults
+
+        Raises
+        ------
+        ValueError
+            If solutions is not of shape (N,J)
+        """
+
+        solutions = np.array(solutions, dtype=float)
+        if solutions.size == 0:
+            solutions = solutions.reshape(0, len(joint_set))
+        if solutions.ndim != 2 or solutions.shape[1] != len(joint_set):
+            raise ValueError('solutions is not of shape (N,J) with J number'
+                             ' of joints in joint_set')
+
+        results = cls.__new__(cls)
+        results.__joint_set = joint_set
+        results.__path = None
+        results.__solutions = solutions
+        results._init_error_codes(error_codes)
+        return results
+
+    def _init_error_codes(self, error_codes):
+        codes = np.fromiter((getattr(e, 'val', getattr(e, 'value', e))
+                             for e in error_codes), dtype=np.int32)
+        self.__solutions.flags.writeable = False
+        codes.flags.writeable = False
+        self.__codes = codes
+        self.__error_codes = None
+        self.__success_mask = codes == ErrorCodes.SUCCESS.value
+        self.__success_mask.flags.writeable = False
+        self.__succeeded = bool(self.__success_mask.all())
+
+    @property
+    def joint_set(self):
+        """
+        joint_set : JointSet
+            joints of the solutions
+        """
+        return self.__joint_set
+
+    @property
+    def solutions(self):
+        """
+        solutions : numpy.ndarray((N,J), dtype=floating) (readonly)
+            joint positions of all solutions
+        """
+        return self.__solutions
 
     @property
     def path(self):
@@ -66,26 +161,66 @@ class IkResults(object):
         path : JointPath
             solutions from the inverse kinematics
         """
+        if self.__path is None:
+            self.__path = JointPath(self.__joint_set,
+                                    [self[i] for i in range(len(self))])
         return self.__path
 
+    @property
+    def codes(self):
+        """
+        codes : numpy.ndarray(dtype=int32) (readonly)
+            error code values of all solutions
+        """
+        return self.__codes
+
     @property
     def error_codes(self):
         """
         error_code : List[ErrorCodes]
             error codes
         """
+        if self.__error_codes is None:
+            self.__error_codes = [ErrorCodes(int(c)) for c in self.__codes]
         return self.__error_codes
 
+    @property
+    def success_mask(self):
+        """
+        success_mask : numpy.ndarray(dtype=bool) (readonly)
+            True for each solution which was found successfully
+        """
+        return self.__success_mask
+
     @property
     def succeeded(self):
-        if all([e == ErrorCodes.SUCCESS
-                for e in self.__error_codes]):
-            return True
-        else:
-            return False
+        """
+        succeeded : bool
+            True if all solutions were found successfully
+        """
+        return self.__succeeded
+
+    def __len__(self):
+        return self.__solutions.shape[0]
+
+    def __getitem__(self, index):
+        """
+        Returns the solution of a pose as JointValues
+
+        Parameters
+        ----------
+        index : int
+            index of the pose
+
+        Returns
+        -------
+        JointValues
+            solution of the pose
+        """
+        return JointValues(self.__joint_set, self.__solutions[index])
 
     def __str__(self):
-        return str(self.__error_codes)
+        return str(self.error_codes)
 
     def __repr__(self):
         return self.__str__()
@@ -0,0 +1,219 @@
+# ik_scoring.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+from typing import Callable, Union
+
+import numpy as np
+
+from .joint_limits import JointLimits
+from .joint_set import JointSet
+from .joint_values import JointValues
+
+
+def joint_limit_margins(solutions, min_position, max_position):
+    """
+    Normalized distance of joint positions to the position limits
+
+    Parameters
+    ----------
+    solutions : np.ndarray((N,J))
+        Joint positions, one row per solution
+    min_position : np.ndarray((J,))
+        Lower position limits, nan if a joint is unbounded
+    max_position : np.ndarray((J,))
+        Upper position limits, nan if a joint is unbounded
+
+    Returns
+    -------
+    np.ndarray((N,))
+        Minimum over all joints of the distance to the closer
+        limit divided by half of the joint range, 1 in the middle
+        of all ranges and 0 at a limit
+    """
+
+    solutions = np.asarray(solutions, dtype=float)
+    if solutions.shape[1] == 0:
+        return np.ones(solutions.shape[0])
+    half_range = (max_position - min_position) / 2.0
+    with np.errstate(invalid='ignore'):
+        distance = np.minimum(solutions - min_position,
+                              max_position - solutions)
+        margin = np.clip(distance / half_range, 0.0, 1.0)
+    # unbounded joints do not reduce the margin
+    margin = np.where(np.isnan(margin), 1.0, margin)
+    return np.min(margin, axis=1)
+
+
+class IkSolutionScorer(object):
+    """
+    Scores inverse kinematic solutions, lower costs are better
+
+    The cost of a solution is the weighted sum of
+    - the euclidean joint distance to a reference configuration
+    - one minus its joint limit margin (see joint_limit_margins)
+    - the negative value of an optional manipulability measure
+
+    Methods
+    -------
+    score(joint_set, solutions, reference=None)
+        Costs of solutions
+    best(joint_set, solutions, reference=None)
+        Index of the solution with the lowest cost
+    """
+
+    def __init__(self, joint_limits: Union[None, JointLimits]=None,
+                 distance_weight: float=1.0,
+                 limit_margin_weight: float=1.0,
+                 manipulability: Union[None, Callable]=None,
+                 manipulability_weight: float=1.0):
+        """
+        Initialization of IkSolutionScorer
+
+        Parameters
+        ----------
+        joint_limits : JointLimits or None (default None)
+            Position limits for the limit margin, if None the
+            limit margin is not scored
+        distance_weight : float convertable (default 1.0)
+            Weight of the joint distance to the reference
+        limit_margin_weight : float convertable (default 1.0)
+            Weight of the joint limit margin
+        manipulability : callable or None (default None)
+            Function (joint_set, solutions) -> np.ndarray((N,))
+            which rates the solutions, higher values are better
+        manipulability_weight : float convertable (default 1.0)
+            Weight of the manipulability measure
+
+        Raises
+        ------
+        TypeError
+            If joint_limits is not None or of type JointLimits
+            or manipulability is not None or callable
+        """
+
+        if joint_limits is not None and not isinstance(joint_limits,
+                                                       JointLimits):
+            raise TypeError('joint_limits is not one of expected types'
+                            ' None or JointLimits')
+
+        if manipulability is not None and not callable(manipulability):
+            raise TypeError('manipulability is not callable')
+
+        self.__joint_limits = joint_limits
+        self.__distance_weight = float(distance_weight)
+        self.__limit_margin_weight = float(limit_margin_weight)
+        self.__manipulability = manipulability
+        self.__manipulability_weight = float(manipulability_weight)
+
+    @property
+    def joint_limits(self):
+        """
+        joint_limits : JointLimits or None (readonly)
+            Position limits for the limit margin
+        """
+        return self.__joint_limits
+
+    def score(self, joint_set: JointSet, solutions,
+              reference: Union[None, JointValues]=None) -> np.ndarray:
+        """
+        Costs of solutions
+
+        Parameters
+        ----------
+        joint_set : JointSet
+            Joints of the columns of solutions
+        solutions : convertable to np.ndarray((N,J))
+            Joint positions, one row per solution
+        reference : JointValues or None (default None)
+            Configuration the joint distance is measured to,
+            if None the distance is not scored
+
+        Returns
+        -------
+        np.ndarray((N,))
+            Cost of each solution
+
+        Raises
+        ------
+        ValueError
+            If joint limits or reference do not contain
+            all joints of joint_set
+        """
+
+        solutions = np.asarray(solutions, dtype=float)
+        solutions = solutions.reshape(-1, len(joint_set))
+        costs = np.zeros(solutions.shape[0])
+
+        if reference is not None and self.__distance_weight:
+            if reference.joint_set != joint_set:
+                reference = reference.select(joint_set.names)
+            distance = np.linalg.norm(solutions - reference.values, axis=1)
+            costs += self.__distance_weight * distance
+
+        limits = self.__joint_limits
+        if limits is not None and self.__limit_margin_weight:
+            if limits.joint_set != joint_set:
+                try:
+                    limits = limits.select(joint_set.names)
+                except ValueError as exc:
+                    raise ValueError('joint limits do not contain all'
+                                     ' joints of joint_set') from exc
+            if (limits.min_position is not None and
+                    limits.max_position is not None):
+                margins = joint_limit_margins(solutions, limits.min_position,
+                                              limits.max_position)
+                costs += self.__limit_margin_weight * (1.0 - margins)
+
+        if self.__manipulability is not None and self.__manipulability_weight:
+            measure = np.asarray(self.__manipulability(joint_set, solutions),
+                                 dtype=float)
+            costs -= self.__manipulability_weight * measure
+
+        return costs
+
+    def best(self, joint_set: JointSet, solutions,
+             reference: Union[None, JointValues]=None) -> int:
+        """
+        Index of the solution with the lowest cost
+
+        Parameters
+        ----------
+        joint_set : JointSet
+            Joints of the columns of solutions
+        solutions : convertable to np.ndarray((N,J))
+            Joint positions, one row per solution
+        reference : JointValues or None (default None)
+            Configuration the joint distance is measured to
+
+        Returns
+        -------
+        int
+            Row index of the best solution
+
+        Raises
+        ------
+        ValueError
+            If solutions is empty
+        """
+
+        costs = self.score(joint_set, solutions, reference)
+        if costs.size == 0:
+            raise ValueError('solutions is empty')
+        return int(np.argmin(costs))
@@ -0,0 +1,268 @@
+# joint_path_validation.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+from datetime import timedelta
+from typing import Iterable, Union
+
+import numpy as np
+
+from .joint_limits import JointLimits
+from .joint_path import JointPath
+from .joint_trajectory import JointTrajectory
+
+
+class JointPathViolations(object):
+    """
+    Result of a JointPathValidator
+
+    Segment i is the motion from point i to point i+1 of the path.
+    All indices are stored in numpy arrays in ascending order.
+    """
+
+    def __init__(self, jump_indices, jump_deltas, position_violations,
+                 velocity_violations):
+        self.__jump_indices = np.asarray(jump_indices, dtype=int)
+        self.__jump_deltas = np.asarray(jump_deltas, dtype=float)
+        self.__position_violations = np.asarray(position_violations,
+                                                dtype=int).reshape(-1, 2)
+        self.__velocity_violations = np.asarray(velocity_violations,
+                                                dtype=int).reshape(-1, 2)
+        for array in (self.__jump_indices, self.__jump_deltas,
+                      self.__position_violations,
+                      self.__velocity_violations):
+            array.flags.writeable = False
+
+    @property
+    def jump_indices(self):
+        """
+        jump_indices : numpy.ndarray(dtype=int) (readonly)
+            Indices of segments whose maximal joint change
+            exceeds the ik jump threshold
+        """
+        return self.__jump_indices
+
+    @property
+    def jump_deltas(self):
+        """
+        jump_deltas : numpy.ndarray(dtype=floating) (readonly)
+            Maximal joint change of each segment in jump_indices
+        """
+        return self.__jump_deltas
+
+    @property
+    def position_violations(self):
+        """
+        position_violations : numpy.ndarray((K,2), dtype=int) (readonly)
+            Point index and joint index of each position outside
+            of the joint limits
+        """
+        return self.__position_violations
+
+    @property
+    def velocity_violations(self):
+        """
+        velocity_violations : numpy.ndarray((K,2), dtype=int) (readonly)
+            Segment index and joint index of each segment whose
+            required velocity exceeds the joint velocity limit
+        """
+        return self.__velocity_violations
+
+    @property
+    def valid(self):
+        """
+        valid : bool (readonly)
+            True if no violation was found
+        """
+        return not (self.__jump_indices.size or
+                    self.__position_violations.size or
+                    self.__velocity_violations.size)
+
+    def __bool__(self):
+        return self.valid
+
+    def __str__(self):
+        return ('JointPathViolations(jumps={}, position={},'
+                ' velocity={})'.format(self.__jump_indices.tolist(),
+                                       self.__position_violations.tolist(),
+                                       self.__velocity_violations.tolist()))
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class JointPathValidator(object):
+    """
+    Vectorized sanity checks of a joint path
+
+    Checks all points of a path at once for joint jumps between
+    consecutive points, positions outside of the joint limits and,
+    if time stamps are available, velocities above the joint
+    velocity limits.
+
+    Methods
+    -------
+    validate(path, time_from_start=None)
+        Validates a JointPath or JointTrajectory
+    """
+
+    def __init__(self, ik_jump_threshold: Union[None, float]=None,
+                 joint_limits: Union[None, JointLimits]=None):
+        """
+        Initialization of JointPathValidator
+
+        Parameters
+        ----------
+        ik_jump_threshold : float convertable or None (default None)
+            Maximal allowed change of a joint between two
+            consecutive points, if None jumps are not checked
+        joint_limits : JointLimits or None (default None)
+            Position and velocity limits, if None limits are
+            not checked
+
+        Raises
+        ------
+        TypeError
+            If joint_limits is not one of expected types
+            None or JointLimits
+        """
+
+        if joint_limits is not None and not isinstance(joint_limits,
+                                                       JointLimits):
+            raise TypeError('joint_limits is not one of expected types'
+                            ' None or JointLimits')
+
+        if ik_jump_threshold is not None:
+            ik_jump_threshold = float(ik_jump_threshold)
+
+        self.__ik_jump_threshold = ik_jump_threshold
+        self.__joint_limits = joint_limits
+
+    @property
+    def ik_jump_threshold(self):
+        """
+        ik_jump_threshold : float or None (readonly)
+            Maximal allowed change of a joint between two points
+        """
+        return self.__ik_jump_threshold
+
+    @property
+    def joint_limits(self):
+        """
+        joint_limits : JointLimits or None (readonly)
+            Position and velocity limits
+        """
+        return self.__joint_limits
+
+    def validate(self, path: Union[JointPath, JointTrajectory],
+                 time_from_start: Union[None, Iterable[timedelta],
+                                        Iterable[float]]=None):
+        """
+        Validates a JointPath or JointTrajectory
+
+        Parameters
+        ----------
+        path : JointPath or JointTrajectory
+            Path to validate
+        time_from_start : Iterable[timedelta] or Iterable[float] or None
+            Time stamps of the points in seconds or as timedelta,
+            required for the velocity check if path is a JointPath.
+            The time stamps of a JointTrajectory are used if None
+
+        Returns
+        -------
+        JointPathViolations
+            Found violations
+
+        Raises
+        ------
+        TypeError
+            If path is not one of expected types JointPath
+            or JointTrajectory
+        ValueError
+            If number of time stamps and points differ or
+            joint limits do not contain all joints of path
+        """
+
+        if isinstance(path, JointTrajectory):
+            if time_from_start is None:
+                time_from_start = path.time_from_start
+            positions = path.positions
+        elif isinstance(path, JointPath):
+            positions = path.points
+        else:
+            raise TypeError('path is not one of expected types'
+                            ' JointPath or JointTrajectory')
+
+        # neither type keeps its points as one array, gathering the values
+        # takes one python step per point and dominates for long paths
+        values = np.array([p.values for p in positions], dtype=float)
+        values = values.reshape(len(positions), len(path.joint_set))
+
+        jump_indices = np.empty(0, dtype=int)
+        jump_deltas = np.empty(0)
+        position_violations = np.empty((0, 2), dtype=int)
+        velocity_violations = np.empty((0, 2), dtype=int)
+
+        delta = np.abs(np.diff(values, axis=0))
+
+        if self.__ik_jump_threshold is not None and delta.size:
+            max_delta = np.max(delta, axis=1)
+            jump_indices = np.flatnonzero(max_delta > self.__ik_jump_threshold)
+            jump_deltas = max_delta[jump_indices]
+
+        limits = self.__joint_limits
+        if limits is not None:
+            if limits.joint_set != path.joint_set:
+                try:
+                    limits = limits.select(path.joint_set.names)
+                except ValueError as exc:
+                    raise ValueError('joint limits do not contain all'
+                                     ' joints of path') from exc
+
+            # nan limits never compare true and are therefore ignored
+            with np.errstate(invalid='ignore'):
+                outside = np.zeros(values.shape, dtype=bool)
+                if limits.min_position is not None:
+                    outside |= values < limits.min_position
+                if limits.max_position is not None:
+                    outside |= values > limits.max_position
+                position_violations = np.argwhere(outside)
+
+                if (time_from_start is not None and
+                        limits.max_velocity is not None and delta.size):
+                    dt = np.diff(self._seconds(time_from_start,
+                                               values.shape[0]))
+                    with np.errstate(divide='ignore'):
+                        velocity = delta / dt[:, None]
+                    velocity[delta == 0.0] = 0.0
+                    velocity_violations = np.argwhere(velocity >
+                                                      limits.max_velocity)
+
+        return JointPathViolations(jump_indices, jump_deltas,
+                                   position_violations, velocity_violations)
+
+    @staticmethod
+    def _seconds(time_from_start, num_points):
+        stamps = [t.total_seconds() if isinstance(t, timedelta) else t
+                  for t in time_from_start]
+        stamps = np.asarray(stamps, dtype=float)
+        if stamps.shape != (num_points,):
+            raise ValueError('number of time stamps and points differ')
+        return stamps
@@ -21,15 +21,60 @@
 import bisect
 from collections import Iterable
 from datetime import timedelta
-from typing import Callable, Union
+from typing import Callable, Sequence, Union
 
 import numpy as np
 import rospy
 import trajectory_msgs
 from std_msgs.msg import Header
 
+from .joint_limits import JointLimits
 from .joint_set import JointSet
 from .joint_trajectory_point import JointTrajectoryPoint
+from .joint_values import JointValues
+
+
+def hermite_interpolate(t0, t1, p0, p1, v0, v1, t):
+    """
+    Cubic hermite interpolation between trajectory points
+
+    Uses the same polynomial as JointTrajectoryPoint.interpolate_cubic.
+    All arguments are broadcast against each other, times have
+    shape (N,) and positions and velocities shape (N,J).
+
+    Parameters
+    ----------
+    t0, t1 : np.ndarray((N,))
+        Time stamps of the segment start and end points
+    p0, p1 : np.ndarray((N,J))
+        Positions at t0 and t1
+    v0, v1 : np.ndarray((N,J))
+        Velocities at t0 and t1
+    t : np.ndarray((N,))
+        Time stamps to evaluate, clamped to [t0, t1]
+
+    Returns
+    -------
+    positions, velocities, accelerations : np.ndarray((N,J))
+        Interpolated values, segments shorter than 1e-6 seconds
+        return the values at t1
+    """
+
+    h = np.asarray(t1 - t0, dtype=float)[:, None]
+    degenerate = h < 1e-6
+    h = np.where(degenerate, 1.0, h)
+    s = np.clip(np.asarray(t - t0, dtype=float)[:, None], 0.0, h)
+
+    c = (-3.0 * p0 + 3.0 * p1 - 2.0 * h * v0 - h * v1) / h**2
+    d = (2.0 * p0 - 2.0 * p1 + h * v0 + h * v1) / h**3
+    positions = p0 + v0 * s + c * s**2 + d * s**3
+    velocities = v0 + 2.0 * c * s + 3.0 * d * s**2
+    accelerations = 2.0 * c + 6.0 * d * s
+
+    positions = np.where(degenerate, p1, positions)
+    velocities = np.where(degenerate, v1, velocities)
+    accelerations = np.where(degenerate, 0.0, accelerations)
+    return positions, velocities, accelerations
 
 
 class JointTrajectoryFlags(object):
@@ -125,6 +170,16 @@ class JointTrajectory(object):
     -------
     empty()
         Creates a empty JointTrajectory instance
+    retime(time_scale, joint_limits=None)
+        Scales the time of the trajectory uniformly or per point
+    min_time_scale(joint_limits)
+        Smallest uniform time scale which respects joint limits
+    decimate(tolerance)
+        Removes points which cubic interpolation reproduces
+    decimation_mask(tolerance)
+        Mask of the points kept by decimate
+    resample(time_from_start)
+        Evaluates the cubic interpolation at new time stamps
     to_joint_trajectory_msg(self, seq=0, frame_id='')
         Converts JointTrajectory to JointTrajectory ros message
     """
@@ -496,6 +551,369 @@ class JointTrajectory(object):
 
         return type(self)(union_joint_set, merged_points)
 
+    def retime(self, time_scale: Union[float, Sequence[float]],
+               joint_limits: Union[None, JointLimits]=None):
+        """
+        Scales the time of the trajectory uniformly or per point
+
+        The time between the points is stretched by time_scale,
+        values greater than one slow the trajectory down. For a time
+        scale s(t) velocities become v / s and accelerations
+        a / s**2 - v * ds/dt / s**3, positions and efforts are kept.
+        No service call is involved.
+
+        Parameters
+        ----------
+        time_scale : float or Sequence[float]
+            One positive factor for the whole trajectory or one
+            positive factor per point. The duration of a segment is
+            scaled by the mean factor of its two points
+        joint_limits : JointLimits or None (default None)
+            If defined the retimed velocities and accelerations
+            are verified against these limits
+
+        Returns
+        -------
+        JointTrajectory
+            Retimed trajectory
+
+        Raises
+        ------
+        TypeError
+            If joint_limits is not None or of type JointLimits
+        ValueError
+            If time_scale is not positive, the number of factors
+            differs from the number of points or the retimed
+            trajectory violates joint_limits
+        """
+
+        if joint_limits is not None and not isinstance(joint_limits,
+                                                       JointLimits):
+            raise TypeError('joint_limits is not one of expected types'
+                            ' None or JointLimits')
+
+        num_points = len(self)
+        scale = np.asarray(time_scale, dtype=float)
+        if scale.ndim == 0:
+            scale = np.full(num_points, float(scale))
+        if scale.shape != (num_points,):
+            raise ValueError('time_scale must be a scalar or provide'
+                             ' one factor per point')
+        if not np.all(scale > 0.0):
+            raise ValueError('time_scale must be positive')
+
+        times, positions, velocities, accelerations = self._arrays()
+
+        new_times = np.empty(num_points)
+        new_times[:1] = times[:1] * scale[:1]
+        new_times[1:] = new_times[0] + np.cumsum(np.diff(times) *
+                                                 (scale[:-1] + scale[1:]) /
+                                                 2.0)
+
+        s = scale[:, None]
+        if velocities is not None:
+            new_velocities = velocities / s
+        else:
+            new_velocities = None
+
+        if accelerations is not None:
+            new_accelerations = accelerations / s**2
+            if velocities is not None and np.ptp(scale) > 0.0:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    scale_rate = np.gradient(scale, times)
+                scale_rate[~np.isfinite(scale_rate)] = 0.0
+                new_accelerations -= velocities * scale_rate[:, None] / s**3
+        else:
+            new_accelerations = None
+
+        if joint_limits is not None:
+            violations = self._limit_violations(joint_limits, new_velocities,
+                                                new_accelerations)
+            if violations:
+                raise ValueError('retimed trajectory exceeds ' + '; '.join(
+                    '{} limits of {}'.format(kind, ', '.join(names))
+                    for kind, names in violations.items()))
+
+        joint_set = self.__joint_set
+        efforts = self.efforts
+
+        def values(array, i):
+            if array is None:
+                return None
+            return JointValues(joint_set, array[i])
+
+        points = [JointTrajectoryPoint(timedelta(seconds=new_times[i]),
+                                       values(positions, i),
+                                       values(new_velocities, i),
+                                       values(new_accelerations, i),
+                                       efforts[i])
+                  for i in range(num_points)]
+
+        return type(self)(joint_set, points, self.is_valid)
+
+    def min_time_scale(self, joint_limits: JointLimits) -> float:
+        """
+        Smallest uniform time scale which respects joint limits
+
+        Parameters
+        ----------
+        joint_limits : JointLimits
+            Velocity and acceleration limits, nan limits are ignored
+
+        Returns
+        -------
+        float
+            Smallest factor for retime with which the velocities
+            and accelerations of the trajectory stay within the
+            limits, smaller than one if the trajectory can be
+            executed faster. 0.0 if no limit constrains the
+            trajectory, e.g. if it is stationary or all limits
+            are nan or None. retime requires a positive factor,
+            so the result has to be clamped in this case
+
+        Raises
+        ------
+        TypeError
+            If joint_limits is not of type JointLimits
+        ValueError
+            If the trajectory has no velocities or joint limits
+            do not contain all joints of the trajectory
+        """
+
+        if not isinstance(joint_limits, JointLimits):
+            raise TypeError('joint_limits is not of expected'
+                            ' type JointLimits')
+
+        if not self.has_velocity:
+            raise ValueError('trajectory has no velocities')
+
+        limits = self._select_limits(joint_limits)
+        _, _, velocities, accelerations = self._arrays()
+
+        scale = 0.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if limits.max_velocity is not None:
+                ratio = np.abs(velocities) / limits.max_velocity
+                ratio = ratio[~np.isnan(ratio)]
+                if ratio.size:
+                    scale = max(scale, ratio.max())
+            if accelerations is not None and limits.max_acceleration is not None:
+                ratio = np.abs(accelerations) / limits.max_acceleration
+                ratio = ratio[~np.isnan(ratio)]
+                if ratio.size:
+                    scale = max(scale, np.sqrt(ratio.max()))
+
+        return float(scale)
+
+    def decimate(self, tolerance: float,
+                 velocity_tolerance: Union[None, float]=None):
+        """
+        Removes points which cubic interpolation reproduces
+
+        Starting with the first and last point, the point with the
+        largest interpolation error of every segment is kept until
+        the cubic hermite interpolation between the kept points
+        reproduces the positions of all points within tolerance
+        (and their velocities within velocity_tolerance).
+        The kept points are not modified, resample restores a
+        trajectory at the original time stamps.
+
+        Parameters
+        ----------
+        tolerance : float convertable
+            Maximal absolute joint position error of the removed
+            points in radian or meter
+        velocity_tolerance : None or float convertable (default None)
+            Maximal absolute joint velocity error of the removed
+            points, if None the velocity error is not bounded
+
+        Returns
+        -------
+        JointTrajectory
+            Trajectory with the kept points
+
+        Raises
+        ------
+        ValueError
+            If a tolerance is negative or the trajectory has
+            no velocities
+        """
+
+        keep = self.decimation_mask(tolerance, velocity_tolerance)
+        return type(self)(self.__joint_set,
+                          [p for p, k in zip(self.__points, keep) if k],
+                          self.is_valid)
+
+    def decimation_mask(self, tolerance: float,
+                        velocity_tolerance: Union[None, float]=None
+                        ) -> np.ndarray:
+        """
+        Mask of the points kept by decimate
+
+        Parameters
+        ----------
+        tolerance : float convertable
+            Maximal absolute joint position error of the removed
+            points
+        velocity_tolerance : None or float convertable (default None)
+            Maximal absolute joint velocity error of the removed
+            points, if None the velocity error is not bounded
+
+        Returns
+        -------
+        np.ndarray((N,), dtype=bool)
+            True for every point which is kept
+
+        Raises
+        ------
+        ValueError
+            If a tolerance is negative or the trajectory has
+            no velocities
+        """
+
+        tolerance = float(tolerance)
+        if tolerance < 0.0:
+            raise ValueError('tolerance must not be negative')
+        if velocity_tolerance is not None:
+            velocity_tolerance = float(velocity_tolerance)
+            if velocity_tolerance < 0.0:
+                raise ValueError('velocity_tolerance must not be negative')
+        if not self.has_velocity:
+            raise ValueError('trajectory has no velocities')
+
+        times, positions, velocities, _ = self._arrays()
+        num_points = times.shape[0]
+        keep = np.zeros(num_points, dtype=bool)
+        keep[[0, -1]] = True
+        if num_points <= 2:
+            return keep
+
+        points = np.arange(num_points)
+        while True:
+            kept = np.flatnonzero(keep)
+            segment = np.minimum(np.searchsorted(kept, points,
+                                                 side='right') - 1,
+                                 kept.shape[0] - 2)
+            i0 = kept[segment]
+            i1 = kept[segment + 1]
+            interpolated, interpolated_velocities, _ = hermite_interpolate(
+                times[i0], times[i1], positions[i0], positions[i1],
+                velocities[i0], velocities[i1], times)
+            error = np.max(np.abs(interpolated - positions), axis=1)
+            error[keep] = 0.0
+            exceeded = error > tolerance
+            if velocity_tolerance is not None:
+                velocity_error = np.max(np.abs(interpolated_velocities -
+                                               velocities), axis=1)
+                velocity_error[keep] = 0.0
+                exceeded |= velocity_error > velocity_tolerance
+            if not np.any(exceeded):
+                return keep
+
+            # keep the point with the largest error of each segment,
+            # points exceeding a tolerance take precedence
+            order = np.lexsort((-error, ~exceeded, segment))
+            first = np.ones(num_points, dtype=bool)
+            first[1:] = segment[order][1:] != segment[order][:-1]
+            worst = order[first]
+            keep[worst[exceeded[worst]]] = True
+
+    def resample(self, time_from_start: Union[Sequence[timedelta],
+                                              Sequence[float]]):
+        """
+        Evaluates the cubic interpolation at new time stamps
+
+        Parameters
+        ----------
+        time_from_start : Sequence[timedelta] or Sequence[float]
+            Ascending time stamps as timedelta or in seconds, values
+            outside of the trajectory are clamped to its start or end
+
+        Returns
+        -------
+        JointTrajectory
+            Trajectory with interpolated positions, velocities
+            and accelerations at the requested time stamps
+
+        Raises
+        ------
+        ValueError
+            If the trajectory has no velocities or the time
+            stamps are not ascending
+        """
+
+        if not self.has_velocity:
+            raise ValueError('trajectory has no velocities')
+
+        stamps = np.asarray([t.total_seconds() if isinstance(t, timedelta)
+                             else t for t in time_from_start], dtype=float)
+        if np.any(np.diff(stamps) < 0.0):
+            raise ValueError('time_from_start must be ascending')
+
+        times, positions, velocities, _ = self._arrays()
+        if times.shape[0] == 1:
+            i0 = i1 = np.zeros(stamps.shape[0], dtype=int)
+        else:
+            i0 = np.clip(np.searchsorted(times, stamps, side='right') - 1,
+                         0, times.shape[0] - 2)
+            i1 = i0 + 1
+        result = hermite_interpolate(times[i0], times[i1], positions[i0],
+                                     positions[i1], velocities[i0],
+                                     velocities[i1], stamps)
+
+        joint_set = self.__joint_set
+        points = [JointTrajectoryPoint(timedelta(seconds=t),
+                                       JointValues(joint_set, p),
+                                       JointValues(joint_set, v),
+                                       JointValues(joint_set, a))
+                  for t, p, v, a in zip(stamps, *result)]
+        return type(self)(joint_set, points, self.is_valid)
+
+    def _arrays(self):
+        num_joints = len(self.__joint_set)
+        times = np.array([p.time_from_start.total_seconds()
+                          for p in self.__points])
+        positions = np.array([p.positions.values for p in self.__points],
+                             dtype=float).reshape(-1, num_joints)
+        velocities = None
+        accelerations = None
+        if self.has_velocity:
+            velocities = np.array([p.velocities.values
+                                   for p in self.__points],
+                                  dtype=float).reshape(-1, num_joints)
+        if self.has_acceleration:
+            accelerations = np.array([p.accelerations.values
+                                      for p in self.__points],
+                                     dtype=float).reshape(-1, num_joints)
+        return times, positions, velocities, accelerations
+
+    def _select_limits(self, joint_limits):
+        if joint_limits.joint_set == self.__joint_set:
+            return joint_limits
+        try:
+            return joint_limits.select(self.__joint_set.names)
+        except ValueError as exc:
+            raise ValueError('joint limits do not contain all'
+                             ' joints of trajectory') from exc
+
+    def _limit_violations(self, joint_limits, velocities, accelerations):
+        limits = self._select_limits(joint_limits)
+        names = self.__joint_set.names
+        violations = {}
+        # nan limits never compare true and are therefore ignored
+        with np.errstate(invalid='ignore'):
+            for kind, values, limit in (
+                    ('velocity', velocities, limits.max_velocity),
+                    ('acceleration', accelerations, limits.max_acceleration)):
+                if values is None or limit is None:
+                    continue
+                exceeded = np.any(np.abs(values) > limit * (1.0 + 1e-9),
+                                  axis=0)
+                if np.any(exceeded):
+                    violations[kind] = [names[i]
+                                        for i in np.flatnonzero(exceeded)]
+        return violations
+
     def to_joint_trajectory_msg(self, seq=0, frame_id=''):
         """
         Converts JointTrajectory to JointTrajectory ros message
@@ -18,6 +18,7 @@
 
 #!/usr/bin/env python3
 
+import numpy as np
 
 class JointValuesCollisions(object):
     """
@@ -63,3 +64,77 @@ class JointValuesCollisions(object):
 
     def __repr__(self):
         return self.__str__()
+
+
+class JointPathCollisions(object):
+    """
+    Compact collision check result of a joint path
+
+    All per point information is stored in numpy arrays. If the
+    check was stopped after the first collision not all points
+    of the path are checked, see checked.
+    """
+
+    def __init__(self, in_collision, error_codes, checked):
+        self.__in_collision = np.asarray(in_collision, dtype=bool)
+        self.__error_codes = np.asarray(error_codes, dtype=np.int32)
+        self.__checked = np.asarray(checked, dtype=bool)
+        self.__in_collision.flags.writeable = False
+        self.__error_codes.flags.writeable = False
+        self.__checked.flags.writeable = False
+
+    @property
+    def in_collision(self):
+        """
+        in_collision : numpy.ndarray(dtype=bool) (readonly)
+            True for each point which is in collision
+        """
+        return self.__in_collision
+
+    @property
+    def error_codes(self):
+        """
+        error_codes : numpy.ndarray(dtype=int32) (readonly)
+            Error code of each point, see JointValuesCollisions.error_code,
+            zero for points which are not checked
+        """
+        return self.__error_codes
+
+    @property
+    def checked(self):
+        """
+        checked : numpy.ndarray(dtype=bool) (readonly)
+            True for each point which was checked
+        """
+        return self.__checked
+
+    @property
+    def indices(self):
+        """
+        indices : numpy.ndarray(dtype=int) (readonly)
+            Indices of points in collision in ascending order
+        """
+        return np.flatnonzero(self.__in_collision)
+
+    @property
+    def complete(self):
+        """
+        complete : bool (readonly)
+            True if all points of the path are checked
+        """
+        return bool(self.__checked.all())
+
+    def __bool__(self):
+        return bool(self.__in_collision.any())
+
+    def __len__(self):
+        return len(self.__in_collision)
+
+    def __str__(self):
+        return ('JointPathCollisions(num_points={}, checked={},'
+                ' collisions={})'.format(len(self.__in_collision),
+                                         int(self.__checked.sum()),
+                                         self.indices.tolist()))
+
+    def __repr__(self):
+        return self.__str__()
@@ -18,8 +18,6 @@
 
 #!/usr/bin/env python3
 
-from control_msgs.msg import GripperCommandResult
-
 
 class MoveGripperResult(object):
     """
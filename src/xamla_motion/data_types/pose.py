@@ -23,6 +23,36 @@ import geometry_msgs.msg as geometry_msgs
 import numpy as np
 
 
+def _quaternion(q):
+    # wraps a numpy array of shape (4,) without the input
+    # validation of pyquaternion, q must be trusted
+    quaternion = Quaternion.__new__(Quaternion)
+    quaternion.q = q
+    return quaternion
+
+
+def _quaternion_product(a, b):
+    aw, ax, ay, az = a
+    bw, bx, by, bz = b
+    return np.array([aw * bw - ax * bx - ay * by - az * bz,
+                     aw * bx + ax * bw + ay * bz - az * by,
+                     aw * by - ax * bz + ay * bw + az * bx,
+                     aw * bz + ax * by - ay * bx + az * bw])
+
+
+def _quaternion_to_matrix(q):
+    w, x, y, z = q / np.sqrt(np.dot(q, q))
+    return np.array([[1.0 - 2.0 * (y * y + z * z),
+                      2.0 * (x * y - z * w),
+                      2.0 * (x * z + y * w)],
+                     [2.0 * (x * y + z * w),
+                      1.0 - 2.0 * (x * x + z * z),
+                      2.0 * (y * z - x * w)],
+                     [2.0 * (x * z - y * w),
+                      2.0 * (y * z + x * w),
+                      1.0 - 2.0 * (x * x + y * y)]])
+
+
 class Pose(object):
     """
     Pose defined by three dimensional translation and rotation
@@ -116,7 +146,7 @@ class Pose(object):
 
         # rotation
         if isinstance(rotation, Quaternion):
-            self.__quaternion = Quaternion(rotation.q.copy())
+            self.__quaternion = _quaternion(np.array(rotation.q, dtype=float))
 
         else:
             raise TypeError('rotation is not of the expected'
@@ -135,6 +165,30 @@ class Pose(object):
 
         self.__translation.flags.writeable = False
         self.__quaternion.q.flags.writeable = False
+        self.__rotation_matrix = None
+
+    # default for instances unpickled from previous versions
+    __rotation_matrix = None
+
+    @classmethod
+    def _create(cls, translation, quaternion, frame_id,
+                rotation_matrix=None):
+        """
+        Trusted constructor without validation
+
+        translation and quaternion must be numpy float arrays of
+        shape (3,) and (4,) which are not modified afterwards,
+        frame_id must be a str.
+        """
+
+        pose = cls.__new__(cls)
+        translation.flags.writeable = False
+        quaternion.flags.writeable = False
+        pose.__translation = translation
+        pose.__quaternion = _quaternion(quaternion)
+        pose.__frame_id = frame_id
+        pose.__rotation_matrix = rotation_matrix
+        return pose
 
     @classmethod
     def identity(cls, frame_id='world'):
@@ -237,22 +291,15 @@ class Pose(object):
         if not isinstance(msg, geometry_msgs.PoseStamped):
             raise TypeError('msg is not of expected type PoseStamped')
 
-        translation = np.fromiter([msg.pose.position.x,
-                                   msg.pose.position.y,
-                                   msg.pose.position.z],
-                                  float)
+        position = msg.pose.position
+        orientation = msg.pose.orientation
 
-        quaternion = Quaternion([msg.pose.orientation.w,
-                                 msg.pose.orientation.x,
-                                 msg.pose.orientation.y,
-                                 msg.pose.orientation.z])
-
-        frame_id = msg.header.frame_id
-
-        if not frame_id:
-            frame_id = 'world'
-
-        return cls(translation, quaternion, frame_id)
+        return cls._create(np.array((position.x, position.y, position.z),
+                                    dtype=float),
+                           np.array((orientation.w, orientation.x,
+                                     orientation.y, orientation.z),
+                                    dtype=float),
+                           msg.header.frame_id or 'world')
 
     @classmethod
     def from_pose_msg(cls, msg, frame_id='world'):
@@ -278,17 +325,18 @@ class Pose(object):
         if not isinstance(msg, geometry_msgs.Pose):
             raise TypeError('msg is not of type ros geometry_msgs/Pose')
 
-        translation = np.fromiter([msg.position.x,
-                                   msg.position.y,
-                                   msg.position.z],
-                                  float)
+        if not isinstance(frame_id, str):
+            raise TypeError('frame_id is not of expected type str')
 
-        quaternion = Quaternion([msg.orientation.w,
-                                 msg.orientation.x,
-                                 msg.orientation.y,
-                                 msg.orientation.z])
+        position = msg.position
+        orientation = msg.orientation
 
-        return cls(translation, quaternion, frame_id)
+        return cls._create(np.array((position.x, position.y, position.z),
+                                    dtype=float),
+                           np.array((orientation.w, orientation.x,
+                                     orientation.y, orientation.z),
+                                    dtype=float),
+                           frame_id)
 
     @property
     def frame_id(self):
@@ -360,7 +408,16 @@ class Pose(object):
             matrix
         """
 
-        return self.__quaternion.rotation_matrix
+        return self._cached_rotation_matrix().copy()
+
+    def _cached_rotation_matrix(self):
+        # computed once, poses are immutable
+        rotation_matrix = self.__rotation_matrix
+        if rotation_matrix is None:
+            rotation_matrix = _quaternion_to_matrix(self.__quaternion.q)
+            rotation_matrix.flags.writeable = False
+            self.__rotation_matrix = rotation_matrix
+        return rotation_matrix
 
     def transformation_matrix(self):
         """
@@ -372,7 +429,8 @@ class Pose(object):
             A 4x4 numpy array with dtype float which represents the transformation
             matrix in homogenous coordinates
         """
-        transformation_matrix = self.__quaternion.transformation_matrix
+        transformation_matrix = np.eye(4)
+        transformation_matrix[:-1, :-1] = self._cached_rotation_matrix()
         transformation_matrix[:-1, -1] = self.__translation
         return transformation_matrix
 
@@ -395,9 +453,15 @@ class Pose(object):
         TypeError : type mismatch
             If new_frame_id is not of type str
         """
-        q_inv = self.__quaternion.inverse
-        t_inv = q_inv.rotate(-self.translation)
-        return self.__class__(t_inv, q_inv, new_frame_id)
+        if not isinstance(new_frame_id, str):
+            raise TypeError('new_frame_id is not of expected type str')
+
+        q = self.__quaternion.q
+        q_inv = q * np.array([1.0, -1.0, -1.0, -1.0]) / np.dot(q, q)
+        rotation_matrix_inv = self._cached_rotation_matrix().T
+        t_inv = -rotation_matrix_inv.dot(self.__translation)
+        return self._create(t_inv, q_inv, new_frame_id,
+                            np.ascontiguousarray(rotation_matrix_inv))
 
     def translate(self, translation):
         """
@@ -430,7 +494,8 @@ class Pose(object):
             raise exc
 
         new_t = self.__translation + translation
-        return type(self)(new_t, self.__quaternion, self.__frame_id)
+        return self._create(new_t, self.__quaternion.q, self.__frame_id,
+                            self.__rotation_matrix)
 
     def rotate(self, rotation):
         """
@@ -459,10 +524,10 @@ class Pose(object):
                               rotation.shape == (3, 3))
 
         if is_quaternion:
-            new_q = self.__quaternion * rotation
+            q = rotation.q
         elif is_rotation_matrix:
             try:
-                new_q = self.__quaternion * Quaternion(matrix=rotation)
+                q = Quaternion(matrix=rotation).q
             except ValueError as exc:
                 raise ValueError(
                     'quaternion initialization went wrong') from exc
@@ -470,7 +535,8 @@ class Pose(object):
             raise TypeError('rotation is not one of expected types '
                             'Quaternion or np.ndarray (3x3)')
 
-        return type(self)(self.__translation, new_q, self.__frame_id)
+        new_q = _quaternion_product(self.__quaternion.q, q)
+        return self._create(self.__translation, new_q, self.__frame_id)
 
     def to_posestamped_msg(self):
         """
@@ -547,11 +613,13 @@ class Pose(object):
         if id(other) == id(self):
             return True
 
-        if not np.allclose(self.__translation, other.translation,
-                           rtol=r_tol, atol=a_tol):
+        # same tolerance test as np.allclose without its overhead
+        t = other.translation
+        if not (np.abs(self.__translation - t) <= a_tol + r_tol * np.abs(t)).all():
             return False
 
-        if self.__quaternion != other.quaternion:
+        q = other.quaternion.q
+        if not (np.abs(self.__quaternion.q - q) <= 1.0e-14 + 1.0e-13 * np.abs(q)).all():
             return False
 
         return True
@@ -561,31 +629,29 @@ class Pose(object):
 
     def __mul__(self, other):
 
-        if isinstance(other, self.__class__):
-            new_q = self.__quaternion * other.quaternion
+        if isinstance(other, Pose):
+            new_q = _quaternion_product(self.__quaternion.q,
+                                        other.quaternion.q)
             new_t = (self.__translation +
-                     self.__quaternion.rotate(other.translation))
-            return self.__class__(new_t, new_q, self.frame_id)
+                     self._cached_rotation_matrix().dot(other.translation))
+            return self._create(new_t, new_q, self.__frame_id)
         elif (isinstance(other, np.ndarray) and
                 issubclass(other.dtype.type, np.floating)):
+            rotation_matrix = self._cached_rotation_matrix()
             if other.shape == (3,):
-                new_t = (self.__translation +
-                         self.__quaternion.rotate(other))
-                return new_t
+                return self.__translation + rotation_matrix.dot(other)
             elif other.shape == (3, 1):
-                new_t = (self.__translation +
-                         self.__quaternion.rotate(other))
-                return np.expand_dims(new_t, axis=1)
+                return (np.expand_dims(self.__translation, axis=1) +
+                        rotation_matrix.dot(other))
             elif other.shape == (4,):
                 new_t = np.ones(other.shape)
                 new_t[0:3] = (self.__translation * other[-1] +
-                              self.__quaternion.rotate(other[:3]))
+                              rotation_matrix.dot(other[:3]))
                 return new_t
             elif other.shape == (4, 1):
                 new_t = np.ones(other.shape)
-                t3 = (self.__translation * other[-1] +
-                      self.__quaternion.rotate(other[:3]))
-                new_t[0:3] = np.expand_dims(t3, axis=1)
+                new_t[0:3] = (np.expand_dims(self.__translation, axis=1) *
+                              other[-1] + rotation_matrix.dot(other[:3]))
                 return new_t
             elif other.shape == (4, 4):
                 product = np.matmul(self.transformation_matrix(), other)
@@ -595,9 +661,8 @@ class Pose(object):
                           ' (4,), (4,1)  or matrix (4,4)')
 
         else:
-            TypeError('other is not of expected type Pose,'
-                      ' 3 or 4 dimensional numpy vector or'
-                      ' 4x4 transformation matrix dtype floating')
+            # allows other types like PoseArray to implement __rmul__
+            return NotImplemented
 
     def __rmul__(self, other):
         return np.dot(other, self.transformation_matrix())
@@ -0,0 +1,884 @@
+# pose_array.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+from typing import Iterable
+
+import geometry_msgs.msg as geometry_msgs
+import numpy as np
+
+from .cartesian_path import CartesianPath
+from .pose import Pose, _quaternion_product, _quaternion_to_matrix
+
+
+def quaternion_multiply(a, b):
+    """
+    Hamilton product of quaternion arrays in (w, x, y, z) order
+
+    Parameters
+    ----------
+    a : np.ndarray((N,4) or (4,))
+        Left quaternions
+    b : np.ndarray((N,4) or (4,))
+        Right quaternions, broadcast against a
+
+    Returns
+    -------
+    np.ndarray((N,4) or (4,))
+        Products a * b
+    """
+
+    if a.ndim == 1 and b.ndim == 1:
+        return _quaternion_product(a, b)
+
+    aw, av = a[..., :1], a[..., 1:]
+    bw, bv = b[..., :1], b[..., 1:]
+    w = aw * bw - np.sum(av * bv, axis=-1, keepdims=True)
+    v = aw * bv + bw * av + np.cross(av, bv)
+    return np.concatenate((w, v), axis=-1)
+
+
+def quaternion_rotate(q, v):
+    """
+    Rotate vectors by quaternions
+
+    Quaternions are normalized before the rotation is applied
+    like pyquaternion does.
+
+    Parameters
+    ----------
+    q : np.ndarray((N,4) or (4,))
+        Quaternions in (w, x, y, z) order
+    v : np.ndarray((N,3) or (3,))
+        Vectors, broadcast against q
+
+    Returns
+    -------
+    np.ndarray((N,3))
+        Rotated vectors
+    """
+
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    w, u = q[..., :1], q[..., 1:]
+    t = 2.0 * np.cross(u, v)
+    return v + w * t + np.cross(u, t)
+
+
+def quaternion_to_matrix(q):
+    """
+    Rotation matrices of quaternions
+
+    Parameters
+    ----------
+    q : np.ndarray((N,4) or (4,))
+        Quaternions in (w, x, y, z) order
+
+    Returns
+    -------
+    np.ndarray((N,3,3) or (3,3))
+        Rotation matrices
+    """
+
+    if q.ndim == 1:
+        return _quaternion_to_matrix(q)
+
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    m = np.empty(q.shape[:-1] + (3, 3))
+    m[..., 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    m[..., 0, 1] = 2.0 * (x * y - z * w)
+    m[..., 0, 2] = 2.0 * (x * z + y * w)
+    m[..., 1, 0] = 2.0 * (x * y + z * w)
+    m[..., 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    m[..., 1, 2] = 2.0 * (y * z - x * w)
+    m[..., 2, 0] = 2.0 * (x * z - y * w)
+    m[..., 2, 1] = 2.0 * (y * z + x * w)
+    m[..., 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    return m
+
+
+def matrix_to_quaternion(m):
+    """
+    Quaternions of rotation matrices
+
+    Each quaternion is computed from the largest of its
+    components to stay numerically stable (Shepperd's method).
+
+    Parameters
+    ----------
+    m : np.ndarray((N,3,3))
+        Rotation matrices
+
+    Returns
+    -------
+    np.ndarray((N,4))
+        Unit quaternions in (w, x, y, z) order
+    """
+
+    trace = np.trace(m, axis1=-2, axis2=-1)
+    diagonal = np.diagonal(m, axis1=-2, axis2=-1)
+    candidates = np.concatenate((trace[..., None], diagonal), axis=-1)
+    largest = np.argmax(candidates, axis=-1)
+
+    q = np.empty(m.shape[:-2] + (4,))
+    s = np.sqrt(np.maximum(1.0 + 2.0 * np.max(candidates, axis=-1)
+                           - trace, 0.0))
+
+    for k in range(4):
+        i = largest == k
+        if not np.any(i):
+            continue
+        mi = m[i]
+        si = s[i]
+        if k == 0:
+            q[i, 0] = 0.5 * si
+            q[i, 1] = (mi[:, 2, 1] - mi[:, 1, 2]) / (2.0 * si)
+            q[i, 2] = (mi[:, 0, 2] - mi[:, 2, 0]) / (2.0 * si)
+            q[i, 3] = (mi[:, 1, 0] - mi[:, 0, 1]) / (2.0 * si)
+        else:
+            a = k - 1
+            b = (a + 1) % 3
+            c = (a + 2) % 3
+            q[i, 1 + a] = 0.5 * si
+            q[i, 1 + b] = (mi[:, b, a] + mi[:, a, b]) / (2.0 * si)
+            q[i, 1 + c] = (mi[:, c, a] + mi[:, a, c]) / (2.0 * si)
+            q[i, 0] = (mi[:, c, b] - mi[:, b, c]) / (2.0 * si)
+
+    # same sign convention as normalized poses, positive real part
+    q[q[:, 0] < 0.0] *= -1.0
+    return q
+
+
+def quaternion_slerp(q0, q1, fraction):
+    """
+    Spherical linear interpolation of quaternion arrays
+
+    The shorter arc is used, nearly parallel quaternions
+    are interpolated linearly.
+
+    Parameters
+    ----------
+    q0 : np.ndarray((N,4))
+        Start quaternions
+    q1 : np.ndarray((N,4))
+        End quaternions
+    fraction : float or np.ndarray((N,))
+        Interpolation parameter in [0, 1]
+
+    Returns
+    -------
+    np.ndarray((N,4))
+        Interpolated unit quaternions
+    """
+
+    q0 = q0 / np.linalg.norm(q0, axis=-1, keepdims=True)
+    q1 = q1 / np.linalg.norm(q1, axis=-1, keepdims=True)
+    fraction = np.broadcast_to(np.asarray(fraction, dtype=float),
+                               q0.shape[:-1])[..., None]
+
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    q1 = np.where(dot < 0.0, -q1, q1)
+    dot = np.abs(dot)
+
+    linear = dot > 0.9995
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.where(linear, 1.0, np.sin(theta))
+    w0 = np.where(linear, 1.0 - fraction,
+                  np.sin((1.0 - fraction) * theta) / sin_theta)
+    w1 = np.where(linear, fraction, np.sin(fraction * theta) / sin_theta)
+
+    q = w0 * q0 + w1 * q1
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+class PoseArray(object):
+    """
+    Batch of poses stored as translation and quaternion arrays
+
+    A PoseArray holds N poses defined in the same coordinate
+    system as a (N,3) translation array and a (N,4) quaternion
+    array in (w, x, y, z) order. All operations are vectorized,
+    which makes it the preferred type to generate and transform
+    large sets of poses like grids or pallet layouts.
+
+    Methods
+    -------
+    from_poses(poses)
+        Creates an instance of PoseArray from an Iterable of Pose
+    from_cartesian_path(path)
+        Creates an instance of PoseArray from a CartesianPath
+    from_transformation_matrices(matrices, frame_id='world')
+        Creates an instance of PoseArray from transformation matrices
+    from_pose_array_msg(msg)
+        Creates an instance of PoseArray from ROS PoseArray message
+    from_posestamped_msgs(msgs)
+        Creates an instance of PoseArray from ROS PoseStamped messages
+    grid(origin, counts, spacing)
+        Creates a regular grid of poses relative to an origin pose
+    rotation_matrices()
+        Returns the rotation matrices (Nx3x3 numpy array)
+    transformation_matrices()
+        Returns the transformation matrices (Nx4x4 numpy array)
+    inverse(new_frame_id)
+        Creates an instance which contains the inverse poses
+    transform_points(points)
+        Transforms points by the poses
+    interpolate(other, fraction)
+        Interpolates between the poses of self and other
+    densify(max_translation_step, max_rotation_step=None)
+        Resamples the poses as path with limited step sizes
+    to_poses()
+        Converts to a list of Pose
+    to_cartesian_path()
+        Converts to CartesianPath
+    to_pose_array_msg()
+        Creates an instance of the ROS message PoseArray
+    """
+
+    def __init__(self, translations, quaternions, frame_id='world',
+                 normalize_rotation=False):
+        """
+        Initialization of the PoseArray class
+
+        Parameters
+        ----------
+        translations : convertable to numpy array of shape (N,3)
+            translations of the poses
+        quaternions : convertable to numpy array of shape (N,4)
+            rotations of the poses as quaternions in (w, x, y, z) order
+        frame_id : str (optinal defaul = 'world')
+            name of the coordinate system the poses are defined
+        normalize_rotation : bool (optinal default = False)
+            If true quaternion normalization is performed in the
+            initialization process
+
+        Returns
+        ------
+        PoseArray
+            An instance of class PoseArray
+
+        Raises
+        ------
+        TypeError : type mismatch
+            If frame_id is not of type str
+        ValueError
+            If translations or quaternions have not the
+            expected shape or number of poses differs
+        """
+
+        translations = np.array(translations, dtype=float, ndmin=2)
+        quaternions = np.array(quaternions, dtype=float, ndmin=2)
+
+        if translations.size == 0:
+            translations = translations.reshape(0, 3)
+        if quaternions.size == 0:
+            quaternions = quaternions.reshape(0, 4)
+
+        if translations.ndim != 2 or translations.shape[1] != 3:
+            raise ValueError('translations is not convertable to a'
+                             ' numpy array of shape (N,3)')
+
+        if quaternions.ndim != 2 or quaternions.shape[1] != 4:
+            raise ValueError('quaternions is not convertable to a'
+                             ' numpy array of shape (N,4)')
+
+        if translations.shape[0] != quaternions.shape[0]:
+            raise ValueError('number of translations and quaternions'
+                             ' differs')
+
+        if not isinstance(frame_id, str):
+            raise TypeError('frame_id is not of expected type str')
+
+        if normalize_rotation:
+            quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+            quaternions[quaternions[:, 0] < 0.0] *= -1.0
+
+        translations.flags.writeable = False
+        quaternions.flags.writeable = False
+
+        self.__translations = translations
+        self.__quaternions = quaternions
+        self.__frame_id = frame_id
+
+    @classmethod
+    def from_poses(cls, poses: Iterable[Pose]):
+        """
+        Creates an instance of PoseArray from an Iterable of Pose
+
+        Parameters
+        ----------
+        poses : Iterable[Pose]
+            Poses with the same frame id
+
+        Returns
+        -------
+        PoseArray
+            New instance of PoseArray
+
+        Raises
+        ------
+        TypeError
+            If poses is not an Iterable of Pose
+        ValueError
+            If poses have not the same frame_id
+        """
+
+        poses = list(poses)
+        if any(not isinstance(p, Pose) for p in poses):
+            raise TypeError('poses is not of expected type Iterable of Pose')
+
+        frame_id = poses[0].frame_id if poses else 'world'
+        if any(p.frame_id != frame_id for p in poses):
+            raise ValueError('poses have not the same frame_id')
+
+        translations = np.array([p.translation for p in poses]).reshape(-1, 3)
+        quaternions = np.array([p.quaternion.q for p in poses]).reshape(-1, 4)
+        return cls(translations, quaternions, frame_id)
+
+    @classmethod
+    def from_cartesian_path(cls, path: CartesianPath):
+        """
+        Creates an instance of PoseArray from a CartesianPath
+
+        Parameters
+        ----------
+        path : CartesianPath
+            Cartesian path
+
+        Returns
+        -------
+        PoseArray
+            New instance of PoseArray
+
+        Raises
+        ------
+        TypeError
+            If path is not of type CartesianPath
+        """
+
+        if not isinstance(path, CartesianPath):
+            raise TypeError('path is not of expected type CartesianPath')
+
+        return cls.from_poses(path.points)
+
+    @classmethod
+    def from_transformation_matrices(cls, matrices, frame_id='world'):
+        """
+        Creates an instance of PoseArray from transformation matrices
+
+        Parameters
+        ----------
+        matrices : np.ndarray((N,4,4), dtype=floating)
+            Transformation matrices in homogenous coordinates
+        frame_id : str (defaul = 'world')
+            name of the coordinate system the poses are defined
+
+        Returns
+        -------
+        PoseArray
+            New instance of PoseArray
+
+        Raises
+        ------
+        ValueError
+            If matrices is not of shape (N,4,4)
+        """
+
+        matrices = np.asarray(matrices, dtype=float)
+        if matrices.ndim == 2:
+            matrices = matrices[None]
+        if matrices.ndim != 3 or matrices.shape[1:] != (4, 4):
+            raise ValueError('matrices is not of shape (N,4,4)')
+
+        return cls(matrices[:, :3, 3],
+                   matrix_to_quaternion(matrices[:, :3, :3]),
+                   frame_id)
+
+    @classmethod
+    def from_pose_array_msg(cls, msg):
+        """
+        Creates an instance of PoseArray from ROS PoseArray message
+
+        Parameters
+        ----------
+        msg : geometry_msgs/PoseArray
+            pose array message
+
+        Returns
+        -------
+        PoseArray
+            New instance of PoseArray
+
+        Raises
+        ------
+        TypeError
+            If msg is not of type PoseArray
+        """
+
+        if not isinstance(msg, geometry_msgs.PoseArray):
+            raise TypeError('msg is not of type ros geometry_msgs/PoseArray')
+
+        n = len(msg.poses)
+        translations = np.empty((n, 3))
+        quaternions = np.empty((n, 4))
+        for i, p in enumerate(msg.poses):
+            translations[i] = (p.position.x, p.position.y, p.position.z)
+            quaternions[i] = (p.orientation.w, p.orientation.x,
+                              p.orientation.y, p.orientation.z)
+
+        return cls(translations, quaternions,
+                   msg.header.frame_id or 'world')
+
+    @classmethod
+    def from_posestamped_msgs(cls, msgs):
+        """
+        Creates an instance of PoseArray from ROS PoseStamped messages
+
+        The messages are decoded into preallocated arrays, the frame
+        id of the first message is used for all poses.
+
+        Parameters
+        ----------
+        msgs : Sequence[geometry_msgs/PoseStamped]
+            posestamped messages
+
+        Returns
+        -------
+        PoseArray
+            New instance of PoseArray
+        """
+
+        n = len(msgs)
+        translations = np.empty((n, 3))
+        quaternions = np.empty((n, 4))
+        for i, msg in enumerate(msgs):
+            p = msg.pose.position
+            o = msg.pose.orientation
+            translations[i] = (p.x, p.y, p.z)
+            quaternions[i] = (o.w, o.x, o.y, o.z)
+
+        frame_id = msgs[0].header.frame_id if n else ''
+        return cls(translations, quaternions, frame_id or 'world')
+
+    @classmethod
+    def grid(cls, origin: Pose, counts: Iterable[int],
+             spacing: Iterable[float]):
+        """
+        Creates a regular grid of poses relative to an origin pose
+
+        Parameters
+        ----------
+        origin : Pose
+            Pose of the first grid cell, the grid axes are the
+            axes of this pose
+        counts : Iterable[int]
+            Number of cells in x, y and z direction
+        spacing : Iterable[float]
+            Distance between cells in x, y and z direction
+
+        Returns
+        -------
+        PoseArray
+            Poses of all cells, x varies fastest
+
+        Raises
+        ------
+        TypeError
+            If origin is not of type Pose
+        ValueError
+            If counts or spacing are not of size 3
+        """
+
+        if not isinstance(origin, Pose):
+            raise TypeError('origin is not of expected type Pose')
+
+        counts = [int(c) for c in counts]
+        spacing = np.fromiter(spacing, float)
+        if len(counts) != 3 or spacing.shape[0] != 3:
+            raise ValueError('counts and spacing must be of size 3')
+
+        z, y, x = np.meshgrid(*[np.arange(c) for c in reversed(counts)],
+                              indexing='ij')
+        offsets = np.stack((x.ravel(), y.ravel(), z.ravel()), axis=1) * spacing
+
+        translations = (origin.translation +
+                        quaternion_rotate(origin.quaternion.q, offsets))
+        quaternions = np.tile(origin.quaternion.q, (offsets.shape[0], 1))
+        return cls(translations, quaternions, origin.frame_id)
+
+    @property
+    def frame_id(self):
+        """
+        frame_id : str (readonly)
+            Id of the coordinate system / frame
+        """
+        return self.__frame_id
+
+    @property
+    def translations(self):
+        """
+        translations : numpy.array((N,3) dtype=floating) (readonly)
+            translations of all poses
+        """
+        return self.__translations
+
+    @property
+    def quaternions(self):
+        """
+        quaternions : numpy.array((N,4) dtype=floating) (readonly)
+            quaternions of all poses in (w, x, y, z) order
+        """
+        return self.__quaternions
+
+    def rotation_matrices(self):
+        """
+        Returns the rotation matrices (Nx3x3 numpy array)
+        """
+
+        return quaternion_to_matrix(self.__quaternions)
+
+    def transformation_matrices(self):
+        """
+        Returns the transformation matrices (Nx4x4 numpy array)
+        """
+
+        matrices = np.zeros((len(self), 4, 4))
+        matrices[:, :3, :3] = quaternion_to_matrix(self.__quaternions)
+        matrices[:, :3, 3] = self.__translations
+        matrices[:, 3, 3] = 1.0
+        return matrices
+
+    def inverse(self, new_frame_id):
+        """
+        Creates an instance which contains the inverse poses
+
+        Parameters
+        ----------
+        new_frame_id : str
+            name of the coordinate system in which poses are now defined
+
+        Returns
+        -------
+        PoseArray
+            Poses which are the inverse of self
+        """
+
+        q = self.__quaternions
+        q_inv = q * np.array([1.0, -1.0, -1.0, -1.0])
+        q_inv /= np.sum(q * q, axis=1, keepdims=True)
+        t_inv = quaternion_rotate(q_inv, -self.__translations)
+        return type(self)(t_inv, q_inv, new_frame_id)
+
+    def transform_points(self, points):
+        """
+        Transforms points by the poses
+
+        Parameters
+        ----------
+        points : convertable to numpy array of shape (3,) or (N,3)
+            A single point which is transformed by every pose
+            or one point per pose
+
+        Returns
+        -------
+        np.ndarray((N,3))
+            Transformed points
+
+        Raises
+        ------
+        ValueError
+            If points is not broadcastable to shape (N,3)
+        """
+
+        points = np.asarray(points, dtype=float)
+        if points.shape not in ((3,), (len(self), 3)):
+            raise ValueError('points is not of shape (3,) or (N,3)')
+
+        return self.__translations + quaternion_rotate(self.__quaternions,
+                                                       points)
+
+    def interpolate(self, other, fraction):
+        """
+        Interpolates between the poses of self and other
+
+        Translations are interpolated linearly, rotations by
+        spherical linear interpolation.
+
+        Parameters
+        ----------
+        other : PoseArray or Pose
+            Target poses, a Pose is used for all poses of self
+        fraction : float or Iterable[float]
+            Interpolation parameter in [0, 1], a single value
+            or one value per pose
+
+        Returns
+        -------
+        PoseArray
+            Interpolated poses
+
+        Raises
+        ------
+        TypeError
+            If other is not one of expected types PoseArray or Pose
+        ValueError
+            If frame ids or number of poses differ
+        """
+
+        if isinstance(other, Pose):
+            other = PoseArray(other.translation[None], other.quaternion.q[None],
+                              other.frame_id)
+        elif not isinstance(other, PoseArray):
+            raise TypeError('other is not one of expected types'
+                            ' PoseArray or Pose')
+
+        if other.frame_id != self.__frame_id:
+            raise ValueError('poses have not the same frame_id')
+
+        if len(other) not in (1, len(self)):
+            raise ValueError('number of poses differs')
+
+        fraction = np.asarray(fraction, dtype=float)
+        t = fraction[..., None] if fraction.ndim else fraction
+        translations = (self.__translations +
+                        (other.translations - self.__translations) * t)
+        q1 = np.broadcast_to(other.quaternions, self.__quaternions.shape)
+        quaternions = quaternion_slerp(self.__quaternions, q1, fraction)
+        return type(self)(translations, quaternions, self.__frame_id)
+
+    def densify(self, max_translation_step: float,
+                max_rotation_step: float=None):
+        """
+        Resamples the poses as path with limited step sizes
+
+        Each segment between consecutive poses is split into the
+        smallest number of equally sized steps so that no step
+        exceeds the translation and rotation limits. Translations
+        are interpolated linearly, rotations by slerp. The original
+        poses are part of the result.
+
+        Parameters
+        ----------
+        max_translation_step : float
+            Maximal translation between consecutive poses in meter
+        max_rotation_step : float or None (default None)
+            Maximal rotation angle between consecutive poses in
+            radian, if None rotation is not limited
+
+        Returns
+        -------
+        PoseArray
+            Densified poses
+
+        Raises
+        ------
+        ValueError
+            If a step limit is not positive
+        """
+
+        if max_translation_step <= 0.0:
+            raise ValueError('max_translation_step must be positive')
+        if max_rotation_step is not None and max_rotation_step <= 0.0:
+            raise ValueError('max_rotation_step must be positive')
+
+        if len(self) < 2:
+            return self
+
+        t = self.__translations
+        q = self.__quaternions / np.linalg.norm(self.__quaternions, axis=1,
+                                                keepdims=True)
+
+        steps = np.ceil(np.linalg.norm(np.diff(t, axis=0), axis=1) /
+                        max_translation_step)
+        if max_rotation_step is not None:
+            dot = np.abs(np.sum(q[:-1] * q[1:], axis=1))
+            angle = 2.0 * np.arccos(np.clip(dot, 0.0, 1.0))
+            steps = np.maximum(steps, np.ceil(angle / max_rotation_step))
+        steps = np.maximum(steps, 1).astype(int)
+
+        # segment index and interpolation parameter of every new pose
+        segment = np.repeat(np.arange(steps.shape[0]), steps)
+        offsets = np.cumsum(steps) - steps
+        fraction = (np.arange(segment.shape[0]) - offsets[segment]) / steps[segment]
+
+        translations = np.empty((segment.shape[0] + 1, 3))
+        quaternions = np.empty((segment.shape[0] + 1, 4))
+        translations[:-1] = (t[segment] +
+                             (t[segment + 1] - t[segment]) * fraction[:, None])
+        quaternions[:-1] = quaternion_slerp(q[segment], q[segment + 1],
+                                            fraction)
+        translations[-1] = t[-1]
+        quaternions[-1] = q[-1]
+
+        return type(self)(translations, quaternions, self.__frame_id)
+
+    def to_poses(self):
+        """
+        Converts to a list of Pose
+
+        Returns
+        -------
+        List[Pose]
+            Poses of this PoseArray
+        """
+
+        frame_id = self.__frame_id
+        return [Pose._create(t, q, frame_id)
+                for t, q in zip(self.__translations.copy(),
+                                self.__quaternions.copy())]
+
+    def to_cartesian_path(self):
+        """
+        Converts to CartesianPath
+
+        Returns
+        -------
+        CartesianPath
+            Cartesian path with the poses of this PoseArray
+        """
+
+        return CartesianPath(self.to_poses())
+
+    def to_pose_array_msg(self):
+        """
+        Creates an instance of the ROS message PoseArray
+
+        Returns
+        ------
+            Instance of ROS message PoseArray (seq and time are not set)
+            geometry_msgs/PoseArray
+        """
+
+        msg = geometry_msgs.PoseArray()
+        msg.header.frame_id = self.__frame_id
+
+        poses = []
+        for t, q in zip(self.__translations.tolist(),
+                        self.__quaternions.tolist()):
+            pose = geometry_msgs.Pose()
+            pose.position.x, pose.position.y, pose.position.z = t
+            (pose.orientation.w, pose.orientation.x,
+             pose.orientation.y, pose.orientation.z) = q
+            poses.append(pose)
+        msg.poses = poses
+
+        return msg
+
+    def __len__(self):
+        return self.__translations.shape[0]
+
+    def __iter__(self):
+        return iter(self.to_poses())
+
+    def __getitem__(self, key):
+        """
+        Returns pose by index or PoseArray by slice or index array
+
+        Parameters
+        ----------
+        key : int, slice or Iterable[int] or boolean mask
+
+        Returns
+        -------
+        Pose or PoseArray
+
+        Raises
+        ------
+        IndexError :
+            If index is out of range
+        """
+
+        if isinstance(key, (int, np.integer)):
+            try:
+                return Pose._create(self.__translations[key].copy(),
+                                    self.__quaternions[key].copy(),
+                                    self.__frame_id)
+            except IndexError:
+                raise IndexError('index out of range')
+
+        return type(self)(self.__translations[key], self.__quaternions[key],
+                          self.__frame_id)
+
+    def __str__(self):
+        return ('PoseArray:\nsize : {}\nframe_id : {}'.format(len(self),
+                                                               self.__frame_id))
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __eq__(self, other):
+        r_tol = 1.0e-6
+        a_tol = 1.0e-7
+
+        if not isinstance(other, self.__class__):
+            return False
+
+        if id(other) == id(self):
+            return True
+
+        if (other.frame_id != self.__frame_id or
+                len(other) != len(self)):
+            return False
+
+        return (np.allclose(self.__translations, other.translations,
+                            rtol=r_tol, atol=a_tol) and
+                np.allclose(self.__quaternions, other.quaternions,
+                            rtol=r_tol, atol=a_tol))
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __mul__(self, other):
+        """
+        Composes poses element wise or transforms all by one pose
+
+        self * other with other PoseArray of same length or of
+        length one or other Pose.
+        """
+
+        if isinstance(other, Pose):
+            other_t = other.translation
+            other_q = other.quaternion.q
+        elif isinstance(other, PoseArray):
+            if len(other) not in (1, len(self)) and len(self) != 1:
+                raise ValueError('number of poses differs')
+            other_t = other.translations
+            other_q = other.quaternions
+        else:
+            return NotImplemented
+
+        new_q = quaternion_multiply(self.__quaternions, other_q)
+        new_t = self.__translations + quaternion_rotate(self.__quaternions,
+                                                        other_t)
+        return type(self)(new_t, new_q, self.__frame_id)
+
+    def __rmul__(self, other):
+        """
+        Transforms all poses by a Pose
+
+        other * self with other Pose
+        """
+
+        if not isinstance(other, Pose):
+            return NotImplemented
+
+        q = other.quaternion.q
+        new_q = quaternion_multiply(q, self.__quaternions)
+        new_t = other.translation + quaternion_rotate(q, self.__translations)
+        return type(self)(new_t, new_q, other.frame_id)
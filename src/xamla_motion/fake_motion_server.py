@@ -0,0 +1,425 @@
+# fake_motion_server.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+import posixpath
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+from pyquaternion import Quaternion
+
+from .data_types import (ErrorCodes, JointSet, JointTrajectory,
+                         JointTrajectoryPoint, JointValues, Pose)
+from .transport import FakeActionAborted, FakeTransport
+from .v2 import world_view_client as wv
+
+SUCCESS = 1
+
+
+def _error_code(val: int):
+    return SimpleNamespace(val=val)
+
+
+class FakeMotionServer(object):
+
+    """
+    In-process stand-in for the ROSVITA motion and world view services
+
+    Registers deterministic implementations of the services and
+    actions used by MotionService and WorldViewClient at a
+    FakeTransport. The kinematics is a simple invertible model:
+    the first three joints are the translation of the end effector,
+    joints four to six its rotation vector. Planning interpolates
+    the joint path with limited velocities, execution waits the
+    scaled trajectory duration and updates the current joint state.
+
+    Examples
+    --------
+    >>> transport = FakeTransport(default_latency=0.001)
+    >>> server = FakeMotionServer(transport, time_scale=0.0)
+    >>> set_transport(transport)
+    >>> move_group = MoveGroup()
+
+    Methods
+    -------
+    forward_kinematics(positions)
+        Pose of the fake kinematics for joint positions
+    inverse_kinematics(pose, seed)
+        Joint positions of the fake kinematics for a pose
+    """
+
+    def __init__(self, transport: FakeTransport,
+                 move_groups: Dict[str, Tuple[Iterable[str], Iterable[str],
+                                              Iterable[str]]]=None,
+                 time_scale: float=1.0, max_velocity: float=1.0,
+                 max_acceleration: float=2.0):
+        """
+        Initialize FakeMotionServer and register it at transport
+
+        Parameters
+        ----------
+        transport : FakeTransport
+            Transport at which services and actions are registered
+        move_groups : Dict[str, Tuple[joint names, end effector names,
+                      end effector link names]] or None (default None)
+            Available move groups, if None one move group 'arm' with
+            joints joint1 to joint6 and end effector 'tool'
+        time_scale : float convertable (default 1.0)
+            Scaling of the execution time of trajectories,
+            0.0 executes trajectories immediately
+        max_velocity : float convertable (default 1.0)
+            Velocity limit of all joints
+        max_acceleration : float convertable (default 2.0)
+            Acceleration limit of all joints
+
+        Returns
+        -------
+        FakeMotionServer
+            Instance of FakeMotionServer
+
+        Raises
+        ------
+        TypeError
+            If transport is not of expected type FakeTransport
+        """
+
+        if not isinstance(transport, FakeTransport):
+            raise TypeError('transport is not of expected type FakeTransport')
+
+        if move_groups is None:
+            move_groups = {'arm': (['joint{}'.format(i) for i in range(1, 7)],
+                                   ['tool'], ['tool0'])}
+
+        self.__transport = transport
+        self.__time_scale = float(time_scale)
+        self.__mutex = threading.Lock()
+        self.__move_groups = {name: tuple(list(v) for v in value)
+                              for name, value in move_groups.items()}
+        self.__joint_positions = {}
+        self.__world_view = {}
+        self.__folders = {'/'}
+
+        for joint_names, _, _ in self.__move_groups.values():
+            for joint_name in joint_names:
+                self.__joint_positions[joint_name] = 0.0
+                prefix = 'robot_description_planning/joint_limits/{}/'.format(
+                    joint_name)
+                transport.set_param(prefix + 'has_velocity_limits', True)
+                transport.set_param(prefix + 'max_velocity', float(max_velocity))
+                transport.set_param(prefix + 'has_acceleration_limits', True)
+                transport.set_param(prefix + 'max_acceleration',
+                                    float(max_acceleration))
+                transport.set_param(prefix + 'has_position_limits', True)
+                transport.set_param(prefix + 'min_position', -np.pi)
+                transport.set_param(prefix + 'max_position', np.pi)
+
+        transport.set_param('xamlaJointJogging/end_effector_list',
+                            [{'name': ee,
+                              'taskspace_xyz_max_vel': 0.5,
+                              'taskspace_xyz_max_acc': 1.0,
+                              'taskspace_angular_max_vel': 1.0,
+                              'taskspace_angular_max_acc': 2.0}
+                             for _, ees, _ in self.__move_groups.values()
+                             for ee in ees])
+
+        register = transport.register_service
+        register('xamlaMoveGroupServices/query_move_group_interface',
+                 self._query_move_groups)
+        register('xamlaMoveGroupServices/query_move_group_current_position',
+                 self._query_joint_states)
+        register('xamlaMoveGroupServices/query_fk', self._query_fk)
+        register('xamlaMoveGroupServices/query_ik2', self._query_ik)
+        register('xamlaPlanningServices/query_joint_path',
+                 self._query_joint_path)
+        register('xamlaPlanningServices/query_joint_trajectory',
+                 self._query_joint_trajectory)
+        register('/xamlaResourceLockService/query_resource_lock',
+                 self._query_lock)
+        transport.register_action('moveJ_action', self._move_joints)
+
+        for kind in ('joint_values', 'pose', 'cartesian_path',
+                     'collision_object'):
+            register(getattr(wv, 'add_{}_srv_name'.format(kind)),
+                     self._world_view_add(kind, update=False))
+            register(getattr(wv, 'update_{}_srv_name'.format(kind)),
+                     self._world_view_add(kind, update=True))
+            register(getattr(wv, 'get_{}_srv_name'.format(kind)),
+                     self._world_view_get(kind))
+        register(wv.query_joint_values_srv_name,
+                 self._world_view_query('joint_values', 'points'))
+        register(wv.query_poses_srv_name,
+                 self._world_view_query('pose', 'points'))
+        register(wv.query_cartesian_paths_srv_name,
+                 self._world_view_query('cartesian_path', 'paths'))
+        register(wv.query_collision_objects_srv_name,
+                 self._world_view_query('collision_object',
+                                        'collision_objects'))
+        register(wv.add_folder_srv_name, self._world_view_add_folder)
+        register(wv.remove_element_srv_name, self._world_view_remove)
+
+    @property
+    def joint_positions(self) -> Dict[str, float]:
+        """
+        joint_positions : Dict[str, float]
+            Current positions of all joints by name
+        """
+        with self.__mutex:
+            return dict(self.__joint_positions)
+
+    @staticmethod
+    def forward_kinematics(positions: Iterable[float]) -> Pose:
+        """
+        Pose of the fake kinematics for joint positions
+        """
+        q = np.zeros(6)
+        values = np.asarray(list(positions), dtype=float)[:6]
+        q[:values.shape[0]] = values
+        angle = np.linalg.norm(q[3:])
+        if angle > 0.0:
+            rotation = Quaternion(axis=q[3:] / angle, angle=angle)
+        else:
+            rotation = Quaternion()
+        return Pose(q[:3], rotation)
+
+    @staticmethod
+    def inverse_kinematics(pose: Pose, seed: Iterable[float]) -> np.ndarray:
+        """
+        Joint positions of the fake kinematics for a pose
+        """
+        q = np.asarray(list(seed), dtype=float).copy()
+        if q.shape[0] < 6:
+            raise ValueError('fake kinematics requires six joints')
+        rotation = pose.quaternion
+        if rotation.w < 0.0:
+            rotation = -rotation
+        q[:3] = pose.translation
+        q[3:6] = rotation.axis * rotation.angle
+        return q
+
+    def _query_move_groups(self, *args):
+        groups = [SimpleNamespace(name=name, sub_move_group_ids=[name],
+                                  joint_names=joints,
+                                  end_effector_names=ees,
+                                  end_effector_link_names=links)
+                  for name, (joints, ees, links) in self.__move_groups.items()]
+        return SimpleNamespace(move_group_interfaces=groups)
+
+    def _query_joint_states(self, joint_names):
+        with self.__mutex:
+            positions = [self.__joint_positions[n] for n in joint_names]
+        state = SimpleNamespace(name=list(joint_names), position=positions,
+                                velocity=[], effort=[])
+        return SimpleNamespace(current_joint_position=state)
+
+    def _query_fk(self, move_group_name, end_effector_link, joint_names,
+                  points):
+        solutions = [self.forward_kinematics(p.positions).to_posestamped_msg()
+                     for p in points]
+        return SimpleNamespace(solutions=solutions,
+                               error_codes=[_error_code(SUCCESS)
+                                            for _ in points],
+                               error_msgs=['' for _ in points])
+
+    def _query_ik(self, request):
+        seed = list(request.seed.positions)
+        if not seed:
+            with self.__mutex:
+                seed = [self.__joint_positions[n] for n in request.joint_names]
+        solutions = []
+        error_codes = []
+        for ee_poses in request.points:
+            pose = Pose.from_posestamped_msg(ee_poses.poses[0])
+            try:
+                positions = self.inverse_kinematics(pose, seed)
+                # solutions outside of the position limits are rejected
+                if np.any(np.abs(positions) > np.pi):
+                    raise ValueError('solution violates joint limits')
+                error_codes.append(_error_code(SUCCESS))
+            except ValueError:
+                positions = np.asarray(seed, dtype=float)
+                error_codes.append(_error_code(ErrorCodes.NO_IK_SOLUTION.value))
+            solutions.append(SimpleNamespace(positions=list(positions)))
+            if not request.const_seed:
+                seed = list(positions)
+        return SimpleNamespace(solutions=solutions, error_codes=error_codes)
+
+    def _query_joint_path(self, move_group_name, joint_names, points):
+        return SimpleNamespace(error_code=_error_code(SUCCESS),
+                               path=list(points))
+
+    def _query_joint_trajectory(self, joint_names, points, max_velocity,
+                                max_acceleration, max_deviation, delta_t):
+        joint_set = JointSet(list(joint_names))
+        waypoints = np.asarray([p.positions for p in points], dtype=float)
+        max_velocity = np.asarray(max_velocity, dtype=float)
+        max_acceleration = np.asarray(max_acceleration, dtype=float)
+
+        # segment durations of a velocity and acceleration limited motion
+        delta = np.abs(np.diff(waypoints, axis=0))
+        durations = np.maximum(delta / max_velocity,
+                               2.0 * np.sqrt(delta / max_acceleration))
+        durations = np.max(durations, axis=1) if durations.size else durations
+        stamps = np.concatenate(([0.0], np.cumsum(durations)))
+
+        if stamps[-1] > 0.0:
+            times = np.append(np.arange(0.0, stamps[-1], delta_t), stamps[-1])
+        else:
+            times = np.zeros(1)
+        positions = np.column_stack([np.interp(times, stamps, waypoints[:, j])
+                                     for j in range(waypoints.shape[1])])
+        velocities = np.gradient(positions, axis=0) / max(delta_t, 1e-9) \
+            if times.shape[0] > 1 else np.zeros_like(positions)
+        velocities[-1] = 0.0
+
+        trajectory_points = [
+            JointTrajectoryPoint(timedelta(seconds=float(t)),
+                                 JointValues(joint_set, p),
+                                 JointValues(joint_set, v))
+            for t, p, v in zip(times, positions, velocities)]
+        trajectory = JointTrajectory(joint_set, trajectory_points)
+
+        return SimpleNamespace(error_code=_error_code(SUCCESS),
+                               solution=trajectory.to_joint_trajectory_msg())
+
+    def _query_lock(self, request):
+        return SimpleNamespace(success=True, error_msg='',
+                               id_resources=list(request.id_resources),
+                               id_lock=request.id_lock or 'fake_lock',
+                               creation_date=0, expiration_date=0)
+
+    def _move_joints(self, goal, context):
+        trajectory = goal.trajectory
+        if not trajectory.points:
+            raise FakeActionAborted(SimpleNamespace(
+                result=ErrorCodes.INVALID_MOTION_PLAN.value))
+
+        last = trajectory.points[-1]
+        duration = last.time_from_start.to_sec() * self.__time_scale
+        steps = max(int(duration / 0.01), 1)
+        for i in range(steps):
+            if not context.sleep(duration / steps):
+                raise FakeActionAborted(SimpleNamespace(
+                    result=ErrorCodes.PREEMPTED.value))
+            context.publish_feedback(SimpleNamespace(progress=(i + 1) / steps))
+
+        with self.__mutex:
+            for name, position in zip(trajectory.joint_names, last.positions):
+                self.__joint_positions[name] = position
+
+        return SimpleNamespace(result=SUCCESS)
+
+    @staticmethod
+    def _join(folder, name):
+        return posixpath.normpath(posixpath.join('/', folder, name))
+
+    def _world_view_add(self, kind, update):
+        field = {'joint_values': 'point', 'pose': 'point',
+                 'cartesian_path': 'path',
+                 'collision_object': 'collision_object'}[kind]
+
+        def handler(request):
+            path = self._join(request.element_path, request.display_name)
+            with self.__mutex:
+                exists = path in self.__world_view
+                if update != exists:
+                    error = ('element does not exist' if update
+                             else 'element already exists')
+                    return SimpleNamespace(success=False, error=error)
+                if posixpath.dirname(path) not in self.__folders:
+                    return SimpleNamespace(success=False,
+                                           error='folder does not exist')
+                self.__world_view[path] = (kind, getattr(request, field))
+            return SimpleNamespace(success=True, error='')
+
+        return handler
+
+    def _world_view_get(self, kind):
+        field = {'joint_values': 'point', 'pose': 'point',
+                 'cartesian_path': 'path',
+                 'collision_object': 'collision_object'}[kind]
+
+        def handler(request):
+            path = self._join(request.element_path, '')
+            with self.__mutex:
+                entry = self.__world_view.get(path)
+            if entry is None or entry[0] != kind:
+                return SimpleNamespace(success=False,
+                                       error='element does not exist')
+            return SimpleNamespace(**{'success': True, 'error': '',
+                                      field: entry[1]})
+
+        return handler
+
+    def _world_view_query(self, kind, field):
+
+        def handler(request):
+            folder = self._join(request.folder_path, '')
+            paths = []
+            values = []
+            with self.__mutex:
+                items = sorted(self.__world_view.items())
+            for path, (element_kind, value) in items:
+                parent = posixpath.dirname(path)
+                if element_kind != kind:
+                    continue
+                if request.recursive:
+                    if not (parent == folder or
+                            parent.startswith(folder.rstrip('/') + '/')):
+                        continue
+                elif parent != folder:
+                    continue
+                if not posixpath.basename(path).startswith(request.prefix):
+                    continue
+                paths.append(path)
+                values.append(value)
+            return SimpleNamespace(**{'success': True, 'error': '',
+                                      'element_paths': paths, field: values})
+
+        return handler
+
+    def _world_view_add_folder(self, request):
+        path = self._join(request.folder_path, request.folder_name)
+        with self.__mutex:
+            if path in self.__folders:
+                return SimpleNamespace(success=False,
+                                       error='folder already exists')
+            if posixpath.dirname(path) not in self.__folders:
+                return SimpleNamespace(success=False,
+                                       error='parent folder does not exist')
+            self.__folders.add(path)
+        return SimpleNamespace(success=True, error='')
+
+    def _world_view_remove(self, request):
+        path = self._join(request.element_path, '')
+        prefix = path.rstrip('/') + '/'
+        with self.__mutex:
+            if path in self.__world_view:
+                del self.__world_view[path]
+            elif path in self.__folders and path != '/':
+                self.__folders = {f for f in self.__folders
+                                  if f != path and not f.startswith(prefix)}
+                self.__world_view = {p: v for p, v in self.__world_view.items()
+                                     if not p.startswith(prefix)}
+            else:
+                return SimpleNamespace(success=False,
+                                       error='element does not exist')
+        return SimpleNamespace(success=True, error='')
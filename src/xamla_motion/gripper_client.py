@@ -20,10 +20,13 @@
 
 from .data_types import MoveGripperResult, WsgCommand, WsgResult
 from .motion_service import MotionService
+from .service_call import bind_deadline
+from .transport import get_transport
 from .xamla_motion_exceptions import ServiceException
 
 import rospy
 import asyncio
+from collections.abc import Mapping
 
 
 class WeissWsgGripperProperties(object):
@@ -162,7 +165,7 @@ class WeissWsgGripper(object):
         self.__m_service = motion_service
 
         try:
-            self.__status_service = rospy.ServiceProxy(
+            self.__status_service = get_transport().service_proxy(
                 self.__properties.status_service_name,
                 GetGripperStatus)
         except rospy.ServiceException as exc:
@@ -171,7 +174,7 @@ class WeissWsgGripper(object):
                                    ' could not be established') from exc
 
         try:
-            self.__set_acc_service = rospy.ServiceProxy(
+            self.__set_acc_service = get_transport().service_proxy(
                 self.__properties.set_acc_service_name,
                 SetValue)
         except rospy.ServiceException as exc:
@@ -545,3 +548,403 @@ class CommonGripper(object):
                                                 float(position),
                                                 float(max_effort))
         return r
+
+
+class GripperGroupResult(Mapping):
+
+    """
+    Aggregated results of a command issued to a GripperGroup
+
+    Maps gripper names to the result of the command of the
+    respective gripper. Grippers whose command raised are
+    not part of the mapping but of errors.
+
+    Methods
+    -------
+    raise_on_error()
+        Raise ServiceException if any gripper command failed
+    """
+
+    def __init__(self, results, errors):
+        self.__results = dict(results)
+        self.__errors = dict(errors)
+
+    def __getitem__(self, name):
+        return self.__results[name]
+
+    def __iter__(self):
+        return iter(self.__results)
+
+    def __len__(self):
+        return len(self.__results)
+
+    def __bool__(self):
+        return self.success
+
+    @property
+    def success(self):
+        """
+        success : bool
+            True if commands of all grippers finished without error
+        """
+        return not self.__errors
+
+    @property
+    def errors(self):
+        """
+        errors : Dict[str, BaseException]
+            Exception per gripper name of failed or cancelled commands
+        """
+        return dict(self.__errors)
+
+    def raise_on_error(self):
+        """
+        Raise ServiceException if any gripper command failed
+
+        Raises
+        ------
+        ServiceException
+            If any gripper command failed, the exception of
+            the first failed gripper is chained
+        """
+        if self.__errors:
+            exc = next(iter(self.__errors.values()))
+            raise ServiceException('gripper commands failed for: ' +
+                                   ', '.join(self.__errors)) from exc
+
+    def __repr__(self):
+        return 'GripperGroupResult(results={}, errors={})'.format(
+            self.__results, self.__errors)
+
+
+class GripperGroup(object):
+
+    """
+    Commands several grippers concurrently
+
+    All commands are issued at once on the current event loop
+    and the results are aggregated into a GripperGroupResult.
+    WeissWsgGripper and CommonGripper instances can be mixed,
+    a CommonGripper grasps and moves with the given force as
+    max effort and ignores speed.
+
+    Optionally a status poller caches the latest status of
+    each WeissWsgGripper at a fixed rate, so status reads do
+    not need a blocking service call.
+
+    Examples
+    --------
+    >>> group = GripperGroup({'left': wsg_left, 'right': wsg_right})
+    >>> async with group:
+    >>>     result = await group.grasp_all(0.02, 0.1, 20.0)
+    >>>     result.raise_on_error()
+
+    Methods
+    -------
+    grasp_all(position, speed, force, names)
+        Asynchronous grasp with all grippers concurrently
+    release_all(position, speed, names)
+        Asynchronous release of all grippers concurrently
+    move_all(position, speed, force, stop_on_block, names)
+        Asynchronous move of all grippers concurrently
+    command_all(command, names)
+        Asynchronous run of a custom command for all grippers
+    start_status_poller()
+        Start caching the status of all WeissWsgGripper
+    stop_status_poller()
+        Stop the status poller
+    """
+
+    def __init__(self, grippers, status_rate=10.0):
+        """
+        Initialize GripperGroup
+
+        Parameters
+        ----------
+        grippers : Mapping[str, gripper] or Iterable[WeissWsgGripper]
+            Grippers of the group by name. If an Iterable of
+            WeissWsgGripper is provided the control action names
+            are used as names
+        status_rate : float convertable (default 10.0)
+            Rate in Hz of the status poller
+
+        Returns
+        -------
+        GripperGroup
+            Instance of GripperGroup
+
+        Raises
+        ------
+        TypeError
+            If a gripper is neither of type WeissWsgGripper
+            nor of type CommonGripper
+        ValueError
+            If grippers is empty or status_rate is not positive
+        """
+
+        if not isinstance(grippers, Mapping):
+            grippers = {g.properties.control_action_name: g for g in grippers}
+
+        for name, gripper in grippers.items():
+            if not isinstance(gripper, (WeissWsgGripper, CommonGripper)):
+                raise TypeError('gripper {} is not of expected type'
+                                ' WeissWsgGripper or CommonGripper'.format(name))
+
+        if not grippers:
+            raise ValueError('grippers is empty')
+
+        status_rate = float(status_rate)
+        if status_rate <= 0.0:
+            raise ValueError('status_rate must be positive')
+
+        self.__grippers = dict(grippers)
+        self.__status_rate = status_rate
+        self.__status = {}
+        self.__status_stamps = {}
+        self.__poller = None
+
+    @property
+    def grippers(self):
+        """
+        grippers : Dict[str, gripper]
+            Grippers of the group by name
+        """
+        return dict(self.__grippers)
+
+    @property
+    def status(self):
+        """
+        status : Dict[str, wsg_50_common.msg Status]
+            Latest status of each WeissWsgGripper polled by
+            the status poller
+        """
+        return dict(self.__status)
+
+    @property
+    def status_stamps(self):
+        """
+        status_stamps : Dict[str, float]
+            Event loop time at which the cached status of
+            each WeissWsgGripper was received
+        """
+        return dict(self.__status_stamps)
+
+    @staticmethod
+    def _value(value, name):
+        if isinstance(value, Mapping):
+            return value[name]
+        return value
+
+    async def command_all(self, command, names=None):
+        """
+        Asynchronous run of a custom command for all grippers
+
+        Parameters
+        ----------
+        command : Callable[[str, gripper], Awaitable]
+            Creates the awaitable command for a gripper by
+            its name and instance
+        names : Iterable[str] or None (default None)
+            Names of the grippers to command, if None all
+            grippers of the group are commanded
+
+        Returns
+        -------
+        GripperGroupResult
+            Aggregated results of all grippers
+
+        Raises
+        ------
+        KeyError
+            If a name is not part of the group or a Mapping
+            argument has no value for a commanded gripper
+        """
+
+        if names is None:
+            names = list(self.__grippers)
+        else:
+            names = list(names)
+
+        commands = []
+        try:
+            for name in names:
+                commands.append(command(name, self.__grippers[name]))
+        except BaseException:
+            # commands which are already created are never awaited
+            for c in commands:
+                if asyncio.iscoroutine(c):
+                    c.close()
+                else:
+                    asyncio.ensure_future(c).cancel()
+            raise
+
+        results = await asyncio.gather(*commands, return_exceptions=True)
+
+        succeeded = {}
+        failed = {}
+        for name, result in zip(names, results):
+            # CancelledError is no Exception since python 3.8
+            if isinstance(result, BaseException):
+                failed[name] = result
+            else:
+                succeeded[name] = result
+
+        return GripperGroupResult(succeeded, failed)
+
+    async def grasp_all(self, position, speed, force, names=None):
+        """
+        Asynchronous grasp with all grippers concurrently
+
+        Each parameter can either be a single value for all grippers
+        or a Mapping from gripper name to value.
+
+        Parameters
+        ----------
+        position : float convertable or Mapping
+            Requested position in meters
+        speed : float convertable or Mapping
+            Requested speed in m/s
+        force : float convertable or Mapping
+            Force which should maximally applied in Newton
+        names : Iterable[str] or None (default None)
+            Names of the grippers to command, if None all
+            grippers of the group are commanded
+
+        Returns
+        -------
+        GripperGroupResult
+            Aggregated WsgResult or MoveGripperResult per gripper
+        """
+
+        def grasp(name, gripper):
+            if isinstance(gripper, WeissWsgGripper):
+                return gripper.grasp(self._value(position, name),
+                                     self._value(speed, name),
+                                     self._value(force, name))
+            return gripper.move(self._value(position, name),
+                                self._value(force, name))
+
+        return await self.command_all(grasp, names)
+
+    async def release_all(self, position, speed, names=None):
+        """
+        Asynchronous release of all grippers concurrently
+
+        Each parameter can either be a single value for all grippers
+        or a Mapping from gripper name to value. A CommonGripper moves
+        to position without effort limit.
+
+        Parameters
+        ----------
+        position : float convertable or Mapping
+            Requested position in meters
+        speed : float convertable or Mapping
+            Requested speed in m/s
+        names : Iterable[str] or None (default None)
+            Names of the grippers to command, if None all
+            grippers of the group are commanded
+
+        Returns
+        -------
+        GripperGroupResult
+            Aggregated WsgResult or MoveGripperResult per gripper
+        """
+
+        def release(name, gripper):
+            if isinstance(gripper, WeissWsgGripper):
+                return gripper.release(self._value(position, name),
+                                       self._value(speed, name))
+            return gripper.move(self._value(position, name), 0.0)
+
+        return await self.command_all(release, names)
+
+    async def move_all(self, position, speed, force, stop_on_block=True,
+                       names=None):
+        """
+        Asynchronous move of all grippers concurrently
+
+        Each parameter can either be a single value for all grippers
+        or a Mapping from gripper name to value.
+
+        Parameters
+        ----------
+        position : float convertable or Mapping
+            Requested position in meters
+        speed : float convertable or Mapping
+            Requested speed in m/s
+        force : float convertable or Mapping
+            Force which should maximally applied in Newton
+        stop_on_block : bool convertable or Mapping (default True)
+            If True stop if maximal force is applied
+        names : Iterable[str] or None (default None)
+            Names of the grippers to command, if None all
+            grippers of the group are commanded
+
+        Returns
+        -------
+        GripperGroupResult
+            Aggregated WsgResult or MoveGripperResult per gripper
+        """
+
+        def move(name, gripper):
+            if isinstance(gripper, WeissWsgGripper):
+                return gripper.move(self._value(position, name),
+                                    self._value(speed, name),
+                                    self._value(force, name),
+                                    self._value(stop_on_block, name))
+            return gripper.move(self._value(position, name),
+                                self._value(force, name))
+
+        return await self.command_all(move, names)
+
+    def start_status_poller(self):
+        """
+        Start caching the status of all WeissWsgGripper
+
+        Must be called from a running event loop. Status service
+        calls are performed concurrently in the default executor.
+        """
+
+        if self.__poller is None or self.__poller.done():
+            self.__poller = asyncio.ensure_future(self._poll_status())
+
+    async def stop_status_poller(self):
+        """
+        Stop the status poller
+        """
+
+        poller = self.__poller
+        self.__poller = None
+        if poller is not None:
+            poller.cancel()
+            try:
+                await poller
+            except asyncio.CancelledError:
+                pass
+
+    async def _poll_status(self):
+        loop = asyncio.get_event_loop()
+        period = 1.0 / self.__status_rate
+        grippers = [(name, gripper) for name, gripper in self.__grippers.items()
+                    if isinstance(gripper, WeissWsgGripper)]
+
+        while grippers:
+            start = loop.time()
+            requests = [loop.run_in_executor(None,
+                                             bind_deadline(gripper.get_status))
+                        for _, gripper in grippers]
+            results = await asyncio.gather(*requests, return_exceptions=True)
+            stamp = loop.time()
+            for (name, _), status in zip(grippers, results):
+                # keep the last valid status, its stamp reveals its age
+                if not isinstance(status, Exception):
+                    self.__status[name] = status
+                    self.__status_stamps[name] = stamp
+            await asyncio.sleep(max(period - (loop.time() - start), 0.0))
+
+    async def __aenter__(self):
+        self.start_status_poller()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop_status_poller()
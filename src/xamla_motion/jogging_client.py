@@ -18,7 +18,10 @@
 
 #!/usr/bin/env python3
 
-from typing import List
+import asyncio
+import collections
+import threading
+from typing import List, Union
 
 import rospy
 import actionlib
@@ -39,6 +42,8 @@ from std_srvs.srv import Trigger
 from std_srvs.srv import SetBool
 
 from xamla_motion.utility import ROSNodeSteward
+from xamla_motion.transport import get_transport
+from xamla_motion.jogging_streamer import JoggingStreamer
 from xamla_motion.xamla_motion_exceptions.exceptions import ServiceException
 
 @enum.unique
@@ -55,6 +60,11 @@ class JoggingErrorCode(enum.Enum):
     TASK_SPACE_JUMP_DETECTED = -9
 
 
+# error codes with which the controller continues to move
+_NON_FATAL_ERROR_CODES = frozenset([JoggingErrorCode.OK,
+                                    JoggingErrorCode.CLOSE_TO_SINGULARITY])
+
+
 class JoggingClientFeedbackState():
     """ A data structure class representing the current jogging client state """
 
@@ -192,12 +202,137 @@ class JoggingClientFeedbackEvent(object):
 
 
 
+class JoggingFeedbackStream(object):
+    """
+    Asynchronous stream of jogging controller feedback
+
+    The stream is fed from the rospy subscriber thread and consumed
+    in an asyncio event loop with ``async for``. Only every
+    decimation-th feedback message is forwarded. The subscriber
+    thread never waits for the event loop: it hands the state over
+    with loop.call_soon_threadsafe and returns immediately.
+
+    If coalesce is True only the latest state is kept, a slow
+    consumer always receives the most recent state and never a
+    backlog. Otherwise up to maxsize states are buffered and the
+    oldest state is dropped on overflow.
+
+    The stream is created with JoggingClient.feedback_stream and
+    must be closed (or used as context manager) to unregister it.
+
+    Examples
+    --------
+    >>> with jogging_client.feedback_stream(decimation=10) as stream:
+    >>>     async for state in stream:
+    >>>         print(state.cartesian_distance)
+    """
+
+    def __init__(self, client, loop: asyncio.AbstractEventLoop,
+                 decimation: int=1, coalesce: bool=True, maxsize: int=100):
+        decimation = int(decimation)
+        maxsize = int(maxsize)
+        if decimation < 1 or maxsize < 1:
+            raise ValueError('decimation and maxsize must be'
+                             ' greater than zero')
+
+        self.__client = client
+        self.__loop = loop
+        self.__decimation = decimation
+        self.__counter = 0
+        self.__buffer = collections.deque(maxlen=1 if coalesce else maxsize)
+        self.__wakeup = asyncio.Event()
+        self.__closed = False
+
+    @property
+    def decimation(self) -> int:
+        """
+        decimation : int (readonly)
+            Only every decimation-th feedback message is forwarded
+        """
+        return self.__decimation
+
+    def _accepts(self) -> bool:
+        # called on the subscriber thread for every message
+        self.__counter += 1
+        if self.__counter < self.__decimation:
+            return False
+        self.__counter = 0
+        return True
+
+    def _push(self, state):
+        # called on the subscriber thread, deque append is thread safe
+        self.__buffer.append(state)
+        try:
+            self.__loop.call_soon_threadsafe(self.__wakeup.set)
+        except RuntimeError:
+            # event loop is already closed
+            pass
+
+    async def get(self):
+        """
+        Wait for the next feedback state
+
+        Returns
+        -------
+        JoggingClientFeedbackState
+            Next forwarded feedback state
+
+        Raises
+        ------
+        StopAsyncIteration
+            If the stream is closed
+        """
+
+        while True:
+            if self.__buffer:
+                return self.__buffer.popleft()
+            if self.__closed:
+                raise StopAsyncIteration
+            self.__wakeup.clear()
+            # recheck, the subscriber thread may have pushed in between
+            if self.__buffer:
+                continue
+            await self.__wakeup.wait()
+
+    def close(self):
+        """
+        Unregister the stream from its jogging client
+        """
+
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__client._remove_feedback_stream(self)
+        self.__loop.call_soon_threadsafe(self.__wakeup.set)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
 class JoggingClient(JoggingClientFeedbackEvent):
     """
     A jogging client
 
     TODO: One could argue that the feedback event should rather be used by composition than inheritance
 
+    Attributes
+    ----------
+    set_point_publisher : rospy.Publisher (readonly)
+        Publisher of PoseStamped set points
+    velocities_publisher : rospy.Publisher (readonly)
+        Publisher of JointTrajectory joint velocity commands
+    twist_publisher : rospy.Publisher (readonly)
+        Publisher of TwistStamped twist commands
+
     Methods
     -------
     send_set_point(setPoint)
@@ -206,6 +341,12 @@ class JoggingClient(JoggingClientFeedbackEvent):
         Jogging by applying joint velocities
     send_twist(twist)
         Jogging by applying a twist
+    create_streamer(rate, deadman_timeout, **kwargs)
+        Create a fixed rate command streamer for this client
+    feedback_stream(decimation, coalesce, maxsize)
+        Create an asynchronous stream of controller feedback
+    wait_until_converged(timeout)
+        Wait until the jogging controller reports convergence
     get_velocity_scaling()
         Get velocity scaling
     set_velocity_scaling(value)
@@ -252,33 +393,36 @@ class JoggingClient(JoggingClientFeedbackEvent):
         super(JoggingClient, self).__init__()
         self.__ros_node_steward = ROSNodeSteward()
         self._jogging_event = JoggingClientFeedbackEvent
+        self.__feedback_streams = []
+        self.__feedback_streams_lock = threading.Lock()
         self._init_topics()
         self._init_services()
 
     def _init_topics(self):
-        self._set_point_pub = rospy.Publisher(self.__setpoint_topic,
-                                        PoseStamped,
-                                        queue_size=5)
-        self._jogging_command_pub = rospy.Publisher(self.__jogging_command_topic,
-                                            JointTrajectory,
-                                            queue_size=5)
-        self._jogging_twist_pub = rospy.Publisher(self.__jogging_twist_topic,
-                                            TwistStamped,
-                                            queue_size=5)
-        self.__feedback_sub = rospy.Subscriber(self.__jogging_feedback_topic,
-                                            ControllerState,
-                                            callback=self._handle_jogging_feedback,
-                                            queue_size=1)
+        transport = get_transport()
+        self._set_point_pub = transport.publisher(self.__setpoint_topic,
+                                                  PoseStamped,
+                                                  queue_size=5)
+        self._jogging_command_pub = transport.publisher(self.__jogging_command_topic,
+                                                        JointTrajectory,
+                                                        queue_size=5)
+        self._jogging_twist_pub = transport.publisher(self.__jogging_twist_topic,
+                                                      TwistStamped,
+                                                      queue_size=5)
+        self.__feedback_sub = transport.subscriber(self.__jogging_feedback_topic,
+                                                   ControllerState,
+                                                   callback=self._handle_jogging_feedback,
+                                                   queue_size=1)
 
     def _init_services(self):
 
         def exc_wrap_call(name, msg_type):
             """ utility function for dry purpose
 
-            Call rospy.ServiceProxy for given name and msg type
+            Create service proxy for given name and msg type
             """
             try:
-                return rospy.ServiceProxy(name, msg_type)
+                return get_transport().service_proxy(name, msg_type)
             except rospy.ServiceException as exc:
                 raise ServiceException('connection for service with name: ' +
                                    name +
@@ -304,6 +448,30 @@ class JoggingClient(JoggingClientFeedbackEvent):
         self.__set_flag_service = exc_wrap_call(self.__set_flag_service_id, SetFlag)
         self.__reset_error_service = exc_wrap_call(self.__reset_error_service_id, Trigger)
 
+    @property
+    def set_point_publisher(self):
+        """
+        set_point_publisher : rospy.Publisher (readonly)
+            Publisher of PoseStamped set points
+        """
+        return self._set_point_pub
+
+    @property
+    def velocities_publisher(self):
+        """
+        velocities_publisher : rospy.Publisher (readonly)
+            Publisher of JointTrajectory joint velocity commands
+        """
+        return self._jogging_command_pub
+
+    @property
+    def twist_publisher(self):
+        """
+        twist_publisher : rospy.Publisher (readonly)
+            Publisher of TwistStamped twist commands
+        """
+        return self._jogging_twist_pub
+
     def send_set_point(self, setPoint: Pose):
         """
         Jogging to Pose
@@ -348,6 +516,30 @@ class JoggingClient(JoggingClientFeedbackEvent):
         twist_stamped = twist.to_twiststamped_msg()
         self._jogging_twist_pub.publish(twist_stamped)
 
+    def create_streamer(self, rate: float = 250.0,
+                        deadman_timeout: float = 0.1,
+                        **kwargs) -> JoggingStreamer:
+        """
+        Create a fixed rate command streamer for this client
+
+        Parameters
+        ----------
+        rate : float (default 250.0)
+            Publishing rate in Hz
+        deadman_timeout : float (default 0.1)
+            Time in seconds after the last command update after
+            which the motion is stopped
+        kwargs
+            Further arguments of JoggingStreamer e.g. acceleration limits
+
+        Returns
+        -------
+        JoggingStreamer
+            Streamer which is not started yet
+        """
+
+        return JoggingStreamer(self, rate, deadman_timeout, **kwargs)
+
 
     @staticmethod
     def _exc_wrap_service_call(service_call_func, query_desc, *argv):
@@ -571,7 +763,93 @@ class JoggingClient(JoggingClientFeedbackEvent):
         response = self._exc_wrap_service_call(self.__reset_error_service,
                                     ' reset error ')
 
+    def feedback_stream(self, decimation: int = 1, coalesce: bool = True,
+                        maxsize: int = 100) -> JoggingFeedbackStream:
+        """
+        Create an asynchronous stream of controller feedback
+
+        Must be called from within the asyncio event loop which
+        consumes the stream.
+
+        Parameters
+        ----------
+        decimation : int (default 1)
+            Only every decimation-th feedback message is forwarded
+        coalesce : bool (default True)
+            If True only the latest state is kept for the consumer
+        maxsize : int (default 100)
+            Number of buffered states if coalesce is False
+
+        Returns
+        -------
+        JoggingFeedbackStream
+            Registered feedback stream, close it when done
+
+        Raises
+        ------
+        ValueError
+            If decimation or maxsize is smaller than one
+        """
+
+        stream = JoggingFeedbackStream(self, asyncio.get_event_loop(),
+                                       decimation, coalesce, maxsize)
+        with self.__feedback_streams_lock:
+            self.__feedback_streams = self.__feedback_streams + [stream]
+        return stream
+
+    def _remove_feedback_stream(self, stream: JoggingFeedbackStream):
+        with self.__feedback_streams_lock:
+            self.__feedback_streams = [s for s in self.__feedback_streams
+                                       if s is not stream]
+
+    async def wait_until_converged(self, timeout: Union[None, float] = None,
+                                   decimation: int = 1
+                                   ) -> JoggingClientFeedbackState:
+        """
+        Wait until the jogging controller reports convergence
+
+        Warnings like CLOSE_TO_SINGULARITY with which the controller
+        continues to move do not end the wait, only errors do.
+
+        Parameters
+        ----------
+        timeout : Union[None, float] (default None)
+            Maximal time to wait in seconds, None waits forever
+        decimation : int (default 1)
+            Only every decimation-th feedback message is evaluated
+
+        Returns
+        -------
+        JoggingClientFeedbackState
+            First feedback state which reports convergence
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            If the controller does not converge within timeout
+        ServiceException
+            If the controller reports an error before convergence
+        """
+
+        async def wait(stream):
+            async for state in stream:
+                if state.error_code not in _NON_FATAL_ERROR_CODES:
+                    raise ServiceException('jogging controller reports'
+                                           ' error: {}'.format(
+                                               state.error_code.name),
+                                           error_code=state.error_code)
+                if state.converged:
+                    return state
+
+        with self.feedback_stream(decimation=decimation) as stream:
+            return await asyncio.wait_for(wait(stream), timeout)
+
     def _handle_jogging_feedback(self, state: ControllerState):
+        # the stream list is replaced on change, iterate a snapshot
+        streams = [s for s in self.__feedback_streams if s._accepts()]
+        if not streams and not self._subscribers:
+            return
+
         jogging_state = JoggingClientFeedbackState(
             joint_distance = state.joint_distance,
             cartesian_distance = state.cartesian_distance,
@@ -580,5 +858,8 @@ class JoggingClient(JoggingClientFeedbackEvent):
             self_collision_check_enabled = state.self_collision_check_enabled,
             joint_limits_check_enabled = state.joint_limits_check_enabled,
             scene_collision_check_enabled = state.scene_collision_check_enabled)
-        self._dispatch(jogging_state)
 
+        for stream in streams:
+            stream._push(jogging_state)
+
+        self._dispatch(jogging_state)
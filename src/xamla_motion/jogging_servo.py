@@ -0,0 +1,703 @@
+# jogging_servo.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+import collections
+import time
+from typing import Callable, Iterable, Tuple, Union
+
+import numpy as np
+from pyquaternion import Quaternion
+
+from .data_types import Pose, Twist
+from .data_types.pose import _quaternion_product
+
+
+def _quaternion_conjugate(q: np.ndarray) -> np.ndarray:
+    return np.array([q[0], -q[1], -q[2], -q[3]])
+
+
+def _quaternion_to_rotation_vector(q: np.ndarray) -> np.ndarray:
+    # shortest rotation: flip to positive real part
+    if q[0] < 0.0:
+        q = -q
+    s = np.linalg.norm(q[1:])
+    if s < 1.0e-12:
+        return 2.0 * q[1:]
+    return q[1:] * (2.0 * np.arctan2(s, q[0]) / s)
+
+
+def _rotation_vector_to_quaternion(r: np.ndarray) -> np.ndarray:
+    angle = np.linalg.norm(r)
+    if angle < 1.0e-12:
+        q = np.array([1.0, 0.5 * r[0], 0.5 * r[1], 0.5 * r[2]])
+        return q / np.linalg.norm(q)
+    half = 0.5 * angle
+    return np.concatenate(([np.cos(half)], r * (np.sin(half) / angle)))
+
+
+def _pose_to_arrays(pose: Pose) -> Tuple[np.ndarray, np.ndarray]:
+    return (np.array(pose.translation, dtype=float),
+            np.array(pose.quaternion.elements, dtype=float))
+
+
+class ServoController(object):
+    """
+    Client side servo controller which produces jogging twists
+
+    Target poses arrive at camera rate together with their capture
+    time. The controller estimates the target velocity from the
+    sequence of targets, predicts the target forward to the current
+    time to compensate the latency of the vision pipeline and tracks
+    the prediction with a critically damped second order filter.
+    The filter is evaluated at the jogging rate, which upsamples the
+    camera rate targets to a smooth velocity profile. The velocity
+    of the filter state is the commanded twist.
+
+    Position and orientation are filtered together as one six
+    dimensional state, the orientation error is expressed as
+    rotation vector in the frame of the target poses.
+
+    The filter starts at the robot pose, either set by reset or read
+    from pose_feedback when the first command is computed. If the
+    latest target is older than max_target_age no command is
+    produced, so the deadman timeout of the streamer stops the robot
+    when the camera stops delivering targets.
+
+    The controller can be attached to a JoggingStreamer as twist
+    source so the filter is evaluated on the streamer thread at
+    the jogging rate, or it can be stepped manually e.g. with the
+    offline harness simulate_servo.
+
+    Examples
+    --------
+    >>> servo = ServoController(bandwidth=6.0,
+    >>>                         pose_feedback=end_effector.get_current_pose)
+    >>> streamer = jogging_client.create_streamer(rate=250.0)
+    >>> servo.attach(streamer)
+    >>> streamer.start()
+    >>> for pose, capture_time in camera:
+    >>>     servo.update_target(pose, capture_time)
+
+    Methods
+    -------
+    reset(pose, now)
+        Reset the filter state to a pose at rest
+    update_target(pose, stamp, now)
+        Provide a new target pose measurement
+    predicted_target(now)
+        Latency compensated target at time now
+    step(now)
+        Advance the filter to time now and compute the twist command
+    attach(streamer)
+        Use the controller as twist source of a JoggingStreamer
+    """
+
+    def __init__(self, frame_id: str = 'world', bandwidth: float = 8.0,
+                 latency: Union[None, float] = None,
+                 velocity_smoothing: float = 0.5,
+                 max_linear_velocity: Union[None, float] = None,
+                 max_angular_velocity: Union[None, float] = None,
+                 pose_feedback: Union[None, Callable[[], Pose]] = None,
+                 feedback_gain: float = 0.0,
+                 max_prediction: float = 0.2,
+                 max_target_age: float = 0.5):
+        """
+        Initialize ServoController
+
+        Parameters
+        ----------
+        frame_id : str (default 'world')
+            Frame in which targets are provided and twists are published
+        bandwidth : float (default 8.0)
+            Natural frequency of the critically damped filter in rad/s
+        latency : Union[None, float] (default None)
+            Fixed pipeline latency in seconds which is used for targets
+            without capture time, if None the measured latency is used
+        velocity_smoothing : float (default 0.5)
+            Weight of the previous target velocity estimate in [0, 1),
+            0 uses only the latest finite difference
+        max_linear_velocity : Union[None, float] (default None)
+            Maximal commanded linear velocity in m/s
+        max_angular_velocity : Union[None, float] (default None)
+            Maximal commanded angular velocity in rad/s
+        pose_feedback : Union[None, Callable[[], Pose]] (default None)
+            Returns the current end effector pose, used as initial
+            filter state and to correct the deviation of the robot
+            from the filter state. If None reset must be called
+            before the first step
+        feedback_gain : float (default 0.0)
+            Proportional gain in 1/s for the pose feedback correction
+        max_prediction : float (default 0.2)
+            Maximal time in seconds a target is predicted forward
+        max_target_age : float (default 0.5)
+            Maximal time in seconds between capture of the latest
+            target and a step, no command is produced for older
+            targets
+
+        Returns
+        -------
+        ServoController
+            Instance of ServoController
+
+        Raises
+        ------
+        ValueError
+            If bandwidth, max_prediction or max_target_age is not
+            positive or velocity_smoothing is not in [0, 1)
+        """
+
+        bandwidth = float(bandwidth)
+        velocity_smoothing = float(velocity_smoothing)
+        if (bandwidth <= 0.0 or float(max_prediction) <= 0.0 or
+                float(max_target_age) <= 0.0):
+            raise ValueError('bandwidth, max_prediction and max_target_age'
+                             ' must be positive')
+        if not 0.0 <= velocity_smoothing < 1.0:
+            raise ValueError('velocity_smoothing must be in [0, 1)')
+
+        self.__frame_id = str(frame_id)
+        self.__bandwidth = bandwidth
+        self.__latency = None if latency is None else float(latency)
+        self.__velocity_smoothing = velocity_smoothing
+        self.__max_linear_velocity = max_linear_velocity
+        self.__max_angular_velocity = max_angular_velocity
+        self.__pose_feedback = pose_feedback
+        self.__feedback_gain = float(feedback_gain)
+        self.__max_prediction = float(max_prediction)
+        self.__max_target_age = float(max_target_age)
+
+        self.__measured_latency = None
+
+        # latest target measurement and target velocity estimate
+        self.__target = None
+        self.__target_velocity = np.zeros(6)
+
+        # filter state: position, orientation and 6d velocity
+        self.__position = None
+        self.__orientation = None
+        self.__velocity = np.zeros(6)
+        self.__last_step = None
+
+    @property
+    def frame_id(self) -> str:
+        """
+        frame_id : str (readonly)
+            Frame of targets and twists
+        """
+        return self.__frame_id
+
+    @property
+    def measured_latency(self) -> Union[None, float]:
+        """
+        measured_latency : Union[None, float] (readonly)
+            Smoothed latency between capture and arrival of targets
+            in seconds, None if no stamped target was received
+        """
+        return self.__measured_latency
+
+    @property
+    def state(self) -> Union[None, Pose]:
+        """
+        state : Union[None, Pose] (readonly)
+            Current filter pose or None if the filter was not
+            initialized by reset or pose_feedback yet
+        """
+        if self.__position is None:
+            return None
+        return Pose(self.__position, Quaternion(self.__orientation),
+                    self.__frame_id)
+
+    def reset(self, pose: Pose, now: Union[None, float] = None):
+        """
+        Reset the filter state to a pose at rest
+
+        Parameters
+        ----------
+        pose : Pose
+            New filter pose, usually the current end effector pose
+        now : Union[None, float] (default None)
+            Current time, time.monotonic() if None
+        """
+
+        if not isinstance(pose, Pose):
+            raise TypeError('pose is not of expected type Pose')
+
+        self.__position, self.__orientation = _pose_to_arrays(pose)
+        self.__velocity = np.zeros(6)
+        self.__last_step = time.monotonic() if now is None else float(now)
+
+    def update_target(self, pose: Pose, stamp: Union[None, float] = None,
+                      now: Union[None, float] = None):
+        """
+        Provide a new target pose measurement
+
+        Parameters
+        ----------
+        pose : Pose
+            Target pose in frame_id
+        stamp : Union[None, float] (default None)
+            Capture time of the target on the time.monotonic() clock,
+            if None the configured or measured latency is subtracted
+            from now
+        now : Union[None, float] (default None)
+            Arrival time, time.monotonic() if None
+
+        Raises
+        ------
+        TypeError
+            If pose is not of type Pose
+        ValueError
+            If pose is not defined in frame_id
+        """
+
+        if not isinstance(pose, Pose):
+            raise TypeError('pose is not of expected type Pose')
+        if pose.frame_id != self.__frame_id:
+            raise ValueError('pose must be defined in frame: {}'
+                             ''.format(self.__frame_id))
+
+        now = time.monotonic() if now is None else float(now)
+
+        if stamp is None:
+            if self.__latency is not None:
+                latency = self.__latency
+            elif self.__measured_latency is not None:
+                latency = self.__measured_latency
+            else:
+                latency = 0.0
+            stamp = now - latency
+        else:
+            stamp = float(stamp)
+            latency = max(now - stamp, 0.0)
+            if self.__measured_latency is None:
+                self.__measured_latency = latency
+            else:
+                self.__measured_latency = (0.9 * self.__measured_latency
+                                           + 0.1 * latency)
+
+        position, orientation = _pose_to_arrays(pose)
+
+        if self.__target is not None:
+            last_position, last_orientation, last_stamp = self.__target
+            dt = stamp - last_stamp
+            if dt > 1.0e-6:
+                delta = np.concatenate((
+                    position - last_position,
+                    _quaternion_to_rotation_vector(_quaternion_product(
+                        orientation, _quaternion_conjugate(last_orientation)))
+                ))
+                a = self.__velocity_smoothing
+                self.__target_velocity = (a * self.__target_velocity
+                                          + (1.0 - a) * delta / dt)
+
+        self.__target = (position, orientation, stamp)
+
+    def predicted_target(self, now: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Latency compensated target at time now
+
+        Parameters
+        ----------
+        now : float
+            Time on the time.monotonic() clock
+
+        Returns
+        -------
+        position, orientation : Tuple[numpy.ndarray, numpy.ndarray]
+            Predicted position (3,) and orientation quaternion
+            (4,) in w, x, y, z order
+
+        Raises
+        ------
+        RuntimeError
+            If no target was provided yet
+        """
+
+        if self.__target is None:
+            raise RuntimeError('no target available')
+
+        position, orientation, stamp = self.__target
+        horizon = min(max(now - stamp, 0.0), self.__max_prediction)
+        position = position + self.__target_velocity[:3] * horizon
+        orientation = _quaternion_product(
+            _rotation_vector_to_quaternion(self.__target_velocity[3:]
+                                           * horizon), orientation)
+        return position, orientation
+
+    def step(self, now: Union[None, float] = None) -> Union[None, Twist]:
+        """
+        Advance the filter to time now and compute the twist command
+
+        Parameters
+        ----------
+        now : Union[None, float] (default None)
+            Current time, time.monotonic() if None
+
+        Returns
+        -------
+        Union[None, Twist]
+            Twist command in frame_id or None if no target was
+            provided yet or the latest target is older than
+            max_target_age
+
+        Raises
+        ------
+        RuntimeError
+            If the filter was neither initialized by reset nor
+            can be initialized by pose_feedback
+        """
+
+        if self.__target is None:
+            return None
+
+        now = time.monotonic() if now is None else float(now)
+
+        if now - self.__target[2] > self.__max_target_age:
+            # stale target, the deadman timeout of the streamer stops
+            # the robot, with feedback the filter restarts at its pose
+            self.__velocity = np.zeros(6)
+            self.__last_step = now
+            if self.__pose_feedback is not None:
+                self.__position = None
+            return None
+
+        if self.__position is None:
+            if self.__pose_feedback is None:
+                raise RuntimeError('reset must be called before step if'
+                                   ' no pose_feedback is provided')
+            self.reset(self.__pose_feedback(), now)
+
+        dt = min(max(now - self.__last_step, 0.0), 0.1)
+        self.__last_step = now
+
+        target_position, target_orientation = self.predicted_target(now)
+
+        error = np.concatenate((
+            target_position - self.__position,
+            _quaternion_to_rotation_vector(_quaternion_product(
+                target_orientation,
+                _quaternion_conjugate(self.__orientation)))
+        ))
+
+        # critically damped: x'' = w^2 (target - x) + 2 w (v_target - v),
+        # semi implicit euler keeps the discretization stable
+        w = self.__bandwidth
+        acceleration = (w * w * error
+                        + 2.0 * w * (self.__target_velocity - self.__velocity))
+        self.__velocity = self.__velocity + acceleration * dt
+        self.__position = self.__position + self.__velocity[:3] * dt
+        self.__orientation = _quaternion_product(
+            _rotation_vector_to_quaternion(self.__velocity[3:] * dt),
+            self.__orientation)
+        self.__orientation /= np.linalg.norm(self.__orientation)
+
+        command = self.__velocity.copy()
+
+        if self.__pose_feedback is not None and self.__feedback_gain > 0.0:
+            actual_position, actual_orientation = _pose_to_arrays(
+                self.__pose_feedback())
+            command[:3] += self.__feedback_gain * (self.__position
+                                                   - actual_position)
+            command[3:] += self.__feedback_gain * \
+                _quaternion_to_rotation_vector(_quaternion_product(
+                    self.__orientation,
+                    _quaternion_conjugate(actual_orientation)))
+
+        command[:3] = self._clamp(command[:3], self.__max_linear_velocity)
+        command[3:] = self._clamp(command[3:], self.__max_angular_velocity)
+
+        return Twist(command[:3], command[3:], self.__frame_id)
+
+    @staticmethod
+    def _clamp(v, max_norm):
+        if max_norm is None:
+            return v
+        norm = np.linalg.norm(v)
+        if norm > max_norm:
+            return v * (max_norm / norm)
+        return v
+
+    def attach(self, streamer):
+        """
+        Use the controller as twist source of a JoggingStreamer
+
+        Parameters
+        ----------
+        streamer : JoggingStreamer
+            Streamer which evaluates the controller in each tick
+
+        Raises
+        ------
+        RuntimeError
+            If the filter was not initialized by reset and no
+            pose_feedback is provided
+        """
+
+        if self.__position is None and self.__pose_feedback is None:
+            raise RuntimeError('reset must be called before attach if'
+                               ' no pose_feedback is provided')
+
+        streamer.set_twist_source(self.step)
+
+    def __call__(self, now: Union[None, float] = None):
+        return self.step(now)
+
+
+class SimulatedTwistPlant(object):
+    """
+    Simulated robot which executes twist commands
+
+    The plant integrates twist commands into an end effector pose.
+    Commands take effect after a transport delay and the achieved
+    velocity follows the command with a first order lag.
+    """
+
+    def __init__(self, pose: Pose, delay: float = 0.0,
+                 time_constant: float = 0.0):
+        """
+        Initialize SimulatedTwistPlant
+
+        Parameters
+        ----------
+        pose : Pose
+            Initial end effector pose
+        delay : float (default 0.0)
+            Transport delay of commands in seconds
+        time_constant : float (default 0.0)
+            Time constant of the velocity lag in seconds, 0 means
+            the commanded velocity is reached immediately
+        """
+
+        self.__frame_id = pose.frame_id
+        self.__position, self.__orientation = _pose_to_arrays(pose)
+        self.__velocity = np.zeros(6)
+        self.__command = np.zeros(6)
+        self.__delay = float(delay)
+        self.__time_constant = float(time_constant)
+        self.__pending = collections.deque()
+
+    @property
+    def pose(self) -> Pose:
+        """
+        pose : Pose (readonly)
+            Current end effector pose
+        """
+        return Pose(self.__position, Quaternion(self.__orientation),
+                    self.__frame_id)
+
+    @property
+    def position(self) -> np.ndarray:
+        """
+        position : numpy.ndarray (readonly)
+            Current end effector position
+        """
+        return self.__position.copy()
+
+    @property
+    def velocity(self) -> np.ndarray:
+        """
+        velocity : numpy.ndarray (readonly)
+            Current linear and angular velocity (6,)
+        """
+        return self.__velocity.copy()
+
+    def apply(self, now: float, twist: Union[None, Twist], dt: float):
+        """
+        Apply a twist command at time now and advance by dt
+
+        Parameters
+        ----------
+        now : float
+            Simulation time of the command
+        twist : Union[None, Twist]
+            Command, None keeps the last command
+        dt : float
+            Integration step in seconds
+        """
+
+        if twist is not None:
+            self.__pending.append((now + self.__delay,
+                                   np.concatenate((twist.linear,
+                                                   twist.angular))))
+
+        while self.__pending and self.__pending[0][0] <= now + 1.0e-12:
+            self.__command = self.__pending.popleft()[1]
+        target = self.__command
+
+        if self.__time_constant > 0.0:
+            alpha = min(dt / self.__time_constant, 1.0)
+            self.__velocity = self.__velocity + alpha * (target
+                                                         - self.__velocity)
+        else:
+            self.__velocity = target.copy()
+
+        self.__position = self.__position + self.__velocity[:3] * dt
+        self.__orientation = _quaternion_product(
+            _rotation_vector_to_quaternion(self.__velocity[3:] * dt),
+            self.__orientation)
+        self.__orientation /= np.linalg.norm(self.__orientation)
+
+
+class ServoSimulationResult(object):
+    """
+    Recorded signals of a servo simulation
+
+    Attributes
+    ----------
+    times : numpy.ndarray
+        Simulation time of each tick (N,)
+    positions : numpy.ndarray
+        Plant position at each tick (N, 3)
+    target_positions : numpy.ndarray
+        Ground truth target position at each tick, linearly
+        interpolated from the target samples (N, 3)
+    commands : numpy.ndarray
+        Commanded twist at each tick as (N, 6) array, zero
+        before the first target arrived
+    """
+
+    def __init__(self, times, positions, target_positions, commands):
+        self.times = times
+        self.positions = positions
+        self.target_positions = target_positions
+        self.commands = commands
+
+    @property
+    def position_errors(self) -> np.ndarray:
+        """
+        position_errors : numpy.ndarray (readonly)
+            Euclidean tracking error at each tick (N,)
+        """
+        return np.linalg.norm(self.positions - self.target_positions, axis=1)
+
+    def rms_position_error(self, start_time: float = 0.0) -> float:
+        """
+        Root mean square tracking error after start_time
+
+        Parameters
+        ----------
+        start_time : float (default 0.0)
+            Ticks before start_time are ignored e.g. to skip
+            the transient at the beginning
+
+        Returns
+        -------
+        float
+            RMS of the position error
+        """
+
+        errors = self.position_errors[self.times >= start_time]
+        return float(np.sqrt(np.mean(errors ** 2)))
+
+
+def simulate_servo(controller: ServoController,
+                   targets: Iterable[Tuple[float, Pose]],
+                   plant: SimulatedTwistPlant,
+                   rate: float = 250.0,
+                   camera_latency: float = 0.0,
+                   provide_stamps: bool = True,
+                   duration: Union[None, float] = None
+                   ) -> ServoSimulationResult:
+    """
+    Replay target measurements through a servo controller and plant
+
+    The simulation runs on a virtual clock which starts at the time
+    of the first target. Each target is captured at its time and
+    arrives at the controller camera_latency seconds later. The
+    controller is stepped at rate and its commands are applied to
+    the plant. The run is deterministic and therefore replayable,
+    e.g. with targets recorded from a real camera. A controller
+    which was not reset starts at the initial pose of the plant.
+
+    Parameters
+    ----------
+    controller : ServoController
+        Controller under test
+    targets : Iterable[Tuple[float, Pose]]
+        Pairs of capture time in seconds and target pose
+    plant : SimulatedTwistPlant
+        Simulated robot
+    rate : float (default 250.0)
+        Jogging rate in Hz at which the controller is stepped
+    camera_latency : float (default 0.0)
+        Delay between capture and arrival of a target
+    provide_stamps : bool (default True)
+        If True the capture time is passed to the controller,
+        otherwise the controller must rely on its latency setting
+    duration : Union[None, float] (default None)
+        Simulated time span, if None until camera_latency after
+        the last target
+
+    Returns
+    -------
+    ServoSimulationResult
+        Recorded signals of the simulation
+
+    Raises
+    ------
+    ValueError
+        If targets is empty or rate is not positive
+    """
+
+    targets = sorted(targets, key=lambda t: t[0])
+    if not targets:
+        raise ValueError('targets must not be empty')
+    rate = float(rate)
+    if rate <= 0.0:
+        raise ValueError('rate must be positive')
+
+    dt = 1.0 / rate
+    t0 = targets[0][0]
+    if duration is None:
+        duration = targets[-1][0] - t0 + camera_latency
+    num_ticks = int(np.floor(duration * rate)) + 1
+
+    target_times = np.asarray([t for t, _ in targets])
+    target_positions = np.asarray([p.translation for _, p in targets])
+
+    times = t0 + np.arange(num_ticks) * dt
+    positions = np.zeros((num_ticks, 3))
+    commands = np.zeros((num_ticks, 6))
+
+    if controller.state is None:
+        controller.reset(plant.pose, t0)
+
+    next_target = 0
+    for i, now in enumerate(times):
+        while (next_target < len(targets) and
+               targets[next_target][0] + camera_latency <= now + 1.0e-12):
+            stamp, pose = targets[next_target]
+            controller.update_target(pose,
+                                     stamp if provide_stamps else None,
+                                     now)
+            next_target += 1
+
+        twist = controller.step(now)
+        if twist is not None:
+            commands[i, :3] = twist.linear
+            commands[i, 3:] = twist.angular
+        plant.apply(now, twist, dt)
+        positions[i] = plant.position
+
+    interpolated = np.stack([np.interp(times + dt, target_times,
+                                       target_positions[:, k])
+                             for k in range(3)], axis=1)
+
+    return ServoSimulationResult(times, positions, interpolated, commands)
@@ -0,0 +1,598 @@
+# jogging_streamer.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+import enum
+import threading
+import time
+from typing import Union
+
+import numpy as np
+import rospy
+from geometry_msgs.msg import PoseStamped, TwistStamped
+from trajectory_msgs.msg import JointTrajectory, JointTrajectoryPoint
+
+from .data_types import JointValues, Pose, Twist
+
+
+@enum.unique
+class JoggingStreamMode(enum.Enum):
+    IDLE = 0
+    TWIST = 1
+    VELOCITIES = 2
+    SET_POINT = 3
+
+
+class JoggingStreamStatistics(object):
+    """
+    Timing statistics of a JoggingStreamer
+
+    All durations are in seconds. Rate and jitter are computed
+    over the last window_size ticks.
+    """
+
+    def __init__(self, num_ticks: int, num_published: int,
+                 num_deadman_stops: int, num_overruns: int,
+                 target_rate: float, periods: np.ndarray,
+                 lateness: np.ndarray):
+        self.__num_ticks = num_ticks
+        self.__num_published = num_published
+        self.__num_deadman_stops = num_deadman_stops
+        self.__num_overruns = num_overruns
+        self.__target_rate = target_rate
+        if len(periods):
+            self.__achieved_rate = 1.0 / float(np.mean(periods))
+            self.__period_jitter = float(np.std(periods))
+            self.__max_lateness = float(np.max(lateness))
+            self.__mean_lateness = float(np.mean(lateness))
+        else:
+            self.__achieved_rate = 0.0
+            self.__period_jitter = 0.0
+            self.__max_lateness = 0.0
+            self.__mean_lateness = 0.0
+
+    @property
+    def num_ticks(self) -> int:
+        """
+        num_ticks : int (readonly)
+            Number of scheduler ticks since start
+        """
+        return self.__num_ticks
+
+    @property
+    def num_published(self) -> int:
+        """
+        num_published : int (readonly)
+            Number of published command messages
+        """
+        return self.__num_published
+
+    @property
+    def num_deadman_stops(self) -> int:
+        """
+        num_deadman_stops : int (readonly)
+            Number of times the deadman timeout stopped the motion
+        """
+        return self.__num_deadman_stops
+
+    @property
+    def num_overruns(self) -> int:
+        """
+        num_overruns : int (readonly)
+            Number of ticks which missed their deadline by more
+            than one period
+        """
+        return self.__num_overruns
+
+    @property
+    def target_rate(self) -> float:
+        """
+        target_rate : float (readonly)
+            Configured publishing rate in Hz
+        """
+        return self.__target_rate
+
+    @property
+    def achieved_rate(self) -> float:
+        """
+        achieved_rate : float (readonly)
+            Measured publishing rate in Hz
+        """
+        return self.__achieved_rate
+
+    @property
+    def period_jitter(self) -> float:
+        """
+        period_jitter : float (readonly)
+            Standard deviation of the tick period
+        """
+        return self.__period_jitter
+
+    @property
+    def mean_lateness(self) -> float:
+        """
+        mean_lateness : float (readonly)
+            Mean delay of a tick relative to its deadline
+        """
+        return self.__mean_lateness
+
+    @property
+    def max_lateness(self) -> float:
+        """
+        max_lateness : float (readonly)
+            Maximal delay of a tick relative to its deadline
+        """
+        return self.__max_lateness
+
+    def __str__(self):
+        return ('JoggingStreamStatistics(target_rate={:.1f}, achieved_rate='
+                '{:.1f}, period_jitter={:.6f}, mean_lateness={:.6f},'
+                ' max_lateness={:.6f}, num_ticks={}, num_published={},'
+                ' num_deadman_stops={}, num_overruns={})'.format(
+                    self.__target_rate, self.__achieved_rate,
+                    self.__period_jitter, self.__mean_lateness,
+                    self.__max_lateness, self.__num_ticks,
+                    self.__num_published, self.__num_deadman_stops,
+                    self.__num_overruns))
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class JoggingStreamer(object):
+    """
+    Fixed rate command streamer on top of a JoggingClient
+
+    A dedicated thread publishes the latest command of the caller
+    at a fixed rate. The caller only replaces the command in a
+    single slot, the slot is swapped by one reference assignment
+    so neither side takes a lock. The ROS messages are allocated
+    once and only their fields are updated each tick.
+
+    Twist and joint velocity commands are slew rate limited with
+    the configured accelerations. If no new command arrives within
+    deadman_timeout the streamer ramps twist and velocity commands
+    down to zero (respecting the acceleration limits), publishes
+    the zero command once and then stops publishing until the
+    next command arrives. Set points are not published after the
+    deadman timeout.
+
+    Examples
+    --------
+    >>> with JoggingStreamer(jogging_client, rate=250.0) as streamer:
+    >>>     while servoing:
+    >>>         streamer.set_twist(compute_twist())
+    >>>     print(streamer.statistics)
+
+    Methods
+    -------
+    start()
+        Start the publisher thread
+    stop()
+        Stop the publisher thread
+    set_twist(twist)
+        Stream a twist command
+    set_velocities(velocities)
+        Stream a joint velocities command
+    set_set_point(pose)
+        Stream a set point
+    set_twist_source(source)
+        Compute the twist command in each tick by a callable
+    """
+
+    def __init__(self, jogging_client, rate: float=250.0,
+                 deadman_timeout: float=0.1,
+                 max_linear_acceleration: Union[None, float]=None,
+                 max_angular_acceleration: Union[None, float]=None,
+                 max_joint_acceleration: Union[None, float]=None,
+                 window_size: int=1000):
+        """
+        Initialize JoggingStreamer
+
+        Parameters
+        ----------
+        jogging_client : JoggingClient
+            Jogging client which provides the command publishers
+        rate : float (default 250.0)
+            Publishing rate in Hz
+        deadman_timeout : float (default 0.1)
+            Time in seconds after the last command update after
+            which the motion is stopped
+        max_linear_acceleration : Union[None, float] (default None)
+            Maximal change of the linear twist velocity in m/s^2,
+            None disables rate limiting
+        max_angular_acceleration : Union[None, float] (default None)
+            Maximal change of the angular twist velocity in rad/s^2,
+            None disables rate limiting
+        max_joint_acceleration : Union[None, float] (default None)
+            Maximal change of the joint velocities in rad/s^2,
+            None disables rate limiting
+        window_size : int (default 1000)
+            Number of ticks used to compute the timing statistics
+
+        Returns
+        -------
+        JoggingStreamer
+            Instance of JoggingStreamer
+
+        Raises
+        ------
+        ValueError
+            If rate, deadman_timeout, an acceleration limit or
+            window_size is not positive
+        """
+
+        rate = float(rate)
+        deadman_timeout = float(deadman_timeout)
+        if rate <= 0.0 or deadman_timeout <= 0.0:
+            raise ValueError('rate and deadman_timeout must be positive')
+        if int(window_size) < 1:
+            raise ValueError('window_size must be greater than zero')
+
+        period = 1.0 / rate
+
+        def max_step(name, value):
+            # acceleration limits are applied as maximal change per tick
+            if value is None:
+                return None
+            value = float(value)
+            if value <= 0.0:
+                raise ValueError('{} must be positive'.format(name))
+            return value * period
+
+        self.__client = jogging_client
+        self.__rate = rate
+        self.__period = period
+        self.__deadman_timeout = deadman_timeout
+        self.__max_linear_step = max_step('max_linear_acceleration',
+                                          max_linear_acceleration)
+        self.__max_angular_step = max_step('max_angular_acceleration',
+                                           max_angular_acceleration)
+        self.__max_joint_step = max_step('max_joint_acceleration',
+                                         max_joint_acceleration)
+
+        # slot holds (mode, command, frame_id or joint names, stamp) and is
+        # replaced as a whole, reading it once per tick is consistent
+        self.__slot = (JoggingStreamMode.IDLE, None, None, 0.0)
+        self.__twist_source = None
+
+        self.__thread = None
+        self.__running = threading.Event()
+
+        self.__window_size = int(window_size)
+        self.__periods = np.zeros(self.__window_size)
+        self.__lateness = np.zeros(self.__window_size)
+        self.__num_ticks = 0
+        self.__num_published = 0
+        self.__num_deadman_stops = 0
+        self.__num_overruns = 0
+
+        # preallocated messages
+        self.__twist_msg = TwistStamped()
+        self.__velocities_msg = JointTrajectory()
+        self.__velocities_point = JointTrajectoryPoint()
+        self.__velocities_point.time_from_start = rospy.Duration.from_sec(
+            self.__period)
+        self.__velocities_msg.points = [self.__velocities_point]
+        self.__set_point_msg = PoseStamped()
+
+        # current (rate limited) output of the streamer
+        self.__twist_output = np.zeros(6)
+        self.__velocities_output = None
+
+    @property
+    def rate(self) -> float:
+        """
+        rate : float (readonly)
+            Publishing rate in Hz
+        """
+        return self.__rate
+
+    @property
+    def is_running(self) -> bool:
+        """
+        is_running : bool (readonly)
+            True if the publisher thread is running
+        """
+        return self.__running.is_set()
+
+    @property
+    def statistics(self) -> JoggingStreamStatistics:
+        """
+        statistics : JoggingStreamStatistics (readonly)
+            Timing statistics of the last window_size ticks
+        """
+        n = min(self.__num_ticks, self.__window_size)
+        # the first tick has no predecessor and therefore no period
+        n_periods = min(max(self.__num_ticks - 1, 0), self.__window_size)
+        return JoggingStreamStatistics(self.__num_ticks,
+                                       self.__num_published,
+                                       self.__num_deadman_stops,
+                                       self.__num_overruns,
+                                       self.__rate,
+                                       self.__periods[:n_periods].copy(),
+                                       self.__lateness[:n].copy())
+
+    def set_twist(self, twist: Twist):
+        """
+        Stream a twist command
+
+        Parameters
+        ----------
+        twist : Twist
+            Twist which is published until it is replaced
+
+        Raises
+        ------
+        TypeError
+            If twist is not of type Twist
+        """
+
+        if not isinstance(twist, Twist):
+            raise TypeError('twist is not of expected type Twist')
+
+        command = np.concatenate((twist.linear, twist.angular))
+        self.__slot = (JoggingStreamMode.TWIST, command, twist.frame_id,
+                       time.monotonic())
+
+    def set_velocities(self, velocities: JointValues):
+        """
+        Stream a joint velocities command
+
+        Parameters
+        ----------
+        velocities : JointValues
+            Joint velocities which are published until they are replaced
+
+        Raises
+        ------
+        TypeError
+            If velocities is not of type JointValues
+        """
+
+        if not isinstance(velocities, JointValues):
+            raise TypeError('velocities is not of expected type JointValues')
+
+        self.__slot = (JoggingStreamMode.VELOCITIES,
+                       np.array(velocities.values, dtype=float),
+                       velocities.joint_set.names,
+                       time.monotonic())
+
+    def set_set_point(self, pose: Pose):
+        """
+        Stream a set point
+
+        Parameters
+        ----------
+        pose : Pose
+            Set point which is published until it is replaced
+
+        Raises
+        ------
+        TypeError
+            If pose is not of type Pose
+        """
+
+        if not isinstance(pose, Pose):
+            raise TypeError('pose is not of expected type Pose')
+
+        self.__slot = (JoggingStreamMode.SET_POINT, pose, pose.frame_id,
+                       time.monotonic())
+
+    def set_twist_source(self, source):
+        """
+        Compute the twist command in each tick by a callable
+
+        The source is called on the publisher thread with the current
+        time.monotonic() value at the beginning of each tick. A
+        returned Twist replaces the current command, None keeps the
+        last command so the deadman timeout applies if the source
+        stops to provide commands.
+
+        Parameters
+        ----------
+        source : Union[None, Callable[[float], Union[None, Twist]]]
+            Twist source, None removes the current source
+        """
+
+        self.__twist_source = source
+
+    def start(self):
+        """
+        Start the publisher thread
+
+        Raises
+        ------
+        RuntimeError
+            If the streamer is already running
+        """
+
+        if self.__running.is_set():
+            raise RuntimeError('jogging streamer is already running')
+
+        self.__running.set()
+        self.__thread = threading.Thread(target=self._run,
+                                         name='jogging_streamer',
+                                         daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stop the publisher thread
+
+        A zero command is published for twist and velocity
+        streams before the thread terminates.
+        """
+
+        if not self.__running.is_set():
+            return
+
+        self.__running.clear()
+        self.__thread.join()
+        self.__thread = None
+        self.__slot = (JoggingStreamMode.IDLE, None, None, 0.0)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @staticmethod
+    def _limit_step(current, target, max_step):
+        if max_step is None:
+            return target
+        return current + np.clip(target - current, -max_step, max_step)
+
+    def _publish_twist(self, frame_id):
+        msg = self.__twist_msg
+        v = self.__twist_output
+        msg.header.stamp = rospy.Time.now()
+        msg.header.frame_id = frame_id
+        msg.twist.linear.x = v[0]
+        msg.twist.linear.y = v[1]
+        msg.twist.linear.z = v[2]
+        msg.twist.angular.x = v[3]
+        msg.twist.angular.y = v[4]
+        msg.twist.angular.z = v[5]
+        self.__client.twist_publisher.publish(msg)
+
+    def _publish_velocities(self, joint_names):
+        msg = self.__velocities_msg
+        msg.header.stamp = rospy.Time.now()
+        msg.joint_names = joint_names
+        self.__velocities_point.velocities = self.__velocities_output.tolist()
+        self.__client.velocities_publisher.publish(msg)
+
+    def _publish_set_point(self, pose):
+        msg = self.__set_point_msg
+        t = pose.translation
+        q = pose.quaternion
+        msg.header.stamp = rospy.Time.now()
+        msg.header.frame_id = pose.frame_id
+        msg.pose.position.x = t[0]
+        msg.pose.position.y = t[1]
+        msg.pose.position.z = t[2]
+        msg.pose.orientation.w = q.w
+        msg.pose.orientation.x = q.x
+        msg.pose.orientation.y = q.y
+        msg.pose.orientation.z = q.z
+        self.__client.set_point_publisher.publish(msg)
+
+    def _tick(self, now: float):
+        """
+        Compute and publish the command of one tick
+
+        Returns True if the streamer output is zero or idle.
+        """
+
+        source = self.__twist_source
+        if source is not None:
+            twist = source(now)
+            if twist is not None:
+                self.__slot = (JoggingStreamMode.TWIST,
+                               np.concatenate((twist.linear, twist.angular)),
+                               twist.frame_id, now)
+
+        mode, command, info, stamp = self.__slot
+        expired = (now - stamp) > self.__deadman_timeout
+
+        if mode is JoggingStreamMode.TWIST:
+            out = self.__twist_output
+            if expired and not out.any():
+                # the zero command was published when the ramp ended
+                return True
+            target = np.zeros(6) if expired else command
+            out[:3] = self._limit_step(out[:3], target[:3],
+                                       self.__max_linear_step)
+            out[3:] = self._limit_step(out[3:], target[3:],
+                                       self.__max_angular_step)
+            self._publish_twist(info)
+            self.__num_published += 1
+            return expired and not out.any()
+
+        if mode is JoggingStreamMode.VELOCITIES:
+            if (self.__velocities_output is None or
+                    self.__velocities_output.shape != command.shape):
+                self.__velocities_output = np.zeros_like(command)
+            elif expired and not self.__velocities_output.any():
+                return True
+            target = np.zeros_like(command) if expired else command
+            self.__velocities_output = self._limit_step(
+                self.__velocities_output, target, self.__max_joint_step)
+            self._publish_velocities(info)
+            self.__num_published += 1
+            return expired and not self.__velocities_output.any()
+
+        if mode is JoggingStreamMode.SET_POINT:
+            if expired:
+                return True
+            self._publish_set_point(command)
+            self.__num_published += 1
+            return False
+
+        return True
+
+    def _record_timing(self, now, deadline, last_tick):
+        i = self.__num_ticks % self.__window_size
+        lateness = max(now - deadline, 0.0)
+        self.__lateness[i] = lateness
+        if last_tick is not None:
+            j = (self.__num_ticks - 1) % self.__window_size
+            self.__periods[j] = now - last_tick
+        if lateness > self.__period:
+            self.__num_overruns += 1
+        self.__num_ticks += 1
+
+    def _run(self):
+        deadline = time.monotonic()
+        last_tick = None
+        stopped = True
+
+        while self.__running.is_set():
+            now = time.monotonic()
+            self._record_timing(now, deadline, last_tick)
+            last_tick = now
+
+            is_zero = self._tick(now)
+            if is_zero and not stopped:
+                mode = self.__slot[0]
+                if mode is not JoggingStreamMode.IDLE:
+                    self.__num_deadman_stops += 1
+            stopped = is_zero
+
+            # absolute deadlines avoid drift, skip deadlines which
+            # are already missed instead of bursting
+            deadline += self.__period
+            now = time.monotonic()
+            if deadline < now:
+                deadline += np.ceil((now - deadline) / self.__period) \
+                    * self.__period
+            time.sleep(max(deadline - time.monotonic(), 0.0))
+
+        # bring twist and velocity streams to a stop on shutdown
+        mode, command, info, _ = self.__slot
+        if mode is JoggingStreamMode.TWIST:
+            self.__twist_output[:] = 0.0
+            self._publish_twist(info)
+        elif (mode is JoggingStreamMode.VELOCITIES and
+              self.__velocities_output is not None):
+            self.__velocities_output[:] = 0.0
+            self._publish_velocities(info)
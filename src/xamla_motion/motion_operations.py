@@ -22,12 +22,11 @@
 
 import asyncio
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any, Callable, Union
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Union
 
-import numpy as np
-
-from .data_types import (CartesianPath, JointPath, JointTrajectory,
-                         JointValues, PlanParameters, Pose)
+from .data_types import (CartesianPath, JointPath, JointPathValidator,
+                         JointTrajectory, JointValues, PlanParameters, Pose)
 from .motion_service import SteppedMotionClient
 from .xamla_motion_exceptions import ServiceException
 
@@ -187,6 +186,16 @@ class MoveCartesianArgs(MoveJointsArgs):
 class Plan(object):
     """
     Plan holds a planned trajectory and offer methods for path execution
+
+    Asynchronous commands, e.g. opening a gripper, can be attached to
+    a time or progress of the trajectory. They are started while the
+    trajectory is executed so that they overlap with the motion.
+
+    Examples
+    --------
+    >>> plan = move_op.plan()
+    >>> plan.attach(lambda: gripper.release(0.05, 0.1), progress=0.8)
+    >>> await plan.execute_async()
     """
 
     def __init__(self, move_group: 'xamla_motion.v2.MoveGroup',
@@ -213,6 +222,7 @@ class Plan(object):
         self._move_group = move_group
         self._trajectory = trajectory
         self._parameters = parameters
+        self._attachments = []
 
     @property
     def move_group(self):
@@ -238,14 +248,89 @@ class Plan(object):
         """
         return self._parameters
 
+    @property
+    def attachments(self):
+        """
+        attachments : List[Tuple[float, Callable[[], Awaitable]]]
+            Attached commands with their start time in seconds
+            from trajectory start
+        """
+        return list(self._attachments)
+
+    def attach(self, command: Callable[[], Awaitable],
+               time_from_start: Union[timedelta, float]=None,
+               progress: float=None):
+        """
+        Attach an asynchronous command to a point of the trajectory
+
+        The command is started by execute_async as soon as the
+        trajectory execution reaches the specified point. If the
+        action server sends feedback with a progress field the point
+        is reached when the reported progress passes it. The moveJ
+        action of ROSVITA sends no progress feedback (only the
+        supervised StepwiseMoveJ action reports progress, on its
+        own topic), in this case the point is reached by a timer
+        started when the action server starts the execution. Points
+        beyond the trajectory end are reached when the execution
+        finishes.
+
+        Parameters
+        ----------
+        command : Callable[[], Awaitable]
+            Creates the awaitable command, e.g.
+            lambda: gripper.release(0.05, 0.1)
+        time_from_start : timedelta or float convertable (default None)
+            Time in seconds from trajectory start
+        progress : float convertable (default None)
+            Fraction of the trajectory duration range [0.0-1.0]
+
+        Raises
+        ------
+        TypeError
+            If command is not callable
+        ValueError
+            If not exactly one of time_from_start and progress
+            is provided or if progress is not in range [0.0-1.0]
+        """
+
+        if not callable(command):
+            raise TypeError('command is not callable')
+
+        if (time_from_start is None) == (progress is None):
+            raise ValueError('either time_from_start or progress'
+                             ' must be provided')
+
+        duration = self._trajectory.duration.total_seconds()
+        if progress is not None:
+            progress = float(progress)
+            if progress < 0.0 or progress > 1.0:
+                raise ValueError('progress is not between 0.0 and 1.0')
+            offset = progress * duration
+        elif isinstance(time_from_start, timedelta):
+            offset = time_from_start.total_seconds()
+        else:
+            offset = float(time_from_start)
+
+        self._attachments.append((max(offset, 0.0), command))
+
+    def clear_attachments(self):
+        """
+        Remove all attached commands
+        """
+        self._attachments = []
+
     def execute_async(self) -> asyncio.Task:
         """
         Executes trajectory asynchronously
 
+        Attached commands are started during the execution.
+
         Returns
         -------
         Task : asyncio.Task
-            Task which asynchronously execute trajectory
+            Task which asynchronously execute trajectory, it
+            finishes when the trajectory and all attached commands
+            are finished
 
         Raises
         ------
@@ -254,11 +339,89 @@ class Plan(object):
             or if collision_check is not convertable to bool
         ServiceException
             If execution ends not successful
+        Exception
+            The first exception raised by an attached command
         """
         services = self._move_group.motion_service
+        if self._attachments:
+            return asyncio.ensure_future(self._execute_with_attachments())
         return asyncio.ensure_future(services.execute_joint_trajectory(self._trajectory,
                                                                        self._parameters.collision_check))
 
+    async def _execute_with_attachments(self):
+        loop = asyncio.get_event_loop()
+        services = self._move_group.motion_service
+        duration = self._trajectory.duration.total_seconds()
+        attachments = list(self._attachments)
+        started = loop.create_future()
+        has_progress = asyncio.Event()
+        reached = [asyncio.Event() for _ in attachments]
+        triggered = [False] * len(attachments)
+
+        def on_active():
+            if not started.done():
+                started.set_result(loop.time())
+
+        def on_feedback(feedback):
+            progress = getattr(feedback, 'progress', None)
+            if progress is None:
+                return
+            has_progress.set()
+            position = float(progress) * duration
+            for (offset, _), event in zip(attachments, reached):
+                if position >= offset:
+                    event.set()
+
+        async def trigger(index):
+            offset, command = attachments[index]
+            start = await started
+            remaining = start + offset - loop.time()
+            if remaining > 0.0 and not has_progress.is_set():
+                # the timer is used until progress feedback arrives
+                waits = [asyncio.ensure_future(reached[index].wait()),
+                         asyncio.ensure_future(has_progress.wait())]
+                try:
+                    await asyncio.wait(waits, timeout=remaining,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for w in waits:
+                        w.cancel()
+            if has_progress.is_set():
+                await reached[index].wait()
+            triggered[index] = True
+            return await command()
+
+        triggers = [asyncio.ensure_future(trigger(i))
+                    for i in range(len(attachments))]
+        motion = asyncio.ensure_future(
+            services.execute_joint_trajectory(self._trajectory,
+                                              self._parameters.collision_check,
+                                              active_cb=on_active,
+                                              feedback_cb=on_feedback))
+
+        try:
+            result = await motion
+        except BaseException:
+            # commands which are not started yet are dropped
+            for i, task in enumerate(triggers):
+                if not triggered[i]:
+                    task.cancel()
+            await asyncio.gather(*triggers, return_exceptions=True)
+            raise
+        finally:
+            motion.cancel()
+
+        # the end of the trajectory is reached
+        on_active()
+        for event in reached:
+            event.set()
+
+        outcomes = await asyncio.gather(*triggers, return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        return result
+
     def execute_supervised(self):
         """
         Creates executor for supervised trajectory execution
@@ -790,22 +953,23 @@ class MoveCartesianOperation(MoveOperation):
 
         path = path.prepend(start)
 
-        ik_jump_threshold = self._task_space_plan_parameters.ik_jump_threshold
-        p_p = path[0].values
-        for i, p in enumerate(path[1:]):
-            delta = np.max(np.abs(p.values - p_p))
-            if delta > ik_jump_threshold:
-                raise RuntimeError('The difference {} of two consecutive IK solutions'
-                                   ' for the given cartesian path at index {} exceeds the'
-                                   ' ik jump threshold {}'.format(delta,
-                                                                  i,
-                                                                  ik_jump_threshold))
+        self._check_ik_jumps(path)
 
         t = self._move_group.motion_service.plan_move_joints(path,
                                                              self._plan_parameters)
 
         return Plan(self._move_group, t, self._plan_parameters)
 
+    def _check_ik_jumps(self, path: JointPath):
+        ik_jump_threshold = self._task_space_plan_parameters.ik_jump_threshold
+        violations = JointPathValidator(ik_jump_threshold).validate(path)
+        if violations.jump_indices.size:
+            raise RuntimeError('The difference {} of two consecutive IK solutions'
+                               ' for the given cartesian path at index {} exceeds the'
+                               ' ik jump threshold {}'.format(violations.jump_deltas[0],
+                                                              violations.jump_indices[0],
+                                                              ik_jump_threshold))
+
     def _build(self, args: MoveCartesianArgs):
         """
         Build a new instance of MoveCartesianOperations
@@ -1152,16 +1316,7 @@ class MoveCartesianCollisionFreeOperation(MoveCartesianOperation):
 
         path = path.prepend(start)
 
-        ik_jump_threshold = self._task_space_plan_parameters.ik_jump_threshold
-        p_p = path[0].values
-        for i, p in enumerate(path[1:]):
-            delta = np.max(np.abs(p.values - p_p))
-            if delta > ik_jump_threshold:
-                raise RuntimeError('The difference {} of two consecutive IK solutions'
-                                   ' for the given cartesian path at index {} exceeds the'
-                                   ' ik jump threshold {}'.format(delta,
-                                                                  i,
-                                                                  ik_jump_threshold))
+        self._check_ik_jumps(path)
 
         p = self._move_group.motion_service.plan_collision_free_joint_path(path,
                                                                            self._plan_parameters)
@@ -19,50 +19,47 @@
 #!/usr/bin/env python3
 
 import rospy
-import actionlib
 import numpy as np
 from datetime import timedelta
-import enum
 
 from xamlamoveit_msgs.srv import *
 from xamlamoveit_msgs.msg import *
-from control_msgs.msg import GripperCommandAction, GripperCommandGoal
 from moveit_msgs.msg import MoveItErrorCodes
 from std_srvs.srv import SetBool
 
 from .xamla_motion_exceptions import ServiceException, ArgumentError
 from .data_types import *
 from .utility import ROSNodeSteward, LeaseBaseLock
+from .transport import get_transport
+from .service_call import bind_deadline
+from .ros_resources import (ActionLibGoalStatus, SharedActionClient,
+                            TopicDemultiplexer, shared_publisher)
 from collections import Iterable
 
 from actionlib_msgs.msg import GoalID
 
 from functools import partial
 from threading import Lock
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from copy import deepcopy
 import asyncio
 
 
-@enum.unique
-class ActionLibGoalStatus(enum.Enum):
-    PENDING = 0
-    ACTIVE = 1
-    PREEMPTED = 2
-    SUCCEEDED = 3
-    ABORTED = 4
-    REJECTED = 5
-    PREEMPTING = 6
-    RECALLING = 7
-    RECALLED = 8
-    LOST = 9
-
-
 def generate_action_executor(action):
 
-    async def run_action(goal):
+    async def run_action(goal, active_cb=None, feedback_cb=None):
         loop = asyncio.get_event_loop()
         action_done = loop.create_future()
 
+        # optional callbacks are forwarded to the event loop
+        def active_callback():
+            if active_cb is not None and not loop.is_closed():
+                loop.call_soon_threadsafe(active_cb)
+
+        def feedback_callback(feedback):
+            if feedback_cb is not None and not loop.is_closed():
+                loop.call_soon_threadsafe(feedback_cb, feedback)
+
         def done_callback(goal_status, result):
             status = ActionLibGoalStatus(goal_status)
 
@@ -85,7 +82,9 @@ def generate_action_executor(action):
                                               result)
 
         try:
-            action.send_goal(goal, done_cb=done_callback)
+            action.send_goal(goal, done_cb=done_callback,
+                             active_cb=active_callback,
+                             feedback_cb=feedback_callback)
             await action_done
         except asyncio.CancelledError as exc:
             action.cancel_goal()
@@ -103,10 +102,15 @@ class SteppedMotionClient(object):
     """
     Client to perform supervised trajectory execution
 
+    The action client, the step publishers and the feedback subscriber
+    are shared by all instances, feedback is routed by goal id.
+
     Methods
     -------
     moveJ_supervised
         Run supervised trajectory execution
+    state_queue
+        Create an asyncio queue which receives state updates
     """
 
     __step_topic = '/xamlaMoveActions/step'
@@ -120,7 +124,7 @@ class SteppedMotionClient(object):
         def __init__(self):
             self.instances = {}
             self.mutex = Lock()
-            rospy.on_shutdown(self.on_shutdown)
+            get_transport().on_shutdown(self.on_shutdown)
 
         def on_shutdown(self):
             # print('stepped shutdown')
@@ -144,6 +148,7 @@ class SteppedMotionClient(object):
                 # print('instances after pop: {}'.format(keys))
 
     __shutdown_manager = None
+    __feedback_demux = None
 
     def __init__(self, trajectory: JointTrajectory,
                  velocity_scaling: float, check_collision: bool=True):
@@ -170,20 +175,29 @@ class SteppedMotionClient(object):
             If action goal handle is not available
         """
         self.__mutex = Lock()
+        # __del__ also runs if the constructor raises
+        self.__goal_handle = None
+        self.__goal_id = None
 
         if type(self).__shutdown_manager is None:
             type(self).__shutdown_manager = type(self).__ShutdownManager()
 
-        self.__ros_node_steward = ROSNodeSteward()
+        if type(self).__feedback_demux is None:
+            type(self).__feedback_demux = TopicDemultiplexer(
+                self.__feedback_topic,
+                TrajectoryProgress,
+                key=lambda msg: getattr(msg, 'control_goal_id', ''),
+                queue_size=10)
 
-        self.__m_action = actionlib.SimpleActionClient(self.__movej_action_name,
-                                                       StepwiseMoveJAction)
+        self.__ros_node_steward = ROSNodeSteward()
 
-        if not self.__m_action.wait_for_server(rospy.Duration(5)):
+        try:
+            self.__m_action = SharedActionClient.get(self.__movej_action_name,
+                                                     StepwiseMoveJAction)
+        except ServiceException as exc:
             raise ServiceException('connection to stepped motion action'
-                                   ' server could not be established')
+                                   ' server could not be established') from exc
 
-        self.__goal_id = None
         self.__progress = None
         self.__state = None
 
@@ -200,6 +214,8 @@ class SteppedMotionClient(object):
         goal.trajectory = trajectory.to_joint_trajectory_msg()
 
         loop = asyncio.get_event_loop()
+        self.__loop = loop
+        self.__state_queues = []
         self.__action_done = loop.create_future()
         self.__action_done.add_done_callback(self._done_callback)
 
@@ -226,45 +242,39 @@ class SteppedMotionClient(object):
                     loop.call_soon_threadsafe(self.__action_done.set_result,
                                               result)
 
-        self.__m_action.send_goal(goal, done_cb=done_callback)
+        self.__step_pub = shared_publisher(self.__step_topic, Step)
+        self.__next_pub = shared_publisher(self.__next_topic, GoalID)
+        self.__previous_pub = shared_publisher(self.__previous_topic, GoalID)
 
-        self.__goal_id = self.__m_action.gh.comm_state_machine.action_goal.goal_id
+        self.__goal_handle = self.__m_action.send_goal(goal,
+                                                       done_cb=done_callback)
+        self.__goal_id = self.__goal_handle.goal_id
 
         if not self.__goal_id:
-            self.__m_action.cancel_goal()
+            self.__goal_handle.cancel()
             raise ServiceException('action goal handle is not available')
 
         type(self).__shutdown_manager.register_instance(self.__goal_id.id,
-                                                        self.__m_action.cancel_goal)
+                                                        self.__goal_handle.cancel)
 
         self.__state = SteppedMotionState(self.__goal_id.id, '', 1, 0.0)
 
-        self.__step_pub = rospy.Publisher(self.__step_topic,
-                                          Step,
-                                          queue_size=1)
-        self.__next_pub = rospy.Publisher(self.__next_topic,
-                                          GoalID,
-                                          queue_size=1)
-        self.__previous_pub = rospy.Publisher(self.__previous_topic,
-                                              GoalID,
-                                              queue_size=1)
-
-        self.__feedback_sub = rospy.Subscriber(self.__feedback_topic,
-                                               TrajectoryProgress,
-                                               callback=self._feedback_callback,
-                                               queue_size=10)
+        type(self).__feedback_demux.register(self.__goal_id.id,
+                                             self._feedback_callback)
 
     def __del__(self):
-        type(self).__shutdown_manager.unregister_instance(self.__goal_id.id)
+        if self.__goal_id:
+            type(self).__shutdown_manager.unregister_instance(self.__goal_id.id)
+            type(self).__feedback_demux.unregister(self.__goal_id.id)
 
     def cancel(self):
         type(self).__shutdown_manager.unregister_instance(self.__goal_id.id)
         try:
-            self.__m_action.cancel_goal()
+            self.__goal_handle.cancel()
         except ServiceException:
             pass
         finally:
-            self.__m_action.wait_for_result()
+            self.__goal_handle.wait()
 
     @property
     def state(self):
@@ -283,6 +293,44 @@ class SteppedMotionClient(object):
         """
         return self.__goal_id
 
+    def state_queue(self, maxsize: int=16) -> asyncio.Queue:
+        """
+        Create an asyncio queue which receives state updates
+
+        The feedback subscriber pushes each progress change as
+        SteppedMotionState into the queue, so consumers can await
+        updates instead of polling state. If the queue is full the
+        oldest state is dropped. When the supervised motion is done
+        None is put into the queue.
+
+        Must be called from the event loop in which the client
+        was created.
+
+        Parameters
+        ----------
+        maxsize : int (default 16)
+            Maximal number of buffered states
+
+        Returns
+        -------
+        asyncio.Queue
+            Queue of SteppedMotionState ending with None
+        """
+
+        queue = asyncio.Queue(maxsize=max(int(maxsize), 1))
+        if self.__action_done.done():
+            queue.put_nowait(None)
+        else:
+            self.__state_queues.append(queue)
+        return queue
+
+    def _push_state(self, state):
+        # runs in the event loop
+        for queue in self.__state_queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(state)
+
     @property
     def action_done_future(self):
         """
@@ -343,27 +391,34 @@ class SteppedMotionClient(object):
                                                   trajectory_progress.error_msg,
                                                   trajectory_progress.error_code,
                                                   trajectory_progress.progress)
+                state = self.__state
+
+            if self.__state_queues and not self.__loop.is_closed():
+                self.__loop.call_soon_threadsafe(self._push_state, state)
 
     def _done_callback(self, future):
         # print('done callback')
         # type(self).__shutdown_manager.unregister_instance(self.__goal_id.id)
-        self.__feedback_sub.unregister()
-        self.__step_pub.unregister()
-        self.__next_pub.unregister()
-        self.__previous_pub.unregister()
+        self._push_state(None)
+        self.__state_queues = []
+        type(self).__feedback_demux.unregister(self.__goal_id.id)
 
 
 class MotionService(object):
 
     __movej_action = 'moveJ_action'
     __query_inverse_kinematics_service = "xamlaMoveGroupServices/query_ik2"
+    # threads shared by the concurrent ik requests of one instance
+    __ik_workers = 8
 
     def __init__(self):
 
         self.__ros_node_steward = ROSNodeSteward()
+        self.__ik_executor = None
+        self.__ik_executor_lock = Lock()
 
         try:
-            self.__ik_service = rospy.ServiceProxy(
+            self.__ik_service = get_transport().service_proxy(
                 self.__query_inverse_kinematics_service,
                 GetIKSolution2)
 
@@ -372,8 +427,8 @@ class MotionService(object):
                                    ' inverse kinematics failed,'
                                    ' abort ') from exc
 
-        self.__m_action = actionlib.SimpleActionClient(self.__movej_action,
-                                                       moveJAction)
+        self.__m_action = get_transport().simple_action_client(
+            self.__movej_action, moveJAction)
 
         if not self.__m_action.wait_for_server(rospy.Duration(5)):
             raise ServiceException('connection to moveJ action'
@@ -407,7 +462,7 @@ class MotionService(object):
                                     'query_move_group_interface')
 
         try:
-            service = rospy.ServiceProxy(
+            service = get_transport().service_proxy(
                 query_move_group_service,
                 QueryMoveGroupInterfaces)
             response = service()
@@ -502,7 +557,7 @@ class MotionService(object):
                                      'end_effector_list')
 
         try:
-            eel_param = rospy.get_param(end_effector_limits_param)
+            eel_param = get_transport().get_param(end_effector_limits_param)
         except KeyError as exc:
             raise RuntimeError('end effector limit ros param: '
                                + end_effector_limits_param +
@@ -563,6 +618,7 @@ class MotionService(object):
         if not isinstance(joint_set, JointSet):
             raise TypeError('joint_set is not of expected type JointSet')
 
+        transport = get_transport()
         maxVel = [None] * len(joint_set)
         maxAcc = [None] * len(joint_set)
         minPos = [None] * len(joint_set)
@@ -571,15 +627,15 @@ class MotionService(object):
         for i, name in enumerate(joint_set):
             prefix = joint_limits_param + '/' + name + '/'
 
-            if rospy.get_param(prefix+'has_velocity_limits'):
-                maxVel[i] = rospy.get_param(prefix+'max_velocity')
+            if transport.get_param(prefix+'has_velocity_limits'):
+                maxVel[i] = transport.get_param(prefix+'max_velocity')
 
-            if rospy.get_param(prefix+'has_acceleration_limits'):
-                maxAcc[i] = rospy.get_param(prefix+'max_acceleration')
+            if transport.get_param(prefix+'has_acceleration_limits'):
+                maxAcc[i] = transport.get_param(prefix+'max_acceleration')
 
-            if rospy.get_param(prefix+'has_position_limits'):
-                minPos[i] = rospy.get_param(prefix+'min_position')
-                maxPos[i] = rospy.get_param(prefix+'max_position')
+            if transport.get_param(prefix+'has_position_limits'):
+                minPos[i] = transport.get_param(prefix+'min_position')
+                maxPos[i] = transport.get_param(prefix+'max_position')
 
         return JointLimits(joint_set, maxVel, maxAcc, minPos, maxPos)
 
@@ -617,7 +673,7 @@ class MotionService(object):
             raise TypeError('joint_set is not of expected type JointSet')
 
         try:
-            service = rospy.ServiceProxy(
+            service = get_transport().service_proxy(
                 query_joint_states_service,
                 GetCurrentJointState)
             response = service(joint_set.names).current_joint_position
@@ -721,7 +777,7 @@ class MotionService(object):
             raise TypeError('joint_path is not of expected type JointPath')
 
         try:
-            service = rospy.ServiceProxy(
+            service = get_transport().service_proxy(
                 query_forward_kinematics_service,
                 GetFKSolution)
             response = service(move_group_name,
@@ -767,7 +823,7 @@ class MotionService(object):
             raise TypeError('joint_path is not of expected type JointPath')
 
         try:
-            service = rospy.ServiceProxy(
+            service = get_transport().service_proxy(
                 query_joint_path_service,
                 GetMoveItJointPath)
             response = service(move_group_name,
@@ -897,7 +953,7 @@ class MotionService(object):
         delta_t = 1 / delta_t if delta_t > 1.0 else delta_t
 
         try:
-            service = rospy.ServiceProxy(
+            service = get_transport().service_proxy(
                 query_joint_trajectory_service,
                 GetOptimJointTrajectory)
             response = service(joint_path.joint_set,
@@ -1012,7 +1068,7 @@ class MotionService(object):
         delta_t = 1 / delta_t if delta_t > 1.0 else delta_t
 
         try:
-            service = rospy.ServiceProxy(
+            service = get_transport().service_proxy(
                 query_cartesian_trajectory_service,
                 GetLinearCartesianTrajectory)
             response = service(end_effector_name,
@@ -1085,7 +1141,7 @@ class MotionService(object):
             raise TypeError('joint_path is not of expected type JointPath')
 
         try:
-            service = rospy.ServiceProxy(
+            service = get_transport().service_proxy(
                 query_joint_path_collisions,
                 QueryJointStateCollisions)
             response = service(move_group_name,
@@ -1116,6 +1172,129 @@ class MotionService(object):
 
         return result
 
+    @classmethod
+    def check_joint_path_collisions(cls, move_group_name, joint_path,
+                                    chunk_size=64, max_in_flight=4,
+                                    stop_on_first=False):
+        """
+        Check a joint path for collisions in chunks
+
+        The path is split into chunks of chunk_size points which are
+        checked by concurrent service calls, at most max_in_flight
+        calls are pending at any time. If stop_on_first is True no
+        further chunks are requested after the first chunk with a
+        collision was received, which makes a yes / no check of a
+        long path considerably cheaper when it is in collision.
+
+        Parameters
+        ----------
+        move_group_name : str convertable
+            Name of the move group for which a path should be check
+            for collisions
+        joint_path : JointPath
+            The path that should be check for collisions
+        chunk_size : int (default 64)
+            Number of points per service call
+        max_in_flight : int (default 4)
+            Maximal number of concurrent service calls
+        stop_on_first : bool (default False)
+            If True stop requesting chunks after the first collision
+
+        Returns
+        -------
+        JointPathCollisions
+            Compact result with collision mask, error codes and
+            mask of checked points, evaluates to True if a
+            collision was found
+
+        Raises
+        ------
+        TypeError
+            If move_group_name ist not str convertable or
+            if joint_path is not of type JointPath
+        ValueError
+            If chunk_size or max_in_flight is smaller than one
+        ServiceException
+            If the collision check service is not available
+            or returns an invalid response
+        """
+
+        query_joint_path_collisions = ('xamlaMoveGroupServices/'
+                                       'query_joint_position_collision_check')
+
+        move_group_name = str(move_group_name)
+
+        if not isinstance(joint_path, JointPath):
+            raise TypeError('joint_path is not of expected type JointPath')
+
+        chunk_size = int(chunk_size)
+        max_in_flight = int(max_in_flight)
+        if chunk_size < 1 or max_in_flight < 1:
+            raise ValueError('chunk_size and max_in_flight must be'
+                             ' greater than zero')
+
+        num_points = len(joint_path)
+        in_collision = np.zeros(num_points, dtype=bool)
+        error_codes = np.zeros(num_points, dtype=np.int32)
+        checked = np.zeros(num_points, dtype=bool)
+
+        if num_points == 0:
+            return JointPathCollisions(in_collision, error_codes, checked)
+
+        service = get_transport().service_proxy(query_joint_path_collisions,
+                                                QueryJointStateCollisions)
+        joint_names = joint_path.joint_set
+
+        def check_chunk(start):
+            stop = min(start + chunk_size, num_points)
+            points = [joint_path[i].to_joint_path_point_msg()
+                      for i in range(start, stop)]
+            try:
+                response = service(move_group_name, joint_names, points)
+            except rospy.ServiceException as exc:
+                raise ServiceException('service call for query'
+                                       ' joint collisions'
+                                       ' failed, abort') from exc
+
+            if (len(response.in_collision) != stop - start or
+                    len(response.error_codes) != stop - start):
+                raise ServiceException('service call for query joint'
+                                       ' collisions was not successful. '
+                                       'service name:' +
+                                       query_joint_path_collisions)
+
+            in_collision[start:stop] = response.in_collision
+            error_codes[start:stop] = response.error_codes
+            checked[start:stop] = True
+            return bool(in_collision[start:stop].any())
+
+        check_chunk = bind_deadline(check_chunk)
+        starts = iter(range(0, num_points, chunk_size))
+        collision_found = False
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            pending = set()
+            for start in starts:
+                pending.add(executor.submit(check_chunk, start))
+                if len(pending) >= max_in_flight:
+                    break
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    # re-raises service exceptions of the chunk
+                    collision_found |= future.result()
+
+                if collision_found and stop_on_first:
+                    # running chunks complete, no further chunks are sent
+                    continue
+
+                for start in starts:
+                    pending.add(executor.submit(check_chunk, start))
+                    if len(pending) >= max_in_flight:
+                        break
+
+        return JointPathCollisions(in_collision, error_codes, checked)
+
     @classmethod
     def create_plan_parameters(cls, move_group_name=None, joint_set=None,
                                max_velocity=None, max_acceleration=None,
@@ -1475,7 +1654,8 @@ class MotionService(object):
                                           parameters.max_deviation,
                                           parameters.sample_resolution)
 
-    async def execute_joint_trajectory(self, trajectory, collision_check):
+    async def execute_joint_trajectory(self, trajectory, collision_check,
+                                       active_cb=None, feedback_cb=None):
         """
         Executes a joint trajectory
 
@@ -1485,6 +1665,11 @@ class MotionService(object):
             Joint trajectory which should be executed
         collision_check : bool convertable
             If True check for collision while executing
+        active_cb : Callable[[], None] or None (default None)
+            Called in the event loop when the action server
+            starts the execution
+        feedback_cb : Callable[[moveJFeedback], None] or None (default None)
+            Called in the event loop with each action feedback
 
         Raises
         ------
@@ -1508,7 +1693,7 @@ class MotionService(object):
 
         # the server itself lock resources
         # with LeaseBaseLock(trajectory.joint_set.names) as lock_resources:
-        await run_action(goal)
+        await run_action(goal, active_cb=active_cb, feedback_cb=feedback_cb)
 
     def execute_joint_trajectory_supervised(self, trajectory: JointTrajectory,
                                             velocity_scaling: float,
@@ -1604,7 +1789,7 @@ class MotionService(object):
             raise ServiceException('ik service call failed with error'
                                    ' code: {}'.format(result.error_codes[0]))
 
-        return result.path[0]
+        return result[0]
 
     def query_inverse_kinematics_many(self, poses, parameters,
                                       seed=[],
@@ -1674,10 +1859,10 @@ class MotionService(object):
                 raise ValueError('joint set of parameters and seed do not'
                                  ' match and reording is not possible')
 
-        if timeout and not isinstance(timeout, timedelta):
-            raise TypeError('timeout is not of expected type timedelta')
-        else:
+        if timeout is None:
             timeout = timedelta(milliseconds=200)
+        elif not isinstance(timeout, timedelta):
+            raise TypeError('timeout is not of expected type timedelta')
 
         attempts = int(attempts)
         const_seed = bool(const_seed)
@@ -1689,10 +1874,20 @@ class MotionService(object):
         for p in poses:
             poses_msgs.append(p.to_end_effector_pose_msg())
 
+        if seed:
+            joint_set = seed.joint_set
+            seed_msg = seed.to_joint_values_point_msg()
+        else:
+            # without seed the server starts from the current state
+            joint_set = parameters.joint_set
+            seed_msg = JointValuesPoint()
+            seed_msg.joint_names = joint_set.names
+            seed_msg.positions = []
+
         req = GetIKSolution2Request()
         req.group_name = parameters.move_group_name
-        req.joint_names = seed.joint_set.names
-        req.seed = seed.to_joint_values_point_msg()
+        req.joint_names = joint_set.names
+        req.seed = seed_msg
         req.const_seed = const_seed
         req.points = poses_msgs
         req.collision_check = parameters.collision_check
@@ -1708,12 +1903,144 @@ class MotionService(object):
                                    ' inverse kinematics'
                                    ' failed, abort') from exc
 
-        f = JointValues.from_joint_path_point_msg
-        joint_path = JointPath(parameters.joint_set,
-                               [f(seed.joint_set, p).select(parameters.joint_set)
-                                for p in response.solutions])
+        num_joints = len(joint_set)
+        solutions = np.array([p.positions for p in response.solutions],
+                             dtype=float).reshape(-1, num_joints)
+        if joint_set != parameters.joint_set:
+            indices = [joint_set.get_index_of(n)
+                       for n in parameters.joint_set.names]
+            solutions = solutions[:, indices]
+
+        return IkResults.from_arrays(parameters.joint_set, solutions,
+                                     response.error_codes)
+
+    def query_inverse_kinematics_multi_seed(self, pose, parameters, seeds,
+                                            end_effector_link='',
+                                            scorer=None,
+                                            reference=None,
+                                            timeout=None,
+                                            attempts=1,
+                                            max_in_flight=4):
+        """
+        Query inverse kinematics of one pose for several seeds
+
+        One ik request per seed is sent concurrently, with at most
+        max_in_flight requests in flight at a time. The requests run
+        on an executor shared by all calls of this instance which
+        is never larger than 8 threads. Seeds whose request fails
+        are skipped, the successful solutions are rated by scorer
+        and the best one is returned.
+
+        Parameters
+        ----------
+        pose : Pose
+            Pose to transform to joint space
+        parameters : PlanParameters
+            Plan parameters which defines the limits, settings
+            and move group name
+        seeds : Iterable[JointValues] or JointPath
+            Seeds of the ik requests, e.g. joint values stored in
+            the world view
+        end_effector_link : str convertable (optinal)
+            necessary if poses are defined for end effector link
+        scorer : IkSolutionScorer or None (optional)
+            Rates the solutions, if None the joint limit margin
+            and the joint distance to reference are scored
+        reference : JointValues or None (optional)
+            Configuration the joint distance is measured to,
+            e.g. the current joint positions
+        timeout : datatime.timedelta (optional)
+            timeout of each request
+        attempts : int convertable (optional default 1)
+            Attempts to find a solution per request
+        max_in_flight : int (default 4)
+            Maximal number of concurrent service calls
 
-        return IkResults(joint_path, response.error_codes)
+        Returns
+        -------
+        JointValues
+            Best solution with the joint set of parameters
+
+        Raises
+        ------
+        TypeError
+            If pose is not of type Pose, a seed is not of type
+            JointValues or scorer is not of type IkSolutionScorer
+        ValueError
+            If seeds is empty or max_in_flight is smaller than one
+        ServiceException
+            If the requests of all seeds fail or no seed
+            leads to a solution
+        """
+
+        if not isinstance(pose, Pose):
+            raise TypeError('pose is not of expected type Pose')
+
+        seeds = list(seeds)
+        if not seeds:
+            raise ValueError('seeds is empty')
+        if any(not isinstance(s, JointValues) for s in seeds):
+            raise TypeError('seeds is not of expected'
+                            ' type Iterable[JointValues]')
+
+        if scorer is None:
+            scorer = IkSolutionScorer(
+                self.query_joint_limits(parameters.joint_set))
+        elif not isinstance(scorer, IkSolutionScorer):
+            raise TypeError('scorer is not of expected'
+                            ' type IkSolutionScorer')
+
+        max_in_flight = int(max_in_flight)
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be greater than zero')
+
+        end_effector_pose = EndEffectorPose(pose, end_effector_link)
+
+        def solve(seed):
+            return self.query_inverse_kinematics_many([end_effector_pose],
+                                                      parameters,
+                                                      seed,
+                                                      timeout,
+                                                      attempts)
+
+        solve = bind_deadline(solve)
+        executor = self._get_ik_executor()
+        seeds_iter = iter(seeds)
+        pending = set()
+        results = []
+        failures = []
+        while True:
+            for seed in seeds_iter:
+                pending.add(executor.submit(solve, seed))
+                if len(pending) >= max_in_flight:
+                    break
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results.append(future.result())
+                except ServiceException as exc:
+                    # a failing seed does not fail the query
+                    failures.append(exc)
+
+        solutions = np.array([r.solutions[0] for r in results
+                              if r.success_mask[0]], dtype=float)
+        if solutions.size == 0:
+            cause = failures[-1] if failures else None
+            raise ServiceException('ik service call failed for all'
+                                   ' {} seeds'.format(len(seeds))) from cause
+
+        best = scorer.best(parameters.joint_set, solutions, reference)
+        return JointValues(parameters.joint_set, solutions[best])
+
+    def _get_ik_executor(self):
+        with self.__ik_executor_lock:
+            if self.__ik_executor is None:
+                self.__ik_executor = ThreadPoolExecutor(
+                    max_workers=self.__ik_workers)
+            return self.__ik_executor
 
     @staticmethod
     def _ros_duration_from_timedelta(timedelta):
@@ -1800,7 +2127,7 @@ class MotionService(object):
         enable = bool(enable)
 
         try:
-            service = rospy.ServiceProxy(
+            service = get_transport().service_proxy(
                 query_emergency_stop,
                 SetBool)
             response = service(enable)
@@ -1989,31 +2316,30 @@ class MotionService(object):
             If action returns unexpected result
         """
 
-        action_name = str(action_name)
+        from control_msgs.msg import GripperCommandAction, GripperCommandGoal
 
-        action_client = actionlib.SimpleActionClient(action_name,
-                                                     GripperCommandAction)
+        action_name = str(action_name)
 
         g = GripperCommandGoal()
         g.command.position = float(position)
         g.command.max_effort = float(max_effort)
 
-        if not action_client.wait_for_server(rospy.Duration(5)):
+        try:
+            action_client = SharedActionClient.get(action_name,
+                                                   GripperCommandAction)
+        except ServiceException as exc:
             raise ServiceException('connection to grippercommand action'
                                    ' server with name: ' + action_name +
-                                   ' could not be established')
-
-        run_action = generate_action_executor(action_client)
+                                   ' could not be established') from exc
 
-        with LeaseBaseLock([action_name]):
-            response = await run_action(g)
+        response = await self._execute_leased(action_client, g)
 
         if not response:
             raise RuntimeError('Unexpected result received by'
                                ' gripper command action: ' +
                                action_name)
 
-        return MoveGripperResult.from_gripper_command_action_result(response.result())
+        return MoveGripperResult.from_gripper_command_action_result(response)
 
     async def wsg_gripper_command(self, action_name, command, width, speed,
                                   max_effort, stop_on_block=True):
@@ -2057,13 +2383,12 @@ class MotionService(object):
         if not isinstance(command, WsgCommand):
             raise TypeError('command is not of expected type WsgCommand')
 
-        action_client = actionlib.SimpleActionClient(action_name,
-                                                     CommandAction)
-
-        if not action_client.wait_for_server(rospy.Duration(5)):
+        try:
+            action_client = SharedActionClient.get(action_name, CommandAction)
+        except ServiceException as exc:
             raise ServiceException('connection to wsg gripper action'
                                    ' server with name: ' + action_name +
-                                   ' could not be established')
+                                   ' could not be established') from exc
 
         g = CommandGoal()
         g.command.command_id = command.value
@@ -2072,14 +2397,35 @@ class MotionService(object):
         g.command.force = float(max_effort)
         g.command.stop_on_block = bool(stop_on_block)
 
-        run_action = generate_action_executor(action_client)
-
-        with LeaseBaseLock([action_name]):
-            response = await run_action(g)
+        response = await self._execute_leased(action_client, g)
 
         if not response:
             raise RuntimeError('Unexpected result received by'
                                ' wsg gripper command action: ' +
                                action_name)
 
-        return WsgResult.from_wsg_command_action_result(response.result())
+        return WsgResult.from_wsg_command_action_result(response)
+
+    @staticmethod
+    async def _execute_leased(action_client, goal):
+        # lock service calls are blocking, keep them off the event loop
+        # so commands to several grippers can run concurrently
+        loop = asyncio.get_event_loop()
+        lease = LeaseBaseLock([action_client.action_name])
+        acquire = loop.run_in_executor(None, bind_deadline(lease.__enter__))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # the worker thread acquires the lock regardless,
+            # release it as soon as the acquisition finished
+            def release(future):
+                if not future.cancelled() and future.exception() is None:
+                    loop.run_in_executor(None, lease.__exit__,
+                                         None, None, None)
+            acquire.add_done_callback(release)
+            raise
+        try:
+            return await action_client.execute(goal)
+        finally:
+            await loop.run_in_executor(None, lease.__exit__,
+                                       None, None, None)
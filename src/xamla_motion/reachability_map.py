@@ -0,0 +1,456 @@
+# reachability_map.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+import json
+import os
+from datetime import timedelta
+from typing import Iterable, Union
+
+import numpy as np
+from pyquaternion import Quaternion
+
+from .data_types import (CartesianPath, EndEffectorPose, JointValues, Pose,
+                         PoseArray)
+from .data_types.ik_scoring import joint_limit_margins
+from .motion_client import EndEffector
+from .v2.motion_client import EndEffector as EndEffectorV2
+
+_metadata_file = 'metadata.json'
+_reachability_file = 'reachability.npy'
+_manipulability_file = 'manipulability.npy'
+_reachable_file = 'reachable.npy'
+
+
+def _default_orientations():
+    # tool z axis pointing along +z, -z, +x, -x, +y and -y
+    return [Quaternion(),
+            Quaternion(axis=[1.0, 0.0, 0.0], angle=np.pi),
+            Quaternion(axis=[0.0, 1.0, 0.0], angle=np.pi / 2.0),
+            Quaternion(axis=[0.0, 1.0, 0.0], angle=-np.pi / 2.0),
+            Quaternion(axis=[1.0, 0.0, 0.0], angle=-np.pi / 2.0),
+            Quaternion(axis=[1.0, 0.0, 0.0], angle=np.pi / 2.0)]
+
+
+class ReachabilityMap(object):
+    """
+    Voxelized reachability map of an end effector stored on disk
+
+    The workspace box is divided into voxels. For the center of each
+    voxel and a fixed set of sample orientations the inverse kinematics
+    is solved once offline by build. Per voxel the map stores the
+    fraction of reachable orientations (reachability) and the mean
+    normalized distance of the solutions to the joint position limits
+    (manipulability, 1 in the middle of the joint ranges and 0 at
+    the limits). The arrays are memory-mapped, a lookup only reads
+    the voxels of the queried poses.
+
+    Methods
+    -------
+    build(end_effector, directory, bounds_min, bounds_max, resolution,
+          orientations=None, collision_check=False, seed=None,
+          batch_size=512, timeout=None, attempts=1)
+        Samples the workspace of an end effector and stores the map
+    voxel_indices(translations)
+        Voxel indices of translations
+    reachability(poses, match_orientation=False)
+        Reachability of poses looked up in the map
+    manipulability(poses)
+        Manipulability of poses looked up in the map
+    """
+
+    def __init__(self, directory: str):
+        """
+        Opens a reachability map stored by build
+
+        Parameters
+        ----------
+        directory : str
+            Directory of the map
+
+        Raises
+        ------
+        FileNotFoundError
+            If directory does not contain a reachability map
+        """
+
+        self.__directory = str(directory)
+        with open(os.path.join(self.__directory, _metadata_file), 'r') as f:
+            metadata = json.load(f)
+
+        self.__end_effector_name = metadata['end_effector_name']
+        self.__frame_id = metadata['frame_id']
+        self.__bounds_min = np.asarray(metadata['bounds_min'], dtype=float)
+        self.__resolution = np.asarray(metadata['resolution'], dtype=float)
+        self.__shape = tuple(metadata['shape'])
+        self.__orientations = np.asarray(metadata['orientations'],
+                                         dtype=float)
+
+        self.__reachability = np.load(os.path.join(self.__directory,
+                                                   _reachability_file),
+                                      mmap_mode='r')
+        self.__manipulability = np.load(os.path.join(self.__directory,
+                                                     _manipulability_file),
+                                        mmap_mode='r')
+        self.__reachable = np.load(os.path.join(self.__directory,
+                                                _reachable_file),
+                                   mmap_mode='r')
+
+    @classmethod
+    def build(cls, end_effector: Union[EndEffector, EndEffectorV2],
+              directory: str,
+              bounds_min: Iterable[float], bounds_max: Iterable[float],
+              resolution: Union[float, Iterable[float]],
+              orientations: Union[None, Iterable[Quaternion]]=None,
+              collision_check: bool=False,
+              seed: Union[None, JointValues]=None,
+              batch_size: int=512,
+              timeout: Union[None, timedelta]=None,
+              attempts: int=1):
+        """
+        Samples the workspace of an end effector and stores the map
+
+        The inverse kinematics of all voxel centers and orientations
+        is queried in batches of batch_size poses with the same seed
+        for each pose. The joint position limits which define the
+        manipulability are queried from the ros params.
+
+        Parameters
+        ----------
+        end_effector : EndEffector or xamla_motion.v2.EndEffector
+            End effector for which the map is created
+        directory : str
+            Directory where the map is stored, it is created if
+            it does not exist and an existing map is overwritten
+        bounds_min : Iterable[float]
+            Lower corner of the sampled box in world frame
+        bounds_max : Iterable[float]
+            Upper corner of the sampled box in world frame
+        resolution : float or Iterable[float]
+            Edge length of the voxels per axis
+        orientations : Iterable[Quaternion] or None
+            Orientations sampled at each voxel center, if None the
+            six orientations with the tool z axis pointing along the
+            positive and negative world axes are used
+        collision_check : bool (default False)
+            If True poses which are only reachable in collision
+            are treated as unreachable
+        seed : JointValues or None
+            Seed of the inverse kinematics, if None the current
+            joint positions of the move group are used
+        batch_size : int (default 512)
+            Number of poses per inverse kinematics request
+        timeout : datetime.timedelta or None
+            Timeout of each inverse kinematics request
+        attempts : int (default 1)
+            Number of attempts to find a solution per pose
+
+        Returns
+        -------
+        ReachabilityMap
+            The created map
+
+        Raises
+        ------
+        TypeError
+            If end_effector is not of expected type EndEffector
+        ValueError
+            If the bounds are empty or resolution or batch_size
+            are not positive
+        ServiceException
+            If the inverse kinematics service is not available
+        """
+
+        if not isinstance(end_effector, (EndEffector, EndEffectorV2)):
+            raise TypeError('end_effector is not of expected'
+                            ' type EndEffector')
+
+        bounds_min = np.asarray(bounds_min, dtype=float).reshape(3)
+        bounds_max = np.asarray(bounds_max, dtype=float).reshape(3)
+        resolution = np.broadcast_to(np.asarray(resolution, dtype=float),
+                                     (3,)).copy()
+        if np.any(resolution <= 0.0):
+            raise ValueError('resolution must be positive')
+        if np.any(bounds_max <= bounds_min):
+            raise ValueError('bounds_max must be greater than bounds_min')
+        batch_size = int(batch_size)
+        if batch_size <= 0:
+            raise ValueError('batch_size must be positive')
+
+        if orientations is None:
+            orientations = _default_orientations()
+        orientations = np.array([q.q for q in orientations], dtype=float)
+        orientations /= np.linalg.norm(orientations, axis=1, keepdims=True)
+        num_orientations = orientations.shape[0]
+
+        shape = tuple(int(s) for s in
+                      np.ceil((bounds_max - bounds_min) / resolution - 1e-9))
+        num_voxels = int(np.prod(shape))
+
+        move_group = end_effector.move_group
+        motion_service = end_effector.motion_service
+        parameters = move_group.default_plan_parameters.with_collision_check(
+            collision_check)
+        if not seed:
+            seed = move_group.get_current_joint_positions()
+
+        # plan parameters carry no position limits
+        limits = motion_service.query_joint_limits(parameters.joint_set)
+        min_position = limits.min_position
+        max_position = limits.max_position
+
+        os.makedirs(directory, exist_ok=True)
+        open_memmap = np.lib.format.open_memmap
+        reachability = open_memmap(os.path.join(directory,
+                                                _reachability_file),
+                                   mode='w+', dtype=np.float32, shape=shape)
+        manipulability = open_memmap(os.path.join(directory,
+                                                  _manipulability_file),
+                                     mode='w+', dtype=np.float32,
+                                     shape=shape)
+        reachable = open_memmap(os.path.join(directory, _reachable_file),
+                                mode='w+', dtype=bool,
+                                shape=shape + (num_orientations,))
+
+        flat_reachable = reachable.reshape(-1)
+        margins = np.zeros(num_voxels * num_orientations, dtype=np.float32)
+        num_poses = num_voxels * num_orientations
+
+        for start in range(0, num_poses, batch_size):
+            stop = min(start + batch_size, num_poses)
+            index = np.arange(start, stop)
+            voxels = np.stack(np.unravel_index(index // num_orientations,
+                                               shape), axis=1)
+            translations = bounds_min + (voxels + 0.5) * resolution
+            batch = PoseArray(translations,
+                              orientations[index % num_orientations])
+
+            poses = [EndEffectorPose(p, end_effector.link_name)
+                     for p in batch.to_poses()]
+            ik = motion_service.query_inverse_kinematics_many(
+                poses, parameters, seed, timeout, attempts, True)
+
+            mask = ik.success_mask
+            flat_reachable[start:stop] = mask
+            if np.any(mask):
+                margins[start:stop][mask] = joint_limit_margins(
+                    ik.solutions[mask], min_position, max_position)
+
+        per_voxel = reachable.reshape(num_voxels, num_orientations)
+        count = np.sum(per_voxel, axis=1)
+        reachability[...] = (count / num_orientations).reshape(shape)
+        margin_sum = np.sum(margins.reshape(num_voxels, num_orientations),
+                            axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_margin = np.where(count > 0, margin_sum / count, 0.0)
+        manipulability[...] = mean_margin.reshape(shape)
+
+        for array in (reachability, manipulability, reachable):
+            array.flush()
+        del reachability, manipulability, reachable, flat_reachable
+
+        metadata = {'end_effector_name': end_effector.name,
+                    'frame_id': 'world',
+                    'bounds_min': bounds_min.tolist(),
+                    'resolution': resolution.tolist(),
+                    'shape': list(shape),
+                    'orientations': orientations.tolist()}
+        with open(os.path.join(directory, _metadata_file), 'w') as f:
+            json.dump(metadata, f, indent=2)
+
+        return cls(directory)
+
+    @property
+    def directory(self):
+        """
+        directory : str (readonly)
+            Directory of the map
+        """
+        return self.__directory
+
+    @property
+    def end_effector_name(self):
+        """
+        end_effector_name : str (readonly)
+            Name of the end effector the map was created for
+        """
+        return self.__end_effector_name
+
+    @property
+    def frame_id(self):
+        """
+        frame_id : str (readonly)
+            Frame of the sampled box
+        """
+        return self.__frame_id
+
+    @property
+    def bounds_min(self):
+        """
+        bounds_min : numpy.ndarray((3,)) (readonly)
+            Lower corner of the sampled box
+        """
+        return self.__bounds_min.copy()
+
+    @property
+    def resolution(self):
+        """
+        resolution : numpy.ndarray((3,)) (readonly)
+            Edge length of the voxels per axis
+        """
+        return self.__resolution.copy()
+
+    @property
+    def shape(self):
+        """
+        shape : Tuple[int, int, int] (readonly)
+            Number of voxels per axis
+        """
+        return self.__shape
+
+    @property
+    def orientations(self):
+        """
+        orientations : numpy.ndarray((K,4)) (readonly)
+            Sampled orientations as quaternions in (w, x, y, z) order
+        """
+        return self.__orientations.copy()
+
+    def voxel_indices(self, translations):
+        """
+        Voxel indices of translations
+
+        Parameters
+        ----------
+        translations : convertable to numpy.ndarray((N,3))
+            Positions in the frame of the map
+
+        Returns
+        -------
+        indices : numpy.ndarray((N,3), dtype=int)
+            Voxel index per axis
+        inside : numpy.ndarray((N,), dtype=bool)
+            True if the translation lies inside of the map
+        """
+
+        translations = np.asarray(translations, dtype=float).reshape(-1, 3)
+        indices = np.floor((translations - self.__bounds_min) /
+                           self.__resolution).astype(int)
+        inside = np.all((indices >= 0) & (indices < self.__shape), axis=1)
+        indices[~inside] = 0
+        return indices, inside
+
+    def reachability(self, poses: Union[Pose, PoseArray, CartesianPath],
+                     match_orientation: bool=False) -> np.ndarray:
+        """
+        Reachability of poses looked up in the map
+
+        Parameters
+        ----------
+        poses : Pose or PoseArray or CartesianPath
+            Poses to look up
+        match_orientation : bool (default False)
+            If True the result of the sampled orientation closest to
+            the orientation of each pose is returned instead of the
+            fraction of reachable orientations of its voxel
+
+        Returns
+        -------
+        numpy.ndarray((N,), dtype=float32)
+            Reachability in [0, 1] per pose, 0 for poses outside of
+            the map
+
+        Raises
+        ------
+        TypeError
+            If poses is not one of expected types
+        ValueError
+            If the frame of poses differs from the frame of the map
+        """
+
+        poses = self._pose_array(poses)
+        indices, inside = self.voxel_indices(poses.translations)
+        i, j, k = indices.T
+        if match_orientation:
+            dot = np.abs(poses.quaternions @ self.__orientations.T)
+            nearest = np.argmax(dot, axis=1)
+            result = self.__reachable[i, j, k, nearest].astype(np.float32)
+        else:
+            result = np.array(self.__reachability[i, j, k])
+        result[~inside] = 0.0
+        return result
+
+    def manipulability(self, poses: Union[Pose, PoseArray,
+                                          CartesianPath]) -> np.ndarray:
+        """
+        Manipulability of poses looked up in the map
+
+        Parameters
+        ----------
+        poses : Pose or PoseArray or CartesianPath
+            Poses to look up
+
+        Returns
+        -------
+        numpy.ndarray((N,), dtype=float32)
+            Mean normalized joint limit distance of the solutions
+            in the voxel of each pose, 0 for unreachable voxels and
+            poses outside of the map
+
+        Raises
+        ------
+        TypeError
+            If poses is not one of expected types
+        ValueError
+            If the frame of poses differs from the frame of the map
+        """
+
+        poses = self._pose_array(poses)
+        indices, inside = self.voxel_indices(poses.translations)
+        i, j, k = indices.T
+        result = np.array(self.__manipulability[i, j, k])
+        result[~inside] = 0.0
+        return result
+
+    def _pose_array(self, poses):
+        if isinstance(poses, Pose):
+            poses = PoseArray.from_poses([poses])
+        elif isinstance(poses, CartesianPath):
+            poses = PoseArray.from_cartesian_path(poses)
+        elif not isinstance(poses, PoseArray):
+            raise TypeError('poses is not one of expected types'
+                            ' Pose, PoseArray or CartesianPath')
+
+        if poses.frame_id != self.__frame_id:
+            raise ValueError('poses are defined in frame {} but the map'
+                             ' in frame {}'.format(poses.frame_id,
+                                                   self.__frame_id))
+        return poses
+
+    def __len__(self):
+        return int(np.prod(self.__shape))
+
+    def __str__(self):
+        return ('ReachabilityMap(end_effector={}, shape={},'
+                ' orientations={})'.format(self.__end_effector_name,
+                                           self.__shape,
+                                           self.__orientations.shape[0]))
+
+    def __repr__(self):
+        return self.__str__()
@@ -1,7 +1,8 @@
 import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Dict, List, Tuple
 
-import actionlib
 import rospy
 from rosgardener_msgs.msg import *
 from rosgardener_msgs.srv import *
@@ -11,7 +12,9 @@ from xamlamoveit_msgs.msg import *
 from xamlamoveit_msgs.srv import *
 
 from .data_types import ErrorCodes, SteppedMotionState
-from .motion_service import SteppedMotionClient, generate_action_executor
+from .motion_service import SteppedMotionClient
+from .ros_resources import SharedActionClient
+from .transport import get_transport
 
 
 class RobotChatClient(object):
@@ -40,7 +43,7 @@ class RobotChatClient(object):
         self.__ros_node_steward = ROSNodeSteward()
 
         try:
-            self.__channel_command_service = rospy.ServiceProxy(
+            self.__channel_command_service = get_transport().service_proxy(
                 self.__robochat_channel_service_name,
                 SetChannelCommand)
         except rospy.ServiceException as exc:
@@ -49,7 +52,7 @@ class RobotChatClient(object):
                                    ' could not be established') from exc
 
         try:
-            self.__channel_message_service = rospy.ServiceProxy(
+            self.__channel_message_service = get_transport().service_proxy(
                 self.__robochat_message_service_name,
                 SetMessageCommand)
         except rospy.ServiceException as exc:
@@ -259,14 +262,13 @@ class RobotChatClient(object):
         ServiceException:
             If action call to ROSVITA RoboChat fails
         """
-        query_action = actionlib.SimpleActionClient(self.__robochat_query_action_name,
-                                                    RobochatQueryAction)
-
-        if not query_action.wait_for_server(rospy.Duration(5)):
+        try:
+            query_action = SharedActionClient.get(self.__robochat_query_action_name,
+                                                  RobochatQueryAction)
+        except ServiceException as exc:
             raise ServiceException('connection to robot chat query action'
-                                   ' server could not be established')
+                                   ' server could not be established') from exc
 
-        query_action = generate_action_executor(query_action)
         goal = RobochatQueryGoal()
         goal.command.header.channel_name = channel_name
         goal.command.header.command = command
@@ -278,7 +280,7 @@ class RobotChatClient(object):
         if message_body:
             goal.command.message_body = message_body
 
-        return await query_action(goal)
+        return await query_action.execute(goal)
 
 
 class RobotChatSteppedMotion(object):
@@ -288,7 +290,7 @@ class RobotChatSteppedMotion(object):
     """
 
     def __init__(self, robot_chat: RobotChatClient, stepped_client: SteppedMotionClient,
-                 move_group_name: str):
+                 move_group_name: str, update_rate: float = 10.0):
         """
         Initialization of RoboChatSteppedMotion
 
@@ -300,6 +302,8 @@ class RobotChatSteppedMotion(object):
             Client which controlles the supervised motion
         move_group_name : str
             Name of the move group which executes the motion
+        update_rate : float (default 10.0)
+            Maximal rate in Hz of progress updates of the dialog
 
         Returns
         -------
@@ -312,6 +316,8 @@ class RobotChatSteppedMotion(object):
             If robot chat is not of expected type RobotChatClient
             If stepped_client is not of expected type SteppedMotionClient
             If move_group_name is not of exptected type str
+        ValueError
+            If update_rate is not positive
         """
 
         if not isinstance(robot_chat, RobotChatClient):
@@ -322,14 +328,29 @@ class RobotChatSteppedMotion(object):
             raise TypeError('stepped_client is not of expected'
                             ' type SteppedMotionClient')
 
+        update_rate = float(update_rate)
+        if update_rate <= 0.0:
+            raise ValueError('update_rate must be positive')
+
         self.robot_chat = robot_chat
         self.stepped_client = stepped_client
         self.move_group_name = str(move_group_name)
+        self.update_rate = update_rate
+        # single worker keeps the order of robot chat calls
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+
+    def _run_in_executor(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(self.__executor, func, *args)
 
     async def handle_stepwise_motions(self):
         """
         Start supervised motion and ROSVITA supervised motion dialog
 
+        The worker thread of the robot chat calls is shut down
+        when the stepped motion is finished, an instance handles
+        one stepped motion.
+
         Raises
         ------
         ServiceException
@@ -339,39 +360,69 @@ class RobotChatSteppedMotion(object):
         topic = "SteppedMotions"
         disposition = "SteppedMotion"
 
-        self.robot_chat.create_chat(channel_name, topic)
-        message_body = self._create_message(str(self.stepped_client.goal_id.id),
-                                            self.move_group_name, 0.0)
-        message_id = self.robot_chat.create_text_message(
-            channel_name, message_body, disposition)
-
         try:
+            await self._run_in_executor(self.robot_chat.create_chat,
+                                        channel_name, topic)
+            message_body = self._create_message(str(self.stepped_client.goal_id.id),
+                                                self.move_group_name, 0.0)
+            message_id = await self._run_in_executor(
+                self.robot_chat.create_text_message,
+                channel_name, message_body, disposition)
+
             task_update = asyncio.ensure_future(
                 self._update_progress(channel_name, message_id))
-            await self.stepped_client.action_done_future
-        except ServiceException as exc:
-            if exc.error_code != ErrorCodes.SUCCESS:
-                raise ServiceException('Robot chat stepped motion ends '
-                                       'not successful') from exc
+            try:
+                await self.stepped_client.action_done_future
+            except ServiceException as exc:
+                if exc.error_code != ErrorCodes.SUCCESS:
+                    raise ServiceException('Robot chat stepped motion ends '
+                                           'not successful') from exc
+            finally:
+                task_update.cancel()
+                await self._run_in_executor(self.robot_chat.delete_text_message,
+                                            channel_name, message_id)
         finally:
-            self.robot_chat.delete_text_message(channel_name, message_id)
-            task_update.cancel()
+            # all submitted calls are already awaited
+            self.__executor.shutdown(wait=False)
 
     async def _update_progress(self, channel_name: str, message_id: str):
-        lastProgress = 0.0
-        run = True
-        while run:
-            await asyncio.sleep(0.05)
-            if self.stepped_client.state:
-                state = self.stepped_client.state
-                if (state.progress != lastProgress):
-                    lastProgress = state.progress
-                    message_body = self._create_message(str(self.stepped_client.goal_id.id),
-                                                        self.move_group_name, lastProgress)
-                    message_id = self.robot_chat.update_text_message(
-                        channel_name, message_id, message_body)
-                    run = state.error_code == ErrorCodes.PROGRESS
+        loop = asyncio.get_event_loop()
+        queue = self.stepped_client.state_queue()
+        min_interval = 1.0 / self.update_rate
+        last_progress = 0.0
+        last_update = None
+        finished = False
+
+        while True:
+            state = await queue.get()
+            if state is None:
+                return
+
+            # throttle to update_rate and only show the latest state,
+            # the last state is shown also if the motion finished
+            if last_update is not None:
+                remaining = last_update + min_interval - loop.time()
+                if remaining > 0.0:
+                    await asyncio.sleep(remaining)
+            while not queue.empty():
+                latest = queue.get_nowait()
+                if latest is None:
+                    finished = True
+                    break
+                state = latest
+
+            if state.progress != last_progress:
+                last_progress = state.progress
+                last_update = loop.time()
+                message_body = self._create_message(str(self.stepped_client.goal_id.id),
+                                                    self.move_group_name, last_progress)
+                await self._run_in_executor(self.robot_chat.update_text_message,
+                                            channel_name, message_id, message_body)
+
+            if finished or state.error_code != ErrorCodes.PROGRESS:
+                return
 
     def _create_message(self, goal_id: str, move_group_name: str, progress: float) -> str:
-        my_message = '"GoalId" : "{}", "MoveGroupName" : "{}", "Progress" : {}'
-        return '{' + my_message.format(goal_id, move_group_name, progress) + '}'
+        return json.dumps({'GoalId': goal_id,
+                           'MoveGroupName': move_group_name,
+                           'Progress': progress})
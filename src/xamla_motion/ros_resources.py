@@ -0,0 +1,539 @@
+# ros_resources.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+import asyncio
+import enum
+from threading import Event, Lock
+from typing import Callable
+
+import actionlib
+import rospy
+
+from .data_types import ErrorCodes
+from .transport import get_transport
+from .utility import ROSNodeSteward
+from .xamla_motion_exceptions import ServiceException
+
+
+@enum.unique
+class ActionLibGoalStatus(enum.Enum):
+    PENDING = 0
+    ACTIVE = 1
+    PREEMPTED = 2
+    SUCCEEDED = 3
+    ABORTED = 4
+    REJECTED = 5
+    PREEMPTING = 6
+    RECALLING = 7
+    RECALLED = 8
+    LOST = 9
+
+
+def action_exception(goal_status: int, result):
+    """
+    Create the exception which describes an unsuccessful action
+
+    Parameters
+    ----------
+    goal_status : int
+        Terminal actionlib goal status
+    result
+        Action result message or None
+
+    Returns
+    -------
+    ServiceException or None
+        None if the action succeeded
+    """
+
+    status = ActionLibGoalStatus(goal_status)
+    if status == ActionLibGoalStatus.SUCCEEDED:
+        return None
+
+    try:
+        reason = ErrorCodes(result.result)
+        return ServiceException('action end unsuccessfully with'
+                                ' state: {}, reason: {}'.format(status,
+                                                                reason),
+                                error_code=reason)
+    except (AttributeError, ValueError):
+        return ServiceException('action end unsuccessfully with'
+                                ' state: {}'.format(status))
+
+
+class SharedGoalHandle(object):
+
+    """
+    Handle of a goal which is sent via a SharedActionClient
+
+    Methods
+    -------
+    cancel
+        Request cancellation of the goal
+    wait
+        Block until the goal is done
+    """
+
+    def __init__(self, done_cb=None, feedback_cb=None):
+        self.__done_cb = done_cb
+        self.__feedback_cb = feedback_cb
+        self.__done = Event()
+        self.__client_goal_handle = None
+        self.__status = None
+        self.__result = None
+
+    @property
+    def goal_id(self):
+        """
+        goal_id : GoalID
+            Ros action goal id
+        """
+
+        return self.__client_goal_handle.comm_state_machine.action_goal.goal_id
+
+    @property
+    def done(self) -> bool:
+        """
+        done : bool
+            True if the goal reached a terminal state
+        """
+
+        return self.__done.is_set()
+
+    @property
+    def status(self):
+        """
+        status : int or None
+            Terminal actionlib goal status or None if not done
+        """
+
+        return self.__status
+
+    @property
+    def result(self):
+        """
+        result
+            Action result message or None if not done
+        """
+
+        return self.__result
+
+    def cancel(self):
+        """
+        Request cancellation of the goal
+        """
+
+        if self.__client_goal_handle is not None and not self.done:
+            self.__client_goal_handle.cancel()
+
+    def wait(self, timeout: float=None) -> bool:
+        """
+        Block until the goal is done
+
+        Parameters
+        ----------
+        timeout : float or None (default None)
+            Timeout in seconds, None waits infinitely
+
+        Returns
+        -------
+        bool
+            True if goal is done
+        """
+
+        return self.__done.wait(timeout)
+
+    def _attach(self, client_goal_handle):
+        self.__client_goal_handle = client_goal_handle
+
+    def _feedback(self, feedback):
+        if self.__feedback_cb is not None:
+            self.__feedback_cb(feedback)
+
+    def _finish(self, status, result):
+        if self.__done.is_set():
+            return
+        self.__status = status
+        self.__result = result
+        self.__done.set()
+        if self.__done_cb is not None:
+            self.__done_cb(status, result)
+
+
+class SharedActionClient(object):
+
+    """
+    Process wide action client which multiplexes goals
+
+    Instead of creating an actionlib.SimpleActionClient and waiting
+    for the action server on every request, one action client per
+    action name is created lazily and reused. Arbitrary many goals
+    can be active at the same time, results and feedback are routed
+    to the SharedGoalHandle of the goal they belong to.
+
+    Methods
+    -------
+    get
+        Get the shared action client of an action
+    send_goal
+        Send a goal and return its SharedGoalHandle
+    execute
+        Send a goal and await its result
+    """
+
+    __instances = {}
+    __instances_lock = Lock()
+
+    @classmethod
+    def get(cls, action_name: str, action_spec,
+            timeout: float=5.0) -> 'SharedActionClient':
+        """
+        Get the shared action client of an action
+
+        The client is created and connected on first use,
+        one client per action and transport is kept.
+
+        Parameters
+        ----------
+        action_name : str
+            Name of the action
+        action_spec
+            Ros action type
+        timeout : float (default 5.0)
+            Timeout in seconds to wait for the action server
+
+        Returns
+        -------
+        SharedActionClient
+            Connected shared action client
+
+        Raises
+        ------
+        ServiceException
+            If action server is not available
+        """
+
+        with cls.__instances_lock:
+            key = (get_transport(), action_name, action_spec)
+            client = cls.__instances.get(key)
+            if client is None:
+                client = cls(action_name, action_spec)
+                cls.__instances[key] = client
+
+        client.wait_for_server(timeout)
+        return client
+
+    def __init__(self, action_name: str, action_spec):
+        self.__ros_node_steward = ROSNodeSteward()
+        self.__action_name = action_name
+        self.__mutex = Lock()
+        self.__connect_lock = Lock()
+        self.__connected = False
+        self.__goals = {}
+        self.__action_client = get_transport().action_client(action_name,
+                                                             action_spec)
+
+    @property
+    def action_name(self) -> str:
+        """
+        action_name : str
+            Name of the action
+        """
+
+        return self.__action_name
+
+    @property
+    def num_active_goals(self) -> int:
+        """
+        num_active_goals : int
+            Number of goals which did not reach a terminal state
+        """
+
+        with self.__mutex:
+            return len(self.__goals)
+
+    def wait_for_server(self, timeout: float=5.0):
+        """
+        Wait until action server is available
+
+        Returns immediately once the connection was established.
+
+        Parameters
+        ----------
+        timeout : float (default 5.0)
+            Timeout in seconds
+
+        Raises
+        ------
+        ServiceException
+            If action server is not available
+        """
+
+        if self.__connected:
+            return
+
+        with self.__connect_lock:
+            if not self.__connected:
+                if not self.__action_client.wait_for_server(rospy.Duration(timeout)):
+                    raise ServiceException('connection to action server {} could'
+                                           ' not be established'.format(
+                                               self.__action_name))
+                self.__connected = True
+
+    def send_goal(self, goal, done_cb: Callable=None,
+                  feedback_cb: Callable=None) -> SharedGoalHandle:
+        """
+        Send a goal and return its SharedGoalHandle
+
+        Callbacks are called from the ros thread.
+
+        Parameters
+        ----------
+        goal
+            Ros action goal
+        done_cb : Callable[[int, result], None] or None
+            Called with terminal goal status and result
+        feedback_cb : Callable[[feedback], None] or None
+            Called with each feedback message of this goal
+
+        Returns
+        -------
+        SharedGoalHandle
+            Handle of the sent goal
+
+        Raises
+        ------
+        ServiceException
+            If goal handle is not available
+        """
+
+        handle = SharedGoalHandle(done_cb, feedback_cb)
+
+        def transition_cb(client_goal_handle):
+            if client_goal_handle.get_comm_state() == actionlib.CommState.DONE:
+                # finish before release, see registration below
+                handle._finish(client_goal_handle.get_goal_status(),
+                               client_goal_handle.get_result())
+                self._release(client_goal_handle)
+
+        def feedback_callback(client_goal_handle, feedback):
+            handle._feedback(feedback)
+
+        client_goal_handle = self.__action_client.send_goal(goal,
+                                                            transition_cb,
+                                                            feedback_callback)
+        if client_goal_handle is None:
+            raise ServiceException('action goal handle is not available')
+
+        handle._attach(client_goal_handle)
+        # actionlib only keeps weak references of active goals. The goal
+        # can finish before it is registered, then the release already
+        # ran and the check under the mutex removes it again
+        goal_id = handle.goal_id.id
+        with self.__mutex:
+            self.__goals[goal_id] = client_goal_handle
+            if handle.done:
+                del self.__goals[goal_id]
+        return handle
+
+    def _release(self, client_goal_handle):
+        goal_id = client_goal_handle.comm_state_machine.action_goal.goal_id.id
+        with self.__mutex:
+            self.__goals.pop(goal_id, None)
+
+    async def execute(self, goal, feedback_cb: Callable=None):
+        """
+        Send a goal and await its result
+
+        If the awaiting task is cancelled the goal is cancelled too.
+
+        Parameters
+        ----------
+        goal
+            Ros action goal
+        feedback_cb : Callable[[feedback], None] or None
+            Called from the ros thread with each feedback message
+
+        Returns
+        -------
+        result
+            Action result message
+
+        Raises
+        ------
+        ServiceException
+            If action ends unsuccessfully
+        """
+
+        loop = asyncio.get_event_loop()
+        action_done = loop.create_future()
+
+        def set_done(status, result):
+            if action_done.done():
+                return
+            exc = action_exception(status, result)
+            if exc is not None:
+                action_done.set_exception(exc)
+            else:
+                action_done.set_result(result)
+
+        def done_callback(status, result):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(set_done, status, result)
+
+        handle = self.send_goal(goal, done_callback, feedback_cb)
+        try:
+            return await action_done
+        except asyncio.CancelledError:
+            handle.cancel()
+            raise
+
+
+class TopicDemultiplexer(object):
+
+    """
+    Shared subscriber which routes messages by goal id
+
+    A single subscriber is created lazily on first registration and
+    kept afterwards, so registering a consumer does not require
+    subscriber setup. Messages without goal id are delivered to
+    all registered consumers.
+
+    Methods
+    -------
+    register
+        Register callback for messages of a goal id
+    unregister
+        Remove callback of a goal id
+    """
+
+    def __init__(self, topic: str, msg_type, key: Callable,
+                 queue_size: int=10):
+        """
+        Initialize TopicDemultiplexer
+
+        Parameters
+        ----------
+        topic : str
+            Name of the topic
+        msg_type
+            Ros message type of the topic
+        key : Callable[[msg], str]
+            Extracts the goal id from a message
+        queue_size : int (default 10)
+            Queue size of the subscriber
+        """
+
+        self.__topic = topic
+        self.__msg_type = msg_type
+        self.__key = key
+        self.__queue_size = queue_size
+        self.__mutex = Lock()
+        self.__callbacks = {}
+        self.__subscriber = None
+        self.__transport = None
+
+    def register(self, goal_id: str, callback: Callable):
+        """
+        Register callback for messages of a goal id
+
+        Parameters
+        ----------
+        goal_id : str
+            Goal id of the messages
+        callback : Callable[[msg], None]
+            Called from the ros thread with each message
+        """
+
+        with self.__mutex:
+            callbacks = dict(self.__callbacks)
+            callbacks[goal_id] = callback
+            self.__callbacks = callbacks
+            transport = get_transport()
+            if self.__transport is not transport:
+                if self.__subscriber is not None:
+                    self.__subscriber.unregister()
+                self.__subscriber = transport.subscriber(self.__topic,
+                                                         self.__msg_type,
+                                                         callback=self._dispatch,
+                                                         queue_size=self.__queue_size)
+                self.__transport = transport
+
+    def unregister(self, goal_id: str):
+        """
+        Remove callback of a goal id
+
+        Parameters
+        ----------
+        goal_id : str
+            Goal id of the messages
+        """
+
+        with self.__mutex:
+            callbacks = dict(self.__callbacks)
+            callbacks.pop(goal_id, None)
+            self.__callbacks = callbacks
+
+    def _dispatch(self, msg):
+        callbacks = self.__callbacks
+        goal_id = self.__key(msg)
+        if goal_id:
+            callback = callbacks.get(goal_id)
+            if callback is not None:
+                callback(msg)
+        else:
+            for callback in callbacks.values():
+                callback(msg)
+
+
+_publishers = {}
+_publishers_lock = Lock()
+
+
+def shared_publisher(topic: str, msg_type, queue_size: int=1) -> rospy.Publisher:
+    """
+    Get a process wide publisher of a topic
+
+    The publisher is created on first use and reused afterwards
+    as long as the transport is not changed.
+
+    Parameters
+    ----------
+    topic : str
+        Name of the topic
+    msg_type
+        Ros message type of the topic
+    queue_size : int (default 1)
+        Queue size of the publisher
+
+    Returns
+    -------
+    rospy.Publisher
+        Shared publisher
+    """
+
+    transport = get_transport()
+    with _publishers_lock:
+        publisher = _publishers.get((transport, topic))
+        if publisher is None:
+            publisher = transport.publisher(topic, msg_type,
+                                            queue_size=queue_size)
+            _publishers[(transport, topic)] = publisher
+        return publisher
@@ -0,0 +1,736 @@
+# service_call.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+import asyncio
+import bisect
+import contextlib
+import random
+import re
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Union
+
+import rospy
+
+try:
+    import contextvars
+except ImportError:
+    # python < 3.7, deadlines are bound to the thread only
+    contextvars = None
+
+
+class ServiceTimeout(rospy.ServiceException):
+    """
+    Raised if a service call does not finish before its deadline
+
+    Derives from rospy.ServiceException, so the clients report it
+    like any other failed service call.
+    """
+    pass
+
+
+def _seconds(value):
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+class CallPolicy(object):
+    """
+    Timeout and retry settings of service calls
+
+    Retries are only performed for idempotent services, the delay
+    before retry k is drawn uniformly from
+    [0, min(max_backoff, backoff * 2**k)] (full jitter). Calls with
+    a timeout run on at most max_in_flight threads per service, a
+    call which finds no free thread before its timeout is never sent.
+
+    Methods
+    -------
+    backoff_delay(attempt)
+        Randomized delay before a retry
+    """
+
+    def __init__(self, timeout: Union[None, float, timedelta]=None,
+                 retries: int=0, backoff: float=0.05,
+                 max_backoff: float=1.0, max_in_flight: int=4,
+                 retry_on_timeout: bool=False):
+        """
+        Initialization of CallPolicy
+
+        Parameters
+        ----------
+        timeout : None, float or timedelta (default None)
+            Maximal duration of one attempt in seconds, None waits
+            until the service responds
+        retries : int (default 0)
+            Number of retries of idempotent services after a failed
+            or timed out attempt
+        backoff : float (default 0.05)
+            Base delay before the first retry in seconds
+        max_backoff : float (default 1.0)
+            Upper bound of the delay before a retry in seconds
+        max_in_flight : int (default 4)
+            Maximal number of concurrent requests with timeout
+            per service, including timed out requests which are
+            still waiting for the server
+        retry_on_timeout : bool (default False)
+            If True timed out attempts are retried too. A new request
+            is only sent once the timed out one is no longer in
+            flight, until then the retry waits for its response
+
+        Raises
+        ------
+        ValueError
+            If timeout or max_in_flight is not positive or any
+            other value is negative
+        """
+
+        self.__timeout = _seconds(timeout)
+        self.__retries = int(retries)
+        self.__backoff = float(backoff)
+        self.__max_backoff = float(max_backoff)
+        self.__max_in_flight = int(max_in_flight)
+        self.__retry_on_timeout = bool(retry_on_timeout)
+
+        if self.__max_in_flight < 1:
+            raise ValueError('max_in_flight must be positive')
+        if self.__timeout is not None and self.__timeout <= 0.0:
+            raise ValueError('timeout must be positive')
+        if self.__retries < 0 or self.__backoff < 0.0 or self.__max_backoff < 0.0:
+            raise ValueError('retries, backoff and max_backoff must'
+                             ' not be negative')
+
+    @property
+    def timeout(self):
+        """
+        timeout : float or None (readonly)
+            Maximal duration of one attempt in seconds
+        """
+        return self.__timeout
+
+    @property
+    def retries(self):
+        """
+        retries : int (readonly)
+            Number of retries of idempotent services
+        """
+        return self.__retries
+
+    @property
+    def backoff(self):
+        """
+        backoff : float (readonly)
+            Base delay before the first retry in seconds
+        """
+        return self.__backoff
+
+    @property
+    def max_backoff(self):
+        """
+        max_backoff : float (readonly)
+            Upper bound of the delay before a retry in seconds
+        """
+        return self.__max_backoff
+
+    @property
+    def max_in_flight(self):
+        """
+        max_in_flight : int (readonly)
+            Maximal number of concurrent requests with timeout
+        """
+        return self.__max_in_flight
+
+    @property
+    def retry_on_timeout(self):
+        """
+        retry_on_timeout : bool (readonly)
+            True if timed out attempts are retried
+        """
+        return self.__retry_on_timeout
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Randomized delay before a retry
+
+        Parameters
+        ----------
+        attempt : int
+            Number of the failed attempt starting with zero
+
+        Returns
+        -------
+        float
+            Delay in seconds
+        """
+        limit = min(self.__max_backoff, self.__backoff * 2.0**attempt)
+        return random.uniform(0.0, limit)
+
+    def __str__(self):
+        return ('CallPolicy(timeout={}, retries={}, backoff={},'
+                ' max_backoff={}, max_in_flight={},'
+                ' retry_on_timeout={})'.format(self.__timeout, self.__retries,
+                                               self.__backoff,
+                                               self.__max_backoff,
+                                               self.__max_in_flight,
+                                               self.__retry_on_timeout))
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class LatencyHistogram(object):
+    """
+    Histogram of service call latencies with logarithmic buckets
+
+    Bucket i counts the calls with a latency of at most
+    bucket_bounds[i] seconds, the last bucket counts all slower calls.
+
+    Methods
+    -------
+    record(latency, outcome)
+        Adds one call
+    percentile(q)
+        Estimated latency percentile
+    snapshot()
+        Statistics as dictionary
+    """
+
+    bucket_bounds = tuple(0.0005 * 2.0**k for k in range(17))
+
+    def __init__(self):
+        self.__mutex = threading.Lock()
+        self.__counts = [0] * (len(self.bucket_bounds) + 1)
+        self.__outcomes = {'ok': 0, 'error': 0, 'timeout': 0}
+        self.__sum = 0.0
+        self.__max = 0.0
+
+    def record(self, latency: float, outcome: str='ok'):
+        """
+        Adds one call
+
+        Parameters
+        ----------
+        latency : float
+            Duration of the call in seconds
+        outcome : str (default 'ok')
+            One of 'ok', 'error' or 'timeout'
+        """
+        index = bisect.bisect_left(self.bucket_bounds, latency)
+        with self.__mutex:
+            self.__counts[index] += 1
+            self.__outcomes[outcome] += 1
+            self.__sum += latency
+            self.__max = max(self.__max, latency)
+
+    @property
+    def count(self):
+        """
+        count : int (readonly)
+            Number of recorded calls
+        """
+        with self.__mutex:
+            return sum(self.__counts)
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimated latency percentile
+
+        Parameters
+        ----------
+        q : float
+            Percentile in [0, 100]
+
+        Returns
+        -------
+        float
+            Upper bound of the bucket which contains the percentile
+            in seconds, the maximal latency for the last bucket and
+            nan if no call was recorded
+        """
+        with self.__mutex:
+            counts = list(self.__counts)
+            maximum = self.__max
+        total = sum(counts)
+        if total == 0:
+            return float('nan')
+        rank = max(1, int(round(q / 100.0 * total)))
+        cumulative = 0
+        for bound, count in zip(self.bucket_bounds, counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, maximum)
+        return maximum
+
+    def snapshot(self) -> Dict:
+        """
+        Statistics as dictionary
+
+        Returns
+        -------
+        Dict
+            count, outcomes, mean, max, p50, p95, p99 and the
+            non empty buckets as (upper bound, count) tuples
+        """
+        with self.__mutex:
+            counts = list(self.__counts)
+            outcomes = dict(self.__outcomes)
+            total_latency = self.__sum
+            maximum = self.__max
+        total = sum(counts)
+        bounds = self.bucket_bounds + (float('inf'),)
+        return {'count': total,
+                'outcomes': outcomes,
+                'mean': total_latency / total if total else float('nan'),
+                'max': maximum,
+                'p50': self.percentile(50.0),
+                'p95': self.percentile(95.0),
+                'p99': self.percentile(99.0),
+                'buckets': [(b, c) for b, c in zip(bounds, counts) if c]}
+
+
+class ServiceCallStatistics(object):
+    """
+    Latency histograms of all service calls by service name
+
+    Methods
+    -------
+    histogram(name)
+        Histogram of a service, created on first use
+    snapshot()
+        Statistics of all services as dictionary
+    reset()
+        Removes all histograms
+    """
+
+    def __init__(self):
+        self.__mutex = threading.Lock()
+        self.__histograms = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """
+        Histogram of a service, created on first use
+        """
+        with self.__mutex:
+            histogram = self.__histograms.get(name)
+            if histogram is None:
+                histogram = self.__histograms[name] = LatencyHistogram()
+            return histogram
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Statistics of all services as dictionary by service name
+        """
+        with self.__mutex:
+            histograms = dict(self.__histograms)
+        return {name: h.snapshot() for name, h in histograms.items()}
+
+    def reset(self):
+        """
+        Removes all histograms
+        """
+        with self.__mutex:
+            self.__histograms = {}
+
+    def __str__(self):
+        lines = ['{:<60} {:>7} {:>7} {:>9} {:>9} {:>9}'.format(
+            'service', 'calls', 'failed', 'p50 ms', 'p99 ms', 'max ms')]
+        for name, s in sorted(self.snapshot().items()):
+            lines.append('{:<60} {:>7} {:>7} {:>9.2f} {:>9.2f} {:>9.2f}'.format(
+                name, s['count'],
+                s['outcomes']['error'] + s['outcomes']['timeout'],
+                s['p50'] * 1e3, s['p99'] * 1e3, s['max'] * 1e3))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+_statistics = ServiceCallStatistics()
+_default_policy = CallPolicy()
+_policies = []
+_policies_lock = threading.Lock()
+_slots = {}
+_slots_lock = threading.Lock()
+
+if contextvars is not None:
+    _deadline = contextvars.ContextVar('xamla_motion_service_deadline',
+                                       default=None)
+
+    def _get_deadline():
+        return _deadline.get()
+
+    def _set_deadline(end):
+        return _deadline.set(end)
+
+    def _reset_deadline(token):
+        _deadline.reset(token)
+else:
+    _deadline = threading.local()
+
+    def _get_deadline():
+        return getattr(_deadline, 'end', None)
+
+    def _set_deadline(end):
+        token = _get_deadline()
+        _deadline.end = end
+        return token
+
+    def _reset_deadline(token):
+        _deadline.end = token
+
+# queries and getters can be repeated safely, except lock requests
+_idempotent_name = re.compile(r'(^|/)(query|get)[^/]*$', re.IGNORECASE)
+_non_idempotent_name = re.compile(r'lock', re.IGNORECASE)
+
+
+def get_service_statistics() -> ServiceCallStatistics:
+    """
+    Latency statistics of all service calls
+    """
+    return _statistics
+
+
+def set_call_policy(policy: CallPolicy, pattern: Union[None, str]=None):
+    """
+    Set the policy of service calls
+
+    Parameters
+    ----------
+    policy : CallPolicy or None
+        New policy, None removes the policy of pattern
+    pattern : str or None (default None)
+        Regular expression searched in the service names the
+        policy applies to, None sets the default policy.
+        Later patterns take precedence over earlier ones
+
+    Raises
+    ------
+    TypeError
+        If policy is not of expected type CallPolicy
+    """
+
+    global _default_policy
+    if policy is not None and not isinstance(policy, CallPolicy):
+        raise TypeError('policy is not of expected type CallPolicy')
+
+    with _policies_lock:
+        if pattern is None:
+            _default_policy = policy if policy is not None else CallPolicy()
+            return
+        _policies[:] = [(p, c) for p, c in _policies if p.pattern != pattern]
+        if policy is not None:
+            _policies.append((re.compile(pattern), policy))
+
+
+def get_call_policy(name: str) -> CallPolicy:
+    """
+    Policy which applies to a service name
+    """
+    with _policies_lock:
+        for pattern, policy in reversed(_policies):
+            if pattern.search(name):
+                return policy
+        return _default_policy
+
+
+def is_idempotent(name: str) -> bool:
+    """
+    True if the service name denotes a query which can be retried
+    """
+    return (_idempotent_name.search(name) is not None and
+            _non_idempotent_name.search(name) is None)
+
+
+@contextlib.contextmanager
+def deadline(timeout: Union[float, timedelta]):
+    """
+    Bounds the duration of all service calls in the with block
+
+    Calls which would end after the deadline time out with
+    ServiceTimeout, nested deadlines can only shorten the
+    deadline. The deadline is bound to the current thread or
+    asyncio task, on python < 3.7 to the current thread only.
+    Worker threads do not inherit it, work submitted to an
+    executor is therefore wrapped with bind_deadline.
+
+    Parameters
+    ----------
+    timeout : float or timedelta
+        Time from now in seconds
+    """
+
+    end = time.monotonic() + _seconds(timeout)
+    current = _get_deadline()
+    if current is not None:
+        end = min(end, current)
+    token = _set_deadline(end)
+    try:
+        yield end
+    finally:
+        _reset_deadline(token)
+
+
+def bind_deadline(function):
+    """
+    Binds the deadline of the current context to function
+
+    Parameters
+    ----------
+    function : callable
+        Function which is run in another thread, e.g. submitted
+        to an executor
+
+    Returns
+    -------
+    callable
+        Function which runs function under the deadline of the
+        caller of bind_deadline, function itself if there is
+        no deadline
+    """
+
+    end = _get_deadline()
+    if end is None:
+        return function
+
+    def run(*args, **kwargs):
+        token = _set_deadline(end)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _reset_deadline(token)
+
+    return run
+
+
+def _service_slots(name, limit):
+    # the semaphore of a previous limit is released by its own calls
+    with _slots_lock:
+        entry = _slots.get(name)
+        if entry is None or entry[0] != limit:
+            entry = _slots[name] = (limit, threading.BoundedSemaphore(limit))
+        return entry[1]
+
+
+class _Attempt(object):
+
+    # one request in a daemon thread, it holds its slot until the
+    # server responds, also if the caller timed out before
+
+    def __init__(self, function, args, kwargs, slots):
+        self.__done = threading.Event()
+        self.__value = None
+        self.__error = None
+
+        def run():
+            try:
+                self.__value = function(*args, **kwargs)
+            except BaseException as exc:
+                self.__error = exc
+            finally:
+                slots.release()
+                self.__done.set()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def wait(self, timeout):
+        return self.__done.wait(timeout)
+
+    def result(self):
+        if self.__error is not None:
+            raise self.__error
+        return self.__value
+
+
+class TimedServiceProxy(object):
+    """
+    Service proxy with deadlines, retries and latency statistics
+
+    Wraps the service proxy of a transport. The CallPolicy is looked
+    up by service name on every call, see set_call_policy. Without
+    timeout and deadline the call runs in the calling thread, else
+    on one of the max_in_flight threads of the service.
+
+    Methods
+    -------
+    call(*args, **kwargs)
+        Calls the service
+    call_async(*args, **kwargs)
+        Calls the service from asyncio, cancellable
+    """
+
+    def __init__(self, proxy, name: str,
+                 idempotent: Union[None, bool]=None):
+        """
+        Initialization of TimedServiceProxy
+
+        Parameters
+        ----------
+        proxy : callable
+            Service proxy of a transport
+        name : str
+            Service name used for the policy and the statistics
+        idempotent : bool or None (default None)
+            True if the service can be retried, if None it is
+            derived from the service name (see is_idempotent)
+        """
+
+        self.__proxy = proxy
+        self.__name = str(name)
+        if idempotent is None:
+            idempotent = is_idempotent(self.__name)
+        self.__idempotent = bool(idempotent)
+        self.__histogram = _statistics.histogram(self.__name)
+
+    @property
+    def name(self):
+        """
+        name : str (readonly)
+            Service name
+        """
+        return self.__name
+
+    @property
+    def idempotent(self):
+        """
+        idempotent : bool (readonly)
+            True if failed calls are retried
+        """
+        return self.__idempotent
+
+    def __call__(self, *args, **kwargs):
+        policy = get_call_policy(self.__name)
+        retries = policy.retries if self.__idempotent else 0
+        end = _get_deadline()
+
+        attempt = 0
+        pending = None
+        while True:
+            timeout = policy.timeout
+            if end is not None:
+                remaining = end - time.monotonic()
+                if remaining <= 0.0:
+                    raise ServiceTimeout('deadline of service call {} is'
+                                         ' exceeded'.format(self.__name))
+                timeout = remaining if timeout is None else min(timeout,
+                                                                remaining)
+
+            start = time.monotonic()
+            try:
+                if timeout is None:
+                    value = self.__proxy(*args, **kwargs)
+                else:
+                    # a timed out request which is still in flight
+                    # is awaited again instead of sending a new one
+                    if pending is None:
+                        pending = self._send(policy, timeout, args, kwargs)
+                    if not pending.wait(timeout):
+                        raise ServiceTimeout('service call {} timed out'
+                                             ' after {:.3f} s'.format(
+                                                 self.__name, timeout))
+                    finished, pending = pending, None
+                    value = finished.result()
+                return self._record(start, 'ok', value)
+            except ServiceTimeout as exc:
+                self._record(start, 'timeout')
+                if not policy.retry_on_timeout:
+                    raise
+                error = exc
+            except rospy.ServiceException as exc:
+                self._record(start, 'error')
+                error = exc
+
+            if attempt >= retries:
+                raise error
+
+            delay = policy.backoff_delay(attempt)
+            if end is not None and time.monotonic() + delay >= end:
+                raise error
+            time.sleep(delay)
+            attempt += 1
+
+    def call(self, *args, **kwargs):
+        """
+        Calls the service
+
+        Raises
+        ------
+        ServiceTimeout
+            If the call exceeds the timeout of the policy or
+            the deadline of the current context
+        rospy.ServiceException
+            If the call failed after all retries
+        """
+        return self(*args, **kwargs)
+
+    async def call_async(self, *args, **kwargs):
+        """
+        Calls the service from asyncio
+
+        The call runs in a daemon thread, so cancelling the awaiting
+        task returns immediately and neither blocks the event loop
+        nor its shutdown. The response of the service is then
+        discarded. The deadline of the awaiting task applies.
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        call = bind_deadline(self)
+
+        def resolve(value, error):
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+        def run():
+            value, error = None, None
+            try:
+                value = call(*args, **kwargs)
+            except Exception as exc:
+                error = exc
+            try:
+                loop.call_soon_threadsafe(resolve, value, error)
+            except RuntimeError:
+                # event loop is already closed
+                pass
+
+        threading.Thread(target=run, daemon=True).start()
+        return await future
+
+    def _send(self, policy, timeout, args, kwargs):
+        slots = _service_slots(self.__name, policy.max_in_flight)
+        if not slots.acquire(timeout=timeout):
+            raise ServiceTimeout('service call {} timed out, {} calls are'
+                                 ' in flight'.format(self.__name,
+                                                     policy.max_in_flight))
+        return _Attempt(self.__proxy, args, kwargs, slots)
+
+    def _record(self, start, outcome, value=None):
+        self.__histogram.record(time.monotonic() - start, outcome)
+        return value
+
+    def __getattr__(self, name):
+        # e.g. wait_for_service or close of rospy.ServiceProxy
+        return getattr(self.__proxy, name)
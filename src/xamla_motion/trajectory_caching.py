@@ -2,19 +2,21 @@ import datetime
 import time
 import enum
 from abc import ABC, abstractmethod
-from typing import Callable, Dict, Iterable, Union
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Union
 
 import numpy as np
-import rospy
 from pyquaternion import Quaternion
-from sklearn.neighbors import BallTree
 from xamlamoveit_msgs.srv import SetJointPosture, SetJointPostureRequest
 
 from .motion_client import EndEffector
+from .transport import get_transport
 from .robot_chat_client import (RobotChatClient,
                                 RobotChatSteppedMotion)
-from .data_types import (CartesianPath, JointPath, JointTrajectory,
-                         JointValues, Pose)
+from .data_types import (CartesianPath, CompressedJointTrajectory, JointPath,
+                         JointTrajectory, JointValues, Pose)
+
+if TYPE_CHECKING:
+    from sklearn.neighbors import BallTree
 
 
 class SampleVolume(ABC):
@@ -126,10 +128,12 @@ class TaskTrajectoryCache(object):
     def __init__(self, start: Union[Pose, Iterable],
                  target: Union[Pose, Iterable],
                  trajectory: Union[JointTrajectory, Iterable],
-                 start_ball_tree: BallTree,
-                 target_ball_tree: BallTree,
+                 start_ball_tree: 'BallTree',
+                 target_ball_tree: 'BallTree',
                  end_effector_name: str,
-                 cache_type: TrajectoryCacheType):
+                 cache_type: TrajectoryCacheType,
+                 compression_tolerance: Union[None, float]=None,
+                 compression_velocity_tolerance: Union[None, float]=None):
 
         if isinstance(start, Iterable):
             self._start = tuple(start)
@@ -141,6 +145,13 @@ class TaskTrajectoryCache(object):
         else:
             self._target = target
 
+        if compression_tolerance is not None:
+            # trajectories are stored decimated and restored on access
+            trajectory = _map_trajectories(
+                trajectory, lambda t: CompressedJointTrajectory.encode(
+                    t, compression_tolerance,
+                    compression_velocity_tolerance))
+
         if isinstance(trajectory, Iterable):
             self._trajectory = tuple(trajectory)
         else:
@@ -193,12 +204,13 @@ class TaskTrajectoryCache(object):
                                    ' are not equal'.format(target,
                                                            self._target))
 
+            trajectory = _decode(self._trajectory)
             start_pose = start
             target_pose = target
-            start_joint_values = self._trajectory[0].positions
-            target_joint_values = self._trajectory[-1].positions
+            start_joint_values = trajectory[0].positions
+            target_joint_values = trajectory[-1].positions
 
-            return (self._trajectory, start_pose, target_pose,
+            return (trajectory, start_pose, target_pose,
                     start_joint_values, target_joint_values)
 
         elif self._cache_type == TrajectoryCacheType.ONETOMANY:
@@ -223,6 +235,7 @@ class TaskTrajectoryCache(object):
             cached_trajectory, cached_target = self._get_trajectory_with_nearest_rotation(target,
                                                                                           poses,
                                                                                           trajectories)
+            cached_trajectory = _decode(cached_trajectory)
 
             start_pose = start
             target_pose = cached_target
@@ -254,6 +267,7 @@ class TaskTrajectoryCache(object):
             cached_trajectory, cached_start = self._get_trajectory_with_nearest_rotation(start,
                                                                                          poses,
                                                                                          trajectories)
+            cached_trajectory = _decode(cached_trajectory)
 
             start_pose = cached_start
             target_pose = target
@@ -271,6 +285,18 @@ class TaskTrajectoryCache(object):
         return vars(self)
 
 
+def _map_trajectories(trajectories, function):
+    if isinstance(trajectories, JointTrajectory):
+        return function(trajectories)
+    return tuple(_map_trajectories(t, function) for t in trajectories)
+
+
+def _decode(trajectory):
+    if isinstance(trajectory, CompressedJointTrajectory):
+        return trajectory.decode()
+    return trajectory
+
+
 def _generate_trajectory(start: Pose, target: Pose,
                          end_effector: EndEffector,
                          seed: JointValues):
@@ -304,8 +330,8 @@ def _set_robot_state(set_robot_service_name, pose, end_effector, seed):
                                                           seconds=5),
                                                       const_seed=False)
 
-    set_state_service_handle = rospy.ServiceProxy(set_robot_service_name,
-                                                  SetJointPosture)
+    set_state_service_handle = get_transport().service_proxy(set_robot_service_name,
+                                                             SetJointPosture)
 
     request = SetJointPostureRequest()
     request.joint_names = new_robot_state.joint_set.names
@@ -323,7 +349,11 @@ def create_trajectory_cache(set_robot_service_name: str,
                             end_effector: EndEffector,
                             seed: JointValues,
                             start: Union[Pose, SampleVolume],
-                            target: Union[Pose, SampleVolume]) -> TaskTrajectoryCache:
+                            target: Union[Pose, SampleVolume],
+                            compression_tolerance: Union[None, float]=None,
+                            compression_velocity_tolerance: Union[None,
+                                                                  float]=None
+                            ) -> TaskTrajectoryCache:
     """
     Factory function to create a TaskTrajectoryCache instance
 
@@ -340,6 +370,15 @@ def create_trajectory_cache(set_robot_service_name: str,
         A Pose or a SampleVolume, defining the start of the trajectory(/ies)
     target: Union[Pose, SampleVolume]
         A Pose or a SampleVolume, defining the end of the trajectory(/ies)
+    compression_tolerance: Union[None, float]
+        If defined the trajectories are stored decimated, the restored
+        positions deviate at most by this tolerance (see
+        CompressedJointTrajectory). Accelerations are restored from
+        the cubic interpolation and trajectories with efforts are
+        rejected
+    compression_velocity_tolerance: Union[None, float]
+        Maximal deviation of the restored velocities, if None the
+        velocity error of compressed trajectories is not bounded
 
     Returns
         -------
@@ -347,6 +386,8 @@ def create_trajectory_cache(set_robot_service_name: str,
         The trajectory cache created.
     """
 
+    from sklearn.neighbors import BallTree
+
     if isinstance(start, SampleVolume) and isinstance(target, SampleVolume):
         raise NotImplementedError('start and target as areas is'
                                   ' currently not supported')
@@ -390,6 +431,8 @@ def create_trajectory_cache(set_robot_service_name: str,
                                    start_ball_tree=start_ball_tree,
                                    target_ball_tree=None,
                                    end_effector_name=end_effector.name,
+                                   compression_tolerance=compression_tolerance,
+                                   compression_velocity_tolerance=compression_velocity_tolerance,
                                    cache_type=TrajectoryCacheType.MANYTOONE)
 
     elif isinstance(target, SampleVolume) and isinstance(start, Pose):
@@ -432,6 +475,8 @@ def create_trajectory_cache(set_robot_service_name: str,
                                    start_ball_tree=None,
                                    target_ball_tree=target_ball_tree,
                                    end_effector_name=end_effector.name,
+                                   compression_tolerance=compression_tolerance,
+                                   compression_velocity_tolerance=compression_velocity_tolerance,
                                    cache_type=TrajectoryCacheType.ONETOMANY)
     else:
         trajectory = _generate_trajectory(start, target,
@@ -444,6 +489,8 @@ def create_trajectory_cache(set_robot_service_name: str,
                                    start_ball_tree=None,
                                    target_ball_tree=None,
                                    end_effector_name=end_effector.name,
+                                   compression_tolerance=compression_tolerance,
+                                   compression_velocity_tolerance=compression_velocity_tolerance,
                                    cache_type=TrajectoryCacheType.ONETOONE)
 
 
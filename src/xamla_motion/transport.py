@@ -0,0 +1,660 @@
+# transport.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+import collections
+import re
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+from typing import Any, Callable, Dict
+
+import actionlib
+import rospy
+from actionlib_msgs.msg import GoalStatus
+
+from .service_call import TimedServiceProxy
+
+
+class Transport(ABC):
+
+    """
+    Interface of the communication layer used by all clients
+
+    Clients never create ros service proxies, publishers, subscribers
+    or action clients directly but request them from the current
+    transport, see get_transport and set_transport. The returned
+    objects provide the subset of the rospy and actionlib interfaces
+    the clients use.
+
+    Methods
+    -------
+    init_node()
+        Make sure the transport is ready to communicate
+    service_proxy(name, service_class)
+        Create a callable service proxy with deadlines, retries
+        and latency statistics, see service_call
+    publisher(topic, msg_type, queue_size)
+        Create a publisher
+    subscriber(topic, msg_type, callback, queue_size)
+        Create a subscriber
+    simple_action_client(name, action_spec)
+        Create a client with the actionlib.SimpleActionClient interface
+    action_client(name, action_spec)
+        Create a client with the actionlib.ActionClient interface
+    get_param(name)
+        Read a parameter
+    on_shutdown(callback)
+        Register callback which is called on shutdown
+    """
+
+    @abstractmethod
+    def init_node(self):
+        pass
+
+    def service_proxy(self, name: str, service_class):
+        return TimedServiceProxy(self._service_proxy(name, service_class),
+                                 name)
+
+    @abstractmethod
+    def _service_proxy(self, name: str, service_class):
+        pass
+
+    @abstractmethod
+    def publisher(self, topic: str, msg_type, queue_size: int=1):
+        pass
+
+    @abstractmethod
+    def subscriber(self, topic: str, msg_type, callback: Callable,
+                   queue_size: int=1):
+        pass
+
+    @abstractmethod
+    def simple_action_client(self, name: str, action_spec):
+        pass
+
+    @abstractmethod
+    def action_client(self, name: str, action_spec):
+        pass
+
+    @abstractmethod
+    def get_param(self, name: str):
+        pass
+
+    @abstractmethod
+    def on_shutdown(self, callback: Callable):
+        pass
+
+
+class RosTransport(Transport):
+
+    """
+    Transport which communicates via rospy and actionlib
+    """
+
+    def init_node(self):
+        if (re.sub('[^A-Za-z0-9]+', '', rospy.get_name()) == 'unnamed'):
+            rospy.init_node('xamla_motion', anonymous=True)
+
+    def _service_proxy(self, name: str, service_class):
+        return rospy.ServiceProxy(name, service_class)
+
+    def publisher(self, topic: str, msg_type, queue_size: int=1):
+        return rospy.Publisher(topic, msg_type, queue_size=queue_size)
+
+    def subscriber(self, topic: str, msg_type, callback: Callable,
+                   queue_size: int=1):
+        return rospy.Subscriber(topic, msg_type, callback=callback,
+                                queue_size=queue_size)
+
+    def simple_action_client(self, name: str, action_spec):
+        return actionlib.SimpleActionClient(name, action_spec)
+
+    def action_client(self, name: str, action_spec):
+        return actionlib.ActionClient(name, action_spec)
+
+    def get_param(self, name: str):
+        return rospy.get_param(name)
+
+    def on_shutdown(self, callback: Callable):
+        rospy.on_shutdown(callback)
+
+
+class FakeActionAborted(Exception):
+
+    """
+    Raised by a fake action handler to abort a goal with a result
+    """
+
+    def __init__(self, result=None):
+        super(FakeActionAborted, self).__init__('action aborted')
+        self.result = result
+
+
+class FakeGoalContext(object):
+
+    """
+    Context handed to fake action handlers
+
+    Methods
+    -------
+    publish_feedback(feedback)
+        Send feedback to the client of the goal
+    sleep(duration)
+        Sleep unless the goal is cancelled
+    """
+
+    def __init__(self, goal_id: str, feedback_cb: Callable):
+        self.__goal_id = goal_id
+        self.__feedback_cb = feedback_cb
+        self.__cancelled = threading.Event()
+
+    @property
+    def goal_id(self) -> str:
+        """
+        goal_id : str
+            Id of the goal
+        """
+        return self.__goal_id
+
+    @property
+    def cancel_requested(self) -> bool:
+        """
+        cancel_requested : bool
+            True if the client requested cancellation
+        """
+        return self.__cancelled.is_set()
+
+    def publish_feedback(self, feedback):
+        """
+        Send feedback to the client of the goal
+        """
+        self.__feedback_cb(feedback)
+
+    def sleep(self, duration: float) -> bool:
+        """
+        Sleep unless the goal is cancelled
+
+        Returns
+        -------
+        bool
+            False if the goal was cancelled while sleeping
+        """
+        return not self.__cancelled.wait(max(duration, 0.0))
+
+    def _cancel(self):
+        self.__cancelled.set()
+
+
+class _FakeGoal(object):
+
+    def __init__(self, handler, latency, goal, active_cb, feedback_cb,
+                 done_cb):
+        self.goal_id = SimpleNamespace(id=uuid.uuid4().hex, stamp=None)
+        self.status = GoalStatus.PENDING
+        self.result = None
+        self.done = threading.Event()
+        self.context = FakeGoalContext(self.goal_id.id, self._feedback)
+        self.__handler = handler
+        self.__latency = latency
+        self.__goal = goal
+        self.__active_cb = active_cb
+        self.__feedback_cb = feedback_cb
+        self.__done_cb = done_cb
+        self.__thread = threading.Thread(target=self._run, daemon=True)
+        self.__thread.start()
+
+    def _feedback(self, feedback):
+        if self.__feedback_cb is not None:
+            self.__feedback_cb(feedback)
+
+    def _run(self):
+        if self.context.sleep(self.__latency):
+            self.status = GoalStatus.ACTIVE
+            if self.__active_cb is not None:
+                self.__active_cb()
+            try:
+                self.result = self.__handler(self.__goal, self.context)
+                self.status = GoalStatus.SUCCEEDED
+            except FakeActionAborted as exc:
+                self.result = exc.result
+                self.status = GoalStatus.ABORTED
+            except Exception:
+                self.status = GoalStatus.ABORTED
+            if self.context.cancel_requested and self.status == GoalStatus.SUCCEEDED:
+                self.status = GoalStatus.PREEMPTED
+        else:
+            self.status = GoalStatus.RECALLED
+
+        self.done.set()
+        if self.__done_cb is not None:
+            self.__done_cb(self.status, self.result)
+
+
+class _FakeSimpleActionClient(object):
+
+    def __init__(self, transport, name):
+        self.__transport = transport
+        self.__name = name
+        self.__goal = None
+
+    def wait_for_server(self, timeout=None):
+        return self.__transport._action_handler(self.__name) is not None
+
+    def send_goal(self, goal, done_cb=None, active_cb=None, feedback_cb=None):
+        handler, latency = self.__transport._require_action(self.__name)
+        self.__goal = _FakeGoal(handler, latency, goal, active_cb,
+                                feedback_cb, done_cb)
+
+    def cancel_goal(self):
+        if self.__goal is not None:
+            self.__goal.context._cancel()
+
+    def wait_for_result(self, timeout=None):
+        if self.__goal is None:
+            return False
+        if timeout is not None and hasattr(timeout, 'to_sec'):
+            timeout = timeout.to_sec() or None
+        return self.__goal.done.wait(timeout)
+
+    def get_result(self):
+        return None if self.__goal is None else self.__goal.result
+
+    def get_state(self):
+        return GoalStatus.LOST if self.__goal is None else self.__goal.status
+
+
+class _FakeClientGoalHandle(object):
+
+    def __init__(self, goal):
+        self.__goal = goal
+        self.comm_state_machine = SimpleNamespace(
+            action_goal=SimpleNamespace(goal_id=goal.goal_id))
+
+    def get_comm_state(self):
+        if self.__goal.done.is_set():
+            return actionlib.CommState.DONE
+        return actionlib.CommState.ACTIVE
+
+    def get_goal_status(self):
+        return self.__goal.status
+
+    def get_result(self):
+        return self.__goal.result
+
+    def cancel(self):
+        self.__goal.context._cancel()
+
+
+class _FakeActionClient(object):
+
+    def __init__(self, transport, name):
+        self.__transport = transport
+        self.__name = name
+
+    def wait_for_server(self, timeout=None):
+        return self.__transport._action_handler(self.__name) is not None
+
+    def send_goal(self, goal, transition_cb=None, feedback_cb=None):
+        handler, latency = self.__transport._require_action(self.__name)
+        handles = []
+
+        def active():
+            if transition_cb is not None:
+                transition_cb(handles[0])
+
+        def feedback(msg):
+            if feedback_cb is not None:
+                feedback_cb(handles[0], msg)
+
+        def done(status, result):
+            if transition_cb is not None:
+                transition_cb(handles[0])
+
+        # the goal thread waits for the latency before using the handle
+        ready = threading.Event()
+
+        def gated(callback):
+            def call(*args):
+                ready.wait()
+                callback(*args)
+            return call
+
+        fake_goal = _FakeGoal(handler, latency, goal, gated(active),
+                              gated(feedback), gated(done))
+        handles.append(_FakeClientGoalHandle(fake_goal))
+        ready.set()
+        return handles[0]
+
+
+class _FakeServiceProxy(object):
+
+    def __init__(self, transport, name):
+        self.__transport = transport
+        self.__name = name
+
+    def __call__(self, *args, **kwargs):
+        return self.__transport._call_service(self.__name, args, kwargs)
+
+    def call(self, *args, **kwargs):
+        return self(*args, **kwargs)
+
+
+class _FakePublisher(object):
+
+    def __init__(self, transport, topic):
+        self.__transport = transport
+        self.__topic = topic
+
+    def publish(self, msg):
+        self.__transport._publish(self.__topic, msg)
+
+    def get_num_connections(self):
+        return self.__transport._num_subscribers(self.__topic)
+
+    def unregister(self):
+        pass
+
+
+class _FakeSubscriber(object):
+
+    def __init__(self, transport, topic, callback):
+        self.__transport = transport
+        self.__topic = topic
+        self.callback = callback
+
+    def unregister(self):
+        self.__transport._unsubscribe(self.__topic, self)
+
+
+class FakeTransport(Transport):
+
+    """
+    In-process transport for tests and benchmarks
+
+    Services and actions are plain python callables registered by
+    name, topics are delivered synchronously to all in-process
+    subscribers. Every service call and action goal is delayed by
+    a deterministic latency, so client overhead can be measured
+    and load tests can be run without a ROSVITA installation.
+
+    Examples
+    --------
+    >>> transport = FakeTransport(default_latency=0.002)
+    >>> FakeMotionServer(transport)
+    >>> previous = set_transport(transport)
+
+    Methods
+    -------
+    register_service(name, handler, latency)
+        Register handler of a service
+    register_action(name, handler, latency)
+        Register handler of an action
+    set_param(name, value)
+        Set a parameter
+    published(topic)
+        Messages published on a topic
+    shutdown()
+        Call registered shutdown callbacks
+    """
+
+    def __init__(self, default_latency: float=0.0, history_size: int=100):
+        """
+        Initialize FakeTransport
+
+        Parameters
+        ----------
+        default_latency : float convertable (default 0.0)
+            Latency in seconds of services and actions
+            registered without explicit latency
+        history_size : int convertable (default 100)
+            Number of published messages kept per topic
+
+        Returns
+        -------
+        FakeTransport
+            Instance of FakeTransport
+        """
+
+        self.__default_latency = float(default_latency)
+        self.__history_size = int(history_size)
+        self.__mutex = threading.Lock()
+        self.__services = {}
+        self.__actions = {}
+        self.__params = {}
+        self.__subscribers = collections.defaultdict(list)
+        self.__published = collections.defaultdict(
+            lambda: collections.deque(maxlen=self.__history_size))
+        self.__shutdown_callbacks = []
+        self.__call_counts = collections.Counter()
+
+    @staticmethod
+    def _normalize(name: str) -> str:
+        return str(name).strip('/')
+
+    @property
+    def call_counts(self) -> Dict[str, int]:
+        """
+        call_counts : Dict[str, int]
+            Number of calls per service and action name
+        """
+        with self.__mutex:
+            return dict(self.__call_counts)
+
+    def register_service(self, name: str, handler: Callable,
+                         latency: float=None):
+        """
+        Register handler of a service
+
+        Parameters
+        ----------
+        name : str
+            Name of the service
+        handler : Callable
+            Called with the arguments of the service call,
+            returns the response
+        latency : float or None (default None)
+            Latency in seconds, if None the default latency
+        """
+
+        latency = self.__default_latency if latency is None else float(latency)
+        with self.__mutex:
+            self.__services[self._normalize(name)] = (handler, latency)
+
+    def register_action(self, name: str, handler: Callable,
+                        latency: float=None):
+        """
+        Register handler of an action
+
+        The handler is executed in a separate thread per goal.
+
+        Parameters
+        ----------
+        name : str
+            Name of the action
+        handler : Callable[[goal, FakeGoalContext], result]
+            Executes a goal and returns the result, raise
+            FakeActionAborted to abort the goal
+        latency : float or None (default None)
+            Latency in seconds until the goal becomes active,
+            if None the default latency
+        """
+
+        latency = self.__default_latency if latency is None else float(latency)
+        with self.__mutex:
+            self.__actions[self._normalize(name)] = (handler, latency)
+
+    def set_param(self, name: str, value: Any):
+        """
+        Set a parameter
+        """
+        with self.__mutex:
+            self.__params[self._normalize(name)] = value
+
+    def published(self, topic: str):
+        """
+        Messages published on a topic
+
+        Returns
+        -------
+        List
+            Latest messages published on topic, oldest first
+        """
+        with self.__mutex:
+            return list(self.__published[self._normalize(topic)])
+
+    def shutdown(self):
+        """
+        Call registered shutdown callbacks
+        """
+        callbacks, self.__shutdown_callbacks = self.__shutdown_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def init_node(self):
+        # rospy.Time.now is used while building messages
+        rospy.rostime.set_rostime_initialized(True)
+
+    def _service_proxy(self, name: str, service_class):
+        return _FakeServiceProxy(self, self._normalize(name))
+
+    def publisher(self, topic: str, msg_type, queue_size: int=1):
+        return _FakePublisher(self, self._normalize(topic))
+
+    def subscriber(self, topic: str, msg_type, callback: Callable,
+                   queue_size: int=1):
+        topic = self._normalize(topic)
+        subscriber = _FakeSubscriber(self, topic, callback)
+        with self.__mutex:
+            self.__subscribers[topic] = self.__subscribers[topic] + [subscriber]
+        return subscriber
+
+    def simple_action_client(self, name: str, action_spec):
+        return _FakeSimpleActionClient(self, self._normalize(name))
+
+    def action_client(self, name: str, action_spec):
+        return _FakeActionClient(self, self._normalize(name))
+
+    def get_param(self, name: str):
+        with self.__mutex:
+            return self.__params[self._normalize(name)]
+
+    def on_shutdown(self, callback: Callable):
+        self.__shutdown_callbacks.append(callback)
+
+    def _call_service(self, name, args, kwargs):
+        with self.__mutex:
+            entry = self.__services.get(name)
+            self.__call_counts[name] += 1
+
+        if entry is None:
+            raise rospy.ServiceException('service {} is not'
+                                         ' available'.format(name))
+
+        handler, latency = entry
+        if latency > 0.0:
+            time.sleep(latency)
+        try:
+            return handler(*args, **kwargs)
+        except Exception as exc:
+            raise rospy.ServiceException('service {} failed: {}'.format(name,
+                                                                       exc)) from exc
+
+    def _action_handler(self, name):
+        with self.__mutex:
+            return self.__actions.get(name)
+
+    def _require_action(self, name):
+        with self.__mutex:
+            entry = self.__actions.get(name)
+            self.__call_counts[name] += 1
+
+        if entry is None:
+            raise rospy.ServiceException('action {} is not'
+                                         ' available'.format(name))
+        return entry
+
+    def _publish(self, topic, msg):
+        with self.__mutex:
+            self.__published[topic].append(msg)
+            subscribers = self.__subscribers[topic]
+        for subscriber in subscribers:
+            subscriber.callback(msg)
+
+    def _num_subscribers(self, topic):
+        with self.__mutex:
+            return len(self.__subscribers[topic])
+
+    def _unsubscribe(self, topic, subscriber):
+        with self.__mutex:
+            self.__subscribers[topic] = [s for s in self.__subscribers[topic]
+                                         if s is not subscriber]
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """
+    Get the transport used by all clients
+
+    Returns
+    -------
+    Transport
+        Current transport, a RosTransport if none was set
+    """
+
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = RosTransport()
+    return _transport
+
+
+def set_transport(transport: Transport) -> Transport:
+    """
+    Set the transport used by all clients created afterwards
+
+    Parameters
+    ----------
+    transport : Transport or None
+        New transport, None restores the default RosTransport
+
+    Returns
+    -------
+    Transport or None
+        Previous transport
+
+    Raises
+    ------
+    TypeError
+        If transport is not of expected type Transport
+    """
+
+    global _transport
+    if transport is not None and not isinstance(transport, Transport):
+        raise TypeError('transport is not of expected type Transport')
+
+    with _transport_lock:
+        previous, _transport = _transport, transport
+    return previous
@@ -20,18 +20,15 @@
 
 import asyncio
 import functools
-import re
 import signal
 from collections import Iterable
 from typing import List
 
-import matplotlib.cm as cmx
-import matplotlib.colors as colors
-import matplotlib.pyplot as plt
 import rospy
 from xamlamoveit_msgs.srv import QueryLock, QueryLockRequest
 
 from .data_types import JointSet, JointTrajectory, JointTrajectoryPoint
+from .transport import get_transport
 from .xamla_motion_exceptions import ServiceException
 
 resource_lock_srv_name = '/xamlaResourceLockService/query_resource_lock'
@@ -124,8 +121,8 @@ class LeaseBaseLock(object):
         self.__request.id_resources = list(resource_ids)
         self.__request.id_lock = str(lock_id)
 
-        self.__lock_service = rospy.ServiceProxy(resource_lock_srv_name,
-                                                 QueryLock)
+        self.__lock_service = get_transport().service_proxy(resource_lock_srv_name,
+                                                            QueryLock)
 
         self.__resource_lock = None
 
@@ -174,8 +171,7 @@ class ROSNodeSteward(object):
     """
 
     def __init__(self):
-        if (re.sub('[^A-Za-z0-9]+', '', rospy.get_name()) == 'unnamed'):
-            rospy.init_node('xamla_motion', anonymous=True)
+        get_transport().init_node()
 
 
 def register_asyncio_shutdown_handler(asyncio_loop):
@@ -214,6 +210,10 @@ def register_asyncio_shutdown_handler(asyncio_loop):
 
 
 def plot_joint_trajectory(trajectory: JointTrajectory, title: str):
+    import matplotlib.cm as cmx
+    import matplotlib.colors as colors
+    import matplotlib.pyplot as plt
+
     joint_names = trajectory.joint_set.names
     jet = plt.get_cmap('jet')
     cNorm = colors.Normalize(vmin=0, vmax=len(joint_names))
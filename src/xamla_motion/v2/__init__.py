@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
 
 from .motion_client import EndEffector, MoveGroup
-from .world_view_client import WorldViewClient
+from .world_view_client import (LazyQueryResult, WorldViewClient,
+                                WorldViewElementResult)
+from .async_world_view_client import AsyncWorldViewClient
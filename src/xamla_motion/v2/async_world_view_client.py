@@ -0,0 +1,363 @@
+# async_world_view_client.py
+#
+# Copyright (c) 2018, Xamla and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA.
+
+#!/usr/bin/env python3
+
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from ..service_call import bind_deadline
+from .world_view_client import (WorldViewClient,
+                                _check_and_convert_element_path)
+
+
+class AsyncWorldViewClient(object):
+
+    """
+    Awaitable wrapper around a WorldViewClient
+
+    All blocking world view service calls are dispatched to a
+    dedicated thread pool so an asyncio event loop keeps running
+    while world view elements are read or written. The size of the
+    pool limits the number of service calls in flight, independent
+    requests can therefore be fanned out with asyncio.gather.
+
+    The wrapped client can be the v2 WorldViewClient (default) or
+    the deprecated v1 WorldViewClient. Arguments of all methods
+    are forwarded unchanged to the method of the same name of the
+    wrapped client, so the signatures are those of the wrapped client.
+
+    Examples
+    --------
+    >>> client = AsyncWorldViewClient(max_concurrency=16)
+    >>> poses = await asyncio.gather(*[client.get_pose(p) for p in paths])
+
+    Methods
+    -------
+    add_joint_values, get_joint_values, query_joint_values
+        Awaitable joint values element access
+    add_pose, get_pose, query_poses
+        Awaitable pose element access
+    add_cartesian_path, get_cartesian_path, query_cartesian_paths
+        Awaitable cartesian path element access
+    add_collision_object, get_collision_object, query_collision_objects
+        Awaitable collision object element access
+    update_joint_values, update_pose, update_cartesian_path,
+    update_collision_object
+        Awaitable update methods (v1 client only)
+    add_many, update_many
+        Awaitable bulk methods with per element results (v2 client only)
+    add_folder
+        Awaitable add folder
+    remove_element
+        Awaitable remove element
+    close
+        Shutdown the dedicated executor
+    """
+
+    def __init__(self, client=None, max_concurrency: int=8):
+        """
+        Initialize AsyncWorldViewClient
+
+        Parameters
+        ----------
+        client : Union[None, WorldViewClient] (default None)
+            World view client which performs the service calls,
+            if None a new v2 WorldViewClient is created
+        max_concurrency : int (default 8)
+            Maximal number of service calls in flight
+
+        Returns
+        -------
+        Instance of AsyncWorldViewClient
+
+        Raises
+        ------
+        ValueError
+            If max_concurrency is smaller than one
+        """
+
+        max_concurrency = int(max_concurrency)
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be greater than zero')
+
+        if client is None:
+            client = WorldViewClient()
+
+        self.__client = client
+        self.__max_concurrency = max_concurrency
+        self.__executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    @property
+    def client(self):
+        """
+        client
+            Wrapped synchronous world view client
+        """
+
+        return self.__client
+
+    @property
+    def max_concurrency(self) -> int:
+        """
+        max_concurrency : int
+            Maximal number of service calls in flight
+        """
+
+        return self.__max_concurrency
+
+    def _run(self, method_name: str, *args, **kwargs):
+        method = getattr(self.__client, method_name, None)
+        if method is None:
+            raise AttributeError('wrapped world view client of type {}'
+                                 ' has no method {}'.format(
+                                     type(self.__client).__name__,
+                                     method_name))
+
+        loop = asyncio.get_event_loop()
+        # the executor threads run under the deadline of the caller
+        return loop.run_in_executor(self.__executor,
+                                    bind_deadline(functools.partial(
+                                        method, *args, **kwargs)))
+
+    async def add_joint_values(self, *args, **kwargs):
+        """
+        Awaitable add_joint_values of the wrapped client
+        """
+        return await self._run('add_joint_values', *args, **kwargs)
+
+    async def get_joint_values(self, *args, **kwargs):
+        """
+        Awaitable get_joint_values of the wrapped client
+        """
+        return await self._run('get_joint_values', *args, **kwargs)
+
+    async def query_joint_values(self, *args, **kwargs):
+        """
+        Awaitable query_joint_values of the wrapped client
+        """
+        return await self._run('query_joint_values', *args, **kwargs)
+
+    async def update_joint_values(self, *args, **kwargs):
+        """
+        Awaitable update_joint_values of the wrapped client
+        """
+        return await self._run('update_joint_values', *args, **kwargs)
+
+    async def add_pose(self, *args, **kwargs):
+        """
+        Awaitable add_pose of the wrapped client
+        """
+        return await self._run('add_pose', *args, **kwargs)
+
+    async def get_pose(self, *args, **kwargs):
+        """
+        Awaitable get_pose of the wrapped client
+        """
+        return await self._run('get_pose', *args, **kwargs)
+
+    async def query_poses(self, *args, **kwargs):
+        """
+        Awaitable query_poses of the wrapped client
+        """
+        return await self._run('query_poses', *args, **kwargs)
+
+    async def update_pose(self, *args, **kwargs):
+        """
+        Awaitable update_pose of the wrapped client
+        """
+        return await self._run('update_pose', *args, **kwargs)
+
+    async def add_cartesian_path(self, *args, **kwargs):
+        """
+        Awaitable add_cartesian_path of the wrapped client
+        """
+        return await self._run('add_cartesian_path', *args, **kwargs)
+
+    async def get_cartesian_path(self, *args, **kwargs):
+        """
+        Awaitable get_cartesian_path of the wrapped client
+        """
+        return await self._run('get_cartesian_path', *args, **kwargs)
+
+    async def query_cartesian_paths(self, *args, **kwargs):
+        """
+        Awaitable query_cartesian_paths of the wrapped client
+        """
+        return await self._run('query_cartesian_paths', *args, **kwargs)
+
+    async def update_cartesian_path(self, *args, **kwargs):
+        """
+        Awaitable update_cartesian_path of the wrapped client
+        """
+        return await self._run('update_cartesian_path', *args, **kwargs)
+
+    async def add_collision_object(self, *args, **kwargs):
+        """
+        Awaitable add_collision_object of the wrapped client
+        """
+        return await self._run('add_collision_object', *args, **kwargs)
+
+    async def get_collision_object(self, *args, **kwargs):
+        """
+        Awaitable get_collision_object of the wrapped client
+        """
+        return await self._run('get_collision_object', *args, **kwargs)
+
+    async def query_collision_objects(self, *args, **kwargs):
+        """
+        Awaitable query_collision_objects of the wrapped client
+        """
+        return await self._run('query_collision_objects', *args, **kwargs)
+
+    async def update_collision_object(self, *args, **kwargs):
+        """
+        Awaitable update_collision_object of the wrapped client
+        """
+        return await self._run('update_collision_object', *args, **kwargs)
+
+    async def _run_many(self, method_name, elements, max_concurrency,
+                        **kwargs):
+        if max_concurrency is None:
+            max_concurrency = self.__max_concurrency
+        max_concurrency = int(max_concurrency)
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be greater than zero')
+
+        # convert up front so invalid paths raise before any call
+        elements = [(_check_and_convert_element_path(p), v)
+                    for p, v in elements]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(element):
+            # single elements are handled without the pool of the
+            # wrapped client, only the executor of this client is used
+            async with semaphore:
+                results = await self._run(method_name, [element],
+                                          max_concurrency=1, **kwargs)
+            return results[0]
+
+        return list(await asyncio.gather(*[run(e) for e in elements]))
+
+    async def add_many(self, elements, transient: bool=False,
+                       update_if_exists: bool=True,
+                       max_concurrency: int=None):
+        """
+        Awaitable add / update of many elements
+
+        Every element is added by a service call of its own on the
+        executor of this client, a failing element does not abort
+        the remaining ones (see WorldViewClient.add_many).
+
+        Parameters
+        ----------
+        elements : Iterable[Tuple[Union[str, pathlib.Path], Any]]
+            Pairs of element path and value, where value is one of
+            JointValues, Pose, CartesianPath or CollisionObject
+        transient : bool (default False)
+            If True the added elements are only valid for this session
+        update_if_exists: bool (default True)
+            If True update elements if they exist instead
+            of reporting an error
+        max_concurrency : int or None (default None)
+            Maximal number of service calls in flight, at most and
+            by default the max_concurrency of this client
+
+        Returns
+        -------
+        results : List[WorldViewElementResult]
+            One result per element in the order of elements
+
+        Raises
+        ------
+        TypeError
+            If an element path can not be converted to pathlib.Path
+        ValueError
+            If max_concurrency is smaller than one
+        """
+
+        return await self._run_many('add_many', elements, max_concurrency,
+                                    transient=transient,
+                                    update_if_exists=update_if_exists)
+
+    async def update_many(self, elements, transient: bool=False,
+                          max_concurrency: int=None):
+        """
+        Awaitable update of many existing elements
+
+        Parameters
+        ----------
+        elements : Iterable[Tuple[Union[str, pathlib.Path], Any]]
+            Pairs of element path and value, where value is one of
+            JointValues, Pose, CartesianPath or CollisionObject
+        transient : bool (default False)
+            If True the updated elements are only valid for this session
+        max_concurrency : int or None (default None)
+            Maximal number of service calls in flight, at most and
+            by default the max_concurrency of this client
+
+        Returns
+        -------
+        results : List[WorldViewElementResult]
+            One result per element in the order of elements,
+            elements which do not exist are reported as failed
+
+        Raises
+        ------
+        TypeError
+            If an element path can not be converted to pathlib.Path
+        ValueError
+            If max_concurrency is smaller than one
+        """
+
+        return await self._run_many('update_many', elements, max_concurrency,
+                                    transient=transient)
+
+    async def add_folder(self, *args, **kwargs):
+        """
+        Awaitable add_folder of the wrapped client
+        """
+        return await self._run('add_folder', *args, **kwargs)
+
+    async def remove_element(self, *args, **kwargs):
+        """
+        Awaitable remove_element of the wrapped client
+        """
+        return await self._run('remove_element', *args, **kwargs)
+
+    def close(self, wait: bool=True):
+        """
+        Shutdown the dedicated executor
+
+        Parameters
+        ----------
+        wait : bool (default True)
+            If True wait until pending service calls are finished
+        """
+
+        self.__executor.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # waiting for pending calls must not block the event loop
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.close)
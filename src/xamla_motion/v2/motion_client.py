@@ -19,7 +19,7 @@
 #!/usr/bin/env python3
 
 from datetime import timedelta
-from typing import Union, Tuple
+from typing import Iterable, Union, Tuple
 
 import numpy as np
 
@@ -27,6 +27,7 @@ from xamla_motion.data_types import (Pose,
                                      CartesianPath,
                                      EndEffectorPose,
                                      IkResults,
+                                     IkSolutionScorer,
                                      JointPath,
                                      JointSet,
                                      JointValues,
@@ -846,6 +847,12 @@ class EndEffector(object):
     #         timeout:  Union[None, datatime.timedelta], const_seed: bool, attempts: int
     #     ) -> IkResults:
     #     inverse kinematic solutions for many poses
+    # inverse_kinematics_multi_seed(
+    #         pose: Pose, seeds: Iterable[JointValues], collision_check: Union[None, bool],
+    #         scorer: Union[None, IkSolutionScorer], timeout: Union[None, datatime.timedelta],
+    #         attempts: int, max_in_flight: int
+    #     ) -> JointValues:
+    #     best inverse kinematic solution of one pose for several seeds
     # move_cartesian(
     #         target: Union[Pose, CartesianPath], seed: Union[None, JointValues]=None,
     #         velocity_scaling: Union[None, float]=None, collision_check: Union[None, bool]=None,
@@ -1213,6 +1220,66 @@ class EndEffector(object):
 
         return ik
 
+    def inverse_kinematics_multi_seed(self, pose: Pose,
+                                      seeds: Iterable[JointValues],
+                                      collision_check: Union[None, bool],
+                                      scorer: Union[None, IkSolutionScorer] = None,
+                                      timeout: Union[None, timedelta] = None,
+                                      attempts: int = 1,
+                                      max_in_flight: int = 4) -> JointValues:
+        """
+        best inverse kinematic solution of one pose for several seeds
+
+        The ik requests of all seeds run concurrently. By default
+        solutions close to the current joint positions and far from
+        the joint limits are preferred.
+
+        Parameters
+        ----------
+        pose : Pose
+            Pose to transform to joint space
+        seeds : Iterable[JointValues]
+            Numerical seeds, e.g. joint values stored in the world view
+        collision_check : Union[None, bool]
+            If true the trajectory planing try to plan a
+            collision free trajectory and before executing
+            a trajectory a collision check is performed
+        scorer : Union[None, IkSolutionScorer] (optional)
+            Rates the solutions, the joint distance is always
+            measured to the current joint positions
+        timeout : Union[None, datatime.timedelta]  (optional)
+            timeout of each request
+        attempts : int (optional default 1)
+            number of attempts to find solution per seed
+        max_in_flight : int (optional default 4)
+            maximal number of concurrent ik requests
+
+        Returns
+        -------
+        JointValues
+            Instance of JointValues with the best found solution
+
+        Raises
+        ------
+        TypeError
+            If pose is not of type Pose
+        ServiceException
+            If the requests of all seeds fail or no seed
+            leads to a solution
+        """
+
+        if not isinstance(pose, Pose):
+            raise TypeError('target is not one of expected '
+                            'types Pose')
+
+        parameters = self.__move_group._build_plan_parameters(1.0,
+                                                              collision_check)
+        current = self.__move_group.get_current_joint_positions()
+
+        return self.__m_service.query_inverse_kinematics_multi_seed(
+            pose, parameters, seeds, self.__link_name, scorer, current,
+            timeout, attempts, max_in_flight)
+
     def move_cartesian(self, target: Union[Pose, CartesianPath],
                        seed: Union[None, JointValues] = None,
                        velocity_scaling: Union[None, float] = None,
@@ -20,7 +20,9 @@
 
 
 import pathlib
-from typing import Dict, List, Union
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple, Union
 
 import moveit_msgs.msg as moveit_msgs
 import rospy
@@ -56,6 +58,8 @@ from xamlamoveit_msgs.srv import (CreateFolderWorldView,
                                   UpdatePoseWorldViewRequest)
 
 from ..data_types import CartesianPath, CollisionObject, JointValues, Pose
+from ..service_call import bind_deadline
+from ..transport import get_transport
 from ..xamla_motion_exceptions import ArgumentError, ServiceException
 
 add_joint_values_srv_name = '/rosvita/world_view/add_joint_posture'
@@ -94,6 +98,170 @@ def _check_and_convert_element_path(element_path):
     return '/' / element_path
 
 
+class WorldViewElementResult(object):
+
+    """
+    Result of a single element operation of a bulk world view request
+
+    Attributes
+    ----------
+    element_path : pathlib.Path
+        Path of the element in world view tree
+    success : bool
+        True if the element was written successfully
+    error : Union[None, Exception]
+        Exception which was raised while writing the element
+        or None on success
+    """
+
+    __slots__ = ('element_path', 'success', 'error')
+
+    def __init__(self, element_path: pathlib.Path, error: Exception=None):
+        self.element_path = element_path
+        self.success = error is None
+        self.error = error
+
+    def __bool__(self):
+        return self.success
+
+    def __repr__(self):
+        return ('WorldViewElementResult(element_path={}, success={},'
+                ' error={!r})'.format(self.element_path, self.success,
+                                      self.error))
+
+
+class LazyQueryResult(Mapping):
+
+    """
+    Read only mapping of a world view query result
+
+    The raw ros messages of the query response are kept and an
+    element is only decoded into its data type when it is accessed
+    for the first time. Decoded elements are cached. The keys
+    are the element paths as pathlib.PurePath in the order of
+    the response.
+
+    Methods
+    -------
+    names
+        Element paths of the query result without decoding
+    page
+        Decode and return a page of the query result as dict
+    """
+
+    __slots__ = ('__paths', '__index', '__msgs', '__decoder', '__cache')
+
+    def __init__(self, element_paths: Sequence[str], msgs: Sequence[Any],
+                 decoder: Callable[[Any], Any]):
+        """
+        Initialize LazyQueryResult
+
+        Parameters
+        ----------
+        element_paths : Sequence[str]
+            Element paths of the queried elements
+        msgs : Sequence[Any]
+            Raw ros messages of the queried elements
+        decoder : Callable[[Any], Any]
+            Function which converts a raw message to its data type
+        """
+
+        self.__paths = [pathlib.PurePath(e) for e in element_paths]
+        self.__index = {p: i for i, p in enumerate(self.__paths)}
+        self.__msgs = msgs
+        self.__decoder = decoder
+        self.__cache = {}
+
+    def _decode(self, index: int):
+        try:
+            return self.__cache[index]
+        except KeyError:
+            value = self.__decoder(self.__msgs[index])
+            self.__cache[index] = value
+            return value
+
+    def __getitem__(self, key):
+        if not isinstance(key, pathlib.PurePath):
+            key = pathlib.PurePath(key)
+        return self._decode(self.__index[key])
+
+    def __contains__(self, key):
+        if not isinstance(key, pathlib.PurePath):
+            key = pathlib.PurePath(key)
+        return key in self.__index
+
+    def __iter__(self):
+        return iter(self.__paths)
+
+    def __len__(self):
+        return len(self.__paths)
+
+    def names(self) -> List[pathlib.PurePath]:
+        """
+        Element paths of the query result without decoding
+
+        Returns
+        -------
+        names : List[pathlib.PurePath]
+            Element paths in order of the query response
+        """
+
+        return list(self.__paths)
+
+    def page(self, page_index: int, page_size: int) -> Dict[pathlib.PurePath, Any]:
+        """
+        Decode and return a page of the query result
+
+        Parameters
+        ----------
+        page_index : int
+            Zero based index of the page
+        page_size : int
+            Number of elements per page
+
+        Returns
+        -------
+        page : Dict[pathlib.PurePath, Any]
+            Decoded elements of the requested page, empty if
+            the page is behind the end of the result
+
+        Raises
+        ------
+        ValueError
+            If page_index is negative or page_size is smaller than one
+        """
+
+        page_index = int(page_index)
+        page_size = int(page_size)
+        if page_index < 0 or page_size < 1:
+            raise ValueError('page_index must be positive and page_size'
+                             ' greater than zero')
+
+        start = page_index * page_size
+        stop = min(start + page_size, len(self.__paths))
+        return {self.__paths[i]: self._decode(i) for i in range(start, stop)}
+
+    def __repr__(self):
+        return 'LazyQueryResult(num_elements={}, decoded={})'.format(
+            len(self.__paths), len(self.__cache))
+
+
+QueryResult = Union[Dict[pathlib.PurePath, Any], LazyQueryResult,
+                    List[pathlib.PurePath]]
+
+
+def _query_result(response_element_paths: Sequence[str],
+                  msgs: Sequence[Any], decoder: Callable[[Any], Any],
+                  lazy: bool, names_only: bool):
+    if names_only:
+        return [pathlib.PurePath(e) for e in response_element_paths]
+
+    result = LazyQueryResult(response_element_paths, msgs, decoder)
+    if lazy:
+        return result
+    return dict(result.items())
+
+
 class WorldViewClient(object):
 
     """
@@ -129,6 +297,10 @@ class WorldViewClient(object):
         Get collision object element from world view tree
     query_cartesian_pahts
         Query all existing castesian paths under folder_path which start with prefix
+    add_many
+        Add / update many elements of mixed types in world view tree
+    update_many
+        Update many existing elements of mixed types in world view tree
     """
 
     def __init__(self):
@@ -147,80 +319,80 @@ class WorldViewClient(object):
         """
 
         # initialize all service to handle joint values in world view
-        self.__add_joint_values_srv = rospy.ServiceProxy(
+        self.__add_joint_values_srv = get_transport().service_proxy(
             add_joint_values_srv_name,
             SetJointPostureWorldView)
 
-        self.__get_joint_values_srv = rospy.ServiceProxy(
+        self.__get_joint_values_srv = get_transport().service_proxy(
             get_joint_values_srv_name,
             GetJointPostureWorldView)
 
-        self.__query_joint_values_srv = rospy.ServiceProxy(
+        self.__query_joint_values_srv = get_transport().service_proxy(
             query_joint_values_srv_name,
             QueryJointValuesWorldView)
 
-        self.__update_joint_values_srv = rospy.ServiceProxy(
+        self.__update_joint_values_srv = get_transport().service_proxy(
             update_joint_values_srv_name,
             UpdateJointPostureWorldView)
 
         # initialize all service to handle poses in world view
-        self.__add_pose_srv = rospy.ServiceProxy(
+        self.__add_pose_srv = get_transport().service_proxy(
             add_pose_srv_name,
             SetPoseWorldView)
 
-        self.__get_pose_srv = rospy.ServiceProxy(
+        self.__get_pose_srv = get_transport().service_proxy(
             get_pose_srv_name,
             GetPoseWorldView)
 
-        self.__query_poses_srv = rospy.ServiceProxy(
+        self.__query_poses_srv = get_transport().service_proxy(
             query_poses_srv_name,
             QueryPosesWorldView)
 
-        self.__update_pose_srv = rospy.ServiceProxy(
+        self.__update_pose_srv = get_transport().service_proxy(
             update_pose_srv_name,
             UpdatePoseWorldView)
 
         # initialize all service to handle cartesian path in world view
-        self.__add_cartesian_path_srv = rospy.ServiceProxy(
+        self.__add_cartesian_path_srv = get_transport().service_proxy(
             add_cartesian_path_srv_name,
             SetCartesianPathWorldView)
 
-        self.__get_cartesian_path_srv = rospy.ServiceProxy(
+        self.__get_cartesian_path_srv = get_transport().service_proxy(
             get_cartesian_path_srv_name,
             GetCartesianPathWorldView)
 
-        self.__query_cartesian_paths_srv = rospy.ServiceProxy(
+        self.__query_cartesian_paths_srv = get_transport().service_proxy(
             query_cartesian_paths_srv_name,
             QueryCartesianPathWorldView)
 
-        self.__update_cartesian_path_srv = rospy.ServiceProxy(
+        self.__update_cartesian_path_srv = get_transport().service_proxy(
             update_cartesian_path_srv_name,
             SetCartesianPathWorldView)
 
         # initialize all service to handle collision objects in world view
-        self.__add_collision_object_srv = rospy.ServiceProxy(
+        self.__add_collision_object_srv = get_transport().service_proxy(
             add_collision_object_srv_name,
             SetCollisionObjectWorldView)
 
-        self.__get_collision_object_srv = rospy.ServiceProxy(
+        self.__get_collision_object_srv = get_transport().service_proxy(
             get_collision_object_srv_name,
             GetCollisionObjectWorldView)
 
-        self.__query_collision_objects_srv = rospy.ServiceProxy(
+        self.__query_collision_objects_srv = get_transport().service_proxy(
             query_collision_objects_srv_name,
             QueryCollisionObjectWorldView)
 
-        self.__update_collision_objects_srv = rospy.ServiceProxy(
+        self.__update_collision_objects_srv = get_transport().service_proxy(
             update_collision_object_srv_name,
             SetCollisionObjectWorldView)
 
         # add folder service
-        self.__add_folder_srv = rospy.ServiceProxy(
+        self.__add_folder_srv = get_transport().service_proxy(
             add_folder_srv_name,
             CreateFolderWorldView)
 
         # remove element service
-        self.__remove_element_srv = rospy.ServiceProxy(
+        self.__remove_element_srv = get_transport().service_proxy(
             remove_element_srv_name,
             RemoveElementWorldView)
 
@@ -301,6 +473,156 @@ class WorldViewClient(object):
                                    ) from exc
         return response
 
+    def _call_update(self, element_path: pathlib.Path, value: Any,
+                     transient: bool):
+        if isinstance(value, JointValues):
+            return self._call_update_joint_values(element_path, value,
+                                                  transient)
+        elif isinstance(value, Pose):
+            return self._call_update_pose(element_path, value, transient)
+        elif isinstance(value, CartesianPath):
+            return self._call_update_cartesian_path(element_path, value,
+                                                    transient)
+        elif isinstance(value, CollisionObject):
+            return self._call_update_collision_object(element_path, value,
+                                                      transient)
+        else:
+            raise TypeError('value is not one of expected types JointValues,'
+                            ' Pose, CartesianPath or CollisionObject')
+
+    def _add(self, element_path: pathlib.Path, value: Any,
+             transient: bool, update_if_exists: bool):
+        if isinstance(value, JointValues):
+            self.add_joint_values(element_path, value, transient,
+                                  update_if_exists)
+        elif isinstance(value, Pose):
+            self.add_pose(element_path, value, transient, update_if_exists)
+        elif isinstance(value, CartesianPath):
+            self.add_cartesian_path(element_path, value, transient,
+                                    update_if_exists)
+        elif isinstance(value, CollisionObject):
+            self.add_collision_object(element_path, value, transient,
+                                      update_if_exists)
+        else:
+            raise TypeError('value is not one of expected types JointValues,'
+                            ' Pose, CartesianPath or CollisionObject')
+
+    def _update(self, element_path: pathlib.Path, value: Any,
+                transient: bool):
+        response = self._call_update(element_path, value, transient)
+        if not response.success:
+            raise ArgumentError('update of element: {} was not successful,'
+                                'response with error: {}'.format(
+                                    element_path, response.error))
+
+    @staticmethod
+    def _run_many(func, elements: Iterable[Tuple[Union[str, pathlib.Path], Any]],
+                  max_concurrency: int) -> List[WorldViewElementResult]:
+        max_concurrency = int(max_concurrency)
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be greater than zero')
+
+        elements = [(_check_and_convert_element_path(p), v)
+                    for p, v in elements]
+
+        def run(element):
+            element_path, value = element
+            try:
+                func(element_path, value)
+            except (ServiceException, ArgumentError, TypeError) as exc:
+                return WorldViewElementResult(element_path, exc)
+            return WorldViewElementResult(element_path)
+
+        if max_concurrency == 1 or len(elements) <= 1:
+            return [run(e) for e in elements]
+
+        with ThreadPoolExecutor(max_workers=min(max_concurrency,
+                                                len(elements))) as executor:
+            # map preserves the input order of the elements
+            return list(executor.map(bind_deadline(run), elements))
+
+    def add_many(self, elements: Iterable[Tuple[Union[str, pathlib.Path], Any]],
+                 transient: bool=False,
+                 update_if_exists: bool=True,
+                 max_concurrency: int=8) -> List[WorldViewElementResult]:
+        """
+        Add / update many elements in world view tree
+
+        The service calls are pipelined over a pool of at most
+        max_concurrency worker threads. A failing element does not
+        abort the remaining ones, instead the error is reported
+        in the result of the respective element.
+
+        Parameters
+        ----------
+        elements : Iterable[Tuple[Union[str, pathlib.Path], Any]]
+            Pairs of element path and value, where value is one of
+            JointValues, Pose, CartesianPath or CollisionObject
+        transient : bool (default False)
+            If True the added elements are only valid for this session
+            and will not be saved in a rosvita project context
+        update_if_exists: bool (default True)
+            If True update elements if they exist instead
+            of reporting an error
+        max_concurrency : int (default 8)
+            Maximal number of service calls in flight
+
+        Returns
+        -------
+        results : List[WorldViewElementResult]
+            One result per element in the order of elements
+
+        Raises
+        ------
+        TypeError
+            If an element path is not of type pathlib.Path
+            and can not be converted to it
+        ValueError
+            If max_concurrency is smaller than one
+        """
+
+        def add(element_path, value):
+            self._add(element_path, value, transient, update_if_exists)
+
+        return self._run_many(add, elements, max_concurrency)
+
+    def update_many(self, elements: Iterable[Tuple[Union[str, pathlib.Path], Any]],
+                    transient: bool=False,
+                    max_concurrency: int=8) -> List[WorldViewElementResult]:
+        """
+        Update many existing elements in world view tree
+
+        Parameters
+        ----------
+        elements : Iterable[Tuple[Union[str, pathlib.Path], Any]]
+            Pairs of element path and value, where value is one of
+            JointValues, Pose, CartesianPath or CollisionObject
+        transient : bool (default False)
+            If True the updated elements are only valid for this session
+            and will not be saved in a rosvita project context
+        max_concurrency : int (default 8)
+            Maximal number of service calls in flight
+
+        Returns
+        -------
+        results : List[WorldViewElementResult]
+            One result per element in the order of elements,
+            elements which do not exist are reported as failed
+
+        Raises
+        ------
+        TypeError
+            If an element path is not of type pathlib.Path
+            and can not be converted to it
+        ValueError
+            If max_concurrency is smaller than one
+        """
+
+        def update(element_path, value):
+            self._update(element_path, value, transient)
+
+        return self._run_many(update, elements, max_concurrency)
+
     def add_joint_values(self, element_path: Union[str, pathlib.Path],
                          joint_values: JointValues,
                          transient: bool=False,
@@ -420,7 +742,8 @@ class WorldViewClient(object):
         return JointValues.from_joint_values_point_msg(response.point)
 
     def query_joint_values(self, folder_path: str, prefix: str='',
-                           recursive: bool=False) -> Dict[pathlib.PurePath, JointValues]:
+                           recursive: bool=False, lazy: bool=False,
+                           names_only: bool=False) -> QueryResult:
         """
         Query all existing joint values elements under folder_path which start with prefix
 
@@ -432,11 +755,19 @@ class WorldViewClient(object):
             Query elements which start with this prefix
         recursive : bool (default False)
             If True query from folder path recursively
+        lazy : bool (default False)
+            If True return a LazyQueryResult which decodes
+            elements only on access
+        names_only : bool (default False)
+            If True return only the element paths and
+            skip decoding of the elements
 
         Returns
         -------
-        result : List[JointValues]
-            List of JointValues in alphanumeric order see world view
+        result : QueryResult
+            Dict of element path to element in alphanumeric order
+            see world view, a LazyQueryResult if lazy is True or a
+            list of element paths if names_only is True
 
         Raises
         ------
@@ -475,17 +806,9 @@ class WorldViewClient(object):
                                 ' error: {}'.format(query_joint_values_srv_name,
                                                     response.error))
 
-        if response.points:
-            result = {}
-            for n, e, p in zip(response.names,
-                               response.element_paths,
-                               response.points):
-
-                path = pathlib.PurePath(e)
-                result[path] = JointValues.from_joint_values_point_msg(p)
-            return result
-        else:
-            return {}
+        return _query_result(response.element_paths, response.points,
+                             JointValues.from_joint_values_point_msg,
+                             lazy, names_only)
 
     def add_pose(self, element_path: Union[str, pathlib.Path],
                  pose: Pose, transient: bool=False,
@@ -607,7 +930,8 @@ class WorldViewClient(object):
         return Pose.from_posestamped_msg(response.point)
 
     def query_poses(self, folder_path: str, prefix: str='',
-                    recursive: bool=False) -> List[Pose]:
+                    recursive: bool=False, lazy: bool=False,
+                    names_only: bool=False) -> QueryResult:
         """
         Query all existing pose elements under folder_path which start with prefix
 
@@ -619,11 +943,19 @@ class WorldViewClient(object):
             Query elements which start with this prefix
         recursive : bool (default False)
             If True query from folder path recursively
+        lazy : bool (default False)
+            If True return a LazyQueryResult which decodes
+            elements only on access
+        names_only : bool (default False)
+            If True return only the element paths and
+            skip decoding of the elements
 
         Returns
         -------
-        result : List[Pose]
-            List of Pose in alphanumeric order see world view
+        result : QueryResult
+            Dict of element path to element in alphanumeric order
+            see world view, a LazyQueryResult if lazy is True or a
+            list of element paths if names_only is True
 
         Raises
         ------
@@ -662,17 +994,9 @@ class WorldViewClient(object):
                                 ' error: {}'.format(query_poses_srv_name,
                                                     response.error))
 
-        if response.points:
-            result = {}
-            for n, e, p in zip(response.names,
-                               response.element_paths,
-                               response.points):
-
-                path = pathlib.PurePath(e)
-                result[path] = Pose.from_posestamped_msg(p)
-            return result
-        else:
-            return {}
+        return _query_result(response.element_paths, response.points,
+                             Pose.from_posestamped_msg,
+                             lazy, names_only)
 
     def add_cartesian_path(self, element_path: Union[str, pathlib.Path],
                            cartesian_path: CartesianPath, transient: bool=False,
@@ -796,7 +1120,8 @@ class WorldViewClient(object):
         return CartesianPath.from_cartesian_path_msg(response.path)
 
     def query_cartesian_paths(self, folder_path: str, prefix: str='',
-                              recursive: bool=False) -> List[CartesianPath]:
+                              recursive: bool=False, lazy: bool=False,
+                              names_only: bool=False) -> QueryResult:
         """
         Query all existing cartesian path elements under folder_path which start with prefix
 
@@ -808,11 +1133,19 @@ class WorldViewClient(object):
             Query elements which start with this prefix
         recursive : bool (default False)
             If True query from folder path recursively
+        lazy : bool (default False)
+            If True return a LazyQueryResult which decodes
+            elements only on access
+        names_only : bool (default False)
+            If True return only the element paths and
+            skip decoding of the elements
 
         Returns
         -------
-        result : List[CartesianPath]
-            List of CartesianPath in alphanumeric order see world view
+        result : QueryResult
+            Dict of element path to element in alphanumeric order
+            see world view, a LazyQueryResult if lazy is True or a
+            list of element paths if names_only is True
 
         Raises
         ------
@@ -851,17 +1184,9 @@ class WorldViewClient(object):
                                 ' error: {}'.format(query_cartesian_paths_srv_name,
                                                     response.error))
 
-        if response.paths:
-            result = {}
-            for n, e, p in zip(response.names,
-                               response.element_paths,
-                               response.paths):
-
-                path = pathlib.PurePath(e)
-                result[path] = CartesianPath.from_cartesian_path_msg(p)
-            return result
-        else:
-            return {}
+        return _query_result(response.element_paths, response.paths,
+                             CartesianPath.from_cartesian_path_msg,
+                             lazy, names_only)
 
     def add_collision_object(self, element_path: Union[str, pathlib.Path],
                              collision_object: CollisionObject, transient: bool=False,
@@ -985,7 +1310,8 @@ class WorldViewClient(object):
         return CollisionObject.from_collision_object_msg(response.collision_object)
 
     def query_collision_objects(self, folder_path: str, prefix: str='',
-                                recursive: bool=False) -> List[CollisionObject]:
+                                recursive: bool=False, lazy: bool=False,
+                                names_only: bool=False) -> QueryResult:
         """
         Query all existing collision objet elements under folder_path which start with prefix
 
@@ -997,11 +1323,19 @@ class WorldViewClient(object):
             Query elements which start with this prefix
         recursive : bool (default False)
             If True query from folder path recursively
+        lazy : bool (default False)
+            If True return a LazyQueryResult which decodes
+            elements only on access
+        names_only : bool (default False)
+            If True return only the element paths and
+            skip decoding of the elements
 
         Returns
         -------
-        result : List[CollisionObject]
-            List of CollisionObject in alphanumeric order see world view
+        result : QueryResult
+            Dict of element path to element in alphanumeric order
+            see world view, a LazyQueryResult if lazy is True or a
+            list of element paths if names_only is True
 
         Raises
         ------
@@ -1040,17 +1374,9 @@ class WorldViewClient(object):
                                 ' error: {}'.format(query_collision_objects_srv_name,
                                                     response.error))
 
-        if response.collision_objects:
-            result = {}
-            for n, e, p in zip(response.names,
-                               response.element_paths,
-                               response.collision_objects):
-
-                path = pathlib.PurePath(e)
-                result[path] = CollisionObject.from_collision_object_msg(p)
-            return result
-        else:
-            return {}
+        return _query_result(response.element_paths, response.collision_objects,
+                             CollisionObject.from_collision_object_msg,
+                             lazy, names_only)
 
     def add_folder(self, folder_path: Union[str, pathlib.Path],
                    raise_exception_if_exists: bool=False):
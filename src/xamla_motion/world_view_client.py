@@ -57,6 +57,7 @@ from xamlamoveit_msgs.srv import (CreateFolderWorldView,
                                   UpdatePoseWorldViewRequest)
 
 from .data_types import CartesianPath, CollisionObject, JointValues, Pose
+from .transport import get_transport
 from .xamla_motion_exceptions import ArgumentError, ServiceException
 
 add_joint_values_srv_name = '/rosvita/world_view/add_joint_posture'
@@ -146,80 +147,80 @@ class WorldViewClient(object):
         """
 
         # initialize all service to handle joint values in world view
-        self.__add_joint_values_srv = rospy.ServiceProxy(
+        self.__add_joint_values_srv = get_transport().service_proxy(
             add_joint_values_srv_name,
             SetJointPostureWorldView)
 
-        self.__get_joint_values_srv = rospy.ServiceProxy(
+        self.__get_joint_values_srv = get_transport().service_proxy(
             get_joint_values_srv_name,
             GetJointPostureWorldView)
 
-        self.__query_joint_values_srv = rospy.ServiceProxy(
+        self.__query_joint_values_srv = get_transport().service_proxy(
             query_joint_values_srv_name,
             QueryJointValuesWorldView)
 
-        self.__update_joint_values_srv = rospy.ServiceProxy(
+        self.__update_joint_values_srv = get_transport().service_proxy(
             update_joint_values_srv_name,
             UpdateJointPostureWorldView)
 
         # initialize all service to handle poses in world view
-        self.__add_pose_srv = rospy.ServiceProxy(
+        self.__add_pose_srv = get_transport().service_proxy(
             add_pose_srv_name,
             SetPoseWorldView)
 
-        self.__get_pose_srv = rospy.ServiceProxy(
+        self.__get_pose_srv = get_transport().service_proxy(
             get_pose_srv_name,
             GetPoseWorldView)
 
-        self.__query_poses_srv = rospy.ServiceProxy(
+        self.__query_poses_srv = get_transport().service_proxy(
             query_poses_srv_name,
             QueryPosesWorldView)
 
-        self.__update_pose_srv = rospy.ServiceProxy(
+        self.__update_pose_srv = get_transport().service_proxy(
             update_pose_srv_name,
             UpdatePoseWorldView)
 
         # initialize all service to handle cartesian path in world view
-        self.__add_cartesian_path_srv = rospy.ServiceProxy(
+        self.__add_cartesian_path_srv = get_transport().service_proxy(
             add_cartesian_path_srv_name,
             SetCartesianPathWorldView)
 
-        self.__get_cartesian_path_srv = rospy.ServiceProxy(
+        self.__get_cartesian_path_srv = get_transport().service_proxy(
             get_cartesian_path_srv_name,
             GetCartesianPathWorldView)
 
-        self.__query_cartesian_paths_srv = rospy.ServiceProxy(
+        self.__query_cartesian_paths_srv = get_transport().service_proxy(
             query_cartesian_paths_srv_name,
             QueryCartesianPathWorldView)
 
-        self.__update_cartesian_path_srv = rospy.ServiceProxy(
+        self.__update_cartesian_path_srv = get_transport().service_proxy(
             update_cartesian_path_srv_name,
             SetCartesianPathWorldView)
 
         # initialize all service to handle collision objects in world view
-        self.__add_collision_object_srv = rospy.ServiceProxy(
+        self.__add_collision_object_srv = get_transport().service_proxy(
             add_collision_object_srv_name,
             SetCollisionObjectWorldView)
 
-        self.__get_collision_object_srv = rospy.ServiceProxy(
+        self.__get_collision_object_srv = get_transport().service_proxy(
             get_collision_object_srv_name,
             GetCollisionObjectWorldView)
 
-        self.__query_collision_objects_srv = rospy.ServiceProxy(
+        self.__query_collision_objects_srv = get_transport().service_proxy(
             query_collision_objects_srv_name,
             QueryCollisionObjectWorldView)
 
-        self.__update_collision_objects_srv = rospy.ServiceProxy(
+        self.__update_collision_objects_srv = get_transport().service_proxy(
             update_collision_object_srv_name,
             SetCollisionObjectWorldView)
 
         # add folder service
-        self.__add_folder_srv = rospy.ServiceProxy(
+        self.__add_folder_srv = get_transport().service_proxy(
             add_folder_srv_name,
             CreateFolderWorldView)
 
         # remove element service
-        self.__remove_element_srv = rospy.ServiceProxy(
+        self.__remove_element_srv = get_transport().service_proxy(
             remove_element_srv_name,
             RemoveElementWorldView)
 
@@ -0,0 +1,34 @@
+import pytest
+
+from xamla_motion.transport import FakeTransport, set_transport
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers',
+                            'fake_transport(**kwargs): run the test class'
+                            ' against a FakeTransport created with kwargs')
+
+
+@pytest.fixture(scope='class', autouse=True)
+def fake_transport(request):
+    """
+    FakeTransport of a test class marked with fake_transport
+
+    The transport is the current transport while the tests of the
+    class run and is available as the transport attribute of the
+    class already in setup_class. The previous transport is
+    restored afterwards.
+    """
+
+    marker = request.node.get_closest_marker('fake_transport')
+    if marker is None or request.cls is None:
+        yield None
+        return
+
+    transport = FakeTransport(**marker.kwargs)
+    previous = set_transport(transport)
+    request.cls.transport = transport
+    try:
+        yield transport
+    finally:
+        set_transport(previous)
@@ -0,0 +1,39 @@
+import functools
+import threading
+import time
+
+
+class InFlightRecorder(object):
+
+    """
+    Records the concurrent calls of a function or of the methods
+    of an object
+
+    Calling the recorder calls the wrapped function, other attributes
+    are the methods of the wrapped object. Each call is delayed, so
+    concurrent calls overlap.
+    """
+
+    def __init__(self, target, delay=0.01):
+        self.target = target
+        self.delay = delay
+        self.mutex = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __call__(self, *args, **kwargs):
+        return self._record(self.target, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return functools.partial(self._record, getattr(self.target, name))
+
+    def _record(self, function, *args, **kwargs):
+        with self.mutex:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return function(*args, **kwargs)
+        finally:
+            with self.mutex:
+                self.in_flight -= 1
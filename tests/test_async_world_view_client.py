@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from xamla_motion.data_types import Pose
+from xamla_motion.fake_motion_server import FakeMotionServer
+from xamla_motion.service_call import ServiceTimeout, deadline
+from xamla_motion.transport import FakeTransport, set_transport
+from xamla_motion.v2 import WorldViewClient
+from xamla_motion.v2 import world_view_client as wv
+from xamla_motion.v2.async_world_view_client import AsyncWorldViewClient
+from xamla_motion.xamla_motion_exceptions import ServiceException
+
+from helpers import InFlightRecorder
+
+
+@pytest.mark.fake_transport
+class TestAsyncWorldViewClient(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.server = FakeMotionServer(cls.transport)
+        cls.client = WorldViewClient()
+        cls.client.add_folder('test_async')
+
+    def run(self, coroutine):
+        return asyncio.get_event_loop().run_until_complete(coroutine)
+
+    def test_gather(self):
+        paths = ['test_async/gather_{}'.format(i) for i in range(6)]
+        poses = [Pose.identity().translate([0.1 * i, 0.0, 0.0])
+                 for i in range(6)]
+
+        async def run():
+            async with AsyncWorldViewClient(self.client) as client:
+                await asyncio.gather(*[client.add_pose(p, v)
+                                       for p, v in zip(paths, poses)])
+                return await asyncio.gather(*[client.get_pose(p)
+                                              for p in paths])
+
+        assert self.run(run()) == poses
+
+    def test_add_many(self):
+        elements = [('test_async/many_{}'.format(i),
+                     Pose.identity().translate([0.0, 0.1 * i, 0.0]))
+                    for i in range(12)]
+        elements.insert(5, ('missing_folder/pose', Pose.identity()))
+        recorder = InFlightRecorder(self.client)
+
+        async def run():
+            async with AsyncWorldViewClient(recorder,
+                                            max_concurrency=4) as client:
+                return await client.add_many(elements, max_concurrency=3)
+
+        results = self.run(run())
+        assert [str(r.element_path) for r in results] == \
+            ['/' + p for p, _ in elements]
+        assert [r.success for r in results] == \
+            [i != 5 for i in range(len(elements))]
+        assert recorder.max_in_flight == 3
+
+        updates = [(p, Pose.identity()) for p, _ in elements]
+
+        async def update():
+            async with AsyncWorldViewClient(recorder,
+                                            max_concurrency=2) as client:
+                return await client.update_many(updates)
+
+        recorder.max_in_flight = 0
+        results = self.run(update())
+        assert [r.success for r in results] == \
+            [i != 5 for i in range(len(elements))]
+        assert recorder.max_in_flight == 2
+        assert self.client.get_pose(elements[0][0]) == Pose.identity()
+
+        with pytest.raises(TypeError):
+            self.run(AsyncWorldViewClient(self.client).add_many([(None,
+                                                                   None)]))
+
+    def test_deadline(self):
+        transport = FakeTransport()
+        release = threading.Event()
+        transport.register_service(wv.get_pose_srv_name,
+                                   lambda request: release.wait(2.0))
+        previous = set_transport(transport)
+        try:
+            hung_client = WorldViewClient()
+        finally:
+            set_transport(previous)
+
+        async def run():
+            async with AsyncWorldViewClient(hung_client) as client:
+                with deadline(0.2):
+                    return await client.get_pose('test_async/hung')
+
+        start = time.monotonic()
+        try:
+            with pytest.raises(ServiceException) as exc:
+                self.run(run())
+        finally:
+            release.set()
+        # the deadline of the awaiting task applies in the executor
+        assert isinstance(exc.value.__cause__, ServiceTimeout)
+        assert time.monotonic() - start < 1.0
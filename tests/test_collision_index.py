@@ -0,0 +1,78 @@
+import pytest
+from xamla_motion.data_types import (CollisionIndex, CollisionObject,
+                                     CollisionPrimitive, Pose)
+import numpy as np
+from pyquaternion import Quaternion
+
+
+class TestCollisionIndex(object):
+
+    @classmethod
+    def setup_class(cls):
+        rotated = Quaternion(axis=[0.0, 0.0, 1.0], angle=np.pi / 4.0)
+        cls.box = CollisionPrimitive.create_box(
+            1.0, 0.2, 0.2, Pose([1.0, 0.0, 0.0], rotated))
+        cls.sphere = CollisionPrimitive.create_sphere(
+            0.5, Pose([-1.0, 0.0, 0.0], Quaternion()))
+        cls.cylinder = CollisionPrimitive.create_cylinder(
+            1.0, 0.1, Pose([0.0, 2.0, 0.0], Quaternion()))
+        cls.plane = CollisionPrimitive.create_plane(
+            0.0, 0.0, 1.0, 0.0, Pose([0.0, 0.0, -1.0], Quaternion()))
+
+        cls.index = CollisionIndex([CollisionObject([cls.box, cls.sphere]),
+                                    CollisionObject([cls.cylinder,
+                                                     cls.plane])],
+                                   leaf_size=1)
+
+    def test_contains_points(self):
+        points = np.asarray([[1.3, 0.3, 0.0],   # inside rotated box
+                             [1.4, 0.0, 0.0],   # outside rotated box
+                             [-1.0, 0.4, 0.0],  # inside sphere
+                             [0.0, 2.0, 0.45],  # inside cylinder
+                             [0.0, 2.15, 0.0],  # outside cylinder
+                             [5.0, 5.0, -1.5],  # below plane
+                             [5.0, 5.0, 0.0]])  # free
+
+        mask = self.index.contains_points(points)
+
+        assert mask.tolist() == [True, False, True, True, False, True, False]
+
+    def test_intersects_spheres(self):
+        centers = np.asarray([[-1.0, 0.7, 0.0],
+                              [0.0, 2.25, 0.0],
+                              [5.0, 5.0, -0.85]])
+
+        assert self.index.intersects_spheres(centers, 0.1).tolist() == \
+            [False, False, False]
+        assert self.index.intersects_spheres(centers, 0.2).tolist() == \
+            [True, True, True]
+
+    def test_intersects_boxes(self):
+        min_corners = np.asarray([[-1.2, 0.6, -0.1], [3.0, 3.0, 0.0]])
+        max_corners = np.asarray([[-1.1, 0.7, 0.1], [4.0, 4.0, 1.0]])
+
+        mask = self.index.intersects_boxes(min_corners, max_corners)
+
+        assert mask.tolist() == [False, False]
+
+        min_corners[:, 1] -= 0.15
+        mask = self.index.intersects_boxes(min_corners, max_corners)
+
+        assert mask.tolist() == [True, False]
+
+    def test_collision_free_poses(self):
+        poses = [Pose([-1.0, 0.0, 0.0], Quaternion()),
+                 Pose([0.0, 0.0, 0.0], Quaternion())]
+
+        assert self.index.collision_free_poses(poses).tolist() == \
+            [False, True]
+
+        with pytest.raises(ValueError):
+            self.index.collision_free_poses(
+                [Pose([0.0, 0.0, 0.0], Quaternion(), 'other')])
+
+    def test_empty_index(self):
+        index = CollisionIndex([])
+
+        assert index.bounds is None
+        assert not index.contains_points(np.zeros((3, 3))).any()
@@ -121,3 +121,15 @@ class TestPose(object):
         print('Pose type mul: {}'.format(pose.transformation_matrix()))
         print('numpy mul: {}'.format(pose_m))
         assert pose.transformation_matrix() == pytest.approx(pose_m)
+
+    def test_cached_rotation_matrix(self):
+        gt = self.pose4.quaternion.normalised.rotation_matrix
+        assert self.pose4.rotation_matrix() == pytest.approx(gt)
+
+        # returned matrix is a copy, the cached one stays untouched
+        self.pose4.rotation_matrix()[0, 0] = 10.0
+        assert self.pose4.rotation_matrix() == pytest.approx(gt)
+
+        inv = self.pose4.inverse('inverse')
+        assert inv.rotation_matrix() == pytest.approx(gt.T)
+        assert inv.quaternion.rotation_matrix == pytest.approx(gt.T)
@@ -0,0 +1,99 @@
+import pytest
+from xamla_motion.data_types import CartesianPath, Pose, PoseArray
+import numpy as np
+from pyquaternion import Quaternion
+
+
+class TestPoseArray(object):
+
+    @classmethod
+    def setup_class(cls):
+        random = np.random.RandomState(42)
+        cls.poses = [Pose(random.uniform(-1.0, 1.0, 3),
+                          Quaternion(random.normal(size=4)).normalised)
+                     for _ in range(20)]
+        cls.others = [Pose(random.uniform(-1.0, 1.0, 3),
+                           Quaternion(random.normal(size=4)).normalised)
+                      for _ in range(20)]
+        cls.array = PoseArray.from_poses(cls.poses)
+        cls.other_array = PoseArray.from_poses(cls.others)
+
+    def test_round_trip(self):
+        assert len(self.array) == 20
+        assert self.array.to_poses() == self.poses
+        assert self.array[3] == self.poses[3]
+        assert self.array[2:5].to_poses() == self.poses[2:5]
+
+        path = CartesianPath(self.poses)
+        assert PoseArray.from_cartesian_path(path) == self.array
+        assert self.array.to_cartesian_path() == path
+
+    def test_composition(self):
+        result = self.array * self.other_array
+        for r, a, b in zip(result.to_poses(), self.poses, self.others):
+            expected = (a * b).normalize_rotation()
+            assert np.allclose(r.translation, expected.translation)
+            assert np.allclose(r.rotation_matrix(), expected.rotation_matrix())
+
+        result = self.poses[0] * self.other_array
+        for r, b in zip(result.to_poses(), self.others):
+            expected = self.poses[0] * b
+            assert np.allclose(r.transformation_matrix(),
+                               expected.transformation_matrix())
+
+    def test_inverse_and_points(self):
+        identity = self.array * self.array.inverse('world')
+        assert np.allclose(identity.translations, 0.0)
+        assert np.allclose(np.abs(identity.quaternions[:, 0]), 1.0)
+
+        point = np.array([0.1, -0.2, 0.3])
+        transformed = self.array.transform_points(point)
+        for t, p in zip(transformed, self.poses):
+            assert np.allclose(t, p * point)
+
+    def test_transformation_matrices(self):
+        matrices = self.array.transformation_matrices()
+        for m, p in zip(matrices, self.poses):
+            assert np.allclose(m, p.transformation_matrix())
+
+        array = PoseArray.from_transformation_matrices(matrices)
+        assert np.allclose(array.transformation_matrices(), matrices)
+
+    def test_interpolate(self):
+        start = self.array.interpolate(self.other_array, 0.0)
+        end = self.array.interpolate(self.other_array, 1.0)
+        assert np.allclose(start.transformation_matrices(),
+                           self.array.transformation_matrices())
+        assert np.allclose(end.transformation_matrices(),
+                           self.other_array.transformation_matrices())
+
+        half = self.array.interpolate(self.other_array, 0.5)
+        for h, a, b in zip(half.to_poses(), self.poses, self.others):
+            expected = Quaternion.slerp(a.quaternion, b.quaternion, 0.5)
+            assert np.allclose(h.rotation_matrix(), expected.rotation_matrix)
+
+    def test_grid(self):
+        origin = Pose([1.0, 0.0, 0.0],
+                      Quaternion(axis=[0.0, 0.0, 1.0], angle=np.pi / 2))
+        grid = PoseArray.grid(origin, (3, 2, 1), (0.1, 0.2, 0.0))
+        assert len(grid) == 6
+        assert np.allclose(grid.translations[1], [1.0, 0.1, 0.0])
+        assert np.allclose(grid.translations[3], [0.8, 0.0, 0.0])
+        assert grid[5].quaternion == origin.quaternion
+
+    def test_densify(self):
+        path = CartesianPath(self.poses[:5])
+        dense = path.densify(0.05, 0.1)
+        array = PoseArray.from_cartesian_path(dense)
+
+        steps = np.linalg.norm(np.diff(array.translations, axis=0), axis=1)
+        dot = np.abs(np.sum(array.quaternions[:-1] * array.quaternions[1:],
+                            axis=1))
+        assert np.all(steps <= 0.05 + 1e-9)
+        assert np.all(2.0 * np.arccos(np.clip(dot, 0.0, 1.0)) <= 0.1 + 1e-9)
+
+        # original poses are kept
+        for pose in self.poses[:5]:
+            assert any(np.allclose(pose.transformation_matrix(),
+                                   p.transformation_matrix())
+                       for p in dense)
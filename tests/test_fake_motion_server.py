@@ -0,0 +1,57 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from xamla_motion.data_types import JointSet
+from xamla_motion.fake_motion_server import FakeMotionServer
+from xamla_motion.motion_service import MotionService
+from xamla_motion.transport import get_transport, set_transport
+
+
+@pytest.mark.fake_transport(default_latency=0.001)
+class TestFakeMotionServer(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.server = FakeMotionServer(cls.transport, time_scale=1.0)
+
+    def test_set_transport(self):
+        assert get_transport() is self.transport
+        with pytest.raises(TypeError):
+            set_transport(object())
+
+    def test_kinematics_round_trip(self):
+        q = np.array([0.1, 0.2, 0.3, 0.4, -0.2, 0.1])
+        pose = self.server.forward_kinematics(q)
+        assert np.allclose(self.server.inverse_kinematics(pose, np.zeros(6)), q)
+
+    def test_motion_service_queries(self):
+        motion_service = MotionService()
+        move_groups = motion_service.query_available_move_groups()
+        assert move_groups[0].name == 'arm'
+
+        joint_set = JointSet(['joint1', 'joint2'])
+        states = motion_service.query_joint_states(joint_set)
+        assert np.allclose(states.positions.values, [0.0, 0.0])
+        assert self.transport.call_counts[
+            'xamlaMoveGroupServices/query_move_group_interface'] >= 1
+
+    def test_move_joints_action(self):
+        action_client = self.transport.simple_action_client('moveJ_action',
+                                                            None)
+        point = SimpleNamespace(time_from_start=SimpleNamespace(to_sec=lambda: 0.1),
+                                positions=[1.0, 2.0])
+        goal = SimpleNamespace(trajectory=SimpleNamespace(
+            joint_names=['joint1', 'joint2'], points=[point]))
+        progress = []
+
+        start = time.time()
+        action_client.send_goal(goal, feedback_cb=lambda f: progress.append(f.progress))
+        action_client.wait_for_result()
+
+        assert time.time() - start >= 0.1
+        assert action_client.get_result().result == 1
+        assert progress[-1] == pytest.approx(1.0)
+        assert self.server.joint_positions['joint2'] == 2.0
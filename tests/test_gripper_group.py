@@ -0,0 +1,193 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from xamla_motion.data_types import (MoveGripperResult, WsgCommand, WsgResult,
+                                     WsgState)
+from xamla_motion.fake_motion_server import FakeMotionServer
+from xamla_motion.gripper_client import (CommonGripper,
+                                         CommonGripperProperties,
+                                         GripperGroup, WeissWsgGripper,
+                                         WeissWsgGripperProperties)
+from xamla_motion.motion_service import MotionService
+from xamla_motion.transport import FakeActionAborted
+from xamla_motion.xamla_motion_exceptions import ServiceException
+
+
+@pytest.mark.fake_transport
+class TestGripperGroup(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.server = FakeMotionServer(cls.transport)
+        cls.mutex = threading.Lock()
+        cls.goals = {}
+        cls.failing = set()
+        cls.status_calls = {}
+        cls.lock_requests = []
+        motion_service = MotionService()
+
+        def wsg_control(name):
+            def handler(goal, context):
+                with cls.mutex:
+                    cls.goals[name] = goal.command
+                context.sleep(0.05)
+                if name in cls.failing:
+                    raise FakeActionAborted()
+                status = SimpleNamespace(
+                    grasping_state_id=WsgState.Holding.value,
+                    width=goal.command.width,
+                    current_force=goal.command.force,
+                    grasping_state='holding')
+                return SimpleNamespace(status=status)
+            return handler
+
+        def wsg_status(name):
+            def handler(*args):
+                with cls.mutex:
+                    cls.status_calls[name] = cls.status_calls.get(name, 0) + 1
+                if name in cls.failing:
+                    raise RuntimeError('status of {} failed'.format(name))
+                return SimpleNamespace(status=cls.status_calls[name])
+            return handler
+
+        def gripper_command(goal, context):
+            with cls.mutex:
+                cls.goals['common'] = goal.command
+            context.sleep(0.05)
+            return SimpleNamespace(position=goal.command.position,
+                                   reached_goal=True, stalled=False,
+                                   effort=goal.command.max_effort)
+
+        def lock(request):
+            # a slow lock leaves time to cancel during the acquisition
+            with cls.mutex:
+                cls.lock_requests.append((tuple(request.id_resources),
+                                          request.release))
+            threading.Event().wait(0.05)
+            return cls.server._query_lock(request)
+
+        cls.transport.register_service(
+            '/xamlaResourceLockService/query_resource_lock', lock)
+
+        cls.grippers = {}
+        for name in ('left', 'right'):
+            properties = WeissWsgGripperProperties(name)
+            cls.transport.register_action(properties.control_action_name,
+                                          wsg_control(name))
+            cls.transport.register_service(properties.status_service_name,
+                                           wsg_status(name))
+            cls.grippers[name] = WeissWsgGripper(properties, motion_service)
+
+        properties = CommonGripperProperties('common', 'xamla/gripper')
+        cls.transport.register_action(properties.command_action_name,
+                                      gripper_command)
+        cls.grippers['common'] = CommonGripper(properties, motion_service)
+
+    def setup_method(self, method):
+        self.goals.clear()
+        self.failing.clear()
+
+    def run(self, coroutine):
+        return asyncio.get_event_loop().run_until_complete(coroutine)
+
+    def test_grasp_all(self):
+        group = GripperGroup(self.grippers)
+        result = self.run(group.grasp_all(0.02, 0.1, 5.0))
+
+        assert result
+        assert result.success
+        assert set(result) == {'left', 'right', 'common'}
+        assert isinstance(result['left'], WsgResult)
+        assert isinstance(result['common'], MoveGripperResult)
+        assert self.goals['left'].command_id == WsgCommand.grasp.value
+        assert self.goals['right'].speed == 0.1
+        # a common gripper grasps with the force as max effort
+        assert self.goals['common'].max_effort == 5.0
+        assert result['common'].position == 0.02
+
+    def test_mapping_arguments(self):
+        group = GripperGroup(self.grippers)
+        result = self.run(group.move_all({'left': 0.01, 'right': 0.03},
+                                         0.2, {'left': 4.0, 'right': 6.0},
+                                         stop_on_block={'left': True,
+                                                        'right': False},
+                                         names=['left', 'right']))
+
+        assert set(result) == {'left', 'right'}
+        assert 'common' not in self.goals
+        assert result['left'].width == 0.01
+        assert result['right'].force == 6.0
+        assert self.goals['left'].command_id == WsgCommand.move.value
+        assert self.goals['left'].stop_on_block
+        assert not self.goals['right'].stop_on_block
+
+        with pytest.raises(KeyError):
+            self.run(group.grasp_all({'left': 0.01}, 0.1, 5.0))
+
+    def test_errors(self):
+        self.failing.add('right')
+        group = GripperGroup(self.grippers)
+        result = self.run(group.release_all(0.05, 0.1))
+
+        assert not result
+        assert set(result) == {'left', 'common'}
+        assert set(result.errors) == {'right'}
+        assert isinstance(result.errors['right'], ServiceException)
+        # a common gripper releases without effort limit
+        assert self.goals['common'].max_effort == 0.0
+
+        with pytest.raises(ServiceException) as exc:
+            result.raise_on_error()
+        assert 'right' in str(exc.value)
+        assert exc.value.__cause__ is result.errors['right']
+
+    def test_cancelled_command(self):
+        group = GripperGroup(self.grippers)
+        del self.lock_requests[:]
+        right = self.grippers['right'].properties.control_action_name
+
+        def command(name, gripper):
+            task = asyncio.ensure_future(gripper.grasp(0.02, 0.1, 5.0))
+            if name == 'right':
+                # cancelled while the lease is acquired
+                asyncio.get_event_loop().call_later(0.02, task.cancel)
+            return task
+
+        async def run():
+            result = await group.command_all(command, ['left', 'right'])
+            await asyncio.sleep(0.2)
+            return result
+
+        result = self.run(run())
+        assert set(result) == {'left'}
+        assert isinstance(result.errors['right'], asyncio.CancelledError)
+        # the lease acquired after the cancellation is released again
+        assert [r for ids, r in self.lock_requests if ids == (right,)] == \
+            [False, True]
+
+    def test_status_poller(self):
+        group = GripperGroup(self.grippers, status_rate=50.0)
+
+        async def run():
+            async with group:
+                await asyncio.sleep(0.1)
+                stamps = group.status_stamps
+                self.failing.add('right')
+                await asyncio.sleep(0.1)
+                return stamps
+
+        stamps = self.run(run())
+        # only the status of WeissWsgGripper is polled
+        assert set(group.status) == {'left', 'right'}
+        assert group.status['left'] > 1
+        # a failed status request keeps the last valid status
+        assert group.status_stamps['right'] == stamps['right']
+        assert group.status_stamps['left'] > stamps['left']
+
+        # the stopped poller sends no further requests
+        calls = dict(self.status_calls)
+        self.run(asyncio.sleep(0.1))
+        assert self.status_calls == calls
@@ -0,0 +1,33 @@
+import pytest
+from xamla_motion.data_types import (ErrorCodes, IkResults, JointPath,
+                                     JointSet, JointValues)
+from types import SimpleNamespace
+import numpy as np
+
+
+class TestIkResults(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.joint_set = JointSet(['joint1', 'joint2'])
+        cls.solutions = np.array([[0.0, 0.1], [0.2, 0.3], [0.4, 0.5]])
+        cls.codes = [SimpleNamespace(val=1), SimpleNamespace(val=-31),
+                     SimpleNamespace(val=1)]
+
+    def test_from_arrays(self):
+        results = IkResults.from_arrays(self.joint_set, self.solutions,
+                                        self.codes)
+        assert len(results) == 3
+        assert not results.succeeded
+        assert results.success_mask.tolist() == [True, False, True]
+        assert results.error_codes[1] == ErrorCodes.NO_IK_SOLUTION
+        assert results[2] == JointValues(self.joint_set, [0.4, 0.5])
+        assert results.path[1] == JointValues(self.joint_set, [0.2, 0.3])
+
+    def test_from_path(self):
+        path = JointPath(self.joint_set,
+                         [JointValues(self.joint_set, v) for v in self.solutions])
+        results = IkResults(path, [1, 1, 1])
+        assert results.succeeded
+        assert results.path is path
+        assert np.allclose(results.solutions, self.solutions)
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from xamla_motion.data_types import (IkSolutionScorer, JointLimits, JointSet,
+                                     JointValues)
+from xamla_motion.fake_motion_server import FakeMotionServer
+from xamla_motion.v2 import MoveGroup
+from xamla_motion.xamla_motion_exceptions import ServiceException
+
+from helpers import InFlightRecorder
+
+
+class TestIkSolutionScorer(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.joint_set = JointSet(['joint1', 'joint2'])
+        cls.limits = JointLimits(cls.joint_set,
+                                 max_velocity=[1.0, 1.0],
+                                 max_acceleration=[1.0, 1.0],
+                                 min_position=[-1.0, -2.0],
+                                 max_position=[1.0, np.nan])
+        cls.solutions = np.array([[0.9, 0.0],
+                                  [0.0, 0.5],
+                                  [0.2, 0.2]])
+
+    def test_score(self):
+        reference = JointValues(JointSet(['joint2', 'joint1']), [0.2, 0.2])
+        distance_only = IkSolutionScorer(distance_weight=1.0)
+        costs = distance_only.score(self.joint_set, self.solutions, reference)
+        assert costs == pytest.approx([np.hypot(0.7, 0.2), np.hypot(0.2, 0.3),
+                                       0.0])
+
+        margin_only = IkSolutionScorer(self.limits, distance_weight=0.0)
+        costs = margin_only.score(self.joint_set, self.solutions)
+        # joint2 has no upper limit and is ignored
+        assert costs == pytest.approx([0.9, 0.0, 0.2])
+        assert margin_only.best(self.joint_set, self.solutions) == 1
+
+        manipulability = IkSolutionScorer(
+            distance_weight=0.0,
+            manipulability=lambda joint_set, solutions: solutions[:, 0])
+        assert manipulability.best(self.joint_set, self.solutions) == 0
+
+        with pytest.raises(ValueError):
+            margin_only.best(self.joint_set, np.empty((0, 2)))
+
+
+@pytest.mark.fake_transport
+class TestMultiSeedInverseKinematics(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.server = FakeMotionServer(cls.transport, time_scale=0.0)
+        cls.move_group = MoveGroup('arm')
+        cls.end_effector = cls.move_group.get_end_effector('tool')
+
+    def test_multi_seed(self):
+        q = np.array([0.1, 0.2, 0.3, 0.1, -0.2, 0.3])
+        pose = self.server.forward_kinematics(q)
+        joint_set = self.move_group.joint_set
+        seeds = [JointValues(joint_set, np.full(6, s))
+                 for s in (-0.2, 0.0, 0.2, 0.4, 0.6)]
+
+        name = 'xamlaMoveGroupServices/query_ik2'
+        calls = self.transport.call_counts.get(name, 0)
+        solution = self.end_effector.inverse_kinematics_multi_seed(
+            pose, seeds, False, max_in_flight=2)
+        assert np.allclose(solution.values, q)
+        assert self.transport.call_counts[name] == calls + len(seeds)
+
+    def test_in_flight(self):
+        name = 'xamlaMoveGroupServices/query_ik2'
+
+        def query_ik(request):
+            if request.seed.positions[0] < 0.0:
+                raise RuntimeError('seed rejected')
+            return self.server._query_ik(request)
+
+        recorder = InFlightRecorder(query_ik, delay=0.02)
+
+        q = np.array([0.1, 0.2, 0.3, 0.1, -0.2, 0.3])
+        pose = self.server.forward_kinematics(q)
+        joint_set = self.move_group.joint_set
+        seeds = [JointValues(joint_set, np.full(6, s))
+                 for s in (-0.4, -0.2, 0.0, -0.1, 0.2, 0.4, -0.3, 0.6)]
+
+        self.transport.register_service(name, recorder)
+        try:
+            # failing seeds are skipped
+            solution = self.end_effector.inverse_kinematics_multi_seed(
+                pose, seeds, False, max_in_flight=3)
+            assert np.allclose(solution.values, q)
+            assert recorder.max_in_flight == 3
+
+            with pytest.raises(ServiceException):
+                self.end_effector.inverse_kinematics_multi_seed(
+                    pose, seeds[:2], False)
+        finally:
+            self.transport.register_service(name, self.server._query_ik)
@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+import pytest
+
+# modules which must only be imported on first use
+heavy_modules = ('matplotlib', 'sklearn', 'rosgardener_msgs',
+                 'wsg_50_common', 'control_msgs')
+
+
+def run_python(code):
+    output = subprocess.check_output([sys.executable, '-c', code])
+    return output.decode().strip().splitlines()
+
+
+class TestImportTime(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.check_modules = ('import sys\n'
+                             '{}\n'
+                             'heavy = {!r}\n'
+                             'print(sorted(m for m in heavy'
+                             ' if m in sys.modules))')
+
+    def test_import_package_is_lazy(self):
+        code = self.check_modules.format('import xamla_motion', heavy_modules)
+        assert run_python(code)[-1] == '[]'
+
+    def test_import_motion_service_is_lazy(self):
+        code = self.check_modules.format('from xamla_motion import MotionService',
+                                         heavy_modules)
+        assert run_python(code)[-1] == '[]'
+
+    def test_lazy_attributes(self):
+        import xamla_motion
+        from xamla_motion.motion_service import MotionService
+
+        assert xamla_motion.MotionService is MotionService
+        assert 'MoveGroup' in dir(xamla_motion)
+        with pytest.raises(AttributeError):
+            xamla_motion.NotExisting
+
+    def test_subpackages(self):
+        code = ('import xamla_motion\n'
+                'print(hasattr(xamla_motion, "data_types"),'
+                ' hasattr(xamla_motion, "not_existing"))')
+        assert run_python(code)[-1] == 'True False'
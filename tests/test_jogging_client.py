@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from xamla_motion.jogging_client import (JoggingClient,
+                                         JoggingClientFeedbackState,
+                                         JoggingErrorCode)
+from xamla_motion.xamla_motion_exceptions import ServiceException
+
+
+def controller_state(error_code=JoggingErrorCode.OK, converged=False,
+                     distance=0.0):
+    return SimpleNamespace(joint_distance=[distance],
+                           cartesian_distance=[distance],
+                           error_code=error_code.value,
+                           converged=converged,
+                           self_collision_check_enabled=True,
+                           joint_limits_check_enabled=True,
+                           scene_collision_check_enabled=False)
+
+
+@pytest.mark.fake_transport
+class TestJoggingFeedback(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.client = JoggingClient()
+        cls.publisher = cls.transport.publisher('xamlaJointJogging/feedback',
+                                                None)
+
+    def run(self, coroutine):
+        return asyncio.get_event_loop().run_until_complete(coroutine)
+
+    def publish_later(self, states, delay=0.01):
+        loop = asyncio.get_event_loop()
+        for i, state in enumerate(states):
+            loop.call_later(delay * (i + 1), self.publisher.publish, state)
+
+    def test_stream(self):
+        async def run():
+            with self.client.feedback_stream(decimation=2,
+                                             coalesce=False) as stream:
+                for i in range(6):
+                    self.publisher.publish(controller_state(distance=i))
+                return [await stream.get() for _ in range(3)]
+
+        states = self.run(run())
+        assert all(isinstance(s, JoggingClientFeedbackState) for s in states)
+        # every second message is forwarded
+        assert [s.joint_distance for s in states] == [[1], [3], [5]]
+        assert states[0].error_code is JoggingErrorCode.OK
+        assert states[0].self_collision_check_enabled
+
+        async def coalesced():
+            with self.client.feedback_stream() as stream:
+                for i in range(3):
+                    self.publisher.publish(controller_state(distance=i))
+                return await stream.get()
+
+        # a slow consumer only sees the latest state
+        assert self.run(coalesced()).joint_distance == [2]
+
+    def test_wait_until_converged(self):
+        self.publish_later([
+            controller_state(distance=1.0),
+            controller_state(JoggingErrorCode.CLOSE_TO_SINGULARITY,
+                             distance=0.5),
+            controller_state(converged=True)])
+        state = self.run(self.client.wait_until_converged(timeout=1.0))
+        assert state.converged
+
+        self.publish_later([
+            controller_state(distance=1.0),
+            controller_state(JoggingErrorCode.SELF_COLLISION),
+            controller_state(converged=True)])
+        with pytest.raises(ServiceException) as exc:
+            self.run(self.client.wait_until_converged(timeout=1.0))
+        assert exc.value.error_code is JoggingErrorCode.SELF_COLLISION
+        # let the message after the error pass
+        self.run(asyncio.sleep(0.05))
+
+        self.publish_later([controller_state(distance=1.0)])
+        with pytest.raises(asyncio.TimeoutError):
+            self.run(self.client.wait_until_converged(timeout=0.05))
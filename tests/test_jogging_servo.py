@@ -0,0 +1,109 @@
+import pytest
+from xamla_motion.data_types import Pose
+from xamla_motion.jogging_servo import (ServoController, SimulatedTwistPlant,
+                                        simulate_servo)
+import numpy as np
+from pyquaternion import Quaternion
+
+
+def circle_targets(rate=30.0, duration=4.0, omega=2.0):
+    times = np.arange(0.0, duration, 1.0 / rate)
+    return [(t, Pose([0.5 + 0.1 * np.cos(omega * t),
+                      0.1 * np.sin(omega * t), 0.3],
+                     Quaternion(axis=[0.0, 0.0, 1.0],
+                                angle=0.3 * np.sin(t))))
+            for t in times]
+
+
+class TestServoController(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.targets = circle_targets()
+
+    def test_no_command_without_target(self):
+        controller = ServoController()
+
+        assert controller.step(0.0) is None
+
+    def test_converges_to_static_target(self):
+        start = Pose([0.0, 0.0, 0.0], Quaternion())
+        goal = Pose([0.1, -0.05, 0.2],
+                    Quaternion(axis=[0.0, 1.0, 0.0], angle=0.5))
+        targets = [(t, goal) for t in np.arange(0.0, 2.0, 1.0 / 30.0)]
+
+        controller = ServoController(bandwidth=10.0)
+        controller.reset(start, 0.0)
+        plant = SimulatedTwistPlant(start)
+        result = simulate_servo(controller, targets, plant, rate=250.0)
+
+        assert plant.position == pytest.approx(goal.translation, abs=1e-3)
+        assert Quaternion.absolute_distance(plant.pose.quaternion,
+                                            goal.quaternion) < 1e-3
+        assert result.position_errors[-1] < 1e-3
+
+    def test_latency_compensation(self):
+        def run(provide_stamps):
+            controller = ServoController(bandwidth=10.0, latency=0.0,
+                                         velocity_smoothing=0.0)
+            plant = SimulatedTwistPlant(self.targets[0][1], delay=0.008,
+                                        time_constant=0.01)
+            return simulate_servo(controller, self.targets, plant,
+                                  rate=250.0, camera_latency=0.06,
+                                  provide_stamps=provide_stamps)
+
+        compensated = run(True).rms_position_error(1.0)
+        uncompensated = run(False).rms_position_error(1.0)
+
+        assert compensated < 0.9 * uncompensated
+
+    def test_velocity_limit(self):
+        controller = ServoController(bandwidth=30.0, max_linear_velocity=0.05)
+        plant = SimulatedTwistPlant(Pose([1.0, 0.0, 0.0], Quaternion()))
+        result = simulate_servo(controller, self.targets, plant, rate=250.0)
+
+        assert np.linalg.norm(result.commands[:, :3], axis=1).max() \
+            <= 0.05 + 1e-9
+
+    def test_replay_is_deterministic(self):
+        def run():
+            controller = ServoController()
+            plant = SimulatedTwistPlant(self.targets[0][1])
+            return simulate_servo(controller, self.targets, plant,
+                                  camera_latency=0.03)
+
+        assert np.array_equal(run().positions, run().positions)
+
+    def test_initial_state(self):
+        start = Pose([0.2, 0.0, 0.0], Quaternion())
+        goal = Pose([0.3, 0.1, 0.0], Quaternion())
+
+        controller = ServoController()
+        controller.update_target(goal, 0.0, 0.0)
+        with pytest.raises(RuntimeError):
+            controller.step(0.0)
+
+        # the filter starts at the robot pose, not at the first target
+        plant = SimulatedTwistPlant(start)
+        controller = ServoController(bandwidth=10.0,
+                                     pose_feedback=lambda: plant.pose)
+        for now in np.arange(0.0, 2.0, 0.004):
+            controller.update_target(goal, now, now)
+            plant.apply(now, controller.step(now), 0.004)
+
+        assert plant.position == pytest.approx(goal.translation, abs=1e-3)
+
+    def test_stale_target(self):
+        start = Pose([0.0, 0.0, 0.0], Quaternion())
+        goal = Pose([0.1, 0.0, 0.0], Quaternion())
+        controller = ServoController(max_target_age=0.2)
+        controller.reset(start, 0.0)
+        controller.update_target(goal, 0.0, 0.0)
+
+        assert controller.step(0.1) is not None
+        # no command lets the deadman timeout of the streamer fire
+        assert controller.step(0.3) is None
+        assert controller.step(0.4) is None
+
+        controller.update_target(goal, 0.5, 0.5)
+        assert controller.step(0.5) is not None
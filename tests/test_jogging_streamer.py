@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from xamla_motion.data_types import JointSet, JointValues, Twist
+from xamla_motion.jogging_client import JoggingClient
+from xamla_motion.jogging_streamer import JoggingStreamer
+
+
+@pytest.mark.fake_transport
+class TestJoggingStreamer(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.client = JoggingClient()
+        cls.twists = []
+        cls.velocities = []
+
+        # the streamer reuses its messages, record the values
+        cls.transport.subscriber(
+            'xamlaJointJogging/jogging_twist', None,
+            lambda msg: cls.twists.append(msg.twist.linear.x))
+        cls.transport.subscriber(
+            'xamlaJointJogging/jogging_command', None,
+            lambda msg: cls.velocities.append(list(msg.points[0].velocities)))
+
+    def setup_method(self, method):
+        del self.twists[:]
+        del self.velocities[:]
+
+    def test_slew_limit_and_deadman_ramp(self):
+        streamer = JoggingStreamer(self.client, rate=100.0,
+                                   deadman_timeout=0.1,
+                                   max_linear_acceleration=1.0)
+        streamer.set_twist(Twist([1.0, 0.0, 0.0], [0.0, 0.0, 0.0]))
+        now = time.monotonic()
+        for _ in range(3):
+            assert not streamer._tick(now)
+        # one tick changes the velocity by acceleration / rate
+        assert self.twists == pytest.approx([0.01, 0.02, 0.03])
+
+        del self.twists[:]
+        stopped = [streamer._tick(now + 1.0) for _ in range(10)]
+        assert self.twists[:3] == pytest.approx([0.02, 0.01, 0.0])
+        assert self.twists[-1] == 0.0
+        assert stopped[-1]
+        # the zero twist is published once and not repeated
+        assert len(self.twists) < 5
+        assert self.twists.count(0.0) == 1
+
+        # a new command resumes publishing
+        streamer.set_twist(Twist([1.0, 0.0, 0.0], [0.0, 0.0, 0.0]))
+        assert not streamer._tick(time.monotonic())
+        assert self.twists[-1] == pytest.approx(0.01)
+
+    def test_velocities_deadman(self):
+        streamer = JoggingStreamer(self.client, rate=100.0,
+                                   deadman_timeout=0.1)
+        joint_set = JointSet(['joint1', 'joint2'])
+        streamer.set_velocities(JointValues(joint_set, [0.5, -0.5]))
+        now = time.monotonic()
+        assert not streamer._tick(now)
+        assert self.velocities == [[0.5, -0.5]]
+
+        assert streamer._tick(now + 1.0)
+        assert streamer._tick(now + 1.1)
+        assert self.velocities == [[0.5, -0.5], [0.0, 0.0]]
+
+    def test_timing_statistics(self):
+        streamer = JoggingStreamer(self.client, rate=100.0, window_size=4)
+        # the fourth tick misses its deadline by more than a period
+        ticks = [(0.0, 0.0), (0.01, 0.01), (0.02, 0.02), (0.045, 0.03),
+                 (0.05, 0.05)]
+        last_tick = None
+        for now, deadline in ticks:
+            streamer._record_timing(now, deadline, last_tick)
+            last_tick = now
+        statistics = streamer.statistics
+
+        assert statistics.num_ticks == 5
+        assert statistics.num_overruns == 1
+        # only the last window_size ticks are evaluated
+        assert statistics.achieved_rate == pytest.approx(80.0)
+        assert statistics.max_lateness == pytest.approx(0.015)
+        assert statistics.mean_lateness == pytest.approx(0.00375)
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from xamla_motion.data_types import JointPath, JointSet, JointValues
+from xamla_motion.motion_service import MotionService
+
+from helpers import InFlightRecorder
+
+
+@pytest.mark.fake_transport
+class TestCheckJointPathCollisions(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.name = ('xamlaMoveGroupServices/'
+                    'query_joint_position_collision_check')
+
+        # points whose first joint position reaches 100 are in collision
+        def check(move_group_name, joint_names, points):
+            in_collision = [p.positions[0] >= 100.0 for p in points]
+            return SimpleNamespace(
+                in_collision=in_collision,
+                error_codes=[-1 if c else 1 for c in in_collision])
+
+        cls.recorder = InFlightRecorder(check, delay=0.005)
+        cls.transport.register_service(cls.name, cls.recorder)
+
+        joint_set = JointSet(['joint1', 'joint2'])
+        cls.path = JointPath(joint_set, [JointValues(joint_set, [i, 0.0])
+                                         for i in range(1000)])
+
+    def check(self, **kwargs):
+        calls = self.transport.call_counts.get(self.name, 0)
+        self.recorder.max_in_flight = 0
+        result = MotionService.check_joint_path_collisions(
+            'arm', self.path, chunk_size=50, max_in_flight=2, **kwargs)
+        return result, self.transport.call_counts[self.name] - calls
+
+    def test_complete(self):
+        result, calls = self.check()
+
+        assert result
+        assert result.complete
+        assert calls == 20
+        assert self.recorder.max_in_flight == 2
+        assert np.array_equal(result.indices, np.arange(100, 1000))
+        assert np.all(result.error_codes[:100] == 1)
+
+    def test_stop_on_first(self):
+        result, calls = self.check(stop_on_first=True)
+
+        assert result
+        assert not result.complete
+        # chunks in flight when the collision is found still complete
+        assert 3 <= calls <= 4
+        assert self.recorder.max_in_flight == 2
+        assert result.checked[:150].all()
+        assert not result.in_collision[:100].any()
+        assert result.in_collision[100:150].all()
+        # points which are not checked are not reported
+        assert not result.in_collision[~result.checked].any()
+        assert np.all(result.error_codes[~result.checked] == 0)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(TypeError):
+            MotionService.check_joint_path_collisions('arm', [])
+        with pytest.raises(ValueError):
+            MotionService.check_joint_path_collisions('arm', self.path,
+                                                      chunk_size=0)
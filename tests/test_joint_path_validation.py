@@ -0,0 +1,66 @@
+import pytest
+from xamla_motion.data_types import (JointLimits, JointPath, JointPathValidator,
+                                     JointSet, JointValues)
+from xamla_motion.motion_operations import MoveCartesianOperation
+from datetime import timedelta
+from types import SimpleNamespace
+import numpy as np
+
+
+class TestJointPathValidator(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.joint_set = JointSet(['joint1', 'joint2', 'joint3'])
+        values = np.array([[0.0, 0.0, 0.0],
+                           [0.1, 0.0, 0.0],
+                           [0.2, 0.5, 0.0],
+                           [0.3, 0.5, 1.2],
+                           [0.4, 0.5, 1.2]])
+        cls.path = JointPath(cls.joint_set,
+                             [JointValues(cls.joint_set, v) for v in values])
+        cls.limits = JointLimits(cls.joint_set,
+                                 max_velocity=[1.0, 1.0, np.nan],
+                                 max_acceleration=[1.0, 1.0, 1.0],
+                                 min_position=[-1.0, -1.0, -1.0],
+                                 max_position=[1.0, 1.0, 1.0])
+
+    def test_jumps_between_consecutive_points(self):
+        violations = JointPathValidator(0.3).validate(self.path)
+        assert violations.jump_indices.tolist() == [1, 2]
+        assert violations.jump_deltas == pytest.approx([0.5, 1.2])
+        assert not violations.valid
+        assert not violations
+
+        assert JointPathValidator(1.5).validate(self.path).valid
+        # true like other results if the path is ok
+        assert JointPathValidator(1.5).validate(self.path)
+
+    def test_limits(self):
+        validator = JointPathValidator(joint_limits=self.limits)
+        violations = validator.validate(self.path)
+        assert violations.position_violations.tolist() == [[3, 2], [4, 2]]
+        assert violations.velocity_violations.size == 0
+
+        stamps = [timedelta(seconds=t) for t in (0.0, 0.1, 0.2, 0.3, 0.3)]
+        violations = validator.validate(self.path, stamps)
+        # joint3 has no velocity limit, the jump of joint2 is too fast
+        assert violations.velocity_violations.tolist() == [[1, 1], [3, 0]]
+
+    def test_reordered_limits(self):
+        joint_set = JointSet(['joint3', 'joint1', 'joint2'])
+        limits = self.limits.select(joint_set.names)
+        violations = JointPathValidator(joint_limits=limits).validate(self.path)
+        assert violations.position_violations.tolist() == [[3, 2], [4, 2]]
+
+    def test_move_cartesian_ik_jumps(self):
+        operation = SimpleNamespace(_task_space_plan_parameters=SimpleNamespace(
+            ik_jump_threshold=0.3))
+        # the first point does not jump, the path jumps after the second
+        with pytest.raises(RuntimeError) as exc:
+            MoveCartesianOperation._check_ik_jumps(operation, self.path)
+        assert 'difference 0.5 ' in str(exc.value)
+        assert 'at index 1 ' in str(exc.value)
+
+        operation._task_space_plan_parameters.ik_jump_threshold = 1.5
+        MoveCartesianOperation._check_ik_jumps(operation, self.path)
@@ -0,0 +1,143 @@
+import pytest
+from xamla_motion.data_types import (CompressedJointTrajectory, JointLimits,
+                                     JointSet, JointTrajectory,
+                                     JointTrajectoryPoint, JointValues)
+from datetime import timedelta
+import numpy as np
+import pickle
+
+
+class TestJointTrajectoryRetime(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.joint_set = JointSet(['joint1', 'joint2'])
+        cls.times = np.linspace(0.0, 2.0, 401)
+        offsets = np.array([0.0, 0.5])
+        points = []
+        for t in cls.times:
+            points.append(JointTrajectoryPoint(
+                timedelta(seconds=t),
+                JointValues(cls.joint_set, np.sin(t + offsets)),
+                JointValues(cls.joint_set, np.cos(t + offsets)),
+                JointValues(cls.joint_set, -np.sin(t + offsets))))
+        cls.trajectory = JointTrajectory(cls.joint_set, points)
+        cls.limits = JointLimits(cls.joint_set,
+                                 max_velocity=[0.5, np.nan],
+                                 max_acceleration=[0.5, 0.5],
+                                 min_position=[-1.0, -1.0],
+                                 max_position=[1.0, 1.0])
+
+    def test_uniform(self):
+        slow = self.trajectory.retime(2.0)
+        assert slow.duration == timedelta(seconds=4.0)
+        assert slow[10].positions == self.trajectory[10].positions
+        assert np.allclose(slow[10].velocities.values,
+                           self.trajectory[10].velocities.values / 2.0)
+        assert np.allclose(slow[10].accelerations.values,
+                           self.trajectory[10].accelerations.values / 4.0)
+
+    def test_non_uniform(self):
+        retimed = self.trajectory.retime(1.0 + 0.5 * self.times)
+        times = np.array([t.total_seconds() for t in retimed.time_from_start])
+        positions = np.array([p.values for p in retimed.positions])
+        velocities = np.array([v.values for v in retimed.velocities])
+        accelerations = np.array([a.values for a in retimed.accelerations])
+
+        # retimed derivatives are consistent with the new time stamps
+        assert np.allclose(np.gradient(positions, times, axis=0)[1:-1],
+                           velocities[1:-1], atol=1e-3)
+        assert np.allclose(np.gradient(velocities, times, axis=0)[1:-1],
+                           accelerations[1:-1], atol=1e-3)
+
+        with pytest.raises(ValueError):
+            self.trajectory.retime([1.0, 2.0])
+        with pytest.raises(ValueError):
+            self.trajectory.retime(0.0)
+
+    def test_limits(self):
+        # |v| of joint1 reaches 1.0 at t=0, joint2 has no velocity limit
+        scale = self.trajectory.min_time_scale(self.limits)
+        assert scale == pytest.approx(2.0)
+
+        self.trajectory.retime(scale, self.limits)
+        with pytest.raises(ValueError):
+            self.trajectory.retime(0.9 * scale, self.limits)
+
+    def test_unconstrained(self):
+        values = JointValues(self.joint_set, [0.1, 0.2])
+        zero = JointValues(self.joint_set, [0.0, 0.0])
+        stationary = JointTrajectory(self.joint_set, [
+            JointTrajectoryPoint(timedelta(seconds=t), values, zero, zero)
+            for t in (0.0, 1.0)])
+        assert stationary.min_time_scale(self.limits) == 0.0
+
+        no_limits = JointLimits(self.joint_set,
+                                max_velocity=[np.nan, np.nan])
+        assert self.trajectory.min_time_scale(no_limits) == 0.0
+
+        # the unconstrained scale is no valid factor of retime
+        with pytest.raises(ValueError):
+            stationary.retime(stationary.min_time_scale(self.limits))
+
+
+class TestJointTrajectoryDecimation(object):
+
+    @classmethod
+    def setup_class(cls):
+        # smooth motion sampled at 125 Hz like planned trajectories
+        cls.joint_set = JointSet(['joint{}'.format(i) for i in range(1, 7)])
+        cls.times = np.arange(376) * 0.008
+        phase = np.arange(6)
+        points = [JointTrajectoryPoint(
+            timedelta(seconds=t),
+            JointValues(cls.joint_set, np.sin(0.5 * t + phase)),
+            JointValues(cls.joint_set, 0.5 * np.cos(0.5 * t + phase)))
+            for t in cls.times]
+        cls.trajectory = JointTrajectory(cls.joint_set, points)
+        cls.positions = np.array([p.values for p in cls.trajectory.positions])
+
+    def test_decimate(self):
+        decimated = self.trajectory.decimate(1e-4)
+        assert len(decimated) * 5 <= len(self.trajectory)
+        assert decimated[0] == self.trajectory[0]
+        assert decimated[-1] == self.trajectory[-1]
+
+        restored = decimated.resample(self.trajectory.time_from_start)
+        assert restored.time_from_start == self.trajectory.time_from_start
+        positions = np.array([p.values for p in restored.positions])
+        assert np.max(np.abs(positions - self.positions)) <= 1e-4
+
+        assert len(self.trajectory.decimate(0.0)) <= len(self.trajectory)
+
+    def test_codec(self):
+        encoded = CompressedJointTrajectory.encode(self.trajectory, 1e-4)
+        assert encoded.num_samples == len(self.trajectory)
+        assert len(pickle.dumps(encoded)) * 5 < len(pickle.dumps(
+            self.trajectory))
+
+        decoded = pickle.loads(pickle.dumps(encoded)).decode()
+        assert decoded.time_from_start == self.trajectory.time_from_start
+        positions = np.array([p.values for p in decoded.positions])
+        assert np.max(np.abs(positions - self.positions)) <= 1e-4
+
+    def test_velocity_tolerance(self):
+        velocities = np.array([p.values for p in self.trajectory.velocities])
+        encoded = CompressedJointTrajectory.encode(self.trajectory, 1e-4)
+        assert encoded.velocity_tolerance is None
+
+        bounded = CompressedJointTrajectory.encode(self.trajectory, 1e-4,
+                                                   1e-5)
+        assert bounded.num_points > encoded.num_points
+        assert (bounded.tolerance, bounded.velocity_tolerance) == \
+            (1e-4, 1e-5)
+        decoded = bounded.decode()
+        errors = np.array([p.values for p in decoded.velocities]) - velocities
+        assert np.max(np.abs(errors)) <= 1e-5
+
+        points = [JointTrajectoryPoint(p.time_from_start, p.positions,
+                                       p.velocities, None, p.velocities)
+                  for p in self.trajectory]
+        with pytest.raises(ValueError):
+            CompressedJointTrajectory.encode(
+                JointTrajectory(self.joint_set, points), 1e-4)
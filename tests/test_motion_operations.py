@@ -0,0 +1,90 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from xamla_motion.data_types import (JointSet, JointTrajectory,
+                                     JointTrajectoryPoint, JointValues)
+from xamla_motion.motion_operations import Plan
+from xamla_motion.motion_service import MotionService
+
+
+@pytest.mark.fake_transport
+class TestPlanAttachments(object):
+
+    @classmethod
+    def setup_class(cls):
+        # the action takes twice the trajectory duration
+        cls.execution_time = 0.8
+        cls.send_progress = True
+
+        def move_joints(goal, context):
+            steps = 40
+            for i in range(steps):
+                context.sleep(cls.execution_time / steps)
+                if cls.send_progress:
+                    context.publish_feedback(
+                        SimpleNamespace(progress=(i + 1) / steps))
+                else:
+                    context.publish_feedback(SimpleNamespace())
+            return SimpleNamespace(result=1)
+
+        cls.transport.register_action('moveJ_action', move_joints)
+        cls.move_group = SimpleNamespace(motion_service=MotionService())
+
+        joint_set = JointSet(['joint1', 'joint2'])
+        points = [JointTrajectoryPoint(timedelta(seconds=t),
+                                       JointValues(joint_set, [t, t]))
+                  for t in (0.0, 0.4)]
+        cls.trajectory = JointTrajectory(joint_set, points)
+
+    def execute(self, *attachments):
+        plan = Plan(self.move_group, self.trajectory,
+                    SimpleNamespace(collision_check=False))
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        started = []
+
+        def record(name):
+            async def command():
+                started.append((name, loop.time() - start))
+                return name
+            return command
+
+        for name, kwargs in attachments:
+            plan.attach(record(name), **kwargs)
+        result = loop.run_until_complete(plan.execute_async())
+        return result, dict(started)
+
+    def test_progress_feedback(self):
+        type(self).send_progress = True
+        result, started = self.execute(('half', {'progress': 0.5}),
+                                       ('end', {'time_from_start': 10.0}))
+
+        # the result does not depend on the attachments
+        assert result is None
+        # progress feedback defers the command to the reported progress
+        assert started['half'] >= 0.35
+        assert started['end'] >= self.execution_time
+
+    def test_timer_fallback(self):
+        type(self).send_progress = False
+        try:
+            result, started = self.execute(('half', {'progress': 0.5}))
+        finally:
+            type(self).send_progress = True
+
+        assert result is None
+        # without progress the command starts at the trajectory time
+        assert 0.15 <= started['half'] < 0.35
+
+    def test_failing_command(self):
+        async def fail():
+            raise RuntimeError('gripper failure')
+
+        plan = Plan(self.move_group, self.trajectory,
+                    SimpleNamespace(collision_check=False))
+        plan.attach(fail, progress=0.0)
+        with pytest.raises(RuntimeError):
+            asyncio.get_event_loop().run_until_complete(plan.execute_async())
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from pyquaternion import Quaternion
+
+from xamla_motion.data_types import Pose, PoseArray
+from xamla_motion.fake_motion_server import FakeMotionServer
+from xamla_motion.v2 import MoveGroup
+from xamla_motion.reachability_map import ReachabilityMap
+
+
+@pytest.mark.fake_transport
+class TestReachabilityMap(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.server = FakeMotionServer(cls.transport, time_scale=0.0)
+        cls.end_effector = MoveGroup('arm').get_end_effector('tool')
+
+    def test_build_and_lookup(self, tmpdir):
+        # the fake kinematics only reaches translations within +-pi
+        directory = str(tmpdir.join('map'))
+        orientations = [Quaternion(),
+                        Quaternion(axis=[1.0, 0.0, 0.0], angle=np.pi / 2)]
+        built = ReachabilityMap.build(self.end_effector, directory,
+                                      [2.0, -0.5, -0.5], [4.0, 0.5, 0.5],
+                                      0.5, orientations, batch_size=7)
+        assert built.shape == (4, 2, 2)
+
+        reachability_map = ReachabilityMap(directory)
+        poses = PoseArray([[2.2, 0.0, 0.0], [2.7, 0.0, 0.0],
+                           [3.9, 0.2, -0.2], [5.0, 0.0, 0.0]],
+                          [[1.0, 0.0, 0.0, 0.0]] * 4)
+        assert reachability_map.reachability(poses).tolist() == [1.0, 1.0,
+                                                                 0.0, 0.0]
+        rotated = PoseArray.from_poses([Pose([2.2, 0.0, 0.0], orientations[1]),
+                                        Pose([3.6, 0.0, 0.0], orientations[1])])
+        assert reachability_map.reachability(
+            rotated, match_orientation=True).tolist() == [1.0, 0.0]
+        manipulability = reachability_map.manipulability(poses)
+        assert 0.0 < manipulability[0] < 1.0
+        assert manipulability[2] == 0.0
+
+        with pytest.raises(ValueError):
+            reachability_map.reachability(PoseArray(poses.translations,
+                                                    poses.quaternions,
+                                                    frame_id='other'))
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from xamla_motion.data_types import (ErrorCodes, JointSet, JointTrajectory,
+                                     JointTrajectoryPoint, JointValues)
+from xamla_motion.motion_service import SteppedMotionClient
+from xamla_motion.robot_chat_client import (RobotChatClient,
+                                            RobotChatSteppedMotion)
+
+
+class RecordingRobotChat(RobotChatClient):
+
+    """
+    Records the robot chat calls instead of calling ROSVITA RoboChat
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.update_times = []
+
+    def create_chat(self, name, topic, backlog=1000):
+        self.calls.append(('create_chat', name))
+
+    def create_text_message(self, channel_name, text, disposition):
+        self.calls.append(('create_text_message', json.loads(text)))
+        return 'message'
+
+    def update_text_message(self, channel_name, message_id, text):
+        self.calls.append(('update_text_message', json.loads(text)))
+        self.update_times.append(time.monotonic())
+
+    def delete_text_message(self, channel_name, message_id):
+        self.calls.append(('delete_text_message', message_id))
+
+
+@pytest.mark.fake_transport
+class TestRobotChatSteppedMotion(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.progress = [0.1 * i for i in range(1, 11)]
+
+        def handler(goal, context):
+            # wait until the client registered for feedback
+            context.sleep(0.05)
+            publisher = cls.transport.publisher('xamlaMoveActions/feedback',
+                                                None)
+            for progress in cls.progress:
+                error_code = (ErrorCodes.SUCCESS if progress == 1.0
+                              else ErrorCodes.PROGRESS)
+                publisher.publish(SimpleNamespace(
+                    control_goal_id=context.goal_id, progress=progress,
+                    error_msg='', error_code=error_code.value))
+                context.sleep(0.04)
+            return SimpleNamespace(result=1)
+
+        cls.transport.register_action('moveJ_step_action', handler)
+
+        joint_set = JointSet(['joint1', 'joint2'])
+        points = [JointTrajectoryPoint(timedelta(seconds=t),
+                                       JointValues(joint_set, [t, t]))
+                  for t in (0.0, 1.0)]
+        cls.trajectory = JointTrajectory(joint_set, points)
+
+    def run(self, coroutine):
+        return asyncio.get_event_loop().run_until_complete(coroutine)
+
+    def test_state_queue(self):
+        async def run():
+            client = SteppedMotionClient(self.trajectory, 0.5)
+            queue = client.state_queue(maxsize=2)
+            await client.action_done_future
+            states = []
+            while not queue.empty():
+                states.append(queue.get_nowait())
+            return states
+
+        # the oldest states are dropped, the queue ends with None
+        states = self.run(run())
+        assert len(states) == 2
+        assert states[0].progress == 1.0
+        assert states[0].error_code == ErrorCodes.SUCCESS
+        assert states[1] is None
+
+    def test_update_rate(self):
+        robot_chat = RecordingRobotChat()
+
+        async def run():
+            client = SteppedMotionClient(self.trajectory, 0.5)
+            motion = RobotChatSteppedMotion(robot_chat, client, 'arm',
+                                            update_rate=5.0)
+            await motion.handle_stepwise_motions()
+            return motion
+
+        motion = self.run(run())
+        names = [c[0] for c in robot_chat.calls]
+        assert names[:2] == ['create_chat', 'create_text_message']
+        assert names[-1] == 'delete_text_message'
+
+        # updates are throttled to the update rate, states in between
+        # are skipped
+        updates = [c[1]['Progress'] for c in robot_chat.calls
+                   if c[0] == 'update_text_message']
+        assert 1 < len(updates) < len(self.progress)
+        assert updates == sorted(updates)
+        assert min(np.diff(robot_chat.update_times)) > 0.9 / 5.0
+        assert motion._RobotChatSteppedMotion__executor._shutdown
+
+    def test_final_state(self):
+        robot_chat = RecordingRobotChat()
+
+        async def run():
+            client = SteppedMotionClient(self.trajectory, 0.5)
+            motion = RobotChatSteppedMotion(robot_chat, client, 'arm')
+            await client.action_done_future
+
+            # the motion finished while the states were queued
+            queue = asyncio.Queue()
+            for progress in (0.3, 0.6):
+                queue.put_nowait(SimpleNamespace(
+                    progress=progress, error_code=ErrorCodes.PROGRESS))
+            queue.put_nowait(SimpleNamespace(
+                progress=1.0, error_code=ErrorCodes.SUCCESS))
+            queue.put_nowait(None)
+            motion.stepped_client = SimpleNamespace(
+                goal_id=client.goal_id, state_queue=lambda: queue)
+            await motion._update_progress('MotionDialog', 'message')
+
+        self.run(run())
+        updates = [c[1]['Progress'] for c in robot_chat.calls
+                   if c[0] == 'update_text_message']
+        assert updates == [1.0]
@@ -0,0 +1,195 @@
+import asyncio
+import gc
+import sys
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+
+import actionlib
+import pytest
+
+from xamla_motion.data_types import (JointSet, JointTrajectory,
+                                     JointTrajectoryPoint, JointValues)
+from xamla_motion.motion_service import SteppedMotionClient
+from xamla_motion.ros_resources import SharedActionClient, TopicDemultiplexer
+from xamla_motion.transport import (FakeActionAborted, FakeTransport,
+                                    set_transport)
+from xamla_motion.xamla_motion_exceptions import ServiceException
+
+
+class DoneFirstTransport(FakeTransport):
+
+    """
+    Fake transport whose goals finish before send_goal returns
+    """
+
+    class ActionClient(object):
+
+        def __init__(self, client):
+            self.client = client
+
+        def wait_for_server(self, timeout=None):
+            return self.client.wait_for_server(timeout)
+
+        def send_goal(self, goal, transition_cb=None, feedback_cb=None):
+            done = threading.Event()
+
+            def transition(client_goal_handle):
+                transition_cb(client_goal_handle)
+                if (client_goal_handle.get_comm_state() ==
+                        actionlib.CommState.DONE):
+                    done.set()
+
+            handle = self.client.send_goal(goal, transition, feedback_cb)
+            done.wait(5.0)
+            return handle
+
+    def action_client(self, name, action_spec):
+        return self.ActionClient(super(DoneFirstTransport,
+                                       self).action_client(name, action_spec))
+
+
+@pytest.mark.fake_transport
+class TestSharedActionClient(object):
+
+    @classmethod
+    def setup_class(cls):
+        def handler(goal, context):
+            context.publish_feedback(goal.value)
+            if goal.value < 0:
+                raise FakeActionAborted(SimpleNamespace())
+            return SimpleNamespace(value=goal.value)
+
+        cls.transport.register_action('test/shared_action', handler)
+        cls.client = SharedActionClient.get('test/shared_action', None)
+
+    def test_shared(self):
+        assert SharedActionClient.get('test/shared_action', None) is \
+            self.client
+
+    def test_execute(self):
+        feedback = {}
+
+        async def execute(value):
+            return await self.client.execute(
+                SimpleNamespace(value=value),
+                lambda msg: feedback.setdefault(value, []).append(msg))
+
+        async def run():
+            return await asyncio.gather(*[execute(v) for v in range(10)])
+
+        results = asyncio.get_event_loop().run_until_complete(run())
+        assert [r.value for r in results] == list(range(10))
+        # feedback is routed to the goal it belongs to
+        assert feedback == {v: [v] for v in range(10)}
+
+        with pytest.raises(ServiceException) as exc:
+            asyncio.get_event_loop().run_until_complete(execute(-1))
+        assert 'ABORTED' in str(exc.value)
+
+    def test_goals_are_released(self):
+        handles = [self.client.send_goal(SimpleNamespace(value=v))
+                   for v in range(20)]
+        assert all(h.wait(5.0) for h in handles)
+        assert self.client.num_active_goals == 0
+
+        transport = DoneFirstTransport()
+        transport.register_action('test/shared_action',
+                                  lambda goal, context: None)
+        previous = set_transport(transport)
+        try:
+            client = SharedActionClient.get('test/shared_action', None)
+            handle = client.send_goal(SimpleNamespace(value=0))
+            assert handle.done
+            assert client.num_active_goals == 0
+        finally:
+            set_transport(previous)
+
+
+@pytest.mark.fake_transport
+class TestTopicDemultiplexer(object):
+
+    def test_routing(self):
+        demux = TopicDemultiplexer('test/progress', None,
+                                   key=lambda msg: msg.goal_id)
+        received = {'a': [], 'b': []}
+        demux.register('a', received['a'].append)
+        demux.register('b', received['b'].append)
+
+        publisher = self.transport.publisher('test/progress', None)
+        messages = [SimpleNamespace(goal_id=i, value=k)
+                    for k, i in enumerate(['a', 'b', '', 'c', 'a'])]
+        for msg in messages:
+            publisher.publish(msg)
+
+        # messages without goal id reach all consumers
+        assert [m.value for m in received['a']] == [0, 2, 4]
+        assert [m.value for m in received['b']] == [1, 2]
+
+        demux.unregister('a')
+        publisher.publish(SimpleNamespace(goal_id='a', value=5))
+        assert len(received['a']) == 3
+
+
+@pytest.mark.fake_transport
+class TestSteppedMotionClient(object):
+
+    @classmethod
+    def setup_class(cls):
+        def handler(goal, context):
+            # wait until the client registered for feedback
+            context.sleep(0.05)
+            publisher = cls.transport.publisher('xamlaMoveActions/feedback',
+                                                None)
+            for goal_id, progress in ((context.goal_id, 0.5),
+                                      ('other', 0.9),
+                                      (context.goal_id, 1.0)):
+                publisher.publish(SimpleNamespace(
+                    control_goal_id=goal_id, progress=progress,
+                    error_msg='', error_code=1))
+            return SimpleNamespace(result=1)
+
+        cls.transport.register_action('moveJ_step_action', handler)
+
+        joint_set = JointSet(['joint1', 'joint2'])
+        points = [JointTrajectoryPoint(timedelta(seconds=t),
+                                       JointValues(joint_set, [t, t]))
+                  for t in (0.0, 1.0)]
+        cls.trajectory = JointTrajectory(joint_set, points)
+
+    def test_feedback_routing(self):
+        async def supervise(velocity_scaling):
+            client = SteppedMotionClient(self.trajectory, velocity_scaling)
+            queue = client.state_queue()
+            progress = []
+            while True:
+                state = await queue.get()
+                if state is None:
+                    break
+                assert state.goal_id == client.goal_id.id
+                progress.append(state.progress)
+            await client.action_done_future
+            return progress
+
+        async def run():
+            return await asyncio.gather(supervise(0.25), supervise(0.75))
+
+        progress = asyncio.get_event_loop().run_until_complete(run())
+        # each client only sees the progress of its own goal
+        assert progress == [[0.5, 1.0], [0.5, 1.0]]
+
+    def test_server_not_available(self):
+        transport = FakeTransport()
+        previous = set_transport(transport)
+        unraisable = []
+        hook = sys.unraisablehook
+        sys.unraisablehook = unraisable.append
+        try:
+            with pytest.raises(ServiceException):
+                SteppedMotionClient(self.trajectory, 0.5)
+            gc.collect()
+        finally:
+            sys.unraisablehook = hook
+            set_transport(previous)
+        # the partially initialized client is destroyed without error
+        assert unraisable == []
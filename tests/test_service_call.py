@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import rospy
+
+from xamla_motion.service_call import (CallPolicy, LatencyHistogram,
+                                       ServiceTimeout, deadline,
+                                       get_service_statistics, is_idempotent,
+                                       set_call_policy)
+from xamla_motion.transport import FakeTransport
+
+
+class TestServiceCall(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.transport = FakeTransport()
+        cls.release = threading.Event()
+        cls.failures = [0]
+
+        def flaky(request):
+            if cls.failures[0] > 0:
+                cls.failures[0] -= 1
+                raise RuntimeError('temporary failure')
+            return request
+
+        cls.transport.register_service('test/query_flaky', flaky)
+        cls.transport.register_service('test/set_flaky', flaky)
+        cls.transport.register_service('test/query_hung',
+                                       lambda r: cls.release.wait(5.0))
+        set_call_policy(CallPolicy(timeout=0.1, retries=2, backoff=0.001),
+                        pattern='^test/')
+
+    @classmethod
+    def teardown_class(cls):
+        cls.release.set()
+        set_call_policy(None, pattern='^test/')
+
+    def test_idempotent(self):
+        assert is_idempotent('xamlaMoveGroupServices/query_ik2')
+        assert is_idempotent('/xamlaMoveGroupServices/get_ik_solver')
+        assert not is_idempotent('xamlaResourceLockService/query_resource_lock')
+        assert not is_idempotent('xamlaJointJogging/set_velocity_scaling')
+
+    def test_retry(self):
+        name = 'test/query_flaky'
+        proxy = self.transport.service_proxy(name, None)
+        calls = self.transport.call_counts.get(name, 0)
+        self.failures[0] = 2
+        assert proxy(3) == 3
+        assert self.transport.call_counts[name] == calls + 3
+
+        outcomes = get_service_statistics().snapshot()[name]['outcomes']
+        assert outcomes['error'] >= 2 and outcomes['ok'] >= 1
+
+        # services which modify state are not repeated
+        proxy = self.transport.service_proxy('test/set_flaky', None)
+        self.failures[0] = 1
+        with pytest.raises(rospy.ServiceException):
+            proxy(3)
+        self.failures[0] = 0
+
+    def test_timeout(self):
+        name = 'test/query_hung'
+        proxy = self.transport.service_proxy(name, None)
+        calls = self.transport.call_counts.get(name, 0)
+        start = time.monotonic()
+        with pytest.raises(ServiceTimeout):
+            with deadline(0.15):
+                proxy(None)
+        assert time.monotonic() - start < 1.0
+        # the hung request is not repeated although retries are allowed
+        assert self.transport.call_counts[name] == calls + 1
+
+        snapshot = get_service_statistics().snapshot()['test/query_hung']
+        assert snapshot['outcomes']['timeout'] >= 1
+
+    def test_in_flight(self):
+        name = 'test/query_hung'
+        set_call_policy(CallPolicy(timeout=0.05, retries=2, backoff=0.001,
+                                   max_in_flight=1, retry_on_timeout=True),
+                        pattern='^test/query_hung$')
+        try:
+            proxy = self.transport.service_proxy(name, None)
+            calls = self.transport.call_counts.get(name, 0)
+            for _ in range(3):
+                with pytest.raises(ServiceTimeout):
+                    proxy(None)
+            # the first request still occupies the only slot
+            assert self.transport.call_counts[name] == calls + 1
+        finally:
+            set_call_policy(None, pattern='^test/query_hung$')
+
+    def test_cancel(self):
+        proxy = self.transport.service_proxy('test/query_hung', None)
+        set_call_policy(None, pattern='^test/')
+        try:
+            async def cancelled():
+                task = asyncio.ensure_future(proxy.call_async(None))
+                await asyncio.sleep(0.05)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+            start = time.monotonic()
+            asyncio.run(asyncio.wait_for(cancelled(), 1.0))
+            assert time.monotonic() - start < 1.0
+        finally:
+            self.release.set()
+            set_call_policy(CallPolicy(timeout=0.1, retries=2,
+                                       backoff=0.001), pattern='^test/')
+
+    def test_histogram(self):
+        histogram = LatencyHistogram()
+        for latency in (0.001, 0.002, 0.003, 0.1):
+            histogram.record(latency)
+        histogram.record(60.0, 'timeout')
+        snapshot = histogram.snapshot()
+        assert snapshot['count'] == 5
+        assert snapshot['outcomes'] == {'ok': 4, 'error': 0, 'timeout': 1}
+        assert 0.002 <= snapshot['p50'] <= 0.004
+        assert snapshot['p99'] == 60.0
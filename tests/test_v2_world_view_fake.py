@@ -0,0 +1,91 @@
+import pathlib
+
+import pytest
+
+from xamla_motion.data_types import Pose
+from xamla_motion.fake_motion_server import FakeMotionServer
+from xamla_motion.v2 import WorldViewClient
+from xamla_motion.v2 import world_view_client as wv
+from xamla_motion.v2.world_view_client import LazyQueryResult
+
+from helpers import InFlightRecorder
+
+
+@pytest.mark.fake_transport
+class TestWorldViewClientFake(object):
+
+    """
+    v2 WorldViewClient against the in-process fake motion server
+    """
+
+    @classmethod
+    def setup_class(cls):
+        cls.server = FakeMotionServer(cls.transport)
+        cls.client = WorldViewClient()
+        cls.client.add_folder('test_fake')
+
+    def test_add_many(self):
+        add = InFlightRecorder(self.server._world_view_add('pose',
+                                                           update=False))
+        update = InFlightRecorder(self.server._world_view_add('pose',
+                                                              update=True))
+        self.transport.register_service(wv.add_pose_srv_name, add)
+        self.transport.register_service(wv.update_pose_srv_name, update)
+
+        elements = [('test_fake/many_{}'.format(i),
+                     Pose.identity().translate([0.1 * i, 0.0, 0.0]))
+                    for i in range(10)]
+        elements.insert(3, ('missing_folder/pose', Pose.identity()))
+
+        results = self.client.add_many(elements, max_concurrency=3)
+        # results are in the order of the elements
+        assert [str(r.element_path) for r in results] == \
+            ['/' + p for p, _ in elements]
+        assert [r.success for r in results] == \
+            [i != 3 for i in range(len(elements))]
+        assert add.max_in_flight == 3
+
+        # add tries to update existing elements first
+        update.max_in_flight = 0
+        updates = [(p, Pose.identity()) for p, _ in elements]
+        results = self.client.update_many(updates, max_concurrency=2)
+        assert [r.success for r in results] == \
+            [i != 3 for i in range(len(elements))]
+        assert update.max_in_flight == 2
+        assert self.client.get_pose(elements[-1][0]) == Pose.identity()
+
+        update.max_in_flight = 0
+        self.client.update_many(updates, max_concurrency=1)
+        assert update.max_in_flight == 1
+
+        with pytest.raises(ValueError):
+            self.client.add_many(elements, max_concurrency=0)
+
+    def test_query_lazy(self):
+        self.client.add_folder('test_fake/query')
+        poses = {pathlib.PurePath('/test_fake/query/pose_{}'.format(i)):
+                 Pose.identity().translate([0.0, 0.0, 0.1 * i])
+                 for i in range(5)}
+        for path, pose in poses.items():
+            self.client.add_pose(path, pose)
+
+        eager = self.client.query_poses('/test_fake/query')
+        assert eager == poses
+
+        lazy = self.client.query_poses('/test_fake/query', lazy=True)
+        assert isinstance(lazy, LazyQueryResult)
+        assert sorted(lazy) == sorted(poses)
+        assert 'decoded=0' in repr(lazy)
+
+        # elements are decoded on access only
+        path = pathlib.PurePath('/test_fake/query/pose_3')
+        assert lazy[str(path)] == poses[path]
+        assert 'decoded=1' in repr(lazy)
+        # the second page holds pose_3, which is already cached
+        assert list(lazy.page(1, 3)) == list(lazy)[3:]
+        assert 'decoded=2' in repr(lazy)
+        assert dict(lazy.items()) == poses
+
+        names = self.client.query_poses('/test_fake/query', names_only=True)
+        assert sorted(names) == sorted(poses)
+        assert lazy.names() == list(lazy)